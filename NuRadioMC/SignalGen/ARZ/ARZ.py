@@ -7,6 +7,7 @@ from scipy import integrate
 from radiotools import coordinatesystems as cstrafo
 from NuRadioReco.utilities.metaclasses import Singleton
 import os
+import json
 import logging
 import six
 try:
@@ -316,11 +317,240 @@ def theta_to_thetaprime(theta, xmax, R):
     return np.arctan2(b, a)
 
 
+def get_library_hashes():
+    """
+    returns the sha1 hash sums of the shower and pulse libraries that are available on the data server
+
+    Returns
+    -------
+    lib_hashs: dict
+        the hash sums, the key is the version of the library ("1.2" for the shower library v1.2,
+        "ARZ_1.1" for the pulse library v1.1)
+    """
+    shower_directory = os.path.join(os.path.dirname(__file__), "shower_library/")
+    with open(os.path.join(shower_directory, 'shower_lib_hash.json'), 'r') as fin:
+        return json.load(fin)
+
+
+def check_and_get_library(path, version_key, URL):
+    """
+    checks if a library exists and is up to date by comparing the sha1sum. If the library does not exist
+    or changes on the server, a new library will be downloaded.
+
+    The sha1sum of the local library is cached (see `NuRadioReco.utilities.io_utilities.get_sha1`), so the
+    library is only hashed again if the file has changed.
+
+    Parameters
+    ----------
+    path: string
+        the path to the pickle file of the library
+    version_key: string
+        the key of the library in the file of hash sums (see `get_library_hashes`)
+    URL: string
+        the URL from which the library is downloaded
+    """
+    download_file = False
+    if(not os.path.exists(path)):
+        logger.warning("library {} does not exist on the local file system yet. It will be downloaded to {}".format(version_key, path))
+        download_file = True
+
+    if(os.path.exists(path)):
+        lib_hashs = get_library_hashes()
+        if(version_key in lib_hashs.keys()):
+            if(io_utilities.get_sha1(path) != lib_hashs[version_key]):
+                logger.warning("library {} has changed on the server. downloading newest version...".format(version_key))
+                download_file = True
+        else:
+            logger.warning("no hash sum of {} available, skipping up-to-date check".format(os.path.basename(path)))
+    if not download_file:
+        return True
+    else:
+        import requests
+
+        logger.info("downloading library {} from {}. This can take a while...".format(version_key, URL))
+        r = requests.get(URL)
+        if (r.status_code != requests.codes.ok):
+            logger.error("error in download of library")
+            raise IOError("error in download of library")
+        with open(path, "wb") as code:
+            code.write(r.content)
+        logger.info("...download finished.")
+
+
+def get_memory_map_filenames(path):
+    """
+    returns the names of the files of the memory-mappable version of a library
+
+    The library is stored as a json index file and a single .npy file that holds all arrays of the library.
+    The index reproduces the nested dictionaries of the library, i.e., (shower type, energy bin) for the shower
+    library and (shower type, energy bin, realisation, viewing angle) for the pulse library. Instead of the
+    arrays, it stores their offset and shape in the .npy file. Scalars are stored directly in the index.
+
+    Parameters
+    ----------
+    path: string
+        the path to the pickle file of the library
+
+    Returns
+    -------
+    filenames: dict
+        the filenames of the index ('index') and of the array file ('data')
+    """
+    base = os.path.splitext(path)[0]
+    return {'index': base + '_index.json',
+            'data': base + '_data.npy'}
+
+
+def convert_library_to_memory_map(path):
+    """
+    converts the pickle file of a library into the memory-mappable format (see `get_memory_map_filenames`)
+
+    The files are written next to the pickle file. Each file is first written to a temporary file and then
+    renamed, so that several processes can convert the same library at the same time.
+
+    Parameters
+    ----------
+    path: string
+        the path to the pickle file of the library
+    """
+    library = io_utilities.read_pickle(path)
+    arrays = []
+    n_entries = [0]
+
+    def to_index(value):
+        if isinstance(value, dict):
+            # the keys are stored as a list of pairs to preserve their type (the energies are floats)
+            return {'type': 'dict', 'items': [[np.asarray(key).item(), to_index(item)] for key, item in value.items()]}
+        if isinstance(value, (np.ndarray, list, tuple)):
+            # e.g. the charge-excess profiles of all realisations of an energy bin, stored as a (n_realisations, n_depths) array
+            array = np.asarray(value, dtype=float)
+            arrays.append(array.ravel())
+            n_entries[0] += array.size
+            return {'type': 'array', 'offset': n_entries[0] - array.size, 'shape': list(array.shape)}
+        return {'type': 'scalar', 'value': np.asarray(value).item()}
+
+    index = {'source': os.path.basename(path),
+             'source_sha1': io_utilities.get_sha1(path),
+             'library': to_index(library)}
+    filenames = get_memory_map_filenames(path)
+    tmp_suffix = ".{}.tmp".format(os.getpid())
+    # the arrays are written one by one into the mapped file to avoid a copy of the complete library in memory
+    data = np.lib.format.open_memmap(filenames['data'] + tmp_suffix, mode='w+', dtype=float, shape=(n_entries[0],))
+    offset = 0
+    for array in arrays:
+        data[offset:offset + array.size] = array
+        offset += array.size
+    data.flush()
+    del data
+    os.replace(filenames['data'] + tmp_suffix, filenames['data'])
+    # the index is written last, it marks the conversion as complete
+    with open(filenames['index'] + tmp_suffix, 'w') as fout:
+        json.dump(index, fout)
+    os.replace(filenames['index'] + tmp_suffix, filenames['index'])
+    logger.info("converted library {} into memory-mappable format".format(path))
+
+
+def get_memory_mapped_library(path):
+    """
+    opens the memory-mappable version of a library (see `get_memory_map_filenames`)
+
+    The arrays of the library are not read into memory but mapped, so that the operating system loads only
+    the profiles (or pulses) that are accessed and all processes that use the same library share the memory
+    (via the page cache). The files are only used if they were converted from the current pickle file.
+
+    Parameters
+    ----------
+    path: string
+        the path to the pickle file of the library
+
+    Returns
+    -------
+    None if no up-to-date memory-mappable version exists, otherwise the library as nested dictionaries
+    whose arrays are (read-only) views into the memory-mapped file
+    """
+    filenames = get_memory_map_filenames(path)
+    if not all([os.path.exists(filename) for filename in filenames.values()]):
+        return None
+    try:
+        with open(filenames['index'], 'r') as fin:
+            index = json.load(fin)
+    except (OSError, ValueError):
+        logger.warning("index file {} of the memory-mapped library can not be read".format(filenames['index']))
+        return None
+    if os.path.exists(path) and index['source_sha1'] != io_utilities.get_sha1(path):
+        logger.warning("memory-mapped library {} does not match the pickle file".format(filenames['index']))
+        return None
+    data = np.load(filenames['data'], mmap_mode='r')
+
+    def from_index(node):
+        if node['type'] == 'dict':
+            return {key: from_index(item) for key, item in node['items']}
+        if node['type'] == 'array':
+            size = int(np.prod(node['shape']))
+            return data[node['offset']:node['offset'] + size].reshape(node['shape'])
+        return node['value']
+
+    return from_index(index['library'])
+
+
+def read_library(path, memory_map=True):
+    """
+    reads a shower or pulse library
+
+    Parameters
+    ----------
+    path: string
+        the path to the pickle file of the library
+    memory_map: bool
+        if True, the library is converted once into a memory-mappable format (see `get_memory_map_filenames`),
+        which is then mapped instead of reading the complete library into memory. If the conversion is
+        not possible (e.g. because the directory is not writable), the pickle file is read.
+
+    Returns
+    -------
+    library: dict
+    """
+    if memory_map:
+        library = get_memory_mapped_library(path)
+        if library is None:
+            try:
+                convert_library_to_memory_map(path)
+                library = get_memory_mapped_library(path)
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning("library {} can not be converted into a memory-mappable format ({}), reading the pickle file instead".format(path, e))
+        if library is not None:
+            logger.info("using memory-mapped library {}".format(path))
+            return library
+    logger.warning("loading library ({}) into memory".format(path))
+    return io_utilities.read_pickle(path)
+
+
 @six.add_metaclass(Singleton)
 class ARZ(object):
 
     def __init__(self, seed=1234, interp_factor=1, interp_factor2=100, library=None,
-                 arz_version='ARZ2020', use_numba=True):
+                 arz_version='ARZ2020', use_numba=True, memory_map=True):
+        """
+        Parameters
+        ----------
+        seed: int
+            the seed of the random number generator that selects the shower realizations
+        interp_factor: int
+            interpolation factor of the charge-excess profiles
+        interp_factor2: int
+            interpolation factor around the peak of the form factor
+        library: string or None
+            path to the pickle file of the shower library. If None, the default library is used
+            (and downloaded if necessary)
+        arz_version: string
+            the parametrization of the form factor, 'ARZ2019' or 'ARZ2020'
+        use_numba: bool
+            use the numba implementation of the vector potential calculation (if numba is available)
+        memory_map: bool
+            if True (default), the shower library is converted once into a memory-mappable format that is mapped
+            instead of being read into memory, so that only the accessed profiles are loaded and all processes
+            share the memory of the library (see `read_library`)
+        """
         logger.warning("setting seed to {}".format(seed, interp_factor))
         self._random_generator = np.random.RandomState(seed)
         self._interp_factor = interp_factor
@@ -330,15 +560,14 @@ class ARZ(object):
         # # load shower library into memory
         if(library is None):
             library = os.path.join(os.path.dirname(__file__), "shower_library/library_v{:d}.{:d}.pkl".format(*self._version))
+            self.__check_and_get_library()
         else:
             if(not os.path.exists(library)):
                 logger.error("user specified shower library {} not found.".format(library))
                 raise FileNotFoundError("user specified shower library {} not found.".format(library))
-        self.__check_and_get_library()
         self.__set_model_parameters(arz_version)
 
-        logger.warning("loading shower library ({}) into memory".format(library))
-        self._library = io_utilities.read_pickle(library)
+        self._library = read_library(library, memory_map=memory_map)
         self._use_numba = use_numba
         if use_numba & (not numba_available):
             logger.warning('Numba implementation was requested, but Numba is unavailable. Using Python implementation instead.')
@@ -351,52 +580,14 @@ class ARZ(object):
         or changes on the server, a new library will be downloaded.
         """
         path = os.path.join(os.path.dirname(__file__), "shower_library/library_v{:d}.{:d}.pkl".format(*self._version))
-
-        download_file = False
-        if(not os.path.exists(path)):
-            logger.warning("shower library version {} does not exist on the local file system yet. It will be downloaded to {}".format(self._version, path))
-            download_file = True
-
-        if(os.path.exists(path)):
-            BUF_SIZE = 65536 * 2 ** 4  # lets read stuff in 64kb chunks!
-            import hashlib
-            import json
-            sha1 = hashlib.sha1()
-            with open(path, 'rb') as f:
-                while True:
-                    data = f.read(BUF_SIZE)
-                    if not data:
-                        break
-                    sha1.update(data)
-
-            shower_directory = os.path.join(os.path.dirname(__file__), "shower_library/")
-            with open(os.path.join(shower_directory, 'shower_lib_hash.json'), 'r') as fin:
-                lib_hashs = json.load(fin)
-                if("{:d}.{:d}".format(*self._version) in lib_hashs.keys()):
-                    if(sha1.hexdigest() != lib_hashs["{:d}.{:d}".format(*self._version)]):
-                        logger.warning("shower library {} has changed on the server. downloading newest version...".format(self._version))
-                        download_file = True
-                else:
-                    logger.warning("no hash sum of {} available, skipping up-to-date check".format(os.path.basename(path)))
-        if not download_file:
-            return True
-        else:
-            import requests
-            URL = 'https://rnog-data.zeuthen.desy.de/shower_library/library_v{:d}.{:d}.pkl'.format(*self._version)
-
-            logger.info("downloading shower library {} from {}. This can take a while...".format(self._version, URL))
-            r = requests.get(URL)
-            if (r.status_code != requests.codes.ok):
-                logger.error("error in download of antenna model")
-                raise IOError("error in download of antenna model")
-            with open(path, "wb") as code:
-                code.write(r.content)
-            logger.info("...download finished.")
+        URL = 'https://rnog-data.zeuthen.desy.de/shower_library/library_v{:d}.{:d}.pkl'.format(*self._version)
+        return check_and_get_library(path, "{:d}.{:d}".format(*self._version), URL)
 
     def __set_model_parameters(self, arz_version='ARZ2020'):
         """
         Sets the parameters for the form factor
         """
+        self._arz_version = arz_version
         if (arz_version == 'ARZ2019'):
             # Refit of ZHAireS results => factor 0.88 in Af_e
             self._Af_e = -4.5e-14 * 0.88 * units.V * units.s
@@ -500,7 +691,8 @@ class ARZ(object):
 
 
     def get_time_trace(self, shower_energy, theta, N, dt, shower_type, n_index, R, shift_for_xmax=False,
-                       same_shower=False, iN=None, output_mode='trace', maximum_angle=20 * units.deg):
+                       same_shower=False, iN=None, output_mode='trace', maximum_angle=20 * units.deg,
+                       random_generator=None, template_bank=None):
         """
         calculates the electric-field Askaryan pulse from a charge-excess profile
 
@@ -508,8 +700,10 @@ class ARZ(object):
         ----------
         shower_energy: float
             the energy of the shower
-        theta: float
-            viewing angle, i.e., the angle between shower axis and launch angle of the signal (the ray path)
+        theta: float or array of floats
+            viewing angle, i.e., the angle between shower axis and launch angle of the signal (the ray path).
+            If an array is given, the pulses of all viewing angles (and distances) are calculated from the same
+            charge-excess profile, which is looked up and interpolated only once.
         N: int
             number of samples in the time domain
         dt: float
@@ -518,7 +712,7 @@ class ARZ(object):
             type of shower, either "HAD" (hadronic) or "EM" (electromagnetic)
         n_index: float (default 1.78)
             index of refraction where the shower development takes place
-        R: float (default 1km)
+        R: float or array of floats (default 1km)
             observation distance, the signal amplitude will be scaled according to 1/R
         interp_factor: int (default 10)
             interpolation factor of charge-excess profile. Results in a more precise numerical integration which might be beneficial
@@ -542,11 +736,19 @@ class ARZ(object):
         maximum_angle: float
             Maximum angular difference allowed between the observer angle and the Cherenkov angle.
             If the difference is greater, the function returns an empty trace.
+        random_generator: None or numpy.random.Generator (default None)
+            if provided, the random shower realization is drawn from this generator instead of the random
+            generator of this class. This allows to use an independent random number stream, e.g. per event group.
+        template_bank: None or `NuRadioMC.SignalGen.ARZ.template_bank.ARZTemplateBank`
+            if provided, the vector potentials of the views that are covered by the template bank (shower profile,
+            index of refraction and viewing angle) are interpolated from the precomputed templates of the bank
+            instead of being calculated. Not supported together with `shift_for_xmax`.
 
         Returns
         -------
         efield_trace: array of floats
-            array of electric-field time trace in 'on-sky' coordinate system eR, eTheta, ePhi
+            array of electric-field time trace in 'on-sky' coordinate system eR, eTheta, ePhi, i.e., of shape (3, N),
+            or of shape (n_views, 3, N) if `theta` or `R` is an array
         """
         if not shower_type in self._library.keys():
             raise KeyError("shower type {} not present in library. Available shower types are {}".format(shower_type, *self._library.keys()))
@@ -567,6 +769,11 @@ class ARZ(object):
 
         N_profiles = len(profiles['charge_excess'])
 
+        def draw_profile_id():
+            if random_generator is not None:
+                return random_generator.integers(N_profiles)
+            return self._random_generator.randint(N_profiles)
+
         if(iN is None or np.isnan(iN)):
             if(same_shower):
                 if(shower_type in self._random_numbers):
@@ -574,11 +781,11 @@ class ARZ(object):
                     logger.info("using previously used shower {}/{}".format(iN, N_profiles))
                 else:
                     logger.warning("no previous random number for shower type {} exists. Generating a new random number.".format(shower_type))
-                    iN = self._random_generator.randint(N_profiles)
+                    iN = draw_profile_id()
                     self._random_numbers[shower_type] = iN
                     logger.info("picking profile {}/{} randomly".format(iN, N_profiles))
             else:
-                iN = self._random_generator.randint(N_profiles)
+                iN = draw_profile_id()
                 self._random_numbers[shower_type] = iN
                 logger.info("picking profile {}/{} randomly".format(iN, N_profiles))
         else:
@@ -586,19 +793,87 @@ class ARZ(object):
             logger.info("using shower {}/{} as specified by user".format(iN, N_profiles))
             self._random_numbers[shower_type] = iN
 
+        is_batch = np.ndim(theta) > 0 or np.ndim(R) > 0
+        thetas, distances = np.broadcast_arrays(np.atleast_1d(theta), np.atleast_1d(R))
+        traces_onsky = np.zeros((len(thetas), 3, N))
+
         # we always need to generate a random shower realization. The second ray tracing solution might be closer
         # to the cherenkov angle, but NuRadioMC will reuse the shower realization of the first ray tracing solution.
-        if np.abs(theta - cherenkov_angle) > maximum_angle:
-            logger.info(f"viewing angle {theta/units.deg:.1f}deg is more than {maximum_angle/units.deg:.1f}deg away from the cherenkov cone. Returning zero trace.")
-            empty_trace = np.zeros((3, N))
-            return empty_trace
+        in_range = np.abs(thetas - cherenkov_angle) <= maximum_angle
+        for theta_view in thetas[~in_range]:
+            logger.info(f"viewing angle {theta_view/units.deg:.1f}deg is more than {maximum_angle/units.deg:.1f}deg away from the cherenkov cone. Returning zero trace.")
+        if not np.any(in_range):
+            return traces_onsky if is_batch else traces_onsky[0]
 
         profile_depth = profiles['depth']
         profile_ce = profiles['charge_excess'][iN] * rescaling_factor
 
         xmax = profile_depth[np.argmax(profile_ce)]
 
-        # get the appropriate model parameters
+        # the interpolation of the charge-excess profile is the same for all viewing angles, it is done here once
+        # instead of in every call of the vector potential calculation
+        profile_depth_interp = profile_depth
+        profile_ce_interp = profile_ce
+        if(self._interp_factor != 1):
+            profile_depth_interp = np.linspace(min(profile_depth), max(profile_depth), int(self._interp_factor * len(profile_depth)))
+            profile_ce_interp = np.interp(profile_depth_interp, profile_depth, profile_ce)
+
+        # the vector potentials of the views that are covered by the template bank are interpolated from the bank,
+        # the vector potentials of all other views are calculated
+        vps_bank, in_bank = None, np.zeros(len(thetas), dtype=bool)
+        if template_bank is not None and not shift_for_xmax:
+            vps_bank, in_bank = template_bank.get_vector_potential(
+                self, shower_type, energies[iE], iN, thetas, distances, n_index, N, dt)
+            if vps_bank is not None:
+                # the amplitude of the vector potential is proportional to the shower energy (and the em fraction)
+                if shower_type == "HAD":
+                    energy_factor = shower_energy * self.em_fraction(shower_energy) / (energies[iE] * self.em_fraction(energies[iE]))
+                else:
+                    energy_factor = shower_energy / energies[iE]
+                vps_bank *= energy_factor
+        for i_view in np.flatnonzero(in_range):
+            if in_bank[i_view]:
+                vp = vps_bank[i_view]
+            else:
+                vp = self.get_profile_vector_potential(
+                    shower_energy, thetas[i_view], N, dt, shower_type, n_index, distances[i_view],
+                    profile_depth_interp, profile_ce_interp, shift_for_xmax=shift_for_xmax)
+            trace = -np.diff(vp, axis=0) / dt
+
+            # use viewing angle relative to shower maximum for rotation into spherical coordinate system (that reduced eR component)
+            if shift_for_xmax:  # if we shifted the observerposition already to be relative to Xmax, we don't need to do that here.
+                thetaprime = thetas[i_view]
+            else:
+                thetaprime = theta_to_thetaprime(thetas[i_view], xmax, distances[i_view])
+            cs = cstrafo.cstrafo(zenith=thetaprime, azimuth=0)
+            traces_onsky[i_view] = cs.transform_from_ground_to_onsky(trace.T)
+        trace_onsky = traces_onsky if is_batch else traces_onsky[0]
+        if(output_mode == 'full'):
+            return trace_onsky, profile_depth, profile_ce
+        elif(output_mode == 'Xmax'):
+            xmax = profile_depth[np.argmax(profile_ce)]
+            Lmax = xmax / rho
+            return trace_onsky, Lmax
+        return trace_onsky
+
+    def get_model_parameters(self, shower_type, shower_energy):
+        """
+        returns the parameters of the form factor and the energy fraction of the electromagnetic component
+
+        Parameters
+        ----------
+        shower_type: string
+            type of shower, either "HAD" (hadronic) or "EM" (electromagnetic)
+        shower_energy: float
+            the energy of the shower
+
+        Returns
+        -------
+        model_parameters: dict
+            the parameters of the form factor (keyword arguments of `get_vector_potential`)
+        em_factor: float
+            the energy fraction of the electromagnetic component of the shower
+        """
         if shower_type == "HAD":
             model_parameters = dict(
                 Af = self._Af_p,
@@ -628,37 +903,52 @@ class ARZ(object):
             msg = "showers of type {} are not implemented. Use 'HAD', 'EM'".format(shower_type)
             logger.error(msg)
             raise NotImplementedError(msg)
-        if self._use_numba:
-            vp = get_vector_potential_numba(
-                shower_energy, theta, N, dt, profile_depth, profile_ce,
-                shower_type=shower_type, n_index=n_index, distance=R,
-                interp_factor=self._interp_factor, interp_factor2=self._interp_factor2,
-                shift_for_xmax=shift_for_xmax, **model_parameters, em_factor=em_factor
-            )
-        else:
-            vp = get_vector_potential(
-                shower_energy, theta, N, dt, profile_depth, profile_ce,
-                shower_type=shower_type, n_index=n_index, distance=R,
-                interp_factor=self._interp_factor, interp_factor2=self._interp_factor2,
-                shift_for_xmax=shift_for_xmax, **model_parameters, em_factor=em_factor
-            )
-        trace = -np.diff(vp, axis=0) / dt
-#         trace = -np.gradient(vp, axis=0) / dt
+        return model_parameters, em_factor
 
-        # use viewing angle relative to shower maximum for rotation into spherical coordinate system (that reduced eR component)
-        if shift_for_xmax:  # if we shifted the observerposition already to be relative to Xmax, we don't need to do that here.
-            thetaprime = theta
-        else:
-            thetaprime = theta_to_thetaprime(theta, xmax, R)
-        cs = cstrafo.cstrafo(zenith=thetaprime, azimuth=0)
-        trace_onsky = cs.transform_from_ground_to_onsky(trace.T)
-        if(output_mode == 'full'):
-            return trace_onsky, profile_depth, profile_ce
-        elif(output_mode == 'Xmax'):
-            xmax = profile_depth[np.argmax(profile_ce)]
-            Lmax = xmax / rho
-            return trace_onsky, Lmax
-        return trace_onsky
+    def get_profile_vector_potential(self, shower_energy, theta, N, dt, shower_type, n_index, R,
+                                     profile_depth, profile_ce, shift_for_xmax=False):
+        """
+        calculates the vector potential of a charge-excess profile with the model parameters and the
+        numerical settings (interpolation factor around the peak of the form factor, numba) of this class
+
+        Parameters
+        ----------
+        shower_energy: float
+            the energy of the shower
+        theta: float
+            viewing angle
+        N: int
+            number of samples in the time domain
+        dt: float
+            size of one time bin in units of time
+        shower_type: string
+            type of shower, either "HAD" (hadronic) or "EM" (electromagnetic)
+        n_index: float
+            index of refraction where the shower development takes place
+        R: float
+            observation distance
+        profile_depth: array of floats
+            shower depth values of the (already interpolated) charge-excess profile
+        profile_ce: array of floats
+            charge-excess values of the (already interpolated) charge-excess profile
+        shift_for_xmax: bool
+            if True the observer position is placed relative to the position of the shower maximum
+
+        Returns
+        -------
+        vp: array of floats
+            the vector potential, of shape (N + 1, 3)
+        """
+        model_parameters, em_factor = self.get_model_parameters(shower_type, shower_energy)
+        vector_potential_function = get_vector_potential
+        if self._use_numba:
+            vector_potential_function = get_vector_potential_numba
+        return vector_potential_function(
+            shower_energy, theta, N, dt, profile_depth, profile_ce,
+            shower_type=shower_type, n_index=n_index, distance=R,
+            interp_factor=1, interp_factor2=self._interp_factor2,
+            shift_for_xmax=shift_for_xmax, **model_parameters, em_factor=em_factor
+        )
 
     def get_last_shower_profile_id(self):
         """
@@ -1072,12 +1362,12 @@ class ARZ(object):
 class ARZ_tabulated(object):
     __instance = None
 
-    def __new__(cls, seed=1234, library=None):
+    def __new__(cls, seed=1234, library=None, memory_map=True):
         if ARZ_tabulated.__instance is None:
             ARZ_tabulated.__instance = object.__new__(cls, seed, library)
         return ARZ_tabulated.__instance
 
-    def __init__(self, seed=1234, library=None):
+    def __init__(self, seed=1234, library=None, memory_map=True):
         logger.warning("setting seed to {}".format(seed))
         self._random_generator = np.random.RandomState(seed)
         self._random_numbers = {}
@@ -1085,14 +1375,13 @@ class ARZ_tabulated(object):
         # # load shower library into memory
         if(library is None):
             library = os.path.join(os.path.dirname(__file__), "shower_library/ARZ_library_v{:d}.{:d}.pkl".format(*self._version))
+            self.__check_and_get_library()
         else:
             if(not os.path.exists(library)):
                 logger.error("user specified pulse library {} not found.".format(library))
                 raise FileNotFoundError("user specified pulse library {} not found.".format(library))
-        self.__check_and_get_library()
 
-        logger.warning("loading pulse library into memory")
-        self._library = io_utilities.read_pickle(library)
+        self._library = read_library(library, memory_map=memory_map)
 
     def __check_and_get_library(self):
         """
@@ -1100,47 +1389,8 @@ class ARZ_tabulated(object):
         or changes on the server, a new library will be downloaded.
         """
         path = os.path.join(os.path.dirname(__file__), "shower_library/ARZ_library_v{:d}.{:d}.pkl".format(*self._version))
-
-        download_file = False
-        if(not os.path.exists(path)):
-            logger.warning("ARZ library version {} does not exist on the local file system yet. It will be downloaded to {}".format(self._version, path))
-            download_file = True
-
-        if(os.path.exists(path)):
-            BUF_SIZE = 65536 * 2 ** 4  # lets read stuff in 64kb chunks!
-            import hashlib
-            import json
-            sha1 = hashlib.sha1()
-            with open(path, 'rb') as f:
-                while True:
-                    data = f.read(BUF_SIZE)
-                    if not data:
-                        break
-                    sha1.update(data)
-
-            shower_directory = os.path.join(os.path.dirname(__file__), "shower_library/")
-            with open(os.path.join(shower_directory, 'shower_lib_hash.json'), 'r') as fin:
-                lib_hashs = json.load(fin)
-                if("ARZ_{:d}.{:d}".format(*self._version) in lib_hashs.keys()):
-                    if(sha1.hexdigest() != lib_hashs["{:d}.{:d}".format(*self._version)]):
-                        logger.warning("pulse library {} has changed on the server. downloading newest version...".format(self._version))
-                        download_file = True
-                else:
-                    logger.warning("no hash sum of {} available, skipping up-to-date check".format(os.path.basename(path)))
-        if not download_file:
-            return True
-        else:
-            import requests
-            URL = 'http://arianna.ps.uci.edu/~arianna/data/ce_shower_library/ARZ_library_v{:d}.{:d}.pkl'.format(*self._version)
-
-            logger.info("downloading pulse library {} from {}. This can take a while...".format(self._version, URL))
-            r = requests.get(URL)
-            if (r.status_code != requests.codes.ok):
-                logger.error("error in download of antenna model")
-                raise IOError("error in download of antenna model")
-            with open(path, "wb") as code:
-                code.write(r.content)
-            logger.info("...download finished.")
+        URL = 'http://arianna.ps.uci.edu/~arianna/data/ce_shower_library/ARZ_library_v{:d}.{:d}.pkl'.format(*self._version)
+        return check_and_get_library(path, "ARZ_{:d}.{:d}".format(*self._version), URL)
 
     def set_seed(self, seed):
         """
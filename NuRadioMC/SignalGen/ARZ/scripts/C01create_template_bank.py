@@ -0,0 +1,64 @@
+import numpy as np
+import argparse
+import logging
+from NuRadioReco.utilities import units
+from NuRadioMC.SignalGen.ARZ import ARZ, template_bank
+
+"""
+creates a bank of precomputed ARZ vector potentials (see `NuRadioMC.SignalGen.ARZ.template_bank`) for the
+charge-excess profiles of the shower library and validates it against the exact calculation
+
+The template bank can be used in a simulation by setting the `signal/arz_template_bank` option of the config file.
+"""
+
+logger = logging.getLogger("SignalGen.ARZ.template_bank")
+logging.basicConfig(level=logging.WARNING)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='create a bank of precomputed ARZ vector potentials')
+    parser.add_argument('outputfilename', type=str, help='the hdf5 file of the template bank')
+    parser.add_argument('--library', type=str, default=None,
+                        help='path to the shower library (default: the shower library of the ARZ model)')
+    parser.add_argument('--arz_version', type=str, default='ARZ2020', help='ARZ2019 or ARZ2020')
+    parser.add_argument('--shower_types', type=str, nargs='+', default=['HAD', 'EM'], help='the shower types')
+    parser.add_argument('--energies', type=float, nargs='+', default=None,
+                        help='the energies (in eV) of the shower library (default: all energies)')
+    parser.add_argument('--realisations', type=int, nargs='+', default=None,
+                        help='the indices of the charge-excess profiles (default: all profiles)')
+    parser.add_argument('--n_index', type=float, default=1.78, help='the reference index of refraction')
+    parser.add_argument('--distances', type=float, nargs='+', default=[0.3, 0.5, 0.8, 1.3, 2, 3.2, 5],
+                        help='the reference distances in km')
+    parser.add_argument('--dt', type=float, default=0.05, help='the sampling of the templates in ns')
+    parser.add_argument('--N', type=int, default=4000, help='the number of samples of the templates')
+    parser.add_argument('--accuracy', type=float, default=1e-2,
+                        help='the accuracy of the interpolation between neighbouring viewing angles')
+    parser.add_argument('--max_frequency', type=float, default=1,
+                        help='the maximum frequency (in GHz) that is considered for the accuracy')
+    parser.add_argument('--validate', action='store_true', help='compare the bank with the exact calculation')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    if args.verbose:
+        logger.setLevel(logging.INFO)
+
+    arz = ARZ.ARZ(arz_version=args.arz_version, library=args.library)
+    profiles = []
+    for shower_type in args.shower_types:
+        library = arz._library[shower_type]
+        energies = library.keys() if args.energies is None else np.array(args.energies) * units.eV
+        for energy in energies:
+            energy = min(library.keys(), key=lambda x: abs(np.log10(x / energy)))
+            iNs = range(len(library[energy]['charge_excess'])) if args.realisations is None else args.realisations
+            profiles.extend([(shower_type, energy, iN) for iN in iNs])
+    print(f"creating templates of {len(profiles)} charge-excess profiles")
+    template_bank.create_template_bank(args.outputfilename, arz, profiles, n_index=args.n_index,
+                                       distances=np.array(args.distances) * units.km, N=args.N, dt=args.dt * units.ns,
+                                       accuracy=args.accuracy, max_frequency=args.max_frequency * units.GHz)
+
+    if args.validate:
+        bank = template_bank.ARZTemplateBank(args.outputfilename)
+        # the distances in between the reference distances are the least accurate ones
+        distances = np.sqrt(np.array(args.distances[1:]) * np.array(args.distances[:-1])) * units.km
+        errors = template_bank.validate_template_bank(bank, arz, 1024, args.dt * units.ns, distances,
+                                                      n_indices=[args.n_index])
+        for (shower_type, energy, iN), error in errors.items():
+            print(f"{shower_type} E = {energy / units.eV:.2g} eV, realisation {iN}: maximum deviation {100 * error:.2f}%")
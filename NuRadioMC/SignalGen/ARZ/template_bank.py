@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+"""
+Bank of precomputed ARZ vector potentials
+
+The calculation of the vector potential of the ARZ model (`NuRadioMC.SignalGen.ARZ.ARZ.get_vector_potential`) is
+by far the most expensive part of a simulation with the ARZ model. This module tabulates, for each charge-excess
+profile of the shower library, the vector potential at a few reference distances and a reference index of
+refraction on a grid of viewing angles around the Cherenkov cone (`create_template_bank`). The vector potential of
+any other view is then obtained by interpolating between the neighbouring viewing angles and reference distances
+and scaling the amplitude with 1/R (`ARZTemplateBank.get_vector_potential`), which is used by `ARZ.get_time_trace`
+if a template bank is passed.
+
+The templates are tabulated relative to the shower maximum, i.e., as a function of the viewing angle and the
+distance as seen from the shower maximum and with the time axis aligned to the arrival time of the signal from the
+shower maximum. The angular grid is refined adaptively until the linear interpolation between neighbouring angles
+reproduces the exact calculation to the requested accuracy. The remaining approximations (interpolation in the
+distance, small deviations of the index of refraction) can be quantified with `validate_template_bank`.
+"""
+import numpy as np
+import logging
+import os
+from NuRadioReco.utilities import units
+from NuRadioMC.SignalGen.ARZ.ARZ import rho, c
+
+logger = logging.getLogger("SignalGen.ARZ.template_bank")
+
+
+def get_time_grid(N, dt):
+    """
+    returns the times at which `get_vector_potential` calculates the vector potential (relative to the
+    observer time of the start of the shower)
+
+    Parameters
+    ----------
+    N: int
+        number of samples in the time domain
+    dt: float
+        size of one time bin in units of time
+    """
+    ttt = np.arange(0, (N + 1) * dt, dt)
+    ttt = ttt + 0.5 * dt - ttt.mean()
+    if(len(ttt) != N + 1):
+        ttt = ttt[:-1]
+    return ttt
+
+
+def get_xmax_geometry(theta, R, xmax_length, n_index):
+    """
+    returns the viewing angle and distance relative to the shower maximum and the time offset between the
+    arrival time of the signal from the shower maximum and the observer time of the start of the shower
+
+    Parameters
+    ----------
+    theta: float or array of floats
+        viewing angle relative to the start of the shower
+    R: float or array of floats
+        distance from the start of the shower
+    xmax_length: float
+        the position of the shower maximum along the shower axis (in units of length)
+    n_index: float
+        index of refraction
+
+    Returns
+    -------
+    theta_xmax, R_xmax, t_xmax: floats or arrays of floats
+    """
+    x = R * np.sin(theta)
+    z = R * np.cos(theta) - xmax_length
+    R_xmax = (x ** 2 + z ** 2) ** 0.5
+    t_xmax = (xmax_length + n_index * R_xmax - n_index * R) / c
+    return np.arctan2(x, z), R_xmax, t_xmax
+
+
+def _get_interpolated_profile(arz, shower_type, energy, iN):
+    """
+    returns the charge-excess profile of the shower library interpolated in the same way as in `ARZ.get_time_trace`
+    """
+    profile_depth, profile_ce = arz.get_shower_profile(energy, shower_type, iN)
+    if(arz._interp_factor != 1):
+        profile_depth_interp = np.linspace(min(profile_depth), max(profile_depth), int(arz._interp_factor * len(profile_depth)))
+        profile_ce = np.interp(profile_depth_interp, profile_depth, profile_ce)
+        profile_depth = profile_depth_interp
+    return profile_depth, profile_ce
+
+
+def _sample_template(t, t0, dt, vector_potential):
+    """
+    cubic (Catmull-Rom) interpolation of a template with start time `t0` and sampling `dt` at the times `t`
+
+    A linear interpolation would attenuate the signal by up to 1% at 1 GHz for a sampling of 50ps.
+    """
+    # the template is padded with zeros, the vector potential vanishes outside of the template
+    vp = np.concatenate((np.zeros((2, vector_potential.shape[1])), vector_potential,
+                         np.zeros((3, vector_potential.shape[1]))))
+    index = np.clip((t - t0) / dt, -1, vector_potential.shape[0]) + 2
+    i = np.floor(index).astype(int)
+    f = (index - i)[:, None]
+    return (vp[i - 1] * (-f ** 3 + 2 * f ** 2 - f) + vp[i] * (3 * f ** 3 - 5 * f ** 2 + 2) +
+            vp[i + 1] * (-3 * f ** 3 + 4 * f ** 2 + f) + vp[i + 2] * (f ** 3 - f ** 2)) / 2
+
+
+def _get_band_limited_trace(trace, dt, max_frequency):
+    """
+    returns the trace (time along the first axis) with all frequencies above `max_frequency` removed
+    """
+    spectrum = np.fft.rfft(trace, axis=0)
+    spectrum[np.fft.rfftfreq(trace.shape[0], dt) > max_frequency] = 0
+    return np.fft.irfft(spectrum, trace.shape[0], axis=0)
+
+
+def calculate_templates(arz, shower_type, energy, iN, n_index=1.78, distance=1 * units.km, N=4000,
+                        dt=0.05 * units.ns, delta_thetas=np.arange(-21, 21.1, 0.25) * units.deg,
+                        accuracy=1e-2, max_frequency=1 * units.GHz, max_refinements=6):
+    """
+    calculates the templates of one charge-excess profile of the shower library
+
+    The grid of viewing angles is refined by bisection until the linear interpolation between two neighbouring
+    viewing angles agrees with the exact calculation at the center of the interval, i.e., until the maximum
+    deviation of the electric field is smaller than `accuracy` times the maximum amplitude of the electric field.
+    The comparison is done for the electric field below `max_frequency`: the form factor of the ARZ model has
+    structures on the 10ps scale, so the unfiltered pulses sampled at the (coarser) sampling of a simulation are
+    dominated by aliasing and can not be reproduced by an interpolation.
+
+    Parameters
+    ----------
+    arz: `NuRadioMC.SignalGen.ARZ.ARZ.ARZ`
+        the ARZ object (shower library, model parameters and numerical settings) used for the calculation
+    shower_type: string
+        type of shower, either "HAD" (hadronic) or "EM" (electromagnetic)
+    energy: float
+        the energy of the profile in the shower library
+    iN: int
+        the index of the profile
+    n_index: float
+        the reference index of refraction
+    distance: float
+        the reference distance from the shower maximum
+    N: int
+        number of samples of the templates
+    dt: float
+        sampling of the templates
+    delta_thetas: array of floats
+        the initial grid of viewing angles (seen from the shower maximum) relative to the Cherenkov angle
+    accuracy: float
+        the target accuracy of the interpolation in the viewing angle
+    max_frequency: float
+        the maximum frequency that is considered in the comparison with the exact calculation
+    max_refinements: int
+        maximum number of bisections of an interval of the initial grid
+
+    Returns
+    -------
+    templates: dict
+        'delta_theta': the grid of viewing angles relative to the Cherenkov angle,
+        't0': the start time of each template relative to the arrival time of the signal from the shower maximum,
+        'vector_potential': the x and z component of the vector potential, array of shape (n_angles, N + 1, 2),
+        'xmax_length': the position of the shower maximum along the shower axis,
+        'max_error': the maximum deviation of the interpolation found in the refinement
+    """
+    profile_depth, profile_ce = _get_interpolated_profile(arz, shower_type, energy, iN)
+    xmax_length = (profile_depth / rho)[np.argmax(profile_ce)]
+    cherenkov_angle = np.arccos(1. / n_index)
+    ttt = get_time_grid(N, dt)
+
+    def calculate_template(delta_theta):
+        theta = cherenkov_angle + delta_theta
+        vp = arz.get_profile_vector_potential(energy, theta, N, dt, shower_type, n_index, distance,
+                                              profile_depth, profile_ce, shift_for_xmax=True)
+        # the observer is placed at `distance` from the shower maximum
+        R = ((distance * np.sin(theta)) ** 2 + (distance * np.cos(theta) + xmax_length) ** 2) ** 0.5
+        t0 = ttt[0] + (n_index * R - xmax_length - n_index * distance) / c
+        return t0, vp[:, [0, 2]]
+
+    templates = {delta_theta: calculate_template(delta_theta) for delta_theta in delta_thetas}
+    intervals = list(zip(delta_thetas[:-1], delta_thetas[1:]))
+    max_error = 0
+    for i_refinement in range(max_refinements + 1):
+        failed_intervals = []
+        for delta_theta1, delta_theta2 in intervals:
+            delta_theta = 0.5 * (delta_theta1 + delta_theta2)
+            t0, vp = calculate_template(delta_theta)
+            t = t0 + np.arange(vp.shape[0]) * dt
+            vp_interp = 0.5 * (_sample_template(t, templates[delta_theta1][0], dt, templates[delta_theta1][1]) +
+                               _sample_template(t, templates[delta_theta2][0], dt, templates[delta_theta2][1]))
+            efield = _get_band_limited_trace(np.diff(vp, axis=0), dt, max_frequency)
+            efield_interp = _get_band_limited_trace(np.diff(vp_interp, axis=0), dt, max_frequency)
+            norm = np.max(np.abs(efield))
+            error = 0 if norm == 0 else np.max(np.abs(efield_interp - efield)) / norm
+            if error > accuracy and i_refinement < max_refinements:
+                templates[delta_theta] = (t0, vp)
+                failed_intervals += [(delta_theta1, delta_theta), (delta_theta, delta_theta2)]
+            else:
+                max_error = max(max_error, error)
+        logger.info("refinement {}: {} of {} intervals do not reach the target accuracy of {:.2g}".format(
+            i_refinement, len(failed_intervals) // 2, len(intervals), accuracy))
+        intervals = failed_intervals
+        if not len(intervals):
+            break
+
+    delta_theta_grid = np.array(sorted(templates))
+    return {'delta_theta': delta_theta_grid,
+            't0': np.array([templates[delta_theta][0] for delta_theta in delta_theta_grid]),
+            'vector_potential': np.array([templates[delta_theta][1] for delta_theta in delta_theta_grid]),
+            'xmax_length': xmax_length,
+            'max_error': max_error}
+
+
+def create_template_bank(filename, arz, profiles, n_index=1.78,
+                         distances=np.array([0.3, 0.5, 0.8, 1.3, 2, 3.2, 5]) * units.km, N=4000,
+                         dt=0.05 * units.ns, delta_thetas=np.arange(-21, 21.1, 0.25) * units.deg,
+                         accuracy=1e-2, max_frequency=1 * units.GHz, max_refinements=6):
+    """
+    calculates the templates of several charge-excess profiles at several reference distances
+    (see `calculate_templates`) and adds them to a template bank file
+
+    If the file exists, the profiles are added to it (the reference parameters have to agree).
+
+    Parameters
+    ----------
+    filename: string
+        the hdf5 file of the template bank
+    arz: `NuRadioMC.SignalGen.ARZ.ARZ.ARZ`
+        the ARZ object (shower library, model parameters and numerical settings) used for the calculation
+    profiles: list of tuples
+        (shower_type, energy, iN) of the profiles of the shower library
+    distances: array of floats
+        the reference distances (from the shower maximum). The vector potential at other distances is
+        interpolated logarithmically between the neighbouring reference distances
+    other parameters:
+        see `calculate_templates`
+    """
+    import h5py
+    attributes = {'arz_version': arz._arz_version, 'interp_factor': arz._interp_factor,
+                  'interp_factor2': arz._interp_factor2, 'n_index': n_index, 'distances': np.sort(distances),
+                  'dt': dt, 'N': N, 'accuracy': accuracy, 'max_frequency': max_frequency}
+    with h5py.File(filename, 'a') as fout:
+        for key, value in attributes.items():
+            if key not in fout.attrs:
+                fout.attrs[key] = value
+            elif np.any(fout.attrs[key] != value):
+                raise ValueError("the template bank {} was created with {} = {} (requested {})".format(
+                    filename, key, fout.attrs[key], value))
+        for shower_type, energy, iN in profiles:
+            name = "{}/{!r}/{:d}".format(shower_type, float(energy), iN)
+            if name in fout:
+                logger.warning("templates of profile {} already exist, skipping".format(name))
+                continue
+            group = fout.create_group(name)
+            for i_distance, distance in enumerate(attributes['distances']):
+                logger.info("calculating templates of profile {} at distance {:.0f}m".format(name, distance / units.m))
+                templates = calculate_templates(arz, shower_type, energy, iN, n_index=n_index, distance=distance,
+                                                N=N, dt=dt, delta_thetas=delta_thetas, accuracy=accuracy,
+                                                max_frequency=max_frequency, max_refinements=max_refinements)
+                group_distance = group.create_group("{:d}".format(i_distance))
+                for key in ['delta_theta', 't0', 'vector_potential']:
+                    group_distance[key] = templates[key]
+                group_distance.attrs['max_error'] = templates['max_error']
+                logger.info("{}: {} viewing angles, maximum interpolation error {:.2g}".format(
+                    name, len(templates['delta_theta']), templates['max_error']))
+            group.attrs['shower_type'] = shower_type
+            group.attrs['energy'] = energy
+            group.attrs['iN'] = iN
+            group.attrs['xmax_length'] = templates['xmax_length']
+
+
+class ARZTemplateBank(object):
+    """
+    serves the vector potentials of the ARZ model from a bank of precomputed templates (see `create_template_bank`)
+
+    The templates of a profile are read from the file when they are requested for the first time and are then kept
+    in memory. The file is opened separately in each process (HDF5 file handles can not be shared with processes
+    that are forked after the file was opened, e.g. the worker processes of a parallel simulation run).
+    """
+
+    def __init__(self, filename, n_index_tolerance=0.01):
+        """
+        Parameters
+        ----------
+        filename: string
+            the hdf5 file of the template bank
+        n_index_tolerance: float
+            the templates are used if the index of refraction differs by at most this value from the reference
+            index of refraction of the templates. The viewing angle is then taken relative to the Cherenkov angle.
+            For larger differences the vector potential is calculated.
+        """
+        import h5py
+        self._filename = filename
+        self._file = None
+        self._file_pid = None  # the id of the process that opened `_file`
+        self._n_index_tolerance = n_index_tolerance
+        self._profiles = {}
+        self._templates = {}
+        self._n_interpolated = 0
+        self._n_calculated = 0
+        with h5py.File(filename, 'r') as fin:
+            self._attributes = dict(fin.attrs)
+            fin.visititems(self.__add_profile)
+        logger.info("read template bank {} with {} profiles".format(filename, len(self._profiles)))
+
+    def __add_profile(self, name, item):
+        if 'xmax_length' in item.attrs:
+            self._profiles[(item.attrs['shower_type'], float(item.attrs['energy']), int(item.attrs['iN']))] = name
+
+    def is_compatible(self, arz):
+        """
+        returns True if the templates were calculated with the model parameters and numerical settings of
+        the ARZ object
+        """
+        return (self._attributes['arz_version'] == arz._arz_version and
+                self._attributes['interp_factor'] == arz._interp_factor and
+                self._attributes['interp_factor2'] == arz._interp_factor2)
+
+    def get_profiles(self):
+        """
+        returns the (shower_type, energy, iN) of all profiles in the bank
+        """
+        return list(self._profiles.keys())
+
+    def get_statistics(self):
+        """
+        returns the number of views whose vector potential was interpolated from the templates ('interpolated') and
+        the number of requested views that are not covered by the bank ('calculated')
+        """
+        return {'interpolated': self._n_interpolated, 'calculated': self._n_calculated}
+
+    def __get_file(self):
+        """
+        returns the hdf5 file of the template bank, opened by the current process
+        """
+        if self._file is None or self._file_pid != os.getpid():
+            import h5py
+            # the handle of a parent process is not closed, it is still used by the parent
+            self._file = h5py.File(self._filename, 'r')
+            self._file_pid = os.getpid()
+        return self._file
+
+    def __get_templates(self, key):
+        if key not in self._templates:
+            group = self.__get_file()[self._profiles[key]]
+            self._templates[key] = {'xmax_length': group.attrs['xmax_length'],
+                                    'distances': [{'delta_theta': group[name]['delta_theta'][()],
+                                                   't0': group[name]['t0'][()],
+                                                   'vector_potential': group[name]['vector_potential'][()]}
+                                                  for name in sorted(group.keys(), key=int)]}
+        return self._templates[key]
+
+    def __interpolate(self, templates, delta_theta, t):
+        """
+        interpolates the templates of one reference distance to the viewing angle `delta_theta` and the times `t`
+        """
+        grid = templates['delta_theta']
+        i_angle = min(max(np.searchsorted(grid, delta_theta) - 1, 0), len(grid) - 2)
+        weight = (delta_theta - grid[i_angle]) / (grid[i_angle + 1] - grid[i_angle])
+        vp = (1 - weight) * _sample_template(t, templates['t0'][i_angle], self._attributes['dt'],
+                                             templates['vector_potential'][i_angle])
+        vp += weight * _sample_template(t, templates['t0'][i_angle + 1], self._attributes['dt'],
+                                        templates['vector_potential'][i_angle + 1])
+        return vp
+
+    def get_vector_potential(self, arz, shower_type, energy, iN, theta, R, n_index, N, dt):
+        """
+        returns the vector potentials of several views of a charge-excess profile
+
+        The vector potential is interpolated linearly in the viewing angle (relative to the Cherenkov angle) and
+        logarithmically in the distance (after scaling the templates of the reference distances with 1/R).
+        Outside of the range of reference distances, the template of the closest reference distance is scaled
+        with 1/R.
+
+        Parameters
+        ----------
+        arz: `NuRadioMC.SignalGen.ARZ.ARZ.ARZ`
+            the ARZ object that requests the vector potential (to check that the settings are compatible)
+        shower_type: string
+            type of shower, either "HAD" (hadronic) or "EM" (electromagnetic)
+        energy: float
+            the energy of the profile in the shower library
+        iN: int
+            the index of the profile
+        theta: array of floats
+            the viewing angles (relative to the start of the shower)
+        R: array of floats
+            the distances (relative to the start of the shower)
+        n_index: float
+            index of refraction where the shower development takes place
+        N: int
+            number of samples in the time domain
+        dt: float
+            size of one time bin in units of time
+
+        Returns
+        -------
+        vector_potential: array of floats or None
+            the vector potentials of shape (n_views, N + 1, 3) as calculated by `get_vector_potential` for the energy
+            of the profile, None if the profile is not covered by the bank
+        in_bank: array of bools
+            True for the views that are covered by the bank
+        """
+        theta = np.atleast_1d(theta)
+        R = np.atleast_1d(R)
+        in_bank = np.zeros(len(theta), dtype=bool)
+        key = (shower_type, float(energy), int(iN))
+        if (key not in self._profiles or not self.is_compatible(arz) or
+                np.abs(n_index - self._attributes['n_index']) > self._n_index_tolerance):
+            self._n_calculated += len(theta)
+            return None, in_bank
+        templates = self.__get_templates(key)
+        theta_xmax, R_xmax, t_xmax = get_xmax_geometry(theta, R, templates['xmax_length'], n_index)
+        delta_theta = theta_xmax - np.arccos(1. / n_index)
+        in_bank = np.ones(len(theta), dtype=bool)
+        for templates_distance in templates['distances']:
+            in_bank &= ((delta_theta >= templates_distance['delta_theta'][0]) &
+                        (delta_theta <= templates_distance['delta_theta'][-1]))
+        self._n_interpolated += np.sum(in_bank)
+        self._n_calculated += np.sum(~in_bank)
+
+        log_distances = np.log(self._attributes['distances'])
+        ttt = get_time_grid(N, dt)
+        vector_potential = np.zeros((len(theta), len(ttt), 3))
+        for i_view in np.flatnonzero(in_bank):
+            # times relative to the arrival time of the signal from the shower maximum
+            t = ttt - t_xmax[i_view]
+            log_distance = np.clip(np.log(R_xmax[i_view]), log_distances[0], log_distances[-1])
+            i_distance = min(max(np.searchsorted(log_distances, log_distance) - 1, 0), len(log_distances) - 2)
+            if len(log_distances) == 1:
+                weights = [[0, 1]]
+            else:
+                weight = (log_distance - log_distances[i_distance]) / (log_distances[i_distance + 1] - log_distances[i_distance])
+                weights = [[i_distance, 1 - weight], [i_distance + 1, weight]]
+            for i_distance, weight in weights:
+                vp = self.__interpolate(templates['distances'][i_distance], delta_theta[i_view], t)
+                vector_potential[i_view][:, [0, 2]] += weight * vp * self._attributes['distances'][i_distance] / R_xmax[i_view]
+        return vector_potential, in_bank
+
+
+def validate_template_bank(template_bank, arz, N, dt, distances, n_indices=None, delta_thetas=None):
+    """
+    compares the electric fields obtained from the template bank with the exact calculation
+
+    As in `calculate_templates`, the electric fields are compared below the maximum frequency of the template bank.
+    The sampling `dt` should not be coarser than the sampling of the template bank: the exact calculation samples
+    the (very narrow) pulse close to the Cherenkov angle without any band limitation, so at coarse sampling it is
+    itself affected by aliasing and the comparison is dominated by the aliasing of the exact calculation.
+
+    Parameters
+    ----------
+    template_bank: ARZTemplateBank
+    arz: `NuRadioMC.SignalGen.ARZ.ARZ.ARZ`
+    N: int
+        number of samples in the time domain
+    dt: float
+        size of one time bin in units of time
+    distances: array of floats
+        the distances of the views
+    n_indices: array of floats or None
+        the indices of refraction of the views. If None, the reference index of refraction of the bank is used
+    delta_thetas: array of floats or None
+        viewing angles relative to the Cherenkov angle. If None, a default grid between -10 and 10 degree is used
+
+    Returns
+    -------
+    errors: dict
+        the maximum deviation of the electric field relative to its maximum amplitude for each profile of the bank
+    """
+    if n_indices is None:
+        n_indices = [template_bank._attributes['n_index']]
+    if delta_thetas is None:
+        delta_thetas = np.array([-10, -3, -1, -0.3, -0.1, -0.03, 0, 0.02, 0.05, 0.2, 0.5, 2, 5, 10]) * units.deg
+    errors = {}
+    for shower_type, energy, iN in template_bank.get_profiles():
+        errors[(shower_type, energy, iN)] = 0
+        for n_index in n_indices:
+            thetas, Rs = [x.flatten() for x in np.meshgrid(np.arccos(1. / n_index) + delta_thetas, distances)]
+            traces_exact = arz.get_time_trace(energy, thetas, N, dt, shower_type, n_index, Rs, iN=iN)
+            traces = arz.get_time_trace(energy, thetas, N, dt, shower_type, n_index, Rs, iN=iN,
+                                        template_bank=template_bank)
+            for trace, trace_exact in zip(traces, traces_exact):
+                trace, trace_exact = [_get_band_limited_trace(x.T, dt, template_bank._attributes['max_frequency'])
+                                      for x in [trace, trace_exact]]
+                norm = np.max(np.abs(trace_exact))
+                if norm > 0:
+                    errors[(shower_type, energy, iN)] = max(errors[(shower_type, energy, iN)],
+                                                            np.max(np.abs(trace - trace_exact)) / norm)
+    return errors
@@ -3,6 +3,11 @@ from NuRadioReco.utilities import units, fft
 from scipy import constants
 from scipy.optimize import curve_fit
 import logging
+try:
+    from numba import jit
+    numba_available = True
+except ImportError:
+    numba_available = False
 logger = logging.getLogger("HCRB2017")
 logger.setLevel(logging.INFO)
 
@@ -39,9 +44,10 @@ def get_time_trace(energy, theta, N, dt, is_em_shower, n_index, R, LPM=True, a=N
     ----------
     energy : float
         energy of the shower
-    theta: float
+    theta: float or array of floats
         viewangle: angle between shower axis (neutrino direction) and the line
-        of sight between interaction and detector
+        of sight between interaction and detector. If an array is given, the pulses
+        for all viewing angles (and distances) are calculated at once.
     N : int
         number of samples in the time domain
     dt: float
@@ -50,18 +56,27 @@ def get_time_trace(energy, theta, N, dt, is_em_shower, n_index, R, LPM=True, a=N
         true if EM shower, false otherwise
     n: float
         index of refraction at interaction vertex
-    R: float
+    R: float or array of floats
         distance from vertex to observer
     LPM: bool (default True)
         enable/disable LPD effect
     a: float or None (default Nont)
         if variable set, the shower width is manually set to this value
+
+    Returns
+    -------
+    traces: array
+        the eR, eTheta and ePhi traces, i.e. an array of shape (3, N), or of shape (3, n_views, N)
+        if `theta` or `R` is an array
     """
 
     freqs = np.fft.rfftfreq(N, dt)
+    if np.ndim(theta) > 0 or np.ndim(R) > 0:
+        # the viewing angles and distances are broadcasted along the first axis, the frequencies along the last axis
+        theta, R = np.broadcast_arrays(np.atleast_1d(theta)[:, np.newaxis], np.atleast_1d(R)[:, np.newaxis])
     eR, eTheta = _get_E_omega(freqs, energy, R, theta, n_index, is_em_shower, LPM, a=a)
-    traceR = np.fft.irfft(eR) / dt
-    traceTheta = np.fft.irfft(eTheta) / dt
+    traceR = np.fft.irfft(eR, axis=-1) / dt
+    traceTheta = np.fft.irfft(eTheta, axis=-1) / dt
     return np.array([traceR, traceTheta, np.zeros_like(traceTheta)])
 
 
@@ -180,7 +195,8 @@ def _get_E_omega(ff, E, R, theta, n_index, EM=True,
     thetaComp_num = 1 + eta**2 / (1 + eta)**2 * COS_THETA_C / np.sin(theta)**2 * (np.cos(theta) - COS_THETA_C) + \
         1j * (-eta / (1 + eta)**2 * COS_THETA_C / np.sin(theta)**2 * (np.cos(theta) - COS_THETA_C))
     thetaComp = I_FF * norm * psi * thetaComp_num
-    logger.debug("IFF[0] {:.2g}, norm {:.2g}, psi[0] {:.2g}, thetaComp_num {:.2g}".format(I_FF[1], norm[1], psi[1], thetaComp_num[1]))
+    logger.debug("IFF[0] {:.2g}, norm {:.2g}, psi[0] {:.2g}, thetaComp_num {:.2g}".format(
+        *[np.ravel(x[..., 1])[0] for x in [I_FF, norm, psi, thetaComp_num]]))
 
     if use_form_factor:
         a = k / _rho0
@@ -191,6 +207,63 @@ def _get_E_omega(ff, E, R, theta, n_index, EM=True,
 
     return rComp, thetaComp
 
+
+def _get_profile(x, EM, a, p1, p2):
+    """
+    returns the Greisen profile (EM, `p1` = log(E / E_crit)) or the Gaisser-Hillas profile (`p1` = Xmax, `p2` = l)
+    at the depth `x` (float or array of floats)
+    """
+    if EM:
+        return a * np.exp(x - 1.5 * x * np.log((3 * x) / (x + 2 * p1)))
+    return a * (x / (p1 - p2)) ** (p1 / p2) * np.exp(-x / p2)
+
+
+def _get_profile_maximum(EM, x_start, dx, n_x, a, p1, p2, fit_region_cut):
+    """
+    returns the index and value of the maximum of the shower profile, tabulated at the `n_x` depths
+    `x_start + i * dx`, and the profile (relative to the maximum) around the maximum that is used for the fit of
+    the shower width
+    """
+    nx = _get_profile(x_start + np.arange(n_x) * dx, EM, a, p1, p2)
+    n_max_position = np.argmax(nx)
+    n_max = nx[n_max_position]
+    cut_left = np.argwhere((nx[:n_max_position] / nx[n_max_position]) > fit_region_cut)[0][0]
+    cut_right = np.argwhere((nx[n_max_position:] / nx[n_max_position]) < fit_region_cut)[0][0] + n_max_position
+    fit_width = cut_right - cut_left
+    return n_max_position, n_max, nx[n_max_position - fit_width:n_max_position + fit_width] / nx[n_max_position]
+
+
+def _get_profile_maximum_scan(EM, x_start, dx, n_x, a, p1, p2, fit_region_cut):
+    """
+    same as `_get_profile_maximum` but the profile is only evaluated up to the end of the fit region, making use
+    of the profiles having a single maximum (to be compiled with numba)
+    """
+    n_max_position = 0
+    n_max = _get_profile(x_start, EM, a, p1, p2)
+    while n_max_position + 1 < n_x:
+        value = _get_profile(x_start + (n_max_position + 1) * dx, EM, a, p1, p2)
+        if not value > n_max:
+            break
+        n_max_position += 1
+        n_max = value
+    cut_left = 0
+    while _get_profile(x_start + cut_left * dx, EM, a, p1, p2) / n_max <= fit_region_cut:
+        cut_left += 1
+    cut_right = n_max_position
+    while cut_right < n_x and _get_profile(x_start + cut_right * dx, EM, a, p1, p2) / n_max >= fit_region_cut:
+        cut_right += 1
+    fit_width = cut_right - cut_left
+    max_vicinity = np.empty(2 * fit_width)
+    for i in range(2 * fit_width):
+        max_vicinity[i] = _get_profile(x_start + (n_max_position - fit_width + i) * dx, EM, a, p1, p2) / n_max
+    return n_max_position, n_max, max_vicinity
+
+
+if numba_available:
+    _get_profile = jit(_get_profile, nopython=True, cache=True)
+    _get_profile_maximum_numba = jit(_get_profile_maximum_scan, nopython=True, cache=True)
+
+
 def gauss(x, A, mu, sigma):
     return A * np.exp(-(x-mu)**2/2/sigma**2)
 
@@ -222,13 +295,8 @@ def get_N_AskDepthA(E, EM=True, LPM=True, fudge_LPM=False):
         dx = 0.01  # small enough bin in depth for our purposes.
         x_start = 0.01  # starting radiation length
         # Greissen EM shower profile from Energy E in GeV.
-
-        x = np.arange(x_start, max_x, dx)
         a = 0.31 / (np.log(E / E_CRIT))**0.5
-        b = x
-        c = 1.5 * x
-        d = np.log((3 * x) / (x + 2 * np.log(E / E_CRIT)))
-        nx = a * np.exp(b - c * d)
+        profile_parameters = (a, np.log(E / E_CRIT), 0.)
 
     else:  # hadronic shower profile
         # Gaisser-Hillas hadronic shower parameterization
@@ -240,14 +308,18 @@ def get_N_AskDepthA(E, EM=True, LPM=True, fudge_LPM=False):
         l = 113.03  * units.g /units.cm**2# g/cm^2
         Ec = 0.17006 * units.GeV  # GeV
         Xmax = X0 * np.log(E / Ec)
-        x = np.arange(x_start, max_x, dx)
         a = S0 * E / Ec * (Xmax - l) / Xmax * np.exp(Xmax / l - 1)
-        b = pow(x / (Xmax - l), Xmax / l)
-        c = np.exp(-x / l)
-        nx = a * b * c
+        profile_parameters = (a, Xmax, l)
     # find location of maximum, and charge excess from Fig. 5.9, compare in cm not m.
-    n_max_position = np.argmax(nx)
-    n_max = np.max(nx)
+    # We want to perform a fit for the regions with an excess charge 10% close to the maximum
+    fit_region_cut = 0.95
+    n_x = int(np.ceil((max_x - x_start) / dx))
+    if numba_available:
+        n_max_position, n_max, max_vicinity = _get_profile_maximum_numba(EM, x_start, dx, n_x, *profile_parameters,
+                                                                         fit_region_cut)
+    else:
+        n_max_position, n_max, max_vicinity = _get_profile_maximum(EM, x_start, dx, n_x, *profile_parameters,
+                                                                   fit_region_cut)
     if EM:
         excess = 0.09 + dx * n_max_position * ICE_RAD_LENGTH / ICE_DENSITY / 100.
     else:
@@ -255,12 +327,6 @@ def get_N_AskDepthA(E, EM=True, LPM=True, fudge_LPM=False):
     Nmax = excess * n_max / 1000.0
     logger.debug("Nmax {}, excess {}, n_max {}".format(Nmax, excess, n_max))
 
-    # We want to perform a fit for the regions with an excess charge 10% close to the maximum
-    fit_region_cut = 0.95
-    cut_left = np.argwhere((nx[:n_max_position] / nx[n_max_position]) > fit_region_cut)[0][0]
-    cut_right = np.argwhere((nx[n_max_position:] / nx[n_max_position]) < fit_region_cut)[0][0]+n_max_position
-    fit_width = cut_right-cut_left
-    max_vicinity = nx[n_max_position-fit_width:n_max_position+fit_width]/nx[n_max_position]
     x_fit = np.arange(0, len(max_vicinity), 1)
     sigma = curve_fit(gauss, x_fit, max_vicinity)[0]
     if EM:
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import numpy as np
+import collections
 from NuRadioReco.utilities import units, fft
 from NuRadioMC.SignalGen import parametrizations as par
 import logging
@@ -12,7 +13,7 @@ def set_log_level(level):
 
 
 def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, interp_factor=None, interp_factor2=None,
-                   same_shower=False, seed=None, full_output=False, **kwargs):
+                   same_shower=False, seed=None, full_output=False, random_generator=None, **kwargs):
     """
     returns the Askaryan pulse in the time domain of the eTheta component
 
@@ -26,9 +27,11 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, interp_
     ----------
     energy : float
         energy of the shower
-    theta: float
+    theta: float or array of floats
         viewangle: angle between shower axis (neutrino direction) and the line
-        of sight between interaction and detector
+        of sight between interaction and detector. If an array is given, the signals
+        of all viewing angles (e.g. all channels and ray tracing solutions of a shower)
+        are calculated at once from the same shower realization.
     N : int
         number of samples in the time domain
     dt: float
@@ -39,8 +42,9 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, interp_
         note that TAU showers are currently only implemented in the ARZ2019 model
     n_index: float
         index of refraction at interaction vertex
-    R: float
-        distance from vertex to observer
+    R: float or array of floats
+        distance from vertex to observer. Needs to have the same length as `theta` if
+        both are arrays
     model: string
         specifies the signal model
 
@@ -84,11 +88,16 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, interp_
         the random seed for the Askaryan modules
     full_output: bool (default False)
         if True, askaryan modules can return additional output
+    random_generator: None or numpy.random.Generator (default None)
+        if provided, the random shower realization (Alvarez2009 and ARZ models) is drawn from this generator
+        instead of the module-wide random generator initialized with `seed`. This allows to use an independent
+        random number stream, e.g. per event group (see `NuRadioReco.utilities.random_streams`)
 
     Returns
     -------
     time trace: array
-        the amplitudes for each time bin
+        the amplitudes for each time bin. If `theta` or `R` is an array, an array of
+        shape (n_views, N) is returned
     additional information: dict
         only available if `full_output` enabled
 
@@ -100,7 +109,7 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, interp_
         trace = np.zeros(N)
     if model in par.get_parametrizations():
         tmp = par.get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=seed, same_shower=same_shower,
-                                     full_output=full_output, **kwargs)
+                                     full_output=full_output, random_generator=random_generator, **kwargs)
         if(full_output):
             trace, additional_output = tmp
         else:
@@ -129,13 +138,14 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, interp_
 
         if(interp_factor2 is not None):
             gARZ.set_interpolation_factor2(interp_factor2)
-        trace = gARZ.get_time_trace(energy, theta, N, dt, shower_type, n_index, R, same_shower=same_shower, **kwargs)[1]
+        trace = gARZ.get_time_trace(energy, theta, N, dt, shower_type, n_index, R, same_shower=same_shower,
+                                    random_generator=random_generator, **kwargs)[..., 1, :]
         additional_output['iN'] = gARZ.get_last_shower_profile_id()[shower_type]
 
     elif(model == 'spherical'):
-        amplitude = 1. * energy / R
-        trace = np.zeros(N)
-        trace[N // 2] = amplitude
+        amplitude = np.broadcast_to(1. * energy / R, np.broadcast(theta, R).shape)
+        trace = np.zeros(amplitude.shape + (N,))
+        trace[..., N // 2] = amplitude
     else:
         raise NotImplementedError("model {} unknown".format(model))
     if(full_output):
@@ -152,9 +162,11 @@ def get_frequency_spectrum(energy, theta, N, dt, shower_type, n_index, R, model,
     ----------
     energy : float
         energy of the shower
-    theta: float
+    theta: float or array of floats
         viewangle: angle between shower axis (neutrino direction) and the line
-        of sight between interaction and detector
+        of sight between interaction and detector. If an array is given, the signals
+        of all viewing angles (e.g. all channels and ray tracing solutions of a shower)
+        are calculated at once from the same shower realization.
     N : int
         number of samples in the time domain
     dt: float
@@ -165,8 +177,9 @@ def get_frequency_spectrum(energy, theta, N, dt, shower_type, n_index, R, model,
         note that TAU showers are currently only implemented in the ARZ2019 model
     n_index: float
         index of refraction at interaction vertex
-    R: float
-        distance from vertex to observer
+    R: float or array of floats
+        distance from vertex to observer. Needs to have the same length as `theta` if
+        both are arrays
     model: string
         specifies the signal model
 
@@ -205,7 +218,8 @@ def get_frequency_spectrum(energy, theta, N, dt, shower_type, n_index, R, model,
     Returns
     -------
     spectrum: array
-        the complex amplitudes for the given frequencies
+        the complex amplitudes for the given frequencies. If `theta` or `R` is an array,
+        an array of shape (n_views, n_frequencies) is returned
     additional information: dict
         only available if `full_output` enabled
 
@@ -215,3 +229,137 @@ def get_frequency_spectrum(energy, theta, N, dt, shower_type, n_index, R, model,
         return fft.time2freq(tmp[0], 1 / dt), tmp[1]
     else:
         return fft.time2freq(tmp, 1 / dt)
+
+
+class AskaryanSpectrumCache(object):
+    """
+    least recently used (LRU) cache of Askaryan spectra with quantized input parameters
+
+    Showers that are seen under almost the same viewing angle (e.g. by closely spaced channels or by several
+    stations) lead to almost identical Askaryan signals. The cache quantizes the shower energy, the viewing angle
+    and the index of refraction into bins of the configured tolerances. The spectrum of the first view of a bin is
+    stored normalized to the shower energy and distance, all other views of the same bin are obtained by scaling
+    this spectrum with energy / R. Any other dependence on the distance (e.g. near-field effects in the ARZ model)
+    and on the exact position within a bin is neglected, so the tolerances control the accuracy.
+
+    The spectra are cached per model, shower type, trace length, sampling and shower realization. For the models
+    with random shower realizations (Alvarez2009, ARZ2019, ARZ2020), spectra of previous calls are only used if the
+    realization is specified (via the `k_L` or `iN` argument). Otherwise the realization is drawn as usual and the
+    spectra are only shared among the views of the same call. In both cases the random numbers that are drawn are
+    the same as without the cache. If the total size of the cached spectra exceeds `max_size`, the least recently
+    used spectra are removed.
+    """
+
+    # the arguments that select the shower realization of the models with random shower realizations
+    realization_arguments = {'Alvarez2009': 'k_L', 'ARZ2019': 'iN', 'ARZ2020': 'iN'}
+
+    def __init__(self, max_size=64 * 2 ** 20, energy_tolerance=0.01, viewing_angle_tolerance=0.01 * units.deg,
+                 n_index_tolerance=1e-4):
+        """
+        Parameters
+        ----------
+        max_size: int
+            maximum size of all cached spectra in bytes
+        energy_tolerance: float
+            relative width of the shower energy bins
+        viewing_angle_tolerance: float
+            width of the viewing angle bins
+        n_index_tolerance: float
+            width of the bins of the index of refraction
+        """
+        self._max_size = max_size
+        self._energy_tolerance = energy_tolerance
+        self._viewing_angle_tolerance = viewing_angle_tolerance
+        self._n_index_tolerance = n_index_tolerance
+        self._spectra = collections.OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __add_spectrum(self, key, spectrum):
+        if spectrum.nbytes > self._max_size:
+            return
+        while self._size + spectrum.nbytes > self._max_size:
+            _, evicted_spectrum = self._spectra.popitem(last=False)
+            self._size -= evicted_spectrum.nbytes
+            self.evictions += 1
+        self._spectra[key] = spectrum
+        self._size += spectrum.nbytes
+
+    def get_frequency_spectrum(self, energy, theta, N, dt, shower_type, n_index, R, model, full_output=False,
+                               **kwargs):
+        """
+        same as `get_frequency_spectrum` but uses (and fills) the cache
+
+        Parameters
+        ----------
+        energy, theta, N, dt, shower_type, n_index, R, model, full_output, kwargs
+            see `get_frequency_spectrum`
+        """
+        shower_type = shower_type.upper()
+        is_batch = np.ndim(theta) > 0 or np.ndim(R) > 0
+        theta, R = np.broadcast_arrays(np.atleast_1d(theta), np.atleast_1d(R))
+        if energy == 0:
+            return get_frequency_spectrum(energy, theta if is_batch else theta[0], N, dt, shower_type, n_index,
+                                          R if is_batch else R[0], model, full_output=full_output, **kwargs)
+        realization_argument = self.realization_arguments.get(model, None)
+        # the arguments that only control the drawing of the shower realization are not part of the key
+        settings = tuple(sorted((key, value) for key, value in kwargs.items()
+                                if key not in ['seed', 'same_shower', 'random_generator', realization_argument]))
+        i_energy = int(np.round(np.log(energy) / np.log1p(self._energy_tolerance)))
+        i_n_index = int(np.round(n_index / self._n_index_tolerance))
+        keys = [(model, shower_type, N, dt, i_energy, int(np.round(x / self._viewing_angle_tolerance)), i_n_index,
+                 settings) for x in theta]
+
+        realization = kwargs.get(realization_argument, None)
+        additional_output = {} if realization_argument is None else {realization_argument: realization}
+        spectra = [None] * len(theta)
+        if realization_argument is None or realization is not None:
+            for i_view, key in enumerate(keys):
+                if key + (realization,) in self._spectra:
+                    self._spectra.move_to_end(key + (realization,))
+                    spectra[i_view] = self._spectra[key + (realization,)]
+        # the remaining views are calculated in a single call, only one view per bin
+        first_views = {}
+        for i_view, key in enumerate(keys):
+            if spectra[i_view] is None and key not in first_views:
+                first_views[key] = i_view
+        if len(first_views):
+            i_views = np.array(list(first_views.values()))
+            tmp, additional_output = get_frequency_spectrum(energy, theta[i_views], N, dt, shower_type, n_index,
+                                                            R[i_views], model, full_output=True, **kwargs)
+            realization = additional_output.get(realization_argument, None)
+            for key, spectrum, distance in zip(first_views.keys(), tmp, R[i_views]):
+                spectrum = spectrum * distance / energy
+                self.__add_spectrum(key + (realization,), spectrum)
+                for i_view in np.flatnonzero([x == key for x in keys]):
+                    if spectra[i_view] is None:
+                        spectra[i_view] = spectrum
+        n_misses = len(first_views)
+        self.misses += n_misses
+        self.hits += len(theta) - n_misses
+
+        spectra = np.array(spectra) * energy / R[:, np.newaxis]
+        if not is_batch:
+            spectra = spectra[0]
+        if full_output:
+            return spectra, additional_output
+        return spectra
+
+    def get_statistics(self):
+        """
+        returns the number of cache hits and misses (per view), the number of evictions, the hit rate and the
+        current size (in bytes)
+        """
+        n_requests = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / n_requests if n_requests else 0., 'size': self._size,
+                'n_spectra': len(self._spectra)}
+
+    def clear(self):
+        """
+        removes all spectra from the cache (the statistics are kept)
+        """
+        self._spectra.clear()
+        self._size = 0
@@ -6,6 +6,12 @@ from scipy import constants
 import logging
 logger = logging.getLogger("SignalGen.parametrizations")
 
+_E_C = 73.1 * units.MeV
+_rho = 0.924 * units.g / units.cm ** 3
+_X_0 = 36.08 * units.g / units.cm ** 2
+_R_M = 10.57 * units.g / units.cm ** 2
+_c = constants.c * units.m / units.s
+
 
 def set_log_level(level):
     logger.setLevel(level)
@@ -31,7 +37,7 @@ def get_parametrizations():
 
 
 def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=None, same_shower=False,
-                   k_L=None, full_output=False, average_shower=False):
+                   k_L=None, full_output=False, average_shower=False, random_generator=None):
     """
     returns the Askaryan pulse in the time domain of the eTheta component
 
@@ -45,9 +51,10 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=No
     ----------
     energy : float
         energy of the shower
-    theta: float
+    theta: float or array of floats
         viewangle: angle between shower axis (neutrino direction) and the line
-        of sight between interaction and detector
+        of sight between interaction and detector. If an array is given, the pulses
+        for all viewing angles (and distances) are calculated at once.
     N : int
         number of samples in the time domain
     dt: float
@@ -56,8 +63,9 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=No
         type of shower, either "HAD" (hadronic), "EM" (electromagnetic)
     n_index: float
         index of refraction at interaction vertex
-    R: float
-        distance from vertex to observer
+    R: float or array of floats
+        distance from vertex to observer. Needs to have the same length as `theta` if
+        both are arrays
     model: string
         specifies the signal model
 
@@ -82,66 +90,30 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=No
         - For ZHS1992 and ALvarez2000 the dict is empty.
     average_shower: bool (default False)
         if True, for the Alvarez2009 model electromagnetic showers, no random shower is generated, but the average shower is choosen.
+    random_generator: None or numpy.random.Generator (default None)
+        if provided, the random shower realization is drawn from this generator instead of the module-wide
+        random generator initialized with `seed`. This allows to use an independent random number stream,
+        e.g. per event group.
 
     Returns
     -------
-    spectrum: array
-        the complex amplitudes for the given frequencies
+    time trace: array
+        the amplitudes for each time bin. If `theta` or `R` is an array, an array of shape (n_views, N)
+        is returned. The shower realization (Alvarez2009 model) is the same for all views.
     additional information: dict
         only available if `full_output` enabled
 
     """
     if(model not in _random_generators):
         _random_generators[model] = np.random.RandomState(seed)
-    if(model == 'ZHS1992'):
-        """ Parametrization from E. Zas, F. Halzen, and T. Stanev, Phys. Rev. D 45, 362 (1992)."""
-        freqs = np.fft.rfftfreq(N, dt)
-        vv0 = freqs / (0.5 * units.GHz)
-        cherenkov_angle = np.arccos(1. / n_index)
-        domega = (theta - cherenkov_angle)
-        tmp = np.exp(+0.5j * np.pi)  # set phases to 90deg
-        tmp *= 1.1e-7 * energy / units.TeV * vv0 * 1. / \
-            (1 + 0.4 * (vv0) ** 2) * np.exp(-0.5 * (domega / (2.4 * units.deg / vv0)) ** 2) * \
-            units.V / units.m / (R / units.m) / units.MHz
-        # the factor 0.5 is introduced to compensate the unusual fourier transform normalization used in the ZHS code
-        trace = 0.5 * np.fft.irfft(tmp) / dt
-        trace = np.roll(trace, int(2 * units.ns / dt))
-        if(full_output):
-            return trace, {}
-        else:
-            return trace
-
-    elif(model == 'Alvarez2009'):
-        # This parameterisation is not very accurate for energies above 10 EeV
-        # The ARZ model should be used instead
-        freqs = np.fft.rfftfreq(N, dt)[1:]  # exclude zero frequency
-
-        E_C = 73.1 * units.MeV
-        rho = 0.924 * units.g / units.cm ** 3
-        X_0 = 36.08 * units.g / units.cm ** 2
-        R_M = 10.57 * units.g / units.cm ** 2
-        c = constants.c * units.m / units.s
-
-        # calculate A
-        if (shower_type == 'HAD'):
-            k_E_0 = 4.13e-16 * units.V / units.cm / units.MHz ** 2
-            k_E_1 = 2.54
-            log10_E_E = 10.60
-            k_E_bar = k_E_0 * np.tanh((np.log10(energy / units.eV) - log10_E_E) / k_E_1)
-        elif (shower_type == 'EM'):
-            k_E_bar = 4.65e-16 * units.V / units.cm / units.MHz ** 2
-        else:
-            raise NotImplementedError("shower type {} is not implemented in Alvarez2009 model.".format(shower_type))
-
-        A = k_E_bar * energy / E_C * X_0 / rho * np.sin(theta) * freqs
-
-        # calculate nu_L
-        if (shower_type == 'HAD'):
-            k_L_0 = 31.25
-            gamma = 3.01e-2
-            E_L = 1.e15 * units.eV
-            k_L = k_L_0 * (energy / E_L) ** gamma
-        elif (shower_type == 'EM'):
+    # the pulses of all views are calculated at once from the spectral amplitudes of all views, so that the parts
+    # that only depend on the energy and shower type are calculated only once
+    is_batch = np.ndim(theta) > 0 or np.ndim(R) > 0
+    theta, R = np.broadcast_arrays(np.atleast_1d(theta), np.atleast_1d(R))
+    freqs = np.fft.rfftfreq(N, dt)
+    additional_output = {}
+    if(model == 'Alvarez2009'):
+        if (shower_type == 'EM'):
             sigma_0 = 3.39e-2
             log10_E_sigma = 14.99
             delta_0 = 0
@@ -173,110 +145,188 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=No
                         k_L = _Alvarez2009_k_L
 
                 else:
-                    _Alvarez2009_k_L = 10 ** _random_generators[model].normal(log10_k_L_bar, sigma_k_L)
+                    if random_generator is None:
+                        random_generator = _random_generators[model]
+                    _Alvarez2009_k_L = 10 ** random_generator.normal(log10_k_L_bar, sigma_k_L)
                     k_L = _Alvarez2009_k_L
+        elif (shower_type == 'HAD'):
+            # the k_L parameter of hadronic showers only depends on the energy
+            k_L = None
         else:
             raise NotImplementedError("shower type {} is not implemented in Alvarez2009 model.".format(shower_type))
-        nu_L = rho / k_L / X_0
-        cher_cut = 1.e-8
-        if (np.abs(1 - n_index * np.cos(theta)) < cher_cut):
-            nu_L *= c / cher_cut
-        else:
-            nu_L *= c / np.abs(1 - n_index * np.cos(theta))
 
-        # calculate d_L
-        if (shower_type == "HAD"):
-            beta = 2.57
-        elif (shower_type == "EM"):
-            beta = 2.74
-        else:
-            raise NotImplementedError("shower type {} is not implemented in Alvarez2009 model.".format(shower_type))
+    spectrum = get_spectral_amplitudes(energy, theta, freqs, shower_type, n_index, R, model, k_L=k_L)
+    if(model == 'Alvarez2009'):
+        if k_L is None:
+            k_L = _get_Alvarez2009_k_L_HAD(energy)
+        additional_output['k_L'] = k_L
+
+    trace = np.fft.irfft(spectrum * np.exp(0.5j * np.pi), axis=-1) / dt  # set phases to 90deg
+    if(model == 'ZHS1992'):
+        trace = np.roll(trace, int(2 * units.ns / dt), axis=-1)
+    else:
+        trace = np.roll(trace, trace.shape[-1] // 2, axis=-1)
+
+    if(not is_batch):
+        trace = trace[0]
+    if(full_output):
+        return trace, additional_output
+    else:
+        return trace
+
+
+def get_spectral_amplitudes(energy, theta, freqs, shower_type, n_index, R, model, k_L=None, out=None):
+    """
+    returns the real amplitudes of the frequency spectrum of the eTheta component for many views
+
+    The amplitudes are calculated with vectorized kernels that write into a single (optionally preallocated)
+    output array, so that the parts that only depend on the shower energy are calculated once per view and no
+    temporary arrays of the size of the output are needed. The time trace (see `get_time_trace`) is obtained as
+    `np.fft.irfft(amplitudes * np.exp(0.5j * np.pi)) / dt`, rolled to the center of the trace.
 
-        d_L = 1 / (1 + (freqs / nu_L) ** beta)
+    Parameters
+    ----------
+    energy: float or array of floats
+        energy of the shower (one energy for all views or one per view)
+    theta: float or array of floats
+        the viewing angles
+    freqs: array of floats
+        the frequencies, typically `np.fft.rfftfreq(N, dt)`
+    shower_type: string
+        type of shower, either "HAD" (hadronic), "EM" (electromagnetic)
+    n_index: float
+        index of refraction at interaction vertex
+    R: float or array of floats
+        distance from vertex to observer
+    model: string
+        the parametrization, see `get_parametrizations`
+    k_L: float, array of floats or None
+        the k_L parameter of the Alvarez2009 model, needs to be specified for electromagnetic showers
+        (for hadronic showers it is calculated from the energy)
+    out: array of floats or None
+        output array of shape (n_views, len(freqs)). If None, a new array is allocated
+
+    Returns
+    -------
+    amplitudes: array of floats
+        the spectral amplitudes of shape (n_views, len(freqs))
+    """
+    # the parameters that only depend on the energy are calculated with the shape of `energy`, i.e., only once
+    # if a single energy is given
+    energy = np.asarray(energy, dtype=float)
+    theta, R = [np.asarray(x, dtype=float) for x in
+                np.broadcast_arrays(np.atleast_1d(theta), np.atleast_1d(R), np.atleast_1d(energy))[:2]]
+    if out is None:
+        out = np.empty((len(theta), len(freqs)))
+    cherenkov_angle = np.arccos(1. / n_index)
+    if(model == 'ZHS1992'):
+        """ Parametrization from E. Zas, F. Halzen, and T. Stanev, Phys. Rev. D 45, 362 (1992)."""
+        # the factor 0.5 is introduced to compensate the unusual fourier transform normalization used in the ZHS code
+        amplitude = 0.5 * 1.1e-7 * energy / units.TeV * units.V / units.m / (R / units.m) / units.MHz
+        _get_ZHS1992_spectrum(freqs, amplitude, theta - cherenkov_angle, out)
 
-        # calculate d_R
-        if (shower_type == "HAD"):
+    elif(model == 'Alvarez2009'):
+        # This parameterisation is not very accurate for energies above 10 EeV
+        # The ARZ model should be used instead
+        if (shower_type == 'HAD'):
+            k_E_0 = 4.13e-16 * units.V / units.cm / units.MHz ** 2
+            k_E_1 = 2.54
+            log10_E_E = 10.60
+            k_E_bar = k_E_0 * np.tanh((np.log10(energy / units.eV) - log10_E_E) / k_E_1)
+            k_L = _get_Alvarez2009_k_L_HAD(energy)
+            beta = 2.57
             k_R_0 = 2.73
             k_R_1 = 1.72
             log10_E_R = 12.92
             k_R_bar = k_R_0 + np.tanh((log10_E_R - np.log10(energy / units.eV)) / k_R_1)
-        elif (shower_type == "EM"):
+        elif (shower_type == 'EM'):
+            k_E_bar = 4.65e-16 * units.V / units.cm / units.MHz ** 2
+            if k_L is None:
+                raise ValueError("the k_L parameter needs to be specified for EM showers of the Alvarez2009 model")
+            beta = 2.74
             k_R_bar = 1.54
         else:
             raise NotImplementedError("shower type {} is not implemented in Alvarez2009 model.".format(shower_type))
-        nu_R = rho / k_R_bar / R_M * c / np.sqrt(n_index ** 2 - 1)
-
+        # the factor 0.5 is the ZHS Fourier transform normalisation
+        amplitude = 0.5 * k_E_bar * energy / _E_C * _X_0 / _rho * np.sin(theta) / R
+        cher_cut = 1.e-8
+        nu_L = _rho / k_L / _X_0 * (_c / np.maximum(np.abs(1 - n_index * np.cos(theta)), cher_cut))
+        nu_R = _rho / k_R_bar / _R_M * _c / np.sqrt(n_index ** 2 - 1)
         alpha = 1.27
-        d_R = 1 / (1 + (freqs / nu_R) ** alpha)
-
-        spectrum = A * d_L * d_R
-        spectrum *= 0.5  #  ZHS Fourier transform normalisation
-        spectrum /= R
-        spectrum = np.insert(spectrum, 0, 0)
-
-        trace = np.fft.irfft(spectrum * np.exp(0.5j * np.pi)) / dt  # set phases to 90deg
-        trace = np.roll(trace, len(trace) // 2)
-        if(full_output):
-            return trace, {'k_L': k_L}
-        else:
-            return trace
+        _get_Alvarez2009_spectrum(freqs, amplitude, np.broadcast_to(nu_L, theta.shape),
+                                  np.broadcast_to(nu_R, theta.shape), beta, alpha, out)
 
     elif(model == 'Alvarez2000'):
-        freqs = np.fft.rfftfreq(N, dt)[1:]  # exclude zero frequency
-        cherenkov_angle = np.arccos(1. / n_index)
-
         Elpm = 2e15 * units.eV
-        dThetaEM = 2.7 * units.deg * 500 * units.MHz / freqs * (Elpm / (0.14 * energy + Elpm)) ** 0.3
-#         logger.debug("dThetaEM = {}".format(dThetaEM))
-
-        epsilon = np.log10(energy / units.TeV)
-        dThetaHad = 0
-        if (epsilon >= 0 and epsilon <= 2):
-            dThetaHad = 500 * units.MHz / freqs * (2.07 - 0.33 * epsilon + 7.5e-2 * epsilon ** 2) * units.deg
-        elif (epsilon > 2 and epsilon <= 5):
-            dThetaHad = 500 * units.MHz / freqs * (1.74 - 1.21e-2 * epsilon) * units.deg
-        elif(epsilon > 5 and epsilon <= 7):
-            dThetaHad = 500 * units.MHz / freqs * (4.23 - 0.785 * epsilon + 5.5e-2 * epsilon ** 2) * units.deg
-        elif(epsilon > 7):
-            dThetaHad = 500 * units.MHz / freqs * (4.23 - 0.785 * 7 + 5.5e-2 * 7 ** 2) * \
-                (1 + (epsilon - 7) * 0.075) * units.deg
-
         f0 = 1.15 * units.GHz
-        E = 2.53e-7 * energy / units.TeV * freqs / f0 / (1 + (freqs / f0) ** 1.44)
-        E *= units.V / units.m / units.MHz
-        E *= np.sin(theta) / np.sin(cherenkov_angle)
-
-        tmp = np.zeros(len(freqs) + 1)
+        # the factor 0.5 is introduced to compensate the unusual fourier transform normalization used in the ZHS code
+        amplitude = 0.5 * 2.53e-7 * energy / units.TeV * units.V / units.m / units.MHz
+        amplitude *= np.sin(theta) / np.sin(cherenkov_angle) / R
+        # the width of the Cherenkov cone is `width / frequency`
         if(shower_type == "EM"):
-            tmp[1:] = E * np.exp(-np.log(2) * ((theta - cherenkov_angle) / dThetaEM) ** 2) / R
+            width = 2.7 * units.deg * 500 * units.MHz * (Elpm / (0.14 * energy + Elpm)) ** 0.3
         elif(shower_type == "HAD"):
-            if(np.any(dThetaHad != 0)):
-                tmp[1:] = E * np.exp(-np.log(2) * ((theta - cherenkov_angle) / dThetaHad) ** 2) / R
-
-                def missing_energy_factor(E_0):
-                    # Missing energy factor for hadronic cascades
-                    # Taken from DOI: 10.1016/S0370-2693(98)00905-8
-                    epsilon = np.log10(E_0 / units.TeV)
-                    f_epsilon = -1.27e-2 - 4.76e-2 * (epsilon + 3)
-                    f_epsilon += -2.07e-3 * (epsilon + 3) ** 2 + 0.52 * np.sqrt(epsilon + 3)
-                    return f_epsilon
-
-                tmp[1:] *= missing_energy_factor(energy)
-            else:
-                pass
-                # energy is below a TeV, setting Askaryan pulse to zero
+            epsilon = np.log10(energy / units.TeV)
+            # the width is parametrized piecewise in the energy ranges epsilon = [0, 2], (2, 5], (5, 7] and > 7
+            i_range = np.searchsorted([2, 5, 7], epsilon)
+            c0, c1, c2 = np.array([[2.07, -0.33, 7.5e-2], [1.74, -1.21e-2, 0], [4.23, -0.785, 5.5e-2],
+                                   [4.23, -0.785, 5.5e-2]])[i_range].T
+            width = np.where(i_range == 3, (4.23 - 0.785 * 7 + 5.5e-2 * 7 ** 2) * (1 + (epsilon - 7) * 0.075),
+                             c0 + c1 * epsilon + c2 * epsilon ** 2)
+            width = width * 500 * units.MHz * units.deg
+            # energies below a TeV, setting Askaryan pulse to zero
+            width = np.where(epsilon < 0, np.inf, width)
+            amplitude = np.where(epsilon < 0, 0, amplitude)
+            # Missing energy factor for hadronic cascades
+            # Taken from DOI: 10.1016/S0370-2693(98)00905-8
+            epsilon = np.maximum(epsilon, 0)
+            f_epsilon = -1.27e-2 - 4.76e-2 * (epsilon + 3)
+            f_epsilon += -2.07e-3 * (epsilon + 3) ** 2 + 0.52 * np.sqrt(epsilon + 3)
+            amplitude *= f_epsilon
         else:
             raise NotImplementedError("shower type {} not implemented in {} Askaryan module".format(shower_type, model))
-
-        tmp *= 0.5  # the factor 0.5 is introduced to compensate the unusual fourier transform normalization used in the ZHS code
-
-#         df = np.mean(freqs[1:] - freqs[:-1])
-        trace = np.fft.irfft(tmp * np.exp(0.5j * np.pi)) / dt  # set phases to 90deg
-        trace = np.roll(trace, len(trace) // 2)
-        if(full_output):
-            return trace, {}
-        else:
-            return trace
+        _get_Alvarez2000_spectrum(freqs, amplitude, theta - cherenkov_angle, np.broadcast_to(width, theta.shape),
+                                  f0, out)
 
     else:
         raise NotImplementedError("model {} unknown".format(model))
+    return out
+
+
+def _get_Alvarez2009_k_L_HAD(energy):
+    k_L_0 = 31.25
+    gamma = 3.01e-2
+    E_L = 1.e15 * units.eV
+    return k_L_0 * (energy / E_L) ** gamma
+
+
+def _get_ZHS1992_spectrum(freqs, amplitude, delta_theta, out):
+    vv0 = freqs / (0.5 * units.GHz)
+    np.multiply(delta_theta[:, np.newaxis], vv0 / (2.4 * units.deg), out=out)
+    np.square(out, out=out)
+    out *= -0.5
+    np.exp(out, out=out)
+    out *= vv0 / (1 + 0.4 * vv0 ** 2)
+    out *= amplitude[:, np.newaxis]
+
+
+def _get_Alvarez2000_spectrum(freqs, amplitude, delta_theta, width, f0, out):
+    np.multiply((delta_theta / width)[:, np.newaxis], freqs, out=out)
+    np.square(out, out=out)
+    out *= -np.log(2)
+    np.exp(out, out=out)
+    out *= freqs / f0 / (1 + (freqs / f0) ** 1.44)
+    out *= amplitude[:, np.newaxis]
+
+
+def _get_Alvarez2009_spectrum(freqs, amplitude, nu_L, nu_R, beta, alpha, out):
+    # d_L = 1 / (1 + (freqs / nu_L) ** beta) and d_R = 1 / (1 + (freqs / nu_R) ** alpha)
+    np.divide(freqs, nu_L[:, np.newaxis], out=out)
+    np.power(out, beta, out=out)
+    out += 1
+    if np.all(nu_R == nu_R[0]):
+        out *= 1 + (freqs / nu_R[0]) ** alpha
+    else:
+        out *= 1 + (freqs / nu_R[:, np.newaxis]) ** alpha
+    np.divide(freqs, out, out=out)
+    out *= amplitude[:, np.newaxis]
@@ -657,6 +657,58 @@ class ray_tracing_2D(ray_tracing_base):
             self.__logger.debug(f"calculating attenuation for frequencies {freqs}")
             return freqs
 
+    def get_gauss_legendre_nodes(self, z_start, z_stop, z_turn, order=10, panel_width=2):
+        """
+        calculates the nodes and weights to integrate a function of depth along a ray path with a
+        composite Gauss-Legendre quadrature
+
+        The integration variable is the mirrored z coordinate (see `get_z_mirrored`), i.e., the part of the path
+        after the turning point is mapped back onto the unmirrored depths. The path length element ds/dz has an
+        integrable 1/sqrt(z_turn - z) singularity at the turning point, which is removed with the substitution
+        z = z_turn - s^2.
+
+        Parameters
+        ----------
+        z_start: float
+            start of the integration interval (mirrored z coordinate)
+        z_stop: float
+            end of the integration interval (mirrored z coordinate)
+        z_turn: float
+            z coordinate of the turning point
+        order: int
+            number of nodes per panel
+        panel_width: float
+            the width of the panels in units of sqrt(m) of the substituted variable s
+
+        Returns
+        -------
+        zz: array of floats
+            the (unmirrored) depths of the integration nodes
+        weights: array of floats
+            the integration weights
+        """
+        x_gl, w_gl = np.polynomial.legendre.leggauss(order)
+        # the integration interval split into parts below and above (mirrored) the turning point
+        intervals = []
+        if z_start < z_turn:
+            intervals.append((z_start, min(z_stop, z_turn)))
+        if z_stop > z_turn:
+            intervals.append((2 * z_turn - z_stop, 2 * z_turn - max(z_start, z_turn)))
+        zz = []
+        weights = []
+        for z_low, z_high in intervals:
+            s_low = max(z_turn - z_high, 0) ** 0.5
+            s_high = max(z_turn - z_low, 0) ** 0.5
+            n_panels = max(1, int(np.ceil((s_high - s_low) / (panel_width * units.m ** 0.5))))
+            edges = np.linspace(s_low, s_high, n_panels + 1)
+            half_width = 0.5 * np.diff(edges)[:, None]
+            ss = (0.5 * (edges[1:] + edges[:-1]))[:, None] + half_width * x_gl
+            zz.append((z_turn - ss ** 2).flatten())
+            weights.append((2 * ss * half_width * w_gl).flatten())
+        if len(zz) == 0:
+            return np.array([]), np.array([])
+        return np.concatenate(zz), np.concatenate(weights)
+
     def get_attenuation_along_path(self, x1, x2, C_0, frequency, max_detector_freq,
                                    reflection=0, reflection_case=1):
 
@@ -703,10 +755,6 @@ class ray_tracing_2D(ray_tracing_base):
 
                 x2_mirrored = self.get_z_mirrored(x1, x2, C_0)
 
-                def dt(t, C_0, frequency):
-                    z = self.get_z_unmirrored(t, C_0)
-                    return self.ds(t, C_0) / attenuation_util.get_attenuation_length(z, frequency, self.attenuation_model)
-
                 # to speed up things we only calculate the attenuation for a few frequencies
                 # and interpolate linearly between them
                 mask = frequency > 0
@@ -721,7 +769,7 @@ class ray_tracing_2D(ray_tracing_base):
                     # However, when a path becomes to horizontal (i.e., at the turning point of an refracted ray)
                     # the calculation via a discrete sum becomes to inaccurate. This is because we describe the
                     # path as a function of dz (vertical distance) and have the sum over discrete bins in dz. To avoid that
-                    # we fall back to a numerical integration with scipy.quad only around the turning point. However, instead
+                    # we fall back to a Gauss-Legendre integration only around the turning point. However, instead
                     # of integrating over dt (the exponent of the attenuation factor), we integrate only over ds (the path length)
                     # and evaluate the attenuation (as function of depth and frequency) for the central depth of this segment
                     # (because this is what takes time)
@@ -754,10 +802,12 @@ class ray_tracing_2D(ray_tracing_base):
                     dx_actuals = np.diff(segments)
                     mid_points = segments[:-1] + dx_actuals / 2
 
-                    # calculate attenuation for the different segments using the middle depth of the segment
-                    attenuation_exp_tmp = np.array(
-                        [[dt(x, C_0, f) * dx_actual for x, dx_actual in zip(mid_points, dx_actuals)]
-                        for f in freqs])
+                    # calculate attenuation for the different segments using the middle depth of the segment,
+                    # the attenuation length is evaluated for all frequencies and depths in a single call
+                    z_mid = np.where(mid_points > z_turn, 2 * z_turn - mid_points, mid_points)
+                    ds_mid = (self.get_y_diff_vectorized(z_mid, C_0) ** 2 + 1) ** 0.5
+                    attenuation_exp_tmp = ds_mid * dx_actuals / attenuation_util.get_attenuation_length(
+                        z_mid, freqs[:, None], self.attenuation_model)
 
                     if fallback:
                         # for the segment around z_turn fall back to integration. We only integrate ds (and not dt) for performance reasons
@@ -771,22 +821,21 @@ class ray_tracing_2D(ray_tracing_base):
                         elif idx == -1:
                             idx = 0
 
-                        att_int = np.array(
-                            [integrate.quad(self.ds, segments[idx], segments[idx + 1], args=(C_0), epsrel=1e-2, points=[z_turn])[0] /
-                            attenuation_util.get_attenuation_length(z_turn, f, self.attenuation_model) for f in freqs])
-
-                        attenuation_exp_tmp[:, idx] = att_int
+                        zz, weights = self.get_gauss_legendre_nodes(segments[idx], segments[idx + 1], z_turn)
+                        path_length = np.sum(weights * (self.get_y_diff_vectorized(zz, C_0) ** 2 + 1) ** 0.5)
+                        attenuation_exp_tmp[:, idx] = path_length / attenuation_util.get_attenuation_length(
+                            z_turn, freqs, self.attenuation_model)
 
                     # sum over all segments
                     attenuation_exp = np.sum(attenuation_exp_tmp, axis=1)
 
                 else:
-                    points = None
-                    if x1[1] < z_turn and z_turn < x2_mirrored[1]:
-                        points = [z_turn]
-
-                    attenuation_exp = np.array([integrate.quad(dt, x1[1], x2_mirrored[1], args=(
-                        C_0, f), epsrel=1e-2, points=points)[0] for f in freqs])
+                    # Gauss-Legendre integration of ds / L(z, f) along the path, the attenuation length is evaluated
+                    # for all frequencies and integration nodes in a single call
+                    zz, weights = self.get_gauss_legendre_nodes(x1[1], x2_mirrored[1], z_turn)
+                    ds = (self.get_y_diff_vectorized(zz, C_0) ** 2 + 1) ** 0.5
+                    attenuation_exp = np.sum(weights * ds / attenuation_util.get_attenuation_length(
+                        zz, freqs[:, None], self.attenuation_model), axis=1)
 
                 tmp = np.exp(-1 * attenuation_exp)
 
@@ -1380,6 +1429,279 @@ class ray_tracing_2D(ray_tracing_base):
 
             return sorted(results, key=itemgetter('reflection', 'C0'))
 
+    def get_turning_point_vectorized(self, c):
+        """
+        vectorized version of `get_turning_point`
+
+        Parameters
+        ----------
+        c: array of floats
+            related to C_0 parameter via c = self.medium.n_ice ** 2 - C_0 ** -2
+
+        Returns
+        -------
+        tuple (gamma, z coordinate of turning point) of arrays
+        """
+        gamma2 = self.__b * 0.5 - (0.25 * self.__b ** 2 - c) ** 0.5
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z2 = np.log(gamma2 / self.medium.delta_n) * self.medium.z_0
+        mask = z2 > 0
+        z2[mask] = 0
+        gamma2[mask] = self.get_gamma(0)
+        return gamma2, z2
+
+    def get_y_diff_vectorized(self, z, C_0):
+        """
+        derivative dy(z)/dz for arrays of (unmirrored) depths z and C_0 values
+
+        In contrast to `get_y_diff` no mirroring at the turning point and no air propagation is handled here.
+        """
+        c = self.medium.n_ice ** 2 - C_0 ** -2
+        gamma = self.get_gamma(z)
+        E = -self.__b * gamma + gamma ** 2 + c
+        B = 2 * c ** 0.5 * E ** 0.5 - self.__b * gamma + 2 * c
+        D = self.medium.n_ice ** 2 * C_0 ** 2 - 1
+        return (-c ** 0.5 * self.__b * gamma + 2 * E ** 0.5 * c + 2 * c ** 1.5) / B * E ** -0.5 * D ** -0.5
+
+    def get_delta_y_vectorized(self, logC_0, x1, x2):
+        """
+        vectorized version of `obj_delta_y` for in-ice ray tracing without bottom reflections
+
+        Parameters
+        ----------
+        logC_0: array of floats
+            the (transformed) C_0 parameters, see `get_C0_from_log`
+        x1: array of shape (N, 2)
+            (y, z) coordinates of the start points
+        x2: array of shape (N, 2)
+            (y, z) coordinates of the stop points
+
+        Returns
+        -------
+        array of floats: signed distance in y between the ray and the stop point
+        """
+        C_0 = self.get_C0_from_log(logC_0)
+        c = self.medium.n_ice ** 2 - C_0 ** -2
+        gamma_turn, z_turn = self.get_turning_point_vectorized(c)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # start points are always below the turning point, so no mirroring is needed to determine C_1
+            C_1 = x1[:, 0] - self.get_y(self.get_gamma(x1[:, 1]), C_0, 0)
+            y_turn = self.get_y(gamma_turn, C_0, C_1)
+            y2_raw = self.get_y(self.get_gamma(x2[:, 1]), C_0, C_1)
+        # see `get_delta_y` for the three cases
+        diff_deep = -1 * (((z_turn - x2[:, 1]) ** 2 + (y_turn - x2[:, 0]) ** 2) ** 0.5 + 10 * np.abs(z_turn - x2[:, 1]))
+        diff_direct = x2[:, 0] - y2_raw
+        diff_mirrored = -1 * (x2[:, 0] - (2 * y_turn - y2_raw))
+        return np.where(z_turn < np.minimum(x2[:, 1], 0), diff_deep,
+                        np.where(y_turn > x2[:, 0], diff_direct, diff_mirrored))
+
+    def find_solutions_vectorized(self, x1, x2, n_iterations=64, compact=True):
+        """
+        finds the ray tracing solutions for many pairs of start and stop points at once
+
+        This function only supports in-ice ray tracing without reflections off a bottom layer, and the same
+        coordinate convention as `find_solutions` (x2 is above and to the right of x1).
+        For a given pair of points, the objective function `obj_delta_y` has a single maximum as a function of
+        log(C_0) above the C_0 where the turning point reaches the depth of x2. The maximum is found with a
+        golden-section search and the (up to two) roots left and right of it with a bisection,
+        all operations being vectorized over the pairs of points.
+
+        Parameters
+        ----------
+        x1: array of shape (N, 2)
+            (y, z) coordinates of the start points
+        x2: array of shape (N, 2)
+            (y, z) coordinates of the stop points
+        n_iterations: int
+            number of iterations of the golden-section search and the bisection
+        compact: bool
+            if True (default), a single solution is always returned in the first column. If False, the first
+            (second) column always contains the solution left (right) of the maximum of `obj_delta_y`, which
+            keeps the columns continuous in x1 and x2 (used for interpolation tables).
+
+        Returns
+        -------
+        C0s: array of shape (N, 2)
+            C_0 parameters of the solutions sorted by C_0, NaN if no solution exists
+        """
+        x1 = np.atleast_2d(np.array(x1, dtype=float))
+        x2 = np.atleast_2d(np.array(x2, dtype=float))
+        n_pairs = x1.shape[0]
+
+        # the turning point is below x2 for all C_0 smaller than 1/n(z2), no solutions exists in this range
+        with np.errstate(divide='ignore'):
+            logC0_min = np.log(np.maximum(1. / self.n(x2[:, 1]) - 1. / self.medium.n_ice, 0))
+        logC0_min = np.maximum(logC0_min, -100) + 1e-9
+        logC0_max = np.ones(n_pairs) * 30.  # larger values correspond to vertical rays where delta_y becomes constant
+
+        # golden-section search for the maximum of delta_y
+        inv_phi = (5 ** 0.5 - 1) / 2
+        a = np.copy(logC0_min)
+        b = np.copy(logC0_max)
+        for i in range(n_iterations):
+            c = b - (b - a) * inv_phi
+            d = a + (b - a) * inv_phi
+            mask = self.get_delta_y_vectorized(c, x1, x2) >= self.get_delta_y_vectorized(d, x1, x2)
+            b = np.where(mask, d, b)
+            a = np.where(mask, a, c)
+        logC0_peak = 0.5 * (a + b)
+        delta_peak = self.get_delta_y_vectorized(logC0_peak, x1, x2)
+
+        def bisect(lower, upper):
+            f_lower = self.get_delta_y_vectorized(lower, x1, x2)
+            for i in range(n_iterations):
+                middle = 0.5 * (lower + upper)
+                f_middle = self.get_delta_y_vectorized(middle, x1, x2)
+                mask = np.sign(f_middle) == np.sign(f_lower)
+                lower = np.where(mask, middle, lower)
+                f_lower = np.where(mask, f_middle, f_lower)
+                upper = np.where(mask, upper, middle)
+            return 0.5 * (lower + upper)
+
+        C0s = np.full((n_pairs, 2), np.nan)
+        # a maximum that just touches zero is a single solution
+        mask_touch = np.abs(delta_peak) < 1e-7 ** 0.5
+        C0s[mask_touch, 0] = self.get_C0_from_log(logC0_peak[mask_touch])
+
+        mask_left = (delta_peak > 0) & ~mask_touch & (self.get_delta_y_vectorized(logC0_min, x1, x2) < 0)
+        if np.any(mask_left):
+            C0s[mask_left, 0] = self.get_C0_from_log(bisect(logC0_min, logC0_peak)[mask_left])
+        logC0_stop = np.ones(n_pairs) * 100
+        mask_right = (delta_peak > 0) & ~mask_touch & (self.get_delta_y_vectorized(logC0_stop, x1, x2) < 0)
+        if np.any(mask_right):
+            C0s[mask_right, 1] = self.get_C0_from_log(bisect(logC0_peak, logC0_stop)[mask_right])
+
+        # the same solution can be found twice because of numerical imprecision
+        with np.errstate(invalid='ignore'):
+            mask_duplicate = np.round(np.log(C0s[:, 0] - 1. / self.medium.n_ice), 3) == np.round(np.log(C0s[:, 1] - 1. / self.medium.n_ice), 3)
+        C0s[mask_duplicate, 1] = np.nan
+
+        if compact:
+            # move solutions to the front
+            mask_swap = np.isnan(C0s[:, 0]) & ~np.isnan(C0s[:, 1])
+            C0s[mask_swap] = C0s[mask_swap][:, ::-1]
+        return C0s
+
+    def determine_solution_type_vectorized(self, x1, x2, C_0):
+        """
+        vectorized version of `determine_solution_type` (without bottom reflections)
+
+        Parameters
+        ----------
+        x1: array of shape (N, 2)
+            start positions
+        x2: array of shape (N, 2)
+            stop positions
+        C_0: array of floats
+            C_0 values of the ray tracing solutions
+
+        Returns
+        -------
+        solution_types: array of ints
+        """
+        c = self.medium.n_ice ** 2 - C_0 ** -2
+        gamma_turn, z_turn = self.get_turning_point_vectorized(c)
+        C_1 = x1[:, 0] - self.get_y(self.get_gamma(x1[:, 1]), C_0, 0)
+        y_turn = self.get_y(gamma_turn, C_0, C_1)
+        return np.where(x2[:, 0] < y_turn, solution_types_revert['direct'],
+                        np.where(z_turn == 0, solution_types_revert['reflected'], solution_types_revert['refracted']))
+
+    def get_launch_and_receive_angle_vectorized(self, x1, x2, C_0):
+        """
+        vectorized version of `get_launch_angle` and `get_receive_angle` (without bottom reflections and in-ice only)
+
+        Parameters
+        ----------
+        x1: array of shape (N, 2)
+            start positions
+        x2: array of shape (N, 2)
+            stop positions
+        C_0: array of floats
+            C_0 values of the ray tracing solutions
+
+        Returns
+        -------
+        launch_angles, receive_angles: arrays of floats
+        """
+        angle = np.arctan(self.get_y_diff_vectorized(x1[:, 1], C_0))
+        launch_angles = np.where(angle < 0, np.pi + angle, angle)
+
+        c = self.medium.n_ice ** 2 - C_0 ** -2
+        gamma_turn, z_turn = self.get_turning_point_vectorized(c)
+        C_1 = x1[:, 0] - self.get_y(self.get_gamma(x1[:, 1]), C_0, 0)
+        y_turn = self.get_y(gamma_turn, C_0, C_1)
+        # z position of the receiver on the mirrored ray path, see `get_z_mirrored`
+        z2 = np.where(y_turn < x2[:, 0], x1[:, 1] + np.abs(z_turn - x1[:, 1]) + np.abs(z_turn - x2[:, 1]), x2[:, 1])
+        mirrored = z2 > z_turn
+        dy = self.get_y_diff_vectorized(np.where(mirrored, 2 * z_turn - z2, z2), C_0)
+        angle = np.arctan(np.where(mirrored, -1 * dy, dy))
+        receive_angles = np.pi - np.where(angle < 0, np.pi + angle, angle)
+        return launch_angles, receive_angles
+
+    def get_path_length_and_travel_time_analytic_vectorized(self, x1, x2, C_0, solution_type, launch_angle):
+        """
+        vectorized version of `get_path_length_analytic` and `get_travel_time_analytic`
+        (without bottom reflections and in-ice only)
+
+        Parameters
+        ----------
+        x1: array of shape (N, 2)
+            start positions
+        x2: array of shape (N, 2)
+            stop positions
+        C_0: array of floats
+            C_0 values of the ray tracing solutions
+        solution_type: array of ints
+            the solution types, see `determine_solution_type_vectorized`
+        launch_angle: array of floats
+            the launch angles, see `get_launch_and_receive_angle_vectorized`
+
+        Returns
+        -------
+        path_lengths, travel_times: arrays of floats
+            NaN or inf is returned if the analytic calculation failed
+        """
+        n_ice = self.medium.n_ice
+        z_0 = self.medium.z_0
+        z_deep = get_z_deep((self.medium.n_ice, self.medium.z_0, self.medium.delta_n))
+        beta = self.n(x1[:, 1]) * np.sin(launch_angle)
+        alpha = n_ice ** 2 - beta ** 2
+
+        def get_s(z):
+            n = self.n(z)
+            gamma = np.maximum(n ** 2 - beta ** 2, 0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log_1 = np.log(n_ice * n - beta ** 2 - (alpha * gamma) ** 0.5)
+                log_2 = np.log(n + gamma ** 0.5)
+            length = n_ice / alpha ** 0.5 * (-z + log_1 * z_0) + log_2 * z_0
+            time = (((gamma ** 0.5 + n_ice * log_2 + n_ice ** 2 * log_1 / alpha ** 0.5) * z_0) - z * n_ice ** 2 / alpha ** 0.5) / speed_of_light
+            return length, time
+
+        def get_s_deep(z):
+            length = n_ice * z / alpha ** 0.5
+            time = n_ice * (self.n(z) + n_ice * (z / z_0 - 1)) / (alpha ** 0.5 / z_0 * speed_of_light)
+            return length, time
+
+        length_diff_deep, time_diff_deep = np.subtract(get_s_deep(z_deep), get_s(z_deep))
+
+        def get_direct(z1, z2):
+            deep1 = z1 < z_deep
+            deep2 = z2 < z_deep
+            s1 = np.where(deep1, get_s_deep(z1), get_s(z1))
+            s2 = np.where(deep2, get_s_deep(z2), get_s(z2))
+            sign = np.where(deep1 == deep2, 0, np.where(z1 < z2, 1, -1))
+            return s2[0] - s1[0] + sign * length_diff_deep, s2[1] - s1[1] + sign * time_diff_deep
+
+        gamma_turn, z_turn = self.get_turning_point_vectorized(self.medium.n_ice ** 2 - C_0 ** -2)
+        z_turn = np.where(solution_type == solution_types_revert['reflected'], 0, z_turn)
+        length_direct, time_direct = get_direct(x1[:, 1], x2[:, 1])
+        length_1, time_1 = get_direct(x1[:, 1], z_turn)
+        length_2, time_2 = get_direct(x2[:, 1], z_turn)
+        mask_direct = solution_type == solution_types_revert['direct']
+        path_lengths = np.where(mask_direct, length_direct, length_1 + length_2)
+        travel_times = np.where(mask_direct, time_direct, time_1 + time_2)
+        return path_lengths, travel_times
+
     def plot_result(self, x1, x2, C_0, ax):
         """
         helper function to visualize results
@@ -1816,6 +2138,10 @@ class ray_tracing(ray_tracing_base):
                 * self._config['propagation']['focusing_limit'] = 2
                 * self._config['propagation']['focusing'] = False
 
+            If `config['propagation']['analytic']['lookup_table']` is True, the ray tracing solutions are
+            interpolated from precomputed tables for all antenna depths of the detector
+            (see `NuRadioMC.SignalProp.raytracing_lookup_table`).
+
         detector: detector object
         
         ray_tracing_2D_kwards: dict
@@ -1852,6 +2178,8 @@ class ray_tracing(ray_tracing_base):
         self._r2d = ray_tracing_2D(self._medium, self._attenuation_model, log_level=log_level,
                                     n_frequencies_integration=self._n_frequencies_integration,
                                     **ray_tracing_2D_kwards, use_cpp=use_cpp)
+        self._lookup_table = None
+        self._setup_lookup_table()
 
         self._swap = None
         self._dPhi = None
@@ -1920,8 +2248,8 @@ class ray_tracing(ray_tracing_base):
         for i in range(len(C0s)):
             if(not np.isnan(C0s[i])):
                 if 'ray_tracing_reflection' in raytracing_results.keys():  # for backward compatibility: Check if reflection layer information exists in data file
-                    reflection = raytracing_results['ray_tracing_reflection'][i]
-                    reflection_case = raytracing_results['ray_tracing_reflection_case'][i]
+                    reflection = int(raytracing_results['ray_tracing_reflection'][i])
+                    reflection_case = int(raytracing_results['ray_tracing_reflection_case'][i])
                 else:
                     reflection = 0
                     reflection_case = 0
@@ -1932,10 +2260,58 @@ class ray_tracing(ray_tracing_base):
                                 'reflection_case': reflection_case})
         self._results = results
 
+    def set_lookup_table(self, lookup_table):
+        """
+        Set the table from which the ray tracing solutions are interpolated
+
+        Parameters
+        ----------
+        lookup_table: `NuRadioMC.SignalProp.raytracing_lookup_table.RayTracingLookupTable` or None
+            the lookup table. If None, the ray tracing solutions are always calculated exactly.
+        """
+        self._lookup_table = lookup_table
+
+    def _setup_lookup_table(self):
+        """
+        creates the lookup table for all antenna depths of the detector if requested in the config
+        """
+        table_config = self._config['propagation'].get('analytic', {})
+        if not table_config.get('lookup_table', False):
+            self._lookup_table = None
+            return
+        from NuRadioMC.SignalProp.raytracing_lookup_table import RayTracingLookupTable, default_frequencies
+        frequencies = None
+        if self._config['propagation'].get('attenuate_ice', True):
+            frequencies = default_frequencies
+        self._lookup_table = RayTracingLookupTable(
+            self._r2d, path=table_config.get('lookup_table_path', None),
+            max_error_travel_time=table_config.get('max_error_travel_time', 0.1) * units.ns,
+            max_error_angle=table_config.get('max_error_angle', 0.05) * units.deg,
+            max_error_attenuation=table_config.get('max_error_attenuation', 0.01),
+            frequencies=frequencies)
+        if self._detector is None:
+            self.__logger.warning("no detector is available, antenna depths need to be added to the lookup table manually")
+            return
+        depths = set()
+        for station_id in self._detector.get_station_ids():
+            station_z = self._detector.get_absolute_position(station_id)[2]
+            for channel_id in self._detector.get_channel_ids(station_id):
+                depths.add(np.round(station_z + self._detector.get_relative_position(station_id, channel_id)[2], 3))
+        for z_antenna in sorted(depths):
+            self._lookup_table.add_antenna_depth(z_antenna)
+
     def find_solutions(self):
         """
         find all solutions between x1 and x2
+
+        If a lookup table is set and contains the depth of x1 or x2, the solutions are interpolated
+        from the table if possible.
         """
+        if self._lookup_table is not None and not self._n_reflections and self._x2[1] <= 0:
+            results = self._lookup_table.get_solutions(self._x1, self._x2)
+            if results is not None:
+                self._results = results
+                return
         self._results = self._r2d.find_solutions(self._x1, self._x2)
         for i in range(self._n_reflections):
             for j in range(2):
@@ -1946,6 +2322,214 @@ class ray_tracing(ray_tracing_base):
             self.__logger.error(f"{self.get_number_of_solutions()} were found but only {self.get_number_of_raytracing_solutions()} are allowed! Returning zero solutions")
             self._results = []
 
+    def find_solutions_from_reference(self, reference_results, reference_end_point, max_miss_distance,
+                                      max_newton_steps=2):
+        """
+        derive the ray tracing solutions between x1 and x2 from the solutions to a nearby end point
+
+        Starting from the C_0 parameter of each reference solution, the miss distance `obj_delta_y` of the current
+        geometry is corrected to first order (Newton step). The correction is repeated until the miss distance
+        is smaller than `max_miss_distance` or `max_newton_steps` is reached. The remaining quantities
+        (launch and receive vectors, travel time, path length, attenuation) are afterwards calculated exactly
+        for the corrected C_0 and the actual end point.
+
+        Only in-ice solutions without bottom reflections are supported. The lookup table is not used as a
+        reference, `find_solutions` is faster in that case.
+
+        Parameters
+        ----------
+        reference_results: list of dicts
+            the ray tracing results (see `get_results`) for the same start point and the reference end point
+        reference_end_point: 3dim np.array
+            the end point for which the reference results were calculated
+        max_miss_distance: float
+            the maximum allowed distance between the corrected ray path and the end point
+        max_newton_steps: int
+            the maximum number of first order corrections of C_0
+
+        Returns
+        -------
+        float or None
+            the achieved (largest) miss distance of all solutions or None if the solutions could not be derived
+            from the reference. In the latter case, `find_solutions` needs to be called.
+        """
+        if self._n_reflections or self._x2[1] > 0 or len(reference_results) == 0:
+            return None
+        if any([('lookup_table' in result) or result['reflection'] for result in reference_results]):
+            return None
+        start_point = self._X2 if self._swap else self._X1
+        if (np.asarray(reference_end_point)[2] < start_point[2]) != self._swap:
+            return None
+
+        logC0 = np.log(np.array([result['C0'] for result in reference_results]) - 1. / self._medium.n_ice)
+        n_solutions = len(logC0)
+        x1 = np.tile(self._x1, (3 * n_solutions, 1))
+        x2 = np.tile(self._x2, (3 * n_solutions, 1))
+        logC0_new = logC0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for iteration in range(max_newton_steps + 1):
+                step = 1e-6 * np.maximum(np.abs(logC0_new), 1)
+                delta = self._r2d.get_delta_y_vectorized(np.concatenate([logC0_new, logC0_new - step, logC0_new + step]), x1, x2)
+                miss_distance = np.abs(delta[:n_solutions])
+                if iteration == max_newton_steps or not np.all(np.isfinite(delta)) or np.max(miss_distance) <= max_miss_distance:
+                    break
+                derivative = (delta[2 * n_solutions:] - delta[n_solutions:2 * n_solutions]) / (2 * step)
+                logC0_new = logC0_new - delta[:n_solutions] / derivative
+        if (not np.all(np.isfinite(miss_distance)) or np.max(miss_distance) > max_miss_distance or
+                len(np.unique(np.round(logC0_new, 3))) != n_solutions):
+            self.__logger.debug(f"solution could not be derived from reference (miss distance {miss_distance})")
+            return None
+
+        results = []
+        for result, logC_0 in zip(reference_results, logC0_new):
+            C_0 = self._r2d.get_C0_from_log(logC_0)
+            results.append({'type': self._r2d.determine_solution_type(self._x1, self._x2, C_0),
+                            'C0': C_0,
+                            'C1': self._r2d.get_C_1(self._x1, C_0),
+                            'reflection': 0,
+                            'reflection_case': result['reflection_case']})
+        self._results = results
+        return np.max(miss_distance)
+
+    def find_solutions_batch(self, x1, x2):
+        """
+        find the ray tracing solutions for many pairs of start and stop points in one call
+
+        The C_0 parameters of in-ice ray paths without bottom reflections are determined with the vectorized
+        root finding of `ray_tracing_2D.find_solutions_vectorized` (or the CPP implementation if available), and
+        the launch and receive vectors, path lengths and travel times are calculated vectorized from the
+        analytic solutions. All other cases (ice-to-air propagation, bottom reflections, or if the analytic
+        calculation of the travel time fails) fall back to the single-pair functions.
+        The focusing factor is not part of the output. The solutions are reset after calling this function.
+
+        Parameters
+        ----------
+        x1: np.array of shape (N, 3), default unit
+            start points of the rays
+        x2: np.array of shape (N, 3), default unit
+            stop points of the rays
+
+        Returns
+        -------
+        dict
+            dictionary of arrays of shape (N, n_solutions) or (N, n_solutions, 3) with n_solutions being the value
+            of `get_number_of_raytracing_solutions`. Missing solutions are filled with NaN. The keys are
+
+            * 'ray_tracing_C0'
+            * 'ray_tracing_C1'
+            * 'ray_tracing_reflection'
+            * 'ray_tracing_reflection_case'
+            * 'ray_tracing_solution_type'
+            * 'launch_vectors'
+            * 'receive_vectors'
+            * 'travel_times'
+            * 'travel_distances'
+
+            The first five entries can be passed (per pair of points) to `set_solution`.
+        """
+        X1 = np.atleast_2d(np.array(x1, dtype=float))
+        X2 = np.atleast_2d(np.array(x2, dtype=float))
+        n_pairs = X1.shape[0]
+        nS = self.get_number_of_raytracing_solutions()
+        output = {}
+        for key in ['ray_tracing_C0', 'ray_tracing_C1', 'ray_tracing_reflection', 'ray_tracing_reflection_case',
+                    'ray_tracing_solution_type', 'travel_times', 'travel_distances']:
+            output[key] = np.full((n_pairs, nS), np.nan)
+        output['launch_vectors'] = np.full((n_pairs, nS, 3), np.nan)
+        output['receive_vectors'] = np.full((n_pairs, nS, 3), np.nan)
+
+        # same coordinate transformation as in `set_start_and_end_point`
+        swap = X2[:, 2] < X1[:, 2]
+        X1_tmp = np.where(swap[:, None], X2, X1)
+        X2 = np.where(swap[:, None], X1, X2)
+        X1 = X1_tmp
+        dX = X2 - X1
+        dPhi = -np.arctan2(dX[:, 1], dX[:, 0])
+        cos_phi, sin_phi = np.cos(dPhi), np.sin(dPhi)
+        x1_2d = np.array([X1[:, 0], X1[:, 2]]).T
+        x2_2d = np.array([X1[:, 0] + cos_phi * dX[:, 0] - sin_phi * dX[:, 1], X2[:, 2]]).T
+
+        mask_vectorized = x2_2d[:, 1] <= 0
+        if self._n_reflections:
+            mask_vectorized[:] = False
+
+        fallback = np.copy(~mask_vectorized)
+        if np.any(mask_vectorized):
+            idx = np.arange(n_pairs)[mask_vectorized]
+            x1_v = x1_2d[mask_vectorized]
+            x2_v = x2_2d[mask_vectorized]
+            if self.use_cpp:
+                C0s = np.full((len(idx), 2), np.nan)
+                tmp_reflection = 100  # not used, see `ray_tracing_2D.find_solutions`
+                for i in range(len(idx)):
+                    results = wrapper.find_solutions(x1_v[i], x2_v[i], self._medium.n_ice, self._medium.delta_n,
+                                                     self._medium.z_0, 0, 1, tmp_reflection)
+                    for iS, result in enumerate(results[:2]):
+                        C0s[i, iS] = result['C0']
+            else:
+                C0s = self._r2d.find_solutions_vectorized(x1_v, x2_v)
+
+            for iS in range(2):
+                mask = ~np.isnan(C0s[:, iS])
+                if not np.any(mask):
+                    continue
+                ii = idx[mask]
+                x1_s = x1_v[mask]
+                x2_s = x2_v[mask]
+                C_0 = C0s[mask, iS]
+                solution_type = self._r2d.determine_solution_type_vectorized(x1_s, x2_s, C_0)
+                launch_angle, receive_angle = self._r2d.get_launch_and_receive_angle_vectorized(x1_s, x2_s, C_0)
+                path_length, travel_time = self._r2d.get_path_length_and_travel_time_analytic_vectorized(
+                    x1_s, x2_s, C_0, solution_type, launch_angle)
+
+                output['ray_tracing_C0'][ii, iS] = C_0
+                output['ray_tracing_C1'][ii, iS] = x1_s[:, 0] - self._r2d.get_y(self._r2d.get_gamma(x1_s[:, 1]), C_0, 0)
+                output['ray_tracing_reflection'][ii, iS] = 0
+                output['ray_tracing_reflection_case'][ii, iS] = 1
+                output['ray_tracing_solution_type'][ii, iS] = solution_type
+                output['travel_times'][ii, iS] = travel_time
+                output['travel_distances'][ii, iS] = path_length
+
+                # rotate the 2D vectors back into 3D, the launch and receive vectors are exchanged if
+                # the start and stop points were swapped
+                sw = swap[ii]
+                launch_2d = np.where(sw[:, None],
+                                     np.array([-np.sin(receive_angle), np.cos(receive_angle)]).T,
+                                     np.array([np.sin(launch_angle), np.cos(launch_angle)]).T)
+                receive_2d = np.where(sw[:, None],
+                                      np.array([np.sin(launch_angle), np.cos(launch_angle)]).T,
+                                      np.array([-np.sin(receive_angle), np.cos(receive_angle)]).T)
+                for key, vector_2d in [('launch_vectors', launch_2d), ('receive_vectors', receive_2d)]:
+                    output[key][ii, iS] = np.array([cos_phi[ii] * vector_2d[:, 0],
+                                                    -sin_phi[ii] * vector_2d[:, 0],
+                                                    vector_2d[:, 1]]).T
+
+                # fall back to the numerical integration if the analytic calculation failed
+                fallback[ii[~(np.isfinite(path_length) & np.isfinite(travel_time))]] = True
+
+        for i in np.arange(n_pairs)[fallback]:
+            for key in output:
+                output[key][i] = np.nan
+            if swap[i]:
+                self.set_start_and_end_point(X2[i], X1[i])
+            else:
+                self.set_start_and_end_point(X1[i], X2[i])
+            self.find_solutions()
+            for iS, result in enumerate(self.get_results()):
+                output['ray_tracing_C0'][i, iS] = result['C0']
+                output['ray_tracing_C1'][i, iS] = result['C1']
+                output['ray_tracing_reflection'][i, iS] = result['reflection']
+                output['ray_tracing_reflection_case'][i, iS] = result['reflection_case']
+                output['ray_tracing_solution_type'][i, iS] = self.get_solution_type(iS)
+                output['launch_vectors'][i, iS] = self.get_launch_vector(iS)
+                output['receive_vectors'][i, iS] = self.get_receive_vector(iS)
+                travel_time = self.get_travel_time(iS)
+                path_length = self.get_path_length(iS)
+                output['travel_times'][i, iS] = np.nan if travel_time is None else travel_time
+                output['travel_distances'][i, iS] = np.nan if path_length is None else path_length
+        self.reset_solutions()
+        return output
+
     def get_solution_type(self, iS):
         """ returns the type of the solution
 
@@ -1998,14 +2582,12 @@ class ray_tracing(ray_tracing_base):
             raise IndexError
 
         result = self._results[iS]
-        alpha = self._r2d.get_launch_angle(self._x1, result['C0'], reflection=result['reflection'],
-                                            reflection_case=result['reflection_case'])
-        launch_vector_2d = np.array([np.sin(alpha), 0, np.cos(alpha)])
         if self._swap:
-            alpha = self._r2d.get_receive_angle(self._x1, self._x2, result['C0'],
-                                                 reflection=result['reflection'],
-                                                 reflection_case=result['reflection_case'])
+            alpha = self.__get_receive_angle(result)
             launch_vector_2d = np.array([-np.sin(alpha), 0, np.cos(alpha)])
+        else:
+            alpha = self.__get_launch_angle(result)
+            launch_vector_2d = np.array([np.sin(alpha), 0, np.cos(alpha)])
         self.__logger.debug(self._R.T)
         launch_vector = np.dot(self._R.T, launch_vector_2d)
         return launch_vector
@@ -2031,18 +2613,27 @@ class ray_tracing(ray_tracing_base):
             raise IndexError
 
         result = self._results[iS]
-        alpha = self._r2d.get_receive_angle(self._x1, self._x2, result['C0'],
-                                             reflection=result['reflection'],
-                                             reflection_case=result['reflection_case'])
-        receive_vector_2d = np.array([-np.sin(alpha), 0, np.cos(alpha)])
         if self._swap:
-            alpha = self._r2d.get_launch_angle(self._x1, result['C0'],
-                                                reflection=result['reflection'],
-                                                reflection_case=result['reflection_case'])
+            alpha = self.__get_launch_angle(result)
             receive_vector_2d = np.array([np.sin(alpha), 0, np.cos(alpha)])
+        else:
+            alpha = self.__get_receive_angle(result)
+            receive_vector_2d = np.array([-np.sin(alpha), 0, np.cos(alpha)])
         receive_vector = np.dot(self._R.T, receive_vector_2d)
         return receive_vector
 
+    def __get_launch_angle(self, result):
+        if 'lookup_table' in result:
+            return result['lookup_table']['launch_angle']
+        return self._r2d.get_launch_angle(self._x1, result['C0'], reflection=result['reflection'],
+                                          reflection_case=result['reflection_case'])
+
+    def __get_receive_angle(self, result):
+        if 'lookup_table' in result:
+            return result['lookup_table']['receive_angle']
+        return self._r2d.get_receive_angle(self._x1, self._x2, result['C0'], reflection=result['reflection'],
+                                           reflection_case=result['reflection_case'])
+
     def get_reflection_angle(self, iS):
         """
         calculates the angle of reflection at the surface (in case of a reflected ray)
@@ -2091,6 +2682,8 @@ class ray_tracing(ray_tracing_base):
             raise IndexError
 
         result = self._results[iS]
+        if analytic and 'lookup_table' in result:
+            return result['lookup_table']['path_length']
         if analytic:
             try:
                 analytic_length = self._r2d.get_path_length_analytic(self._x1, self._x2, result['C0'],
@@ -2132,6 +2725,8 @@ class ray_tracing(ray_tracing_base):
             raise IndexError
 
         result = self._results[iS]
+        if analytic and 'lookup_table' in result:
+            return result['lookup_table']['travel_time']
         if(analytic):
             try:
                 analytic_time = self._r2d.get_travel_time_analytic(self._x1, self._x2, result['C0'],
@@ -2179,6 +2774,10 @@ class ray_tracing(ray_tracing_base):
             raise IndexError
 
         result = self._results[iS]
+        if 'lookup_table' in result:
+            attenuation = self._lookup_table.get_attenuation(result, frequency)
+            if attenuation is not None:
+                return attenuation
         return self._r2d.get_attenuation_along_path(self._x1, self._x2, result['C0'], frequency, max_detector_freq,
                                                      reflection=result['reflection'],
                                                      reflection_case=result['reflection_case'])
@@ -2222,6 +2821,14 @@ class ray_tracing(ray_tracing_base):
         if not hasattr(self, "_r1"):
             self._r1 = ray_tracing(self._medium, self._attenuation_model, logging.WARNING,
                              self._n_frequencies_integration, self._n_reflections, use_cpp=self.use_cpp)
+        if 'lookup_table' in self._results[iS]:
+            # the interpolation error of the lookup table is much larger than the change of the launch angle
+            # over dz, so both launch angles are calculated with the exact solution (_r1 has no lookup table)
+            self._r1.set_start_and_end_point(vetPos, recPos)
+            self._r1.find_solutions()
+            if iS < self._r1.get_number_of_solutions():
+                lauVec = self._r1.get_launch_vector(iS)
+                lauAng = np.arccos(lauVec[2] / np.sqrt(lauVec[0] ** 2 + lauVec[1] ** 2 + lauVec[2] ** 2))
         self._r1.set_start_and_end_point(vetPos, recPos1)
         self._r1.find_solutions()
         if iS < self._r1.get_number_of_solutions():
@@ -2367,7 +2974,7 @@ class ray_tracing(ray_tracing_base):
             focusing = self.get_focusing(i_solution, limit=float(self._config['propagation']['focusing_limit']))
             spec[1:] *= focusing
 
-        efield.set_frequency_spectrum(spec, efield.get_sampling_rate())
+        efield.set_frequency_spectrum(spec, efield.get_sampling_rate(), copy=False)
         return efield
 
     def set_config(self, config):
@@ -2387,3 +2994,5 @@ class ray_tracing(ray_tracing_base):
             self._config['propagation']['focusing'] = False
         else:
             self._config = config
+        if hasattr(self, '_r2d'):
+            self._setup_lookup_table()
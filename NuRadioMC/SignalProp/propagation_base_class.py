@@ -136,6 +136,86 @@ class ray_tracing_base:
         self.__logger.error('function not defined')
         raise NotImplementedError
 
+    def find_solutions_batch(self, x1, x2):
+        """
+        find the ray tracing solutions for many pairs of start and stop points in one call
+
+        The generic implementation loops over all pairs of points. Ray tracers can overwrite this function
+        with a more efficient (e.g. vectorized) implementation. The ray tracing solutions of the
+        last pair of points are not kept, i.e., the solutions are reset after calling this function.
+
+        Parameters
+        ----------
+        x1: np.array of shape (N, 3), default unit
+            start points of the rays
+        x2: np.array of shape (N, 3), default unit
+            stop points of the rays
+
+        Returns
+        -------
+        dict
+            dictionary of arrays of shape (N, n_solutions) or (N, n_solutions, 3) with n_solutions being the value
+            of `get_number_of_raytracing_solutions`. Missing solutions are filled with NaN.
+            The keys are the output parameters of the ray tracer (see `get_output_parameters`) and
+
+            * 'launch_vectors'
+            * 'receive_vectors'
+            * 'travel_times'
+            * 'travel_distances'
+        """
+        x1 = np.atleast_2d(x1)
+        x2 = np.atleast_2d(x2)
+        n_pairs = x1.shape[0]
+        nS = self.get_number_of_raytracing_solutions()
+        output = {
+            'launch_vectors': np.full((n_pairs, nS, 3), np.nan),
+            'receive_vectors': np.full((n_pairs, nS, 3), np.nan),
+            'travel_times': np.full((n_pairs, nS), np.nan),
+            'travel_distances': np.full((n_pairs, nS), np.nan)
+        }
+        for parameter_entry in self.get_output_parameters():
+            if parameter_entry['ndim'] == 1:
+                output[parameter_entry['name']] = np.full((n_pairs, nS), np.nan)
+            else:
+                output[parameter_entry['name']] = np.full((n_pairs, nS, parameter_entry['ndim']), np.nan)
+
+        for i in range(n_pairs):
+            self.set_start_and_end_point(x1[i], x2[i])
+            self.find_solutions()
+            for iS in range(self.get_number_of_solutions()):
+                for key, value in self.get_raytracing_output(iS).items():
+                    output[key][i, iS] = value
+                output['launch_vectors'][i, iS] = self.get_launch_vector(iS)
+                output['receive_vectors'][i, iS] = self.get_receive_vector(iS)
+                output['travel_times'][i, iS] = self.get_travel_time(iS)
+                output['travel_distances'][i, iS] = self.get_path_length(iS)
+        self.reset_solutions()
+        return output
+
+    def find_solutions_from_reference(self, reference_results, reference_end_point, max_miss_distance):
+        """
+        derive the ray tracing solutions between x1 and x2 from the solutions to a nearby end point
+
+        This is used to share the ray tracing between close-by channels of a station. The generic implementation
+        does not support this, i.e., the solutions always need to be calculated with `find_solutions`.
+
+        Parameters
+        ----------
+        reference_results: list of dicts
+            the ray tracing results (see `get_results`) for the same start point and the reference end point
+        reference_end_point: 3dim np.array
+            the end point for which the reference results were calculated
+        max_miss_distance: float
+            the maximum allowed distance between the corrected ray path and the end point
+
+        Returns
+        -------
+        float or None
+            the achieved miss distance or None if the solutions could not be derived from the reference.
+            In the latter case, `find_solutions` needs to be called.
+        """
+        return None
+
     def has_solution(self):
         """
         checks if ray tracing solution exists
@@ -0,0 +1,441 @@
+from __future__ import absolute_import, division, print_function
+import numpy as np
+import h5py
+import hashlib
+import json
+import os
+from NuRadioReco.utilities import units
+import logging
+logging.basicConfig()
+
+"""
+Persistent lookup tables for the analytic ray tracer.
+
+For a given ice model the 2D ray tracing solutions only depend on the horizontal distance between
+the two points and their depths. For each antenna depth, a table of the ray tracing solutions
+(C_0, solution type, launch and receive angle, path length, travel time and the attenuation at a set
+of frequencies) is calculated on a regular grid of horizontal distance and vertex depth and stored in
+an HDF5 file. The file name contains a hash of the ice model, the attenuation model and the grid,
+so that tables are only reused for identical settings.
+
+The ray tracing quantities are obtained by bilinear interpolation. The travel time, the path length and the
+attenuation exponent are interpolated relative to a reference distance (the straight-line distance for the
+first solution and the distance via the mirror point at the surface for the second solution), which
+removes most of their curvature. For each grid cell, the interpolation error is estimated from the
+second differences of the tabulated values along both axes and by comparing the exact solution at the
+center of the cell with the interpolated value.
+If the estimated error exceeds the configured bounds, or if the number or type of solutions changes within
+the cell (i.e., close to the shadow zone boundary or the turning point of the ray), the lookup fails and the
+ray tracer falls back to solving the ray tracing problem exactly.
+"""
+
+table_version = 1
+
+# default grid used to build new tables
+default_distances = np.arange(0, 4 * units.km + 1 * units.m, 10 * units.m)
+default_depths = np.arange(-3 * units.km, 0 + 1 * units.m, 10 * units.m)
+default_frequencies = np.linspace(25 * units.MHz, 2.5 * units.GHz, 25)
+
+# datasets that are stored for each node of the grid and each solution
+grid_quantities = ['C0', 'solution_type', 'launch_angle', 'receive_angle', 'path_length', 'travel_time']
+# quantities that are interpolated relative to the reference distance
+scaled_quantities = ['path_length', 'travel_time', 'attenuation_exponent']
+
+
+def get_reference_distance(distances, depths, z_antenna):
+    """
+    returns the reference distances between the antenna and the vertex positions of the grid
+
+    The reference distance of the first solution is the straight-line distance, the reference distance
+    of the second solution (the ray that is refracted or reflected close to the surface) is the distance
+    via the mirror point at the surface.
+
+    Parameters
+    ----------
+    distances: array of floats
+        horizontal distances
+    depths: array of floats
+        vertex depths
+    z_antenna: float
+        the depth of the antenna
+
+    Returns
+    -------
+    array of shape (len(distances), len(depths), 2)
+    """
+    dd, zz = np.meshgrid(distances, depths, indexing='ij')
+    return np.stack([np.sqrt(dd ** 2 + (zz - z_antenna) ** 2), np.sqrt(dd ** 2 + (zz + z_antenna) ** 2)], axis=-1)
+
+
+class RayTracingLookupTable:
+    """
+    interpolation tables of the analytic ray tracing solutions for a fixed set of antenna depths
+    """
+
+    def __init__(self, ray_tracing_2D, path=None,
+                 max_error_travel_time=0.1 * units.ns, max_error_angle=0.05 * units.deg,
+                 max_error_attenuation=0.01, distances=None, depths=None,
+                 frequencies=default_frequencies, log_level=logging.WARNING):
+        """
+        initialize lookup table
+
+        Parameters
+        ----------
+        ray_tracing_2D: `NuRadioMC.SignalProp.analyticraytracing.ray_tracing_2D` object
+            the 2D ray tracer that is used to calculate the tables
+        path: string or None
+            directory where the tables are stored. If None, the tables are stored in the
+            `lookup_tables` directory next to this file.
+        max_error_travel_time: float
+            maximum estimated interpolation error of the travel time
+        max_error_angle: float
+            maximum estimated interpolation error of the launch and receive angle
+        max_error_attenuation: float
+            maximum estimated interpolation error of the attenuation factor (the fraction of the signal
+            amplitude that reaches the observer)
+        distances: array of floats or None
+            grid of horizontal distances used to build new tables. If None, a grid from 0 to 4km
+            in steps of 10m is used.
+        depths: array of floats or None
+            grid of vertex depths used to build new tables. If None, a grid from -3km to 0 in steps
+            of 10m is used.
+        frequencies: array of floats or None
+            frequencies for which the attenuation is tabulated. If None, the attenuation is not
+            tabulated and always calculated exactly.
+        log_level: logging.loglevel object
+            controls verbosity (default WARNING)
+        """
+        self.__logger = logging.getLogger('RayTracingLookupTable')
+        self.__logger.setLevel(log_level)
+        self._r2d = ray_tracing_2D
+        if path is None:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lookup_tables')
+        self._path = path
+        self._max_error_travel_time = max_error_travel_time
+        self._max_error_angle = max_error_angle
+        self._max_error_attenuation = max_error_attenuation
+        self._distances = default_distances if distances is None else np.array(distances, dtype=float)
+        self._depths = default_depths if depths is None else np.array(depths, dtype=float)
+        self._frequencies = None if frequencies is None else np.array(frequencies, dtype=float)
+        self._tables = {}
+
+    def get_hash(self):
+        """
+        returns the hash that identifies the table settings
+
+        The hash is calculated from the parameters of the ice model, the attenuation model,
+        the grid and the frequencies for which the attenuation is tabulated.
+        """
+        medium = self._r2d.medium
+        settings = {
+            'version': table_version,
+            'n_ice': float(medium.n_ice),
+            'delta_n': float(medium.delta_n),
+            'z_0': float(medium.z_0),
+            'attenuation_model': self._r2d.attenuation_model,
+            'distances': [float(x) for x in self._distances],
+            'depths': [float(x) for x in self._depths],
+            'frequencies': None if self._frequencies is None else [float(x) for x in self._frequencies]
+        }
+        return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    def get_filename(self, z_antenna):
+        """
+        returns the path of the table for a given antenna depth
+
+        Parameters
+        ----------
+        z_antenna: float
+            the depth of the antenna
+        """
+        return os.path.join(self._path, "raytracing_table_{}_z{:.3f}m.hdf5".format(self.get_hash(), z_antenna / units.m))
+
+    def get_antenna_depths(self):
+        """
+        returns the list of antenna depths for which a table is loaded
+        """
+        return list(self._tables.keys())
+
+    def add_antenna_depth(self, z_antenna):
+        """
+        loads the table for an antenna depth. If the table does not exist yet, it is calculated and saved.
+
+        Parameters
+        ----------
+        z_antenna: float
+            the depth of the antenna (needs to be in the ice, i.e., z <= 0)
+        """
+        z_antenna = float(z_antenna)
+        if z_antenna > 0:
+            self.__logger.warning(f"lookup tables are only available for in-ice positions, skipping antenna depth z = {z_antenna / units.m:.2f}m")
+            return
+        if z_antenna in self._tables:
+            return
+        filename = self.get_filename(z_antenna)
+        if not os.path.exists(filename):
+            self.__logger.warning(f"ray tracing table {filename} does not exist, calculating table. This can take a while...")
+            self.create_table(z_antenna)
+        self.__logger.info(f"loading ray tracing table {filename}")
+        table = {}
+        with h5py.File(filename, 'r') as fin:
+            for key in fin.keys():
+                table[key] = np.array(fin[key])
+        self._tables[z_antenna] = self.__prepare_table(table, z_antenna)
+
+    def create_table(self, z_antenna):
+        """
+        calculates the table for an antenna depth and saves it to disk
+
+        Parameters
+        ----------
+        z_antenna: float
+            the depth of the antenna
+        """
+        nodes = self.__calculate_grid(self._distances, self._depths, z_antenna)
+        distances_center = 0.5 * (self._distances[1:] + self._distances[:-1])
+        depths_center = 0.5 * (self._depths[1:] + self._depths[:-1])
+        centers = self.__calculate_grid(distances_center, depths_center, z_antenna)
+        length_nodes = get_reference_distance(self._distances, self._depths, z_antenna)
+        length_centers = get_reference_distance(distances_center, depths_center, z_antenna)
+
+        def corner_mean(values):
+            return 0.25 * (values[:-1, :-1] + values[1:, :-1] + values[:-1, 1:] + values[1:, 1:])
+
+        def corner_max(values):
+            return np.maximum(np.maximum(values[:-1, :-1], values[1:, :-1]), np.maximum(values[:-1, 1:], values[1:, 1:]))
+
+        def curvature(values, axis):
+            # the error of a linear interpolation is at most 1/8 of the second difference
+            diff = np.abs(np.diff(values, n=2, axis=axis))
+            padding = [(0, 0)] * values.ndim
+            padding[axis] = (1, 1)
+            return corner_max(np.pad(diff, padding, mode='edge')) / 8.
+
+        def interpolation_error(key):
+            values = nodes[key]
+            values_center = centers[key]
+            if key in scaled_quantities:
+                length = length_nodes if values.ndim == 3 else length_nodes[..., None]
+                length_center = length_centers if values.ndim == 3 else length_centers[..., None]
+                values = values / length
+                values_center = values_center / length_center
+            error = np.maximum(np.abs(values_center - corner_mean(values)),
+                               curvature(values, 0) + curvature(values, 1))
+            if key in scaled_quantities:
+                error = error * length_center
+            if key == 'attenuation_exponent':
+                # convert the error of the exponent into an error of the attenuation factor
+                error = error * np.exp(-centers[key])
+            return error
+
+        def corner_all(values):
+            return values[:-1, :-1] & values[1:, :-1] & values[:-1, 1:] & values[1:, 1:]
+
+        # the status of each cell and solution is 1 if the solution exists at all corners and in the center,
+        # 0 if it exists nowhere and -1 otherwise (i.e., the lookup has to fall back to the exact calculation)
+        exists = np.isfinite(nodes['C0'])
+        usable = exists & (length_nodes > 0)
+        usable_center = np.isfinite(centers['C0'])
+        for key in grid_quantities + ['attenuation_exponent']:
+            if key in nodes:
+                valid = np.isfinite(nodes[key])
+                valid_center = np.isfinite(centers[key])
+                if key == 'attenuation_exponent':
+                    valid = np.all(valid, axis=-1)
+                    valid_center = np.all(valid_center, axis=-1)
+                usable = usable & valid
+                usable_center = usable_center & valid_center
+        same_type = ((nodes['solution_type'][:-1, :-1] == nodes['solution_type'][1:, :-1]) &
+                     (nodes['solution_type'][:-1, :-1] == nodes['solution_type'][:-1, 1:]) &
+                     (nodes['solution_type'][:-1, :-1] == nodes['solution_type'][1:, 1:]) &
+                     (nodes['solution_type'][:-1, :-1] == centers['solution_type']))
+        status = np.full(usable_center.shape, -1, dtype=np.int8)
+        status[corner_all(usable) & usable_center & same_type] = 1
+        status[corner_all(~exists) & ~np.isfinite(centers['C0'])] = 0
+        # cells that contain the antenna depth are not continuous because start and stop point are exchanged
+        status[:, (self._depths[:-1] <= z_antenna) & (self._depths[1:] > z_antenna)] = -1
+
+        table = {key: nodes[key] for key in nodes}
+        table['distances'] = self._distances
+        table['depths'] = self._depths
+        table['cell_status'] = status
+        with np.errstate(invalid='ignore', divide='ignore'):
+            table['error_travel_time'] = interpolation_error('travel_time')
+            table['error_angle'] = np.maximum(interpolation_error('launch_angle'), interpolation_error('receive_angle'))
+            if self._frequencies is not None:
+                table['frequencies'] = self._frequencies
+                table['error_attenuation'] = np.max(interpolation_error('attenuation_exponent'), axis=-1)
+
+        filename = self.get_filename(z_antenna)
+        if not os.path.exists(self._path):
+            os.makedirs(self._path)
+        # write to a temporary file first so that parallel jobs never read incomplete tables
+        tmp_filename = filename + ".{}.tmp".format(os.getpid())
+        with h5py.File(tmp_filename, 'w') as fout:
+            fout.attrs['version'] = table_version
+            fout.attrs['z_antenna'] = z_antenna
+            fout.attrs['attenuation_model'] = self._r2d.attenuation_model
+            for key in ['n_ice', 'delta_n', 'z_0']:
+                fout.attrs[key] = getattr(self._r2d.medium, key)
+            for key, value in table.items():
+                fout[key] = value
+        os.replace(tmp_filename, filename)
+        self.__logger.info(f"saved ray tracing table {filename}")
+
+    def __calculate_grid(self, distances, depths, z_antenna):
+        """
+        calculates the exact ray tracing solutions for all combinations of horizontal distances and depths
+        """
+        dd, zz = np.meshgrid(distances, depths, indexing='ij')
+        shape = dd.shape
+        dd = dd.flatten()
+        zz = zz.flatten()
+        x1 = np.array([np.zeros_like(dd), np.minimum(zz, z_antenna)]).T
+        x2 = np.array([dd, np.maximum(zz, z_antenna)]).T
+        C0s = self._r2d.find_solutions_vectorized(x1, x2, compact=False)
+
+        output = {key: np.full((len(dd), 2), np.nan) for key in grid_quantities}
+        if self._frequencies is not None:
+            output['attenuation_exponent'] = np.full((len(dd), 2, len(self._frequencies)), np.nan)
+        for iS in range(2):
+            mask = ~np.isnan(C0s[:, iS])
+            x1_s = x1[mask]
+            x2_s = x2[mask]
+            C_0 = C0s[mask, iS]
+            solution_type = self._r2d.determine_solution_type_vectorized(x1_s, x2_s, C_0)
+            launch_angle, receive_angle = self._r2d.get_launch_and_receive_angle_vectorized(x1_s, x2_s, C_0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                path_length, travel_time = self._r2d.get_path_length_and_travel_time_analytic_vectorized(
+                    x1_s, x2_s, C_0, solution_type, launch_angle)
+            output['C0'][mask, iS] = C_0
+            output['solution_type'][mask, iS] = solution_type
+            output['launch_angle'][mask, iS] = launch_angle
+            output['receive_angle'][mask, iS] = receive_angle
+            output['path_length'][mask, iS] = path_length
+            output['travel_time'][mask, iS] = travel_time
+            if self._frequencies is not None:
+                self.__logger.info(f"calculating attenuation for {np.sum(mask)} ray paths")
+                for i in np.arange(len(dd))[mask]:
+                    attenuation = self._r2d.get_attenuation_along_path(x1[i], x2[i], C0s[i, iS], self._frequencies, None)
+                    with np.errstate(divide='ignore'):
+                        output['attenuation_exponent'][i, iS] = -np.log(attenuation)
+        for key in output:
+            output[key] = output[key].reshape(shape + output[key].shape[1:])
+        return output
+
+    def __prepare_table(self, table, z_antenna):
+        """
+        precalculates the cells in which the interpolation can be used and the interpolated quantities
+        """
+        status = table['cell_status']
+        with np.errstate(invalid='ignore'):
+            accurate = (table['error_travel_time'] <= self._max_error_travel_time) & \
+                (table['error_angle'] <= self._max_error_angle)
+            if 'error_attenuation' in table:
+                accurate &= table['error_attenuation'] <= self._max_error_attenuation
+        table['cell_valid'] = np.all((status == 0) | ((status == 1) & accurate), axis=-1)
+        length = get_reference_distance(table['distances'], table['depths'], z_antenna)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            table['logC0'] = np.log(table['C0'] - 1. / self._r2d.medium.n_ice)
+            for key in scaled_quantities:
+                if key in table:
+                    table[key] = table[key] / (length if table[key].ndim == 3 else length[..., None])
+        table['z_antenna'] = z_antenna
+        return table
+
+    def get_solutions(self, x1, x2):
+        """
+        returns the interpolated ray tracing solutions
+
+        Parameters
+        ----------
+        x1: array of length 2
+            (y, z) coordinates of the start point (needs to be below the stop point)
+        x2: array of length 2
+            (y, z) coordinates of the stop point
+
+        Returns
+        -------
+        results: list of dicts or None
+            the ray tracing solutions in the format of `ray_tracing_2D.find_solutions`. In addition,
+            each solution contains the interpolated quantities under the key 'lookup_table'.
+            None is returned if the lookup is not possible or not accurate enough.
+        """
+        table = None
+        for z_antenna in self._tables:
+            if np.abs(x2[1] - z_antenna) < 1 * units.mm:
+                table = self._tables[z_antenna]
+                z_vertex = x1[1]
+                break
+            if np.abs(x1[1] - z_antenna) < 1 * units.mm:
+                table = self._tables[z_antenna]
+                z_vertex = x2[1]
+                break
+        if table is None:
+            return None
+
+        distance = x2[0] - x1[0]
+        distances = table['distances']
+        depths = table['depths']
+        i = np.searchsorted(distances, distance, side='right') - 1
+        j = np.searchsorted(depths, z_vertex, side='right') - 1
+        if i < 0 or i >= len(distances) - 1 or j < 0 or j >= len(depths) - 1:
+            return None
+        if not table['cell_valid'][i, j]:
+            self.__logger.debug(f"interpolation in cell ({i}, {j}) not possible or not accurate enough")
+            return None
+
+        t = (distance - distances[i]) / (distances[i + 1] - distances[i])
+        u = (z_vertex - depths[j]) / (depths[j + 1] - depths[j])
+        weights = np.array([[(1 - t) * (1 - u), (1 - t) * u], [t * (1 - u), t * u]])
+
+        def interpolate(key, iS):
+            values = table[key][i:i + 2, j:j + 2, iS]
+            if values.ndim == 3:
+                return np.tensordot(weights, values, axes=([0, 1], [0, 1]))
+            return np.sum(weights * values)
+
+        length = get_reference_distance(distance, z_vertex, table['z_antenna'])[0, 0]
+        results = []
+        for iS in range(2):
+            if table['cell_status'][i, j, iS] != 1:
+                continue
+            C_0 = np.exp(interpolate('logC0', iS)) + 1. / self._r2d.medium.n_ice
+            lookup = {'launch_angle': interpolate('launch_angle', iS),
+                      'receive_angle': interpolate('receive_angle', iS),
+                      'path_length': interpolate('path_length', iS) * length[iS],
+                      'travel_time': interpolate('travel_time', iS) * length[iS]}
+            if 'attenuation_exponent' in table:
+                lookup['frequencies'] = table['frequencies']
+                lookup['attenuation_exponent'] = interpolate('attenuation_exponent', iS) * length[iS]
+            results.append({'type': int(table['solution_type'][i, j, iS]),
+                            'C0': C_0,
+                            'C1': x1[0] - self._r2d.get_y(self._r2d.get_gamma(x1[1]), C_0, 0),
+                            'reflection': 0,
+                            'reflection_case': 1,
+                            'lookup_table': lookup})
+        return results
+
+    def get_attenuation(self, result, frequency):
+        """
+        returns the interpolated attenuation of a ray tracing solution
+
+        Parameters
+        ----------
+        result: dict
+            a ray tracing solution returned by `get_solutions`
+        frequency: array of floats
+            the frequencies for which the attenuation is calculated
+
+        Returns
+        -------
+        attenuation: array of floats or None
+            the fraction of the signal that reaches the observer, None if the attenuation is not tabulated
+        """
+        lookup = result['lookup_table']
+        if 'attenuation_exponent' not in lookup:
+            return None
+        attenuation = np.ones_like(frequency)
+        mask = frequency > 0
+        attenuation[mask] = np.exp(-1 * np.interp(frequency[mask], lookup['frequencies'], lookup['attenuation_exponent']))
+        return attenuation
@@ -0,0 +1,323 @@
+"""
+Helpers to access the input event list of a NuRadioMC simulation
+
+* `EventGroupIndex`: a precomputed index of the showers that belong to each event group
+* `ShowerAccessor`: access to the showers of the input by event group and by shower id that the simulation uses
+* `ChunkedInputFile`: read access to the input hdf5 file that only keeps a block of consecutive event groups
+  in memory, so that the memory consumption does not grow with the size of the input file
+"""
+import numpy as np
+import h5py
+import logging
+logger = logging.getLogger("NuRadioMC.input_reader")
+
+
+class EventGroupIndex(object):
+    """
+    index of the showers of each event group (CSR format: the shower indices sorted by event group and the
+    offsets of each event group in this array)
+    """
+
+    def __init__(self, event_group_ids):
+        """
+        Parameters
+        ----------
+        event_group_ids: array of ints
+            the event group id of each shower
+        """
+        event_group_ids = np.asarray(event_group_ids)
+        # a stable sort keeps the showers of an event group in the order of the input file
+        self.shower_indices = np.argsort(event_group_ids, kind='stable')
+        self.event_group_ids, starts = np.unique(event_group_ids[self.shower_indices], return_index=True)
+        self.offsets = np.append(starts, len(event_group_ids))
+
+    def get_shower_indices(self, event_group_id):
+        """
+        returns the (sorted) indices of the showers of an event group
+        """
+        i = np.searchsorted(self.event_group_ids, event_group_id)
+        if i == len(self.event_group_ids) or self.event_group_ids[i] != event_group_id:
+            raise KeyError(f"event group {event_group_id} is not present in the input")
+        return self.shower_indices[self.offsets[i]:self.offsets[i + 1]]
+
+
+class ShowerAccessor(object):
+    """
+    access to the showers of the input event list by event group and by shower id
+
+    The index of the event groups (see `EventGroupIndex`) and the lookup table of the shower ids are computed
+    once. The columns of the showers of an event group are returned as views (instead of copies) if the showers
+    are stored consecutively. For an input that is kept in memory, the vertex positions are additionally cached
+    in one contiguous array.
+    """
+
+    def __init__(self, fin):
+        """
+        Parameters
+        ----------
+        fin: dict-like
+            the per-shower input data sets, i.e., a dictionary of arrays or the data sets of a `ChunkedInputFile`
+        """
+        self._fin = fin
+        self.event_group_index = EventGroupIndex(fin['event_group_ids'])
+        shower_ids = np.asarray(fin['shower_ids'])
+        self._shower_id_order = np.argsort(shower_ids, kind='stable')
+        self._sorted_shower_ids = shower_ids[self._shower_id_order]
+        self._vertices = None
+        if isinstance(fin, dict):
+            self._vertices = np.ascontiguousarray(np.array([fin['xx'], fin['yy'], fin['zz']], dtype=float).T)
+
+    @property
+    def event_group_ids(self):
+        """
+        the sorted unique event group ids
+        """
+        return self.event_group_index.event_group_ids
+
+    def get_shower_indices(self, event_group_id):
+        """
+        returns the (sorted) indices of the showers of an event group
+        """
+        return self.event_group_index.get_shower_indices(event_group_id)
+
+    def get_shower_index(self, shower_id):
+        """
+        returns the index of a shower (or the indices of an array of showers) from the shower id
+        """
+        if len(self._sorted_shower_ids) == 0:
+            raise KeyError(f"shower id {shower_id} is not present in the input")
+        # searchsorted returns the insertion position (up to the length of the array) for shower ids that are not
+        # present, so the shower id at the position needs to be checked
+        positions = np.minimum(np.searchsorted(self._sorted_shower_ids, shower_id), len(self._sorted_shower_ids) - 1)
+        missing = self._sorted_shower_ids[positions] != shower_id
+        if np.any(missing):
+            missing_ids = np.asarray(shower_id)[missing] if hasattr(shower_id, "__len__") else shower_id
+            raise KeyError(f"shower id {missing_ids} is not present in the input")
+        indices = self._shower_id_order[positions]
+        if hasattr(shower_id, "__len__"):
+            return np.array(indices)
+        return int(indices)
+
+    def _get_selection(self, shower_indices):
+        # the showers of an event group are sorted, so they are stored consecutively if first and last index match
+        if len(shower_indices) and shower_indices[-1] - shower_indices[0] + 1 == len(shower_indices):
+            return slice(shower_indices[0], shower_indices[-1] + 1)
+        return shower_indices
+
+    def get_column(self, key, shower_indices):
+        """
+        returns the values of a per-shower data set for the given showers
+
+        Parameters
+        ----------
+        key: string
+            the name of the data set
+        shower_indices: array of ints
+            the sorted shower indices, e.g. the showers of an event group
+        """
+        return self._fin[key][self._get_selection(shower_indices)]
+
+    def get_vertices(self, shower_indices):
+        """
+        returns the vertex positions of the given showers as an array of shape (n_showers, 3)
+        """
+        selection = self._get_selection(shower_indices)
+        if self._vertices is not None:
+            return self._vertices[selection]
+        return np.array([self._fin['xx'][selection], self._fin['yy'][selection], self._fin['zz'][selection]]).T
+
+
+class ChunkedInputFile(object):
+    """
+    read access to the data sets of a NuRadioMC input file that keeps only one block of consecutive event groups
+    in memory
+
+    The data sets are accessed like the dictionary of arrays of a fully read input file, i.e., ``fin[key][index]``
+    where index is the (global) shower index. If the index is outside of the block that is currently in memory,
+    the block that contains the index is read from the file. A block contains complete event groups with at
+    least `chunk_size` showers. The event group ids are always kept in memory. Data sets that are not per shower
+    (i.e. whose length differs from the number of showers) are read completely.
+
+    The showers of an event group need to be stored consecutively and the event group ids need to be sorted,
+    see `is_sorted`.
+    """
+
+    def __init__(self, filename, chunk_size):
+        """
+        Parameters
+        ----------
+        filename: string
+            the input hdf5 file
+        chunk_size: int
+            the minimal number of showers that are read at once
+        """
+        self._filename = filename
+        self._file = h5py.File(filename, 'r')
+        self.attrs = dict(self._file.attrs)
+        self.event_group_ids = self._file['event_group_ids'][()]
+        self.n_showers = len(self.event_group_ids)
+
+        # the blocks start at the first shower of an event group
+        group_starts = np.flatnonzero(np.append(True, self.event_group_ids[1:] != self.event_group_ids[:-1]))
+        block_starts = []
+        start = 0
+        while start < self.n_showers:
+            block_starts.append(start)
+            i = np.searchsorted(group_starts, start + max(int(chunk_size), 1))
+            start = group_starts[i] if i < len(group_starts) else self.n_showers
+        self._block_starts = np.array(block_starts, dtype=int)
+        self._block_stops = np.append(self._block_starts[1:], self.n_showers)
+        self._i_block = None
+        self._block_data = {}
+        self._full_data = {}
+        self._per_shower = {}
+
+    @staticmethod
+    def is_sorted(filename):
+        """
+        returns True if the event group ids of the input file are sorted, i.e., if the file can be read in blocks
+        """
+        with h5py.File(filename, 'r') as fin:
+            return bool(np.all(np.diff(fin['event_group_ids'][()]) >= 0))
+
+    def reopen(self):
+        """
+        reopens the input file, needs to be called in a forked process before reading data
+        """
+        self._file = h5py.File(self._filename, 'r')
+
+    def close(self):
+        self._file.close()
+
+    def get_datasets(self, group=None):
+        """
+        returns the dictionary-like access to the data sets of the file or of one of its groups
+
+        Parameters
+        ----------
+        group: string or None
+            the name of the group, if None the data sets of the file are returned
+        """
+        return _ChunkedDatasets(self, group)
+
+    def get_group_names(self):
+        """
+        returns the names of the groups (i.e. the station groups of a pre-simulated file)
+        """
+        return [key for key, value in self._file.items() if isinstance(value, h5py.Group)]
+
+    def _read(self, path, selection=slice(None)):
+        value = self._file[path][selection]
+        if value.dtype.kind in ['S', 'O'] and len(value) and isinstance(value.flat[0], bytes):
+            value = value.astype('U')
+        return value
+
+    def is_per_shower(self, path):
+        """
+        returns True if the first axis of the data set corresponds to the showers
+        """
+        if path not in self._per_shower:
+            shape = self._file[path].shape
+            self._per_shower[path] = len(shape) > 0 and shape[0] == self.n_showers
+        return self._per_shower[path]
+
+    def get_full_data(self, path):
+        """
+        returns the complete data set
+        """
+        if path in self._full_data:
+            return self._full_data[path]
+        return self._read(path)
+
+    def get_block_data(self, path, first, last):
+        """
+        returns the data of the block that contains the showers with index `first` to `last`
+        and the index of the first shower of the block
+        """
+        if not self.is_per_shower(path):
+            if path not in self._full_data:
+                self._full_data[path] = self._read(path)
+            return self._full_data[path], 0
+        if self._i_block is None or not (self._block_starts[self._i_block] <= first and last < self._block_stops[self._i_block]):
+            i_block = np.searchsorted(self._block_starts, first, side='right') - 1
+            if last >= self._block_stops[i_block]:
+                raise IndexError(f"the showers {first} to {last} are not part of the same block of event groups")
+            logger.debug(f"reading showers {self._block_starts[i_block]} to {self._block_stops[i_block]} from the input file")
+            self._i_block = i_block
+            self._block_data = {}
+        if path not in self._block_data:
+            self._block_data[path] = self._read(path, slice(self._block_starts[self._i_block], self._block_stops[self._i_block]))
+        return self._block_data[path], self._block_starts[self._i_block]
+
+
+class _ChunkedDatasets(object):
+    """
+    dictionary-like access to the data sets of a `ChunkedInputFile` (or of one of its groups)
+    """
+
+    def __init__(self, reader, group):
+        self._reader = reader
+        self._prefix = "" if group is None else f"{group}/"
+        group_object = reader._file if group is None else reader._file[group]
+        self._keys = [key for key, value in group_object.items() if isinstance(value, h5py.Dataset)]
+
+    def keys(self):
+        return list(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        if self._prefix == "" and key == "event_group_ids":
+            return self._reader.event_group_ids
+        return _ChunkedColumn(self._reader, self._prefix + key)
+
+
+class _ChunkedColumn(object):
+    """
+    a data set of a `ChunkedInputFile` that is indexed with global shower indices
+    """
+
+    def __init__(self, reader, path):
+        self._reader = reader
+        self._path = path
+
+    def __len__(self):
+        return self._reader._file[self._path].shape[0]
+
+    @property
+    def shape(self):
+        return self._reader._file[self._path].shape
+
+    def __array__(self, dtype=None):
+        value = self._reader.get_full_data(self._path)
+        if dtype is not None:
+            value = value.astype(dtype)
+        return value
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            index, remaining_index = index[0], index[1:]
+        else:
+            remaining_index = ()
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            index = np.arange(start, stop, step)
+        index_array = np.asarray(index)
+        if index_array.dtype == bool:
+            index_array = np.flatnonzero(index_array)
+        if index_array.size == 0:
+            return self._reader._read(self._path, slice(0, 0))[(index_array,) + remaining_index]
+        data, offset = self._reader.get_block_data(self._path, index_array.min(), index_array.max())
+        local_index = index_array - offset
+        if local_index.ndim == 0:
+            local_index = int(local_index)
+        return data[(local_index,) + remaining_index]
@@ -7,8 +7,10 @@ from NuRadioMC.SignalGen import emitter
 from NuRadioReco.utilities import units
 from NuRadioMC.utilities import medium
 from NuRadioReco.utilities import fft
+from NuRadioReco.utilities import random_streams
 from NuRadioMC.utilities.earth_attenuation import get_weight
 from NuRadioMC.SignalProp import propagation
+from NuRadioMC.simulation import input_reader
 import h5py
 import time
 import six
@@ -30,6 +32,7 @@ import NuRadioReco.framework.sim_station
 import NuRadioReco.framework.electric_field
 import NuRadioReco.framework.particle
 import NuRadioReco.framework.event
+import NuRadioReco.framework.base_trace
 from NuRadioReco.detector import antennapattern
 from NuRadioReco.utilities import geometryUtilities as geo_utl
 from NuRadioReco.framework.parameters import channelParameters as chp
@@ -45,6 +48,8 @@ from six import iteritems
 import yaml
 import os
 import collections
+import multiprocessing
+import pickle
 from NuRadioMC.utilities.Veff import remove_duplicate_triggers
 
 STATUS = 31
@@ -84,6 +89,17 @@ def pretty_time_delta(seconds):
         return '%ds' % (seconds,)
 
 
+# the simulation instance that is used by the worker processes of a parallel run (inherited by forking)
+_worker_simulation = None
+
+
+def _simulate_event_groups(event_group_ids):
+    """
+    worker function of the process pool of a parallel simulation run
+    """
+    return _worker_simulation._run_event_groups(event_group_ids)
+
+
 def merge_config(user, default):
     if isinstance(user, dict) and isinstance(default, dict):
         for k, v in iteritems(default):
@@ -111,6 +127,8 @@ class simulation:
                  event_list=None,
                  log_level_propagation=logging.WARNING,
                  ice_model=None,
+                 n_workers=1,
+                 resume=False,
                  **kwargs):
         """
         initialize the NuRadioMC end-to-end simulation
@@ -155,6 +173,17 @@ class simulation:
             the log level of the propagation module
         ice_model: medium object (default None)
             allows to specify a custom ice model. This model is used if the config file specifies the ice model as "custom".
+        n_workers: int (default 1)
+            the number of processes used to simulate the event groups in parallel. The event groups are distributed
+            in chunks of consecutive event groups to a pool of worker processes (each worker holds its own copy of
+            the ray tracer, detector and signal generation). The results are merged in the order of the
+            event groups, i.e., the output files are the same as for a serial run. Requires the 'fork' start method
+            of multiprocessing (i.e. not supported on Windows).
+        resume: bool (default False)
+            if True, the simulation continues from the checkpoint file `<outputfilename>.checkpoint` written by an
+            interrupted simulation (see the 'checkpoint' settings of the config): the output of the completed event
+            groups is restored, the .nur file is truncated to the state of the checkpoint and only the remaining
+            event groups are simulated. If no checkpoint file exists, the simulation starts from the beginning.
         """
         logger.setLevel(log_level)
         if 'write_mode' in kwargs.keys():
@@ -194,6 +223,10 @@ class simulation:
         self.__write_detector = write_detector
         logger.status("setting event time to {}".format(evt_time))
         self._event_group_list = event_list
+        self._n_workers = int(n_workers)
+        self._worker_event_group_ids = None  # the event groups simulated by a worker process of a parallel run
+        self._resume = resume
+        self._checkpoint_filename = f"{self._outputfilename}.checkpoint"
 
         self._antenna_pattern_provider = antennapattern.AntennaPatternProvider()
 
@@ -208,6 +241,20 @@ class simulation:
         else:
             self._ice = medium.get_ice_model(self._cfg['propagation']['ice_model'])
 
+        self._arz_template_bank = None
+        if self._cfg['signal']['model'] in ["ARZ2019", "ARZ2020"] and self._cfg['signal']['arz_template_bank'] is not None:
+            from NuRadioMC.SignalGen.ARZ.template_bank import ARZTemplateBank
+            self._arz_template_bank = ARZTemplateBank(self._cfg['signal']['arz_template_bank'],
+                                                      n_index_tolerance=self._cfg['signal']['arz_template_bank_n_index_tolerance'])
+
+        self._askaryan_cache = None
+        if self._cfg['speedup']['askaryan_cache_size']:
+            self._askaryan_cache = askaryan.AskaryanSpectrumCache(
+                max_size=int(self._cfg['speedup']['askaryan_cache_size'] * 2 ** 20),
+                energy_tolerance=self._cfg['speedup']['askaryan_cache_energy_tolerance'],
+                viewing_angle_tolerance=self._cfg['speedup']['askaryan_cache_viewing_angle_tolerance'] * units.deg,
+                n_index_tolerance=self._cfg['speedup']['askaryan_cache_n_index_tolerance'])
+
         self._mout = collections.OrderedDict()
         self._mout_groups = collections.OrderedDict()
         self._mout_attrs = collections.OrderedDict()
@@ -242,6 +289,7 @@ class simulation:
         # read sampling rate from config (this sampling rate will be used internally)
         self._dt = 1. / (self._cfg['sampling_rate'] * units.GHz)
 
+        self._input_reader = None
         if isinstance(inputfilename, str):
             logger.status(f"reading input from {inputfilename}")
             self._inputfilename = inputfilename
@@ -249,9 +297,11 @@ class simulation:
         else:
             logger.status("getting input on-the-fly")
             self._inputfilename = "on-the-fly"
-            self._fin = inputfilename[0]
+            self._fin = {key: np.asarray(value) for key, value in inputfilename[0].items()}
             self._fin_attrs = inputfilename[1]
             self._fin_stations = {}
+        # the index of the event groups and shower ids of the input, built once to look up the showers of an event group
+        self._input_showers = input_reader.ShowerAccessor(self._fin)
         # store all relevant attributes of the input file in a dictionary
         self._generator_info = {}
         for enum_entry in genattrs:
@@ -289,7 +339,7 @@ class simulation:
                 trace = np.zeros_like(self._tt)
                 trace[self._n_samples // 2] = 100 * units.V  # set a signal that will satisfy any high/low trigger
                 trace[self._n_samples // 2 + 1] = -100 * units.V
-                electric_field.set_trace(np.array([np.zeros_like(self._tt), trace, trace]), 1. / self._dt)
+                electric_field.set_trace(np.array([np.zeros_like(self._tt), trace, trace]), 1. / self._dt, copy=False)
                 electric_field.set_trace_start_time(0)
                 electric_field[efp.azimuth] = 0
                 electric_field[efp.zenith] = 100 * units.deg
@@ -385,24 +435,38 @@ class simulation:
             return 0
         logger.status(f"Starting NuRadioMC simulation")
         t_start = time.time()
+        NuRadioReco.framework.base_trace.reset_statistics()
         t_last_update = t_start
 
         self._channelSignalReconstructor = NuRadioReco.modules.channelSignalReconstructor.channelSignalReconstructor()
         self._eventWriter = NuRadioReco.modules.io.eventWriter.eventWriter()
+        antenna_response_cache = None
+        if self._cfg['speedup']['antenna_response_cache_size']:
+            antenna_response_cache = antennapattern.AntennaResponseCache(
+                max_size=int(self._cfg['speedup']['antenna_response_cache_size'] * 2 ** 20))
+        self._antenna_response_cache = antenna_response_cache
+        # the counters at the start of the run, a worker process returns the counts of its chunk of event groups
+        self._statistics_start = self._get_statistics()
+        # the counters of the worker processes of a parallel run
+        self._worker_statistics = {}
         efieldToVoltageConverterPerEfield = NuRadioReco.modules.efieldToVoltageConverterPerEfield.efieldToVoltageConverterPerEfield()
+        efieldToVoltageConverterPerEfield.begin(antenna_response_cache=antenna_response_cache)
         efieldToVoltageConverter = NuRadioReco.modules.efieldToVoltageConverter.efieldToVoltageConverter()
-        efieldToVoltageConverter.begin(time_resolution=self._cfg['speedup']['time_res_efieldconverter'])
+        # the antenna response cache is not used for the voltage traces, their length (and hence their frequencies)
+        # changes from event to event, so the tables would hardly ever be reused
+        efieldToVoltageConverter.begin(time_resolution=self._cfg['speedup']['time_res_efieldconverter'],
+                                       frequency_domain_summation=self._cfg['speedup']['efieldconverter_frequency_domain'])
         channelAddCableDelay = NuRadioReco.modules.channelAddCableDelay.channelAddCableDelay()
         channelGenericNoiseAdder = NuRadioReco.modules.channelGenericNoiseAdder.channelGenericNoiseAdder()
         channelGenericNoiseAdder.begin(seed=self._cfg['seed'])
         channelResampler = NuRadioReco.modules.channelResampler.channelResampler()
         electricFieldResampler = NuRadioReco.modules.electricFieldResampler.electricFieldResampler()
-        if self._outputfilenameNuRadioReco is not None:
+        if self._outputfilenameNuRadioReco is not None and self._worker_event_group_ids is None:
             self._eventWriter.begin(self._outputfilenameNuRadioReco, log_level=self._log_level)
-        unique_event_group_ids = np.unique(self._fin['event_group_ids'])
+        self._worker_events = []
+        unique_event_group_ids = self._input_showers.event_group_ids
         self._n_showers = len(self._fin['event_group_ids'])
         self._shower_ids = np.array(self._fin['shower_ids'])
-        self._shower_index_array = {}  # this array allows to convert the shower id to an index that starts from 0 to be used to access the arrays in the hdf5 file.
 
         self._raytracer = self._prop(
             self._ice, self._cfg['propagation']['attenuation_model'],
@@ -412,9 +476,6 @@ class simulation:
             config=self._cfg,
             detector=self._det
         )
-        for shower_index, shower_id in enumerate(self._shower_ids):
-            self._shower_index_array[shower_id] = shower_index
-
         self._create_meta_output_datastructures()
 
         # check if the same detector was simulated before (then we can save the ray tracing part)
@@ -430,10 +491,21 @@ class simulation:
         outputTime = 0.0
         weightTime = 0.0
         distance_cut_time = 0.0
+        # the time spent in the different parts of the simulation by the worker processes of a parallel run,
+        # summed over all worker processes
+        self._worker_timing = collections.defaultdict(float)
 
         n_shower_station = len(self._station_ids) * self._n_showers
         iCounter = 0
 
+        # channels that are close to each other share the ray tracing solutions (if requested in the config)
+        raytracing_groups = {}
+        n_raytracing_reused = 0
+        raytracing_max_miss_distance = 0.
+        if self._cfg['speedup']['raytracing_groups']:
+            for station_id in self._station_ids:
+                raytracing_groups[station_id] = self._get_raytracing_reference_channels(station_id)
+
         # calculate bary centers of station
         self._station_barycenter = np.zeros((len(self._station_ids), 3))
         for iSt, station_id in enumerate(self._station_ids):
@@ -442,13 +514,36 @@ class simulation:
                 pos.append(self._det.get_relative_position(station_id, channel_id))
             self._station_barycenter[iSt] = np.mean(np.array(pos), axis=0) + self._det.get_absolute_position(station_id)
 
+        # the event groups that were already simulated before the simulation was interrupted
+        completed_event_group_ids = []
+        if self._resume and self._worker_event_group_ids is None:
+            completed_event_group_ids, n_raytracing_reused, raytracing_max_miss_distance = self._read_checkpoint()
+        self._last_checkpoint = {'time': time.time(), 'n_event_groups': len(completed_event_group_ids)}
+        remaining_event_group_ids = unique_event_group_ids[~np.isin(unique_event_group_ids, completed_event_group_ids)]
+
+        # the event groups simulated in this process: all event groups for a serial run, the current chunk for a
+        # worker process of a parallel run and none for the main process of a parallel run
+        if self._worker_event_group_ids is not None:
+            local_event_group_ids = self._worker_event_group_ids
+        elif self._n_workers > 1:
+            n_raytracing_reused, raytracing_max_miss_distance = self._run_event_groups_parallel(
+                remaining_event_group_ids, completed_event_group_ids, n_raytracing_reused, raytracing_max_miss_distance)
+            local_event_group_ids = []
+        else:
+            local_event_group_ids = remaining_event_group_ids
+
         # loop over event groups
-        for i_event_group_id, event_group_id in enumerate(unique_event_group_ids):
+        for i_event_group_id, event_group_id in enumerate(local_event_group_ids):
+            if i_event_group_id > 0 and self._worker_event_group_ids is None:
+                # all event groups before the current one are completed
+                completed_event_group_ids.append(local_event_group_ids[i_event_group_id - 1])
+                if self._is_checkpoint_due(len(completed_event_group_ids)):
+                    self._write_checkpoint(completed_event_group_ids, n_raytracing_reused, raytracing_max_miss_distance)
             logger.debug(f"simulating event group id {event_group_id}")
             if self._event_group_list is not None and event_group_id not in self._event_group_list:
                 logger.debug(f"skipping event group {event_group_id} because it is not in the event group list provided to the __init__ function")
                 continue
-            event_indices = np.atleast_1d(np.squeeze(np.argwhere(self._fin['event_group_ids'] == event_group_id)))
+            event_indices = self._input_showers.get_shower_indices(event_group_id)
 
             # the weight calculation is independent of the station, so we do this calculation only once
             # the weight also depends just on the "mother" particle, i.e. the incident neutrino which determines
@@ -466,7 +561,7 @@ class simulation:
                 self.primary = self.input_particle
                 if self._cfg['weights']['weight_mode'] == "existing":
                     if "weights" in self._fin:
-                        self._mout['weights'] = self._fin["weights"]
+                        self._mout['weights'][event_indices] = self._fin["weights"][event_indices]
                     else:
                         logger.error("config file specifies to use weights from the input hdf5 file but the input file does not contain this information.")
                 elif self._cfg['weights']['weight_mode'] is None:
@@ -493,10 +588,8 @@ class simulation:
             # the shower energies of closeby showers will be added as they can constructively interfere
             if self._cfg['speedup']['distance_cut']:
                 t_tmp = time.time()
-                shower_energies = np.array(self._fin['shower_energies'])[event_indices]
-                vertex_positions = np.array([np.array(self._fin['xx'])[event_indices],
-                                             np.array(self._fin['yy'])[event_indices],
-                                             np.array(self._fin['zz'])[event_indices]]).T
+                shower_energies = self._input_showers.get_column('shower_energies', event_indices)
+                vertex_positions = self._input_showers.get_vertices(event_indices)
                 vertex_distances = np.linalg.norm(vertex_positions - vertex_positions[0], axis=1)
                 distance_cut_time += time.time() - t_tmp
 
@@ -538,9 +631,23 @@ class simulation:
                     self._evt_tmp.add_particle(self.primary)
 
                 self._create_sim_station()
+                signal_random_generator = None
+                if self._cfg['seed_per_event_group']:
+                    # use independent random number streams for each event group and station, so that the result of an
+                    # event group does not depend on which other event groups were simulated before
+                    signal_random_generator = random_streams.get_random_generator(
+                        self._cfg['seed'], event_group_id, self._station_id, random_streams.STREAM_SIGNAL)
+                    channelGenericNoiseAdder.set_seed(random_streams.get_seed_sequence(
+                        self._cfg['seed'], event_group_id, self._station_id, random_streams.STREAM_NOISE))
                 # loop over all showers in event group
                 # create output data structure for this channel
                 sg = self._create_station_output_structure(len(event_indices), self._det.get_number_of_channels(self._station_id))
+                batch_solutions = None
+                if self._cfg['speedup']['batch_raytracing'] and hasattr(self._raytracer, 'set_solution') and \
+                        not (pre_simulated and ray_tracing_performed and not self._cfg['speedup']['redo_raytracing']):
+                    t_tmp = time.time()
+                    batch_solutions = self._find_ray_tracing_solutions_batch(event_indices)
+                    rayTracingTime += time.time() - t_tmp
                 for iSh, self._shower_index in enumerate(event_indices):
                     sg['shower_id'][iSh] = self._shower_ids[self._shower_index]
                     iCounter += 1
@@ -627,6 +734,10 @@ class simulation:
                     t2 = time.time()
 #                     input_time += (time.time() - t1)
 
+                    raytracing_references = {}
+                    # first, find the ray tracing solutions of all channels. The Askaryan signals of all views
+                    # (channel and ray tracing solution) of the shower are then calculated in a single call
+                    views = []
                     for channel_id in range(self._det.get_number_of_channels(self._station_id)):
                         x2 = self._det.get_relative_position(self._station_id, channel_id) + self._det.get_absolute_position(self._station_id)
                         logger.debug(f"simulating channel {channel_id} at {x2}")
@@ -656,8 +767,27 @@ class simulation:
                             for output_parameter in self._raytracer.get_output_parameters():
                                 ray_tracing_solution[output_parameter['name']] = sg_pre[output_parameter['name']][self._shower_index, channel_id]
                             self._raytracer.set_solution(ray_tracing_solution)
+                        elif batch_solutions is not None:
+                            self._raytracer.set_solution({key: value[iSh, channel_id] for key, value in batch_solutions.items()})
                         else:
-                            self._raytracer.find_solutions()
+                            miss_distance = None
+                            if self._station_id in raytracing_groups:
+                                reference_channel_id = raytracing_groups[self._station_id][channel_id]
+                                if reference_channel_id == channel_id:
+                                    self._raytracer.find_solutions()
+                                    raytracing_references[channel_id] = (self._raytracer.get_results(), x2)
+                                elif reference_channel_id in raytracing_references:
+                                    miss_distance = self._raytracer.find_solutions_from_reference(
+                                        *raytracing_references[reference_channel_id],
+                                        self._cfg['speedup']['raytracing_group_max_miss_distance'])
+                                if miss_distance is not None:
+                                    n_raytracing_reused += 1
+                                    raytracing_max_miss_distance = max(raytracing_max_miss_distance, miss_distance)
+                                    logger.debug(f"ray tracing solutions of channel {channel_id} derived from channel {reference_channel_id} (miss distance {miss_distance / units.mm:.2g}mm)")
+                                elif reference_channel_id != channel_id:
+                                    self._raytracer.find_solutions()
+                            else:
+                                self._raytracer.find_solutions()
 
                         if not self._raytracer.has_solution():
                             logger.debug("event {} and station {}, channel {} does not have any ray tracing solution ({} to {})".format(
@@ -669,7 +799,10 @@ class simulation:
                         for iS in range(self._raytracer.get_number_of_solutions()):
                             for key, value in self._raytracer.get_raytracing_output(iS).items():
                                 sg[key][iSh, channel_id, iS] = value
-                            self._launch_vector = self._raytracer.get_launch_vector(iS)
+                            if batch_solutions is not None:
+                                self._launch_vector = batch_solutions['launch_vectors'][iSh, channel_id, iS]
+                            else:
+                                self._launch_vector = self._raytracer.get_launch_vector(iS)
                             sg['launch_vectors'][iSh, channel_id, iS] = self._launch_vector
                             # calculates angle between shower axis and launch vector
                             viewing_angle = hp.get_angle(self._shower_axis, self._launch_vector)
@@ -685,6 +818,7 @@ class simulation:
                             continue
 
                         n = self._raytracer.get_number_of_solutions()
+                        channel_raytracer = None
                         for iS in range(n):  # loop through all ray tracing solution
                             # skip individual channels where the viewing angle difference is too large
                             # discard event if delta_C (angle off cherenkov cone) is too large
@@ -695,6 +829,11 @@ class simulation:
                                 sg_pre = self._fin_stations["station_{:d}".format(self._station_id)]
                                 R = sg_pre['travel_distances'][self._shower_index, channel_id, iS]
                                 T = sg_pre['travel_times'][self._shower_index, channel_id, iS]
+                            elif batch_solutions is not None:
+                                R = batch_solutions['travel_distances'][iSh, channel_id, iS]
+                                T = batch_solutions['travel_times'][iSh, channel_id, iS]
+                                if np.isnan(R) or np.isnan(T):
+                                    continue
                             else:
                                 R = self._raytracer.get_path_length(iS)  # calculate path length
                                 T = self._raytracer.get_travel_time(iS)  # calculate travel time
@@ -702,144 +841,131 @@ class simulation:
                                     continue
                             sg['travel_distances'][iSh, channel_id, iS] = R
                             sg['travel_times'][iSh, channel_id, iS] = T
-                            self._launch_vector = self._raytracer.get_launch_vector(iS)
-                            receive_vector = self._raytracer.get_receive_vector(iS)
+                            if batch_solutions is not None:
+                                self._launch_vector = batch_solutions['launch_vectors'][iSh, channel_id, iS]
+                                receive_vector = batch_solutions['receive_vectors'][iSh, channel_id, iS]
+                            else:
+                                self._launch_vector = self._raytracer.get_launch_vector(iS)
+                                receive_vector = self._raytracer.get_receive_vector(iS)
                             # save receive vector
                             sg['receive_vectors'][iSh, channel_id, iS] = receive_vector
-                            zenith, azimuth = hp.cartesian_to_spherical(*receive_vector)
-
-                            # get neutrino pulse from Askaryan module
-                            t_ask = time.time()
-
-                            if "simulation_mode" not in self._fin_attrs or self._fin_attrs['simulation_mode'] == "neutrino":
-                                # first consider in-ice showers
-                                kwargs = {}
-                                # if the input file specifies a specific shower realization, use that realization
-                                if self._cfg['signal']['model'] in ["ARZ2019", "ARZ2020"] and "shower_realization_ARZ" in self._fin:
-                                    kwargs['iN'] = self._fin['shower_realization_ARZ'][self._shower_index]
-                                    logger.debug(f"reusing shower {kwargs['iN']} ARZ shower library")
-                                elif self._cfg['signal']['model'] == "Alvarez2009" and "shower_realization_Alvarez2009" in self._fin:
-                                    kwargs['k_L'] = self._fin['shower_realization_Alvarez2009'][self._shower_index]
-                                    logger.debug(f"reusing k_L parameter of Alvarez2009 model of k_L = {kwargs['k_L']:.4g}")
-                                else:
-                                    # check if the shower was already simulated (e.g. for a different channel or ray tracing solution)
-                                    if self._cfg['signal']['model'] in ["ARZ2019", "ARZ2020"]:
-                                        if self._sim_shower.has_parameter(shp.charge_excess_profile_id):
-                                            kwargs = {'iN': self._sim_shower.get_parameter(shp.charge_excess_profile_id)}
-                                    if self._cfg['signal']['model'] == "Alvarez2009":
-                                        if self._sim_shower.has_parameter(shp.k_L):
-                                            kwargs = {'k_L': self._sim_shower.get_parameter(shp.k_L)}
-                                            logger.debug(f"reusing k_L parameter of Alvarez2009 model of k_L = {kwargs['k_L']:.4g}")
-
-                                spectrum, additional_output = askaryan.get_frequency_spectrum(self._fin['shower_energies'][self._shower_index], viewing_angles[iS],
-                                                self._n_samples, self._dt, self._fin['shower_type'][self._shower_index], n_index, R,
-                                                self._cfg['signal']['model'], seed=self._cfg['seed'], full_output=True, **kwargs)
-                                # save shower realization to SimShower and hdf5 file
-                                if self._cfg['signal']['model'] in ["ARZ2019", "ARZ2020"]:
-                                    if 'shower_realization_ARZ' not in self._mout:
-                                        self._mout['shower_realization_ARZ'] = np.zeros(self._n_showers)
-                                    if not self._sim_shower.has_parameter(shp.charge_excess_profile_id):
-                                        self._sim_shower.set_parameter(shp.charge_excess_profile_id, additional_output['iN'])
-                                        self._mout['shower_realization_ARZ'][self._shower_index] = additional_output['iN']
-                                        logger.debug(f"setting shower profile for ARZ shower library to i = {additional_output['iN']}")
-                                if self._cfg['signal']['model'] == "Alvarez2009":
-                                    if 'shower_realization_Alvarez2009' not in self._mout:
-                                        self._mout['shower_realization_Alvarez2009'] = np.zeros(self._n_showers)
-                                    if not self._sim_shower.has_parameter(shp.k_L):
-                                        self._sim_shower.set_parameter(shp.k_L, additional_output['k_L'])
-                                        self._mout['shower_realization_Alvarez2009'][self._shower_index] = additional_output['k_L']
-                                        logger.debug(f"setting k_L parameter of Alvarez2009 model to k_L = {additional_output['k_L']:.4g}")
-                                askaryan_time += (time.time() - t_ask)
-
-                                polarization_direction_onsky = self._calculate_polarization_vector()
-                                cs_at_antenna = cstrans.cstrafo(*hp.cartesian_to_spherical(*receive_vector))
-                                polarization_direction_at_antenna = cs_at_antenna.transform_from_onsky_to_ground(polarization_direction_onsky)
-                                logger.debug('receive zenith {:.0f} azimuth {:.0f} polarization on sky {:.2f} {:.2f} {:.2f}, on ground @ antenna {:.2f} {:.2f} {:.2f}'.format(
-                                    zenith / units.deg, azimuth / units.deg, polarization_direction_onsky[0],
-                                    polarization_direction_onsky[1], polarization_direction_onsky[2],
-                                    *polarization_direction_at_antenna))
-                                sg['polarization'][iSh, channel_id, iS] = polarization_direction_at_antenna
-                                eR, eTheta, ePhi = np.outer(polarization_direction_onsky, spectrum)
-
-                            elif self._fin_attrs['simulation_mode'] == "emitter":
-                                # NuRadioMC also supports the simulation of emitters. In this case, the signal model specifies the electric field polarization
-                                amplitude = self._fin['emitter_amplitudes'][self._shower_index]
-                                # following two lines used only for few models( not for all)
-                                emitter_frequency = self._fin['emitter_frequency'][self._shower_index]  # the frequency of cw and tone_burst signal
-                                half_width = self._fin['emitter_half_width'][self._shower_index]  # defines width of square and tone_burst signals
-                                # get emitting antenna properties
-                                antenna_model = self._fin['emitter_antenna_type'][self._shower_index]
-                                antenna_pattern = self._antenna_pattern_provider.load_antenna_pattern(antenna_model)
-                                ori = [self._fin['emitter_orientation_theta'][self._shower_index], self._fin['emitter_orientation_phi'][self._shower_index],
-                                       self._fin['emitter_rotation_theta'][self._shower_index], self._fin['emitter_rotation_phi'][self._shower_index]]
-
-                                # source voltage given to the emitter
-                                voltage_spectrum_emitter = emitter.get_frequency_spectrum(amplitude, self._n_samples, self._dt,
-                                                                                          self._fin['emitter_model'][self._shower_index], half_width=half_width, emitter_frequency=emitter_frequency)
-                                # convolve voltage output with antenna response to obtain emitted electric field
-                                frequencies = np.fft.rfftfreq(self._n_samples, d=self._dt)
-                                zenith_emitter, azimuth_emitter = hp.cartesian_to_spherical(*self._launch_vector)
-                                VEL = antenna_pattern.get_antenna_response_vectorized(frequencies, zenith_emitter, azimuth_emitter, *ori)
-                                c = constants.c * units.m / units.s
-                                eTheta = VEL['theta'] * (-1j) * voltage_spectrum_emitter * frequencies * n_index / c
-                                ePhi = VEL['phi'] * (-1j) * voltage_spectrum_emitter * frequencies * n_index / c
-                                eR = np.zeros_like(eTheta)
-                                # rescale amplitudes by 1/R, for emitters this is not part of the "SignalGen" class
-                                eTheta *= 1 / R
-                                ePhi *= 1 / R
-                            else:
-                                logger.error(f"simulation mode {self._fin_attrs['simulation_mode']} unknown.")
-                                raise AttributeError(f"simulation mode {self._fin_attrs['simulation_mode']} unknown.")
-
-                            if self._debug:
-                                from matplotlib import pyplot as plt
-                                fig, (ax, ax2) = plt.subplots(1, 2)
-                                ax.plot(self._ff, np.abs(eTheta) / units.micro / units.V * units.m)
-                                ax2.plot(self._tt, fft.freq2time(eTheta, 1. / self._dt) / units.micro / units.V * units.m)
-                                ax2.set_ylabel("amplitude [$\mu$V/m]")
-                                fig.tight_layout()
-                                fig.suptitle("$E_C$ = {:.1g}eV $\Delta \Omega$ = {:.1f}deg, R = {:.0f}m".format(
-                                    self._fin['shower_energies'][self._shower_index], viewing_angles[iS], R))
-                                fig.subplots_adjust(top=0.9)
-                                plt.show()
-
-                            electric_field = NuRadioReco.framework.electric_field.ElectricField([channel_id],
-                                                position=self._det.get_relative_position(self._sim_station.get_id(), channel_id),
-                                                shower_id=self._shower_ids[self._shower_index], ray_tracing_id=iS)
-                            if iS is None:
-                                a = 1 / 0
-                            electric_field.set_frequency_spectrum(np.array([eR, eTheta, ePhi]), 1. / self._dt)
-                            electric_field = self._raytracer.apply_propagation_effects(electric_field, iS)
-                            # Trace start time is equal to the interaction time relative to the first
-                            # interaction plus the wave travel time.
-                            if hasattr(self, '_vertex_time'):
-                                trace_start_time = self._vertex_time + T
-                            else:
-                                trace_start_time = T
-
-                            # We shift the trace start time so that the trace time matches the propagation time.
-                            # The centre of the trace corresponds to the instant when the signal from the shower
-                            # vertex arrives at the observer. The next line makes sure that the centre time
-                            # of the trace is equal to vertex_time + T (wave propagation time)
-                            trace_start_time -= 0.5 * electric_field.get_number_of_samples() / electric_field.get_sampling_rate()
-
-                            electric_field.set_trace_start_time(trace_start_time)
-                            electric_field[efp.azimuth] = azimuth
-                            electric_field[efp.zenith] = zenith
-                            electric_field[efp.ray_path_type] = propagation.solution_types[self._raytracer.get_solution_type(iS)]
-                            electric_field[efp.nu_vertex_distance] = sg['travel_distances'][iSh, channel_id, iS]
-                            electric_field[efp.nu_viewing_angle] = viewing_angles[iS]
-                            self._sim_station.add_electric_field(electric_field)
-
-                            # apply a simple threshold cut to speed up the simulation,
-                            # application of antenna response will just decrease the
-                            # signal amplitude
-                            if np.max(np.abs(electric_field.get_trace())) > float(self._cfg['speedup']['min_efield_amplitude']) * self._Vrms_efield_per_channel[self._station_id][channel_id]:
-                                candidate_station = True
+                            if channel_raytracer is None:
+                                # keep the solutions of this channel for the propagation effects, the ray tracer
+                                # itself is reused for the next channel
+                                channel_raytracer = copy.copy(self._raytracer)
+                            views.append({'channel_id': channel_id, 'iS': iS, 'R': R, 'T': T,
+                                          'launch_vector': self._launch_vector, 'receive_vector': receive_vector,
+                                          'viewing_angle': viewing_angles[iS], 'raytracer': channel_raytracer})
                         # end of ray tracing solutions loop
+                    # end of channels loop
+
+                    # get neutrino pulses of all views from Askaryan module
+                    spectra = None
+                    if len(views) and ("simulation_mode" not in self._fin_attrs or self._fin_attrs['simulation_mode'] == "neutrino"):
+                        t_ask = time.time()
+                        spectra = self._get_askaryan_spectra(n_index, [view['viewing_angle'] for view in views],
+                                                             [view['R'] for view in views], signal_random_generator)
+                        askaryan_time += (time.time() - t_ask)
+
+                    for iV, view in enumerate(views):
+                        channel_id = view['channel_id']
+                        iS = view['iS']
+                        R = view['R']
+                        T = view['T']
+                        self._launch_vector = view['launch_vector']
+                        receive_vector = view['receive_vector']
+                        zenith, azimuth = hp.cartesian_to_spherical(*receive_vector)
+
+                        if "simulation_mode" not in self._fin_attrs or self._fin_attrs['simulation_mode'] == "neutrino":
+                            spectrum = spectra[iV]
+                            polarization_direction_onsky = self._calculate_polarization_vector()
+                            cs_at_antenna = cstrans.cstrafo(*hp.cartesian_to_spherical(*receive_vector))
+                            polarization_direction_at_antenna = cs_at_antenna.transform_from_onsky_to_ground(polarization_direction_onsky)
+                            logger.debug('receive zenith {:.0f} azimuth {:.0f} polarization on sky {:.2f} {:.2f} {:.2f}, on ground @ antenna {:.2f} {:.2f} {:.2f}'.format(
+                                zenith / units.deg, azimuth / units.deg, polarization_direction_onsky[0],
+                                polarization_direction_onsky[1], polarization_direction_onsky[2],
+                                *polarization_direction_at_antenna))
+                            sg['polarization'][iSh, channel_id, iS] = polarization_direction_at_antenna
+                            eR, eTheta, ePhi = np.outer(polarization_direction_onsky, spectrum)
+
+                        elif self._fin_attrs['simulation_mode'] == "emitter":
+                            # NuRadioMC also supports the simulation of emitters. In this case, the signal model specifies the electric field polarization
+                            amplitude = self._fin['emitter_amplitudes'][self._shower_index]
+                            # following two lines used only for few models( not for all)
+                            emitter_frequency = self._fin['emitter_frequency'][self._shower_index]  # the frequency of cw and tone_burst signal
+                            half_width = self._fin['emitter_half_width'][self._shower_index]  # defines width of square and tone_burst signals
+                            # get emitting antenna properties
+                            antenna_model = self._fin['emitter_antenna_type'][self._shower_index]
+                            antenna_pattern = self._antenna_pattern_provider.load_antenna_pattern(antenna_model)
+                            ori = [self._fin['emitter_orientation_theta'][self._shower_index], self._fin['emitter_orientation_phi'][self._shower_index],
+                                   self._fin['emitter_rotation_theta'][self._shower_index], self._fin['emitter_rotation_phi'][self._shower_index]]
+
+                            # source voltage given to the emitter
+                            voltage_spectrum_emitter = emitter.get_frequency_spectrum(amplitude, self._n_samples, self._dt,
+                                                                                      self._fin['emitter_model'][self._shower_index], half_width=half_width, emitter_frequency=emitter_frequency)
+                            # convolve voltage output with antenna response to obtain emitted electric field
+                            frequencies = np.fft.rfftfreq(self._n_samples, d=self._dt)
+                            zenith_emitter, azimuth_emitter = hp.cartesian_to_spherical(*self._launch_vector)
+                            VEL = antenna_pattern.get_antenna_response_vectorized(frequencies, zenith_emitter, azimuth_emitter, *ori)
+                            c = constants.c * units.m / units.s
+                            eTheta = VEL['theta'] * (-1j) * voltage_spectrum_emitter * frequencies * n_index / c
+                            ePhi = VEL['phi'] * (-1j) * voltage_spectrum_emitter * frequencies * n_index / c
+                            eR = np.zeros_like(eTheta)
+                            # rescale amplitudes by 1/R, for emitters this is not part of the "SignalGen" class
+                            eTheta *= 1 / R
+                            ePhi *= 1 / R
+                        else:
+                            logger.error(f"simulation mode {self._fin_attrs['simulation_mode']} unknown.")
+                            raise AttributeError(f"simulation mode {self._fin_attrs['simulation_mode']} unknown.")
+
+                        if self._debug:
+                            from matplotlib import pyplot as plt
+                            fig, (ax, ax2) = plt.subplots(1, 2)
+                            ax.plot(self._ff, np.abs(eTheta) / units.micro / units.V * units.m)
+                            ax2.plot(self._tt, fft.freq2time(eTheta, 1. / self._dt) / units.micro / units.V * units.m)
+                            ax2.set_ylabel("amplitude [$\mu$V/m]")
+                            fig.tight_layout()
+                            fig.suptitle("$E_C$ = {:.1g}eV $\Delta \Omega$ = {:.1f}deg, R = {:.0f}m".format(
+                                self._fin['shower_energies'][self._shower_index], view['viewing_angle'], R))
+                            fig.subplots_adjust(top=0.9)
+                            plt.show()
+
+                        electric_field = NuRadioReco.framework.electric_field.ElectricField([channel_id],
+                                            position=self._det.get_relative_position(self._sim_station.get_id(), channel_id),
+                                            shower_id=self._shower_ids[self._shower_index], ray_tracing_id=iS)
+                        if iS is None:
+                            a = 1 / 0
+                        electric_field.set_frequency_spectrum(np.array([eR, eTheta, ePhi]), 1. / self._dt, copy=False)
+                        electric_field = view['raytracer'].apply_propagation_effects(electric_field, iS)
+                        # Trace start time is equal to the interaction time relative to the first
+                        # interaction plus the wave travel time.
+                        if hasattr(self, '_vertex_time'):
+                            trace_start_time = self._vertex_time + T
+                        else:
+                            trace_start_time = T
+
+                        # We shift the trace start time so that the trace time matches the propagation time.
+                        # The centre of the trace corresponds to the instant when the signal from the shower
+                        # vertex arrives at the observer. The next line makes sure that the centre time
+                        # of the trace is equal to vertex_time + T (wave propagation time)
+                        trace_start_time -= 0.5 * electric_field.get_number_of_samples() / electric_field.get_sampling_rate()
+
+                        electric_field.set_trace_start_time(trace_start_time)
+                        electric_field[efp.azimuth] = azimuth
+                        electric_field[efp.zenith] = zenith
+                        electric_field[efp.ray_path_type] = propagation.solution_types[view['raytracer'].get_solution_type(iS)]
+                        electric_field[efp.nu_vertex_distance] = sg['travel_distances'][iSh, channel_id, iS]
+                        electric_field[efp.nu_viewing_angle] = view['viewing_angle']
+                        self._sim_station.add_electric_field(electric_field)
+
+                        # apply a simple threshold cut to speed up the simulation,
+                        # application of antenna response will just decrease the
+                        # signal amplitude
+                        if np.max(np.abs(electric_field.get_trace(copy=False))) > float(self._cfg['speedup']['min_efield_amplitude']) * self._Vrms_efield_per_channel[self._station_id][channel_id]:
+                            candidate_station = True
+                        # end of views loop
                     t3 = time.time()
                     rayTracingTime += t3 - t2
-                    # end of channels loop
                 # end of showers loop
                 # now perform first part of detector simulation -> convert each efield to voltage
                 # (i.e. apply antenna response) and apply additional simulation of signal chain (such as cable delays,
@@ -978,11 +1104,14 @@ class simulation:
                         channelResampler.run(self._evt, self._station.get_sim_station(), self._det, sampling_rate=self._sampling_rate_detector)
                         electricFieldResampler.run(self._evt, self._station.get_sim_station(), self._det, sampling_rate=self._sampling_rate_detector)
 
-                        output_mode = {'Channels': self._cfg['output']['channel_traces'],
-                                       'ElectricFields': self._cfg['output']['electric_field_traces'],
-                                       'SimChannels': self._cfg['output']['sim_channel_traces'],
-                                       'SimElectricFields': self._cfg['output']['sim_electric_field_traces']}
-                        if self.__write_detector:
+                        output_mode = self._get_nur_output_mode()
+                        if self._worker_event_group_ids is not None:
+                            # the events are written by the main process
+                            if self.__write_detector:
+                                self._worker_events.append(self._eventWriter.get_event_bytearray(self._evt, self._det, mode=output_mode))
+                            else:
+                                self._worker_events.append(self._eventWriter.get_event_bytearray(self._evt, mode=output_mode))
+                        elif self.__write_detector:
                             self._eventWriter.run(self._evt, self._det, mode=output_mode)
                         else:
                             self._eventWriter.run(self._evt, mode=output_mode)
@@ -1005,17 +1134,56 @@ class simulation:
 
         # end event group loop
 
+        if self._worker_event_group_ids is not None:
+            timing = {'total': time.time() - t_start, 'input': input_time, 'askaryan': askaryan_time,
+                      'raytracing': rayTracingTime, 'detector_simulation': detSimTime, 'weights': weightTime,
+                      'distance_cut': distance_cut_time}
+            return self._get_worker_output(n_raytracing_reused, raytracing_max_miss_distance, timing)
+
         # Create trigger structures if there are no triggering events.
         # This is done to ensure that files with no triggering n_events
         # merge properly.
 #         self._create_empty_multiple_triggers()
 
+        if self._cfg['speedup']['raytracing_groups']:
+            # report the accuracy of the shared ray tracing solutions
+            self._mout_attrs['raytracing_groups_n_reused'] = n_raytracing_reused
+            self._mout_attrs['raytracing_groups_max_miss_distance'] = raytracing_max_miss_distance
+            logger.status(f"ray tracing solutions of {n_raytracing_reused} channels were derived from close-by channels "
+                          f"(maximum miss distance {raytracing_max_miss_distance / units.mm:.2g}mm)")
+
+        if antenna_response_cache is not None:
+            statistics = self._get_merged_statistics('antenna_response_cache')
+            logger.status(f"antenna response cache: {statistics['hits']} hits, {statistics['misses']} misses, "
+                          f"{statistics['bypasses']} bypasses (hit rate {100 * statistics['hit_rate']:.1f}%), "
+                          f"{statistics['evictions']} evictions")
+        if self._askaryan_cache is not None:
+            statistics = self._get_merged_statistics('askaryan_cache')
+            self._mout_attrs['askaryan_cache_hits'] = statistics['hits']
+            self._mout_attrs['askaryan_cache_misses'] = statistics['misses']
+            logger.status(f"Askaryan cache: {statistics['hits']} hits, {statistics['misses']} misses "
+                          f"(hit rate {100 * statistics['hit_rate']:.1f}%), {statistics['evictions']} evictions")
+        if self._arz_template_bank is not None:
+            statistics = self._get_merged_statistics('arz_template_bank')
+            logger.status(f"ARZ template bank: {statistics['interpolated']} signals interpolated, "
+                          f"{statistics['calculated']} signals calculated")
+        statistics = self._get_merged_statistics('traces')
+        logger.status(f"traces: {statistics['fft']} FFTs, {statistics['ifft']} inverse FFTs and {statistics['copies']} "
+                      f"copies of trace arrays = {statistics['fft'] / max(self._n_showers, 1):.1f} FFTs, "
+                      f"{statistics['ifft'] / max(self._n_showers, 1):.1f} inverse FFTs and "
+                      f"{statistics['copies'] / max(self._n_showers, 1):.1f} copies per event")
+
         # save simulation run in hdf5 format (only triggered events)
         t5 = time.time()
         self._write_output_file()
+        if self._input_reader is not None:
+            self._input_reader.close()
         if self._outputfilenameNuRadioReco is not None:
             self._eventWriter.end()
             logger.debug("closing nur file")
+        if os.path.exists(self._checkpoint_filename):
+            # the simulation is complete, so the checkpoint is not needed anymore
+            os.remove(self._checkpoint_filename)
 
         try:
             self.calculate_Veff()
@@ -1044,6 +1212,17 @@ class simulation:
                                                                                          100 * detSimTime / t_total,
                                                                                          100 * outputTime / t_total,
                                                                                          100 * weightTime / t_total))
+        if self._worker_timing['total'] > 0:
+            # the times of the worker processes are given relative to the time that the worker processes spent
+            # on their chunks of event groups (summed over all worker processes)
+            t_workers = self._worker_timing['total']
+            logger.status("worker processes: {} in total ({:.1f}% input, {:.1f}% ray tracing, {:.1f}% askaryan, {:.1f}% detector simulation, {:.1f}% weights calculation)".format(
+                pretty_time_delta(t_workers),
+                100 * self._worker_timing['input'] / t_workers,
+                100 * (self._worker_timing['raytracing'] - self._worker_timing['askaryan']) / t_workers,
+                100 * self._worker_timing['askaryan'] / t_workers,
+                100 * self._worker_timing['detector_simulation'] / t_workers,
+                100 * self._worker_timing['weights'] / t_workers))
         triggered = remove_duplicate_triggers(self._mout['triggered'], self._fin['event_group_ids'])
         n_triggered = np.sum(triggered)
         return n_triggered
@@ -1051,11 +1230,483 @@ class simulation:
     def _calculate_emitter_output(self):
         pass
 
-    def _get_shower_index(self, shower_id):
-        if hasattr(shower_id, "__len__"):
-            return np.array([self._shower_index_array[x] for x in shower_id])
+    def _get_nur_output_mode(self):
+        """
+        returns the output mode of the eventWriter as specified in the config
+        """
+        return {'Channels': self._cfg['output']['channel_traces'],
+                'ElectricFields': self._cfg['output']['electric_field_traces'],
+                'SimChannels': self._cfg['output']['sim_channel_traces'],
+                'SimElectricFields': self._cfg['output']['sim_electric_field_traces']}
+
+    def _run_event_groups_parallel(self, event_group_ids, completed_event_group_ids, n_raytracing_reused,
+                                   raytracing_max_miss_distance):
+        """
+        simulates the event groups with a pool of `n_workers` processes and merges the results
+
+        The event groups are split into chunks of consecutive event groups. The results of each chunk are merged
+        as soon as they are available but strictly in the order of the chunks, so that the output is the same
+        as for a serial run. A checkpoint is written after merging a chunk if it is due.
+
+        Parameters
+        ----------
+        event_group_ids: array of ints
+            the (sorted) ids of the event groups to simulate
+        completed_event_group_ids: list of ints
+            the ids of the event groups that are already simulated, the merged event groups are appended
+        n_raytracing_reused: int
+            the number of derived ray tracing solutions of the completed event groups
+        raytracing_max_miss_distance: float
+            the maximum miss distance of the derived ray tracing solutions of the completed event groups
+
+        Returns
+        -------
+        n_raytracing_reused: int
+            the number of channels for which the ray tracing solutions were derived from a close-by channel
+        raytracing_max_miss_distance: float
+            the maximum miss distance of the derived ray tracing solutions
+        """
+        global _worker_simulation
+        if self._event_group_list is not None:
+            event_group_ids = [event_group_id for event_group_id in event_group_ids if event_group_id in self._event_group_list]
+        n_chunks = min(len(event_group_ids), 4 * self._n_workers)
+        chunks = [chunk for chunk in np.array_split(event_group_ids, n_chunks) if len(chunk)]
+        logger.status(f"simulating {len(event_group_ids)} event groups in {len(chunks)} chunks with {self._n_workers} processes")
+        if not self._cfg['seed_per_event_group'] and (self._is_simulate_noise() or self._cfg['signal']['model'] in ["Alvarez2009", "ARZ2019", "ARZ2020"]):
+            logger.warning("the random numbers (noise and shower realizations) of a parallel simulation depend on the "
+                           "number of processes. Set 'seed_per_event_group' in the config to get the same result as a serial run.")
+
+        _worker_simulation = self
+        try:
+            with multiprocessing.get_context('fork').Pool(self._n_workers) as pool:
+                for iChunk, output in enumerate(pool.imap(_simulate_event_groups, chunks)):
+                    logger.info(f"merging results of chunk {iChunk + 1}/{len(chunks)}")
+                    self._merge_worker_output(output)
+                    n_raytracing_reused += output['n_raytracing_reused']
+                    raytracing_max_miss_distance = max(raytracing_max_miss_distance, output['raytracing_max_miss_distance'])
+                    completed_event_group_ids.extend(chunks[iChunk])
+                    if iChunk < len(chunks) - 1 and self._is_checkpoint_due(len(completed_event_group_ids)):
+                        self._write_checkpoint(completed_event_group_ids, n_raytracing_reused, raytracing_max_miss_distance)
+        finally:
+            _worker_simulation = None
+        return n_raytracing_reused, raytracing_max_miss_distance
+
+    def _run_event_groups(self, event_group_ids):
+        """
+        simulates a chunk of event groups in a worker process of a parallel run, see `_get_worker_output`
+        for the returned results
+        """
+        self._worker_event_group_ids = event_group_ids
+        if self._input_reader is not None:
+            self._input_reader.reopen()
+        # the trigger names are collected per chunk to merge them in the same order as in a serial run
+        self._mout_attrs.pop('trigger_names', None)
+        return self.run()
+
+    def _get_worker_output(self, n_raytracing_reused, raytracing_max_miss_distance, timing):
+        """
+        collects the results of the event groups simulated by a worker process
+
+        Parameters
+        ----------
+        n_raytracing_reused: int
+            the number of channels for which the ray tracing solutions were derived from a close-by channel
+        raytracing_max_miss_distance: float
+            the maximum miss distance of the derived ray tracing solutions
+        timing: dict
+            the time that the worker process spent on the chunk of event groups ('total') and on the different
+            parts of the simulation
+
+        Returns
+        -------
+        dict
+            contains the entries of the output data structures that belong to the simulated event groups,
+            the trigger names (in the order in which the triggers were found), the serialized events of
+            the NuRadioReco output, the ray tracing statistics, the timing and the statistics of the caches
+            (see `_get_statistics`)
+        """
+        shower_indices = np.arange(self._n_showers)[np.isin(self._fin['event_group_ids'], self._worker_event_group_ids)]
+        output = {'shower_indices': shower_indices,
+                  'mout': {key: value[shower_indices] for key, value in self._mout.items()},
+                  'trigger_names': list(self._mout_attrs.get('trigger_names', [])),
+                  'mout_groups': self._mout_groups,
+                  'events': self._worker_events,
+                  'n_raytracing_reused': n_raytracing_reused,
+                  'raytracing_max_miss_distance': raytracing_max_miss_distance,
+                  'timing': timing,
+                  'statistics': {}}
+        # the caches are kept between the chunks of event groups that a worker process simulates, so only the
+        # counts of the current chunk are returned
+        for name, statistics in self._get_statistics().items():
+            output['statistics'][name] = {key: value - self._statistics_start[name][key]
+                                          for key, value in statistics.items()}
+        for key in self._get_per_event_output_keys():
+            output[key] = getattr(self, key)
+        return output
+
+    def _get_statistics(self):
+        """
+        returns the counters of the caches, the ARZ template bank and the trace operations of this process
+
+        Returns
+        -------
+        dict
+            the counters per name ('askaryan_cache', 'antenna_response_cache', 'arz_template_bank', 'traces')
+        """
+        statistics = {'traces': NuRadioReco.framework.base_trace.get_statistics()}
+        if self._askaryan_cache is not None:
+            cache_statistics = self._askaryan_cache.get_statistics()
+            statistics['askaryan_cache'] = {key: cache_statistics[key] for key in ['hits', 'misses', 'evictions']}
+        if self._antenna_response_cache is not None:
+            cache_statistics = self._antenna_response_cache.get_statistics()
+            statistics['antenna_response_cache'] = {key: cache_statistics[key]
+                                                    for key in ['hits', 'misses', 'bypasses', 'evictions']}
+        if self._arz_template_bank is not None:
+            statistics['arz_template_bank'] = self._arz_template_bank.get_statistics()
+        return statistics
+
+    def _get_merged_statistics(self, name):
+        """
+        returns the counters of `_get_statistics` of this process plus the ones of the worker processes of a
+        parallel run, and the hit rate of the caches
+        """
+        statistics = collections.Counter(self._get_statistics()[name])
+        statistics.update(self._worker_statistics.get(name, {}))
+        statistics = dict(statistics)
+        if name in ['askaryan_cache', 'antenna_response_cache']:
+            n_requests = statistics['hits'] + statistics['misses'] + statistics.get('bypasses', 0)
+            statistics['hit_rate'] = statistics['hits'] / n_requests if n_requests else 0.
+        return statistics
+
+    def _get_per_event_output_keys(self):
+        """
+        returns the names of the data structures that store the output per triggered event and station
+        """
+        return ['_output_triggered_station', '_output_event_group_ids', '_output_sub_event_ids',
+                '_output_multiple_triggers_station', '_output_trigger_times_station',
+                '_output_maximum_amplitudes', '_output_maximum_amplitudes_envelope']
+
+    def _remap_trigger_columns(self, values, trigger_names, fill_value):
+        """
+        converts an array whose last axis corresponds to `trigger_names` into an array whose last axis
+        corresponds to the trigger names of the merged output
+        """
+        values = np.asarray(values)
+        remapped = np.full(values.shape[:-1] + (len(self._mout_attrs['trigger_names']),), fill_value, dtype=values.dtype)
+        indices = [self._mout_attrs['trigger_names'].index(name) for name in trigger_names[:values.shape[-1]]]
+        remapped[..., indices] = values
+        return remapped
+
+    def _merge_worker_output(self, output):
+        """
+        adds the results of a chunk of event groups (see `_get_worker_output`) to the output data structures
+        """
+        trigger_names = output['trigger_names']
+        if len(trigger_names):
+            if 'trigger_names' not in self._mout_attrs:
+                self._mout_attrs['trigger_names'] = []
+            for name in trigger_names:
+                if name not in self._mout_attrs['trigger_names']:
+                    self._mout_attrs['trigger_names'].append(name)
+            n_triggers = len(self._mout_attrs['trigger_names'])
+            if 'multiple_triggers' not in self._mout:
+                self._mout['multiple_triggers'] = np.zeros((self._n_showers, n_triggers), dtype=bool)
+                self._mout['trigger_times'] = np.nan * np.zeros_like(self._mout['multiple_triggers'], dtype=float)
+            elif self._mout['multiple_triggers'].shape[1] < n_triggers:
+                ny = self._mout['multiple_triggers'].shape[1]
+                tmp = np.zeros((self._n_showers, n_triggers), dtype=bool)
+                tmp[:, :ny] = self._mout['multiple_triggers']
+                self._mout['multiple_triggers'] = tmp
+                tmp_t = np.nan * np.zeros_like(tmp, dtype=float)
+                tmp_t[:, :ny] = self._mout['trigger_times']
+                self._mout['trigger_times'] = tmp_t
+
+        shower_indices = output['shower_indices']
+        for key, value in output['mout'].items():
+            if key == 'multiple_triggers':
+                self._mout[key][shower_indices] = self._remap_trigger_columns(value, trigger_names, False)
+            elif key == 'trigger_times':
+                self._mout[key][shower_indices] = self._remap_trigger_columns(value, trigger_names, np.nan)
+            else:
+                self._mout[key][shower_indices] = value
+
+        for station_id, sg in output['mout_groups'].items():
+            for key, value in sg.items():
+                if key == 'multiple_triggers':
+                    value = [self._remap_trigger_columns(row, trigger_names, False) for row in value]
+                elif key == 'trigger_times':
+                    value = [self._remap_trigger_columns(row, trigger_names, np.nan) for row in value]
+                if key not in self._mout_groups[station_id]:
+                    self._mout_groups[station_id][key] = list(value)
+                else:
+                    self._mout_groups[station_id][key].extend(value)
+
+        for key in self._get_per_event_output_keys():
+            for station_id, values in output[key].items():
+                if key == '_output_multiple_triggers_station':
+                    values = [self._remap_trigger_columns(row, trigger_names, False) for row in values]
+                elif key == '_output_trigger_times_station':
+                    values = [self._remap_trigger_columns(row, trigger_names, np.nan) for row in values]
+                getattr(self, key)[station_id].extend(values)
+
+        for key, value in output['timing'].items():
+            self._worker_timing[key] += value
+        for name, statistics in output['statistics'].items():
+            if name not in self._worker_statistics:
+                self._worker_statistics[name] = collections.Counter()
+            self._worker_statistics[name].update(statistics)
+
+        if self._outputfilenameNuRadioReco is not None:
+            for event_bytearray in output['events']:
+                if self.__write_detector:
+                    self._eventWriter.write_event_bytearray(event_bytearray, det=self._det)
+                else:
+                    self._eventWriter.write_event_bytearray(event_bytearray)
+
+    def _is_checkpoint_due(self, n_completed_event_groups):
+        """
+        checks if a checkpoint needs to be written according to the 'checkpoint' settings of the config
+
+        Parameters
+        ----------
+        n_completed_event_groups: int
+            the number of completed event groups
+        """
+        n_event_groups = self._cfg['checkpoint']['n_event_groups']
+        interval = self._cfg['checkpoint']['interval']
+        if n_event_groups is not None and n_completed_event_groups - self._last_checkpoint['n_event_groups'] >= n_event_groups:
+            return True
+        if interval is not None and time.time() - self._last_checkpoint['time'] >= interval:
+            return True
+        return False
+
+    def _get_checkpoint_array(self, key, values):
+        """
+        converts a list of output values into an array. The rows of the trigger data structures are padded to
+        the current number of triggers because the number of triggers can increase during the simulation.
+        """
+        if key in ['multiple_triggers', '_output_multiple_triggers_station']:
+            values = [self._remap_trigger_columns(row, self._mout_attrs['trigger_names'], False) for row in values]
+        elif key in ['trigger_times', '_output_trigger_times_station']:
+            values = [self._remap_trigger_columns(row, self._mout_attrs['trigger_names'], np.nan) for row in values]
+        return np.array(values)
+
+    def _write_checkpoint(self, completed_event_group_ids, n_raytracing_reused, raytracing_max_miss_distance):
+        """
+        writes the output data structures of the completed event groups and the state of the .nur writer into
+        the checkpoint file
+
+        The checkpoint is first written into a temporary file that replaces the previous checkpoint, so that a
+        valid checkpoint exists at any time.
+
+        Parameters
+        ----------
+        completed_event_group_ids: list of ints
+            the ids of the completed event groups
+        n_raytracing_reused: int
+            the number of derived ray tracing solutions
+        raytracing_max_miss_distance: float
+            the maximum miss distance of the derived ray tracing solutions
+        """
+        t_start = time.time()
+        tmp_filename = self._checkpoint_filename + ".tmp"
+        with h5py.File(tmp_filename, 'w') as fout:
+            fout['completed_event_group_ids'] = np.array(completed_event_group_ids, dtype=int)
+            fout.attrs['n_showers'] = self._n_showers
+            fout.attrs['n_raytracing_reused'] = n_raytracing_reused
+            fout.attrs['raytracing_max_miss_distance'] = raytracing_max_miss_distance
+            if 'trigger_names' in self._mout_attrs:
+                fout.attrs['trigger_names'] = np.array(self._mout_attrs['trigger_names'], dtype=h5py.string_dtype(encoding='utf-8'))
+            for key, value in self._mout.items():
+                fout[f"mout/{key}"] = value
+            for station_id, sg in self._mout_groups.items():
+                group = fout.create_group(f"mout_groups/station_{station_id:d}")
+                for key, value in sg.items():
+                    group[key] = self._get_checkpoint_array(key, value)
+            for key in self._get_per_event_output_keys():
+                for station_id, values in getattr(self, key).items():
+                    fout[f"{key}/station_{station_id:d}"] = self._get_checkpoint_array(key, values)
+            if self._outputfilenameNuRadioReco is not None:
+                fout['event_writer'] = np.void(pickle.dumps(self._eventWriter.get_checkpoint(), protocol=4))
+        os.replace(tmp_filename, self._checkpoint_filename)
+        self._last_checkpoint = {'time': time.time(), 'n_event_groups': len(completed_event_group_ids)}
+        logger.status(f"wrote checkpoint after {len(completed_event_group_ids)} event groups to {self._checkpoint_filename} "
+                      f"in {pretty_time_delta(time.time() - t_start)}")
+
+    def _read_checkpoint(self):
+        """
+        restores the output data structures and the state of the .nur writer from the checkpoint file
+
+        Returns
+        -------
+        completed_event_group_ids: list of ints
+            the ids of the event groups that were simulated before the checkpoint was written
+        n_raytracing_reused: int
+            the number of derived ray tracing solutions
+        raytracing_max_miss_distance: float
+            the maximum miss distance of the derived ray tracing solutions
+        """
+        if not os.path.exists(self._checkpoint_filename):
+            logger.status(f"no checkpoint file {self._checkpoint_filename} found, starting the simulation from the beginning")
+            return [], 0, 0.
+        with h5py.File(self._checkpoint_filename, 'r') as fin:
+            if fin.attrs['n_showers'] != self._n_showers:
+                msg = f"checkpoint {self._checkpoint_filename} was written for {fin.attrs['n_showers']} showers but the input file contains {self._n_showers} showers"
+                logger.error(msg)
+                raise ValueError(msg)
+            if ('event_writer' in fin) != (self._outputfilenameNuRadioReco is not None):
+                msg = f"checkpoint {self._checkpoint_filename} does not match the requested .nur output"
+                logger.error(msg)
+                raise ValueError(msg)
+            completed_event_group_ids = list(fin['completed_event_group_ids'][()])
+            if 'trigger_names' in fin.attrs:
+                self._mout_attrs['trigger_names'] = [str(name) for name in fin.attrs['trigger_names']]
+            for key in fin['mout']:
+                self._mout[key] = fin['mout'][key][()]
+            for station_id in self._station_ids:
+                group = fin['mout_groups'][f"station_{station_id:d}"]
+                self._mout_groups[station_id] = {key: list(group[key][()]) for key in group}
+            for key in self._get_per_event_output_keys():
+                for station_id in self._station_ids:
+                    getattr(self, key)[station_id] = list(fin[key][f"station_{station_id:d}"][()])
+            if self._outputfilenameNuRadioReco is not None:
+                self._eventWriter.resume_from_checkpoint(pickle.loads(fin['event_writer'][()].tobytes()))
+            n_raytracing_reused = int(fin.attrs['n_raytracing_reused'])
+            raytracing_max_miss_distance = float(fin.attrs['raytracing_max_miss_distance'])
+        logger.status(f"resuming simulation from checkpoint {self._checkpoint_filename}, "
+                      f"{len(completed_event_group_ids)} event groups were already simulated")
+        if not self._cfg['seed_per_event_group'] and (self._is_simulate_noise() or self._cfg['signal']['model'] in ["Alvarez2009", "ARZ2019", "ARZ2020"]):
+            logger.warning("the random numbers (noise and shower realizations) of a resumed simulation differ from an uninterrupted "
+                           "simulation. Set 'seed_per_event_group' in the config to get the same result.")
+        return completed_event_group_ids, n_raytracing_reused, raytracing_max_miss_distance
+
+    def _get_raytracing_reference_channels(self, station_id):
+        """
+        groups the channels of a station whose positions are closer than `raytracing_group_tolerance`
+
+        The first channel of each group is the reference channel. The ray tracing solutions are calculated
+        exactly only for the reference channel and are derived from them for all other channels of the group.
+
+        Parameters
+        ----------
+        station_id: int
+            the station id
+
+        Returns
+        -------
+        dict
+            maps each channel id to the id of the reference channel of its group
+        """
+        tolerance = self._cfg['speedup']['raytracing_group_tolerance'] * units.m
+        positions = {}
+        reference_channels = {}
+        for channel_id in range(self._det.get_number_of_channels(station_id)):
+            positions[channel_id] = self._det.get_relative_position(station_id, channel_id)
+            reference_channels[channel_id] = channel_id
+            for reference_channel_id in sorted(set(reference_channels.values())):
+                if reference_channel_id != channel_id and \
+                        np.linalg.norm(positions[channel_id] - positions[reference_channel_id]) < tolerance:
+                    reference_channels[channel_id] = reference_channel_id
+                    break
+        logger.info(f"station {station_id}: {len(set(reference_channels.values()))} ray tracing groups for "
+                    f"{len(reference_channels)} channels")
+        return reference_channels
+
+    def _find_ray_tracing_solutions_batch(self, event_indices):
+        """
+        calculates the ray tracing solutions between all showers of the event group and all channels of the
+        current station in a single call of the ray tracer
+
+        Parameters
+        ----------
+        event_indices: array of ints
+            the indices of the showers of the event group
+
+        Returns
+        -------
+        dict of arrays of shape (n_showers, n_channels, n_solutions, ...), see `find_solutions_batch` of the ray tracer
+        """
+        n_channels = self._det.get_number_of_channels(self._station_id)
+        vertices = self._input_showers.get_vertices(event_indices)
+        antenna_positions = np.array([self._det.get_relative_position(self._station_id, channel_id) +
+                                      self._det.get_absolute_position(self._station_id) for channel_id in range(n_channels)])
+        x1 = np.repeat(vertices, n_channels, axis=0)
+        x2 = np.tile(antenna_positions, (len(event_indices), 1))
+        solutions = self._raytracer.find_solutions_batch(x1, x2)
+        for key, value in solutions.items():
+            solutions[key] = value.reshape((len(event_indices), n_channels) + value.shape[1:])
+        return solutions
+
+    def _get_askaryan_spectra(self, n_index, viewing_angles, distances, random_generator=None):
+        """
+        calculates the Askaryan signals of the current shower for all views (i.e. all channels and ray tracing
+        solutions) in a single call of the Askaryan module
+
+        All views use the same shower realization, which is saved in the sim shower and in the hdf5 output.
+
+        Parameters
+        ----------
+        n_index: float
+            the index of refraction at the vertex
+        viewing_angles: list of floats
+            the viewing angle of each view
+        distances: list of floats
+            the distance between vertex and antenna along the ray path of each view
+        random_generator: None or numpy.random.Generator
+            the random number stream of the event group (see config option `seed_per_event_group`)
+
+        Returns
+        -------
+        spectra: array of shape (n_views, n_frequencies)
+            the frequency spectra of the eTheta component
+        """
+        kwargs = {}
+        # if the input file specifies a specific shower realization, use that realization
+        if self._cfg['signal']['model'] in ["ARZ2019", "ARZ2020"] and "shower_realization_ARZ" in self._fin:
+            kwargs['iN'] = self._fin['shower_realization_ARZ'][self._shower_index]
+            logger.debug(f"reusing shower {kwargs['iN']} ARZ shower library")
+        elif self._cfg['signal']['model'] == "Alvarez2009" and "shower_realization_Alvarez2009" in self._fin:
+            kwargs['k_L'] = self._fin['shower_realization_Alvarez2009'][self._shower_index]
+            logger.debug(f"reusing k_L parameter of Alvarez2009 model of k_L = {kwargs['k_L']:.4g}")
         else:
-            return self._shower_index_array[shower_id]
+            # check if the shower was already simulated (e.g. for a different station)
+            if self._cfg['signal']['model'] in ["ARZ2019", "ARZ2020"]:
+                if self._sim_shower.has_parameter(shp.charge_excess_profile_id):
+                    kwargs = {'iN': self._sim_shower.get_parameter(shp.charge_excess_profile_id)}
+            if self._cfg['signal']['model'] == "Alvarez2009":
+                if self._sim_shower.has_parameter(shp.k_L):
+                    kwargs = {'k_L': self._sim_shower.get_parameter(shp.k_L)}
+                    logger.debug(f"reusing k_L parameter of Alvarez2009 model of k_L = {kwargs['k_L']:.4g}")
+
+        if self._arz_template_bank is not None:
+            kwargs['template_bank'] = self._arz_template_bank
+        get_frequency_spectrum = askaryan.get_frequency_spectrum
+        if self._askaryan_cache is not None:
+            get_frequency_spectrum = self._askaryan_cache.get_frequency_spectrum
+        spectra, additional_output = get_frequency_spectrum(
+            self._fin['shower_energies'][self._shower_index], np.array(viewing_angles),
+            self._n_samples, self._dt, self._fin['shower_type'][self._shower_index], n_index, np.array(distances),
+            self._cfg['signal']['model'], seed=self._cfg['seed'], full_output=True,
+            random_generator=random_generator, **kwargs)
+        # save shower realization to SimShower and hdf5 file
+        if self._cfg['signal']['model'] in ["ARZ2019", "ARZ2020"]:
+            if 'shower_realization_ARZ' not in self._mout:
+                self._mout['shower_realization_ARZ'] = np.zeros(self._n_showers)
+            if not self._sim_shower.has_parameter(shp.charge_excess_profile_id):
+                self._sim_shower.set_parameter(shp.charge_excess_profile_id, additional_output['iN'])
+                self._mout['shower_realization_ARZ'][self._shower_index] = additional_output['iN']
+                logger.debug(f"setting shower profile for ARZ shower library to i = {additional_output['iN']}")
+        if self._cfg['signal']['model'] == "Alvarez2009":
+            if 'shower_realization_Alvarez2009' not in self._mout:
+                self._mout['shower_realization_Alvarez2009'] = np.zeros(self._n_showers)
+            if not self._sim_shower.has_parameter(shp.k_L):
+                self._sim_shower.set_parameter(shp.k_L, additional_output['k_L'])
+                self._mout['shower_realization_Alvarez2009'][self._shower_index] = additional_output['k_L']
+                logger.debug(f"setting k_L parameter of Alvarez2009 model to k_L = {additional_output['k_L']:.4g}")
+        return spectra
+
+    def _get_shower_index(self, shower_id):
+        return self._input_showers.get_shower_index(shower_id)
 
     def _is_simulate_noise(self):
         """
@@ -1096,17 +1747,31 @@ class simulation:
         """
         if channel_id is None:
             for electric_field in self._station.get_sim_station().get_electric_fields():
-                electric_field.set_trace(electric_field.get_trace() * factor, sampling_rate=electric_field.get_sampling_rate())
+                electric_field.set_trace(electric_field.get_trace(copy=False) * factor, sampling_rate=electric_field.get_sampling_rate(), copy=False)
 
         else:
             sim_channels = self._station.get_sim_station().get_electric_fields_for_channels([channel_id])
             for sim_channel in sim_channels:
-                sim_channel.set_trace(sim_channel.get_trace() * factor, sampling_rate=sim_channel.get_sampling_rate())
+                sim_channel.set_trace(sim_channel.get_trace(copy=False) * factor, sampling_rate=sim_channel.get_sampling_rate(), copy=False)
 
     def _read_input_hdf5(self):
         """
         reads input file into memory
+
+        If the config specifies an 'input_chunk_size', the input file is read in blocks of event groups
+        while the event groups are simulated (see `NuRadioMC.simulation.input_reader.ChunkedInputFile`).
         """
+        chunk_size = self._cfg['speedup']['input_chunk_size']
+        if chunk_size is not None:
+            if input_reader.ChunkedInputFile.is_sorted(self._inputfilename):
+                logger.status(f"reading input file in blocks of at least {chunk_size} showers")
+                self._input_reader = input_reader.ChunkedInputFile(self._inputfilename, chunk_size)
+                self._fin = self._input_reader.get_datasets()
+                self._fin_stations = {key: self._input_reader.get_datasets(key) for key in self._input_reader.get_group_names()}
+                self._fin_attrs = self._input_reader.attrs
+                return
+            logger.warning("the event group ids of the input file are not sorted, the input file can not be read in blocks. "
+                           "Reading the complete input file into memory.")
         fin = h5py.File(self._inputfilename, 'r')
         self._fin = {}
         self._fin_stations = {}
@@ -1390,11 +2055,10 @@ class simulation:
             # triggered should indicate if an interaction has produced a trigger
             saved = np.copy(self._mout['triggered'])
             if 'n_interaction' in self._fin:  # if n_interactions is not specified, there are not parents
-                parent_mask = self._fin['n_interaction'] == 1
-                for event_id in np.unique(self._fin['event_group_ids']):
-                    event_mask = self._fin['event_group_ids'] == event_id
-                    if True in self._mout['triggered'][event_mask]:
-                        saved[parent_mask & event_mask] = True
+                parent_mask = np.array(self._fin['n_interaction']) == 1
+                event_group_ids = np.asarray(self._fin['event_group_ids'])
+                triggered_event_group_ids = np.unique(event_group_ids[self._mout['triggered']])
+                saved[parent_mask & np.isin(event_group_ids, triggered_event_group_ids)] = True
 
             logger.status("start saving events")
             # save data sets
@@ -1471,11 +2135,12 @@ class simulation:
                 if key.startswith("station_"):
                     continue
                 if not key in fout.keys():  # only save data sets that havn't been recomputed and saved already
-                    if np.array(self._fin[key]).dtype.char == 'U':
-                        fout[key] = np.array(self._fin[key], dtype=h5py.string_dtype(encoding='utf-8'))[saved]
+                    value = np.array(self._fin[key])
+                    if value.dtype.char == 'U':
+                        fout[key] = np.array(value, dtype=h5py.string_dtype(encoding='utf-8'))[saved]
 
                     else:
-                        fout[key] = np.array(self._fin[key])[saved]
+                        fout[key] = value[saved]
 
         for key in self._fin_attrs.keys():
             if not key in fout.attrs.keys():  # only save atrributes sets that havn't been recomputed and saved already
@@ -0,0 +1,170 @@
+import numpy as np
+import time
+from scipy import constants
+from NuRadioMC.SignalGen import parametrizations, HCRB2017
+from NuRadioReco.utilities import units
+
+"""
+micro-benchmark of the spectral kernels of the parametrized Askaryan models (ZHS1992, Alvarez2000, Alvarez2009)
+and of the shower profile maximum of the HCRB2017 model, compared to the previous implementations.
+
+The previous implementations are copied below (the spectra broadcasted over all views with temporary arrays, the
+HCRB2017 shower profile tabulated on the full depth grid). The benchmark asserts that the new implementations
+give the same results.
+"""
+
+n_index = 1.78
+cherenkov_angle = np.arccos(1. / n_index)
+N = 2048
+dt = 0.2 * units.ns
+freqs = np.fft.rfftfreq(N, dt)
+rng = np.random.default_rng(0)
+
+
+def get_spectrum_previous(energy, theta, shower_type, R, model, k_L=None):
+    theta, R = np.broadcast_arrays(np.atleast_1d(theta)[:, np.newaxis], np.atleast_1d(R)[:, np.newaxis])
+    if(model == 'ZHS1992'):
+        vv0 = freqs / (0.5 * units.GHz)
+        domega = (theta - cherenkov_angle)
+        with np.errstate(divide='ignore'):
+            return 0.5 * 1.1e-7 * energy / units.TeV * vv0 * 1. / \
+                (1 + 0.4 * (vv0) ** 2) * np.exp(-0.5 * (domega / (2.4 * units.deg / vv0)) ** 2) * \
+                units.V / units.m / (R / units.m) / units.MHz
+    elif(model == 'Alvarez2009'):
+        ff = freqs[1:]
+        E_C = 73.1 * units.MeV
+        rho = 0.924 * units.g / units.cm ** 3
+        X_0 = 36.08 * units.g / units.cm ** 2
+        R_M = 10.57 * units.g / units.cm ** 2
+        c = constants.c * units.m / units.s
+        if (shower_type == 'HAD'):
+            k_E_bar = 4.13e-16 * units.V / units.cm / units.MHz ** 2 * np.tanh((np.log10(energy / units.eV) - 10.60) / 2.54)
+            k_L = 31.25 * (energy / (1.e15 * units.eV)) ** 3.01e-2
+            beta = 2.57
+            k_R_bar = 2.73 + np.tanh((12.92 - np.log10(energy / units.eV)) / 1.72)
+        else:
+            k_E_bar = 4.65e-16 * units.V / units.cm / units.MHz ** 2
+            beta = 2.74
+            k_R_bar = 1.54
+        A = k_E_bar * energy / E_C * X_0 / rho * np.sin(theta) * ff
+        nu_L = rho / k_L / X_0 * (c / np.maximum(np.abs(1 - n_index * np.cos(theta)), 1.e-8))
+        d_L = 1 / (1 + (ff / nu_L) ** beta)
+        nu_R = rho / k_R_bar / R_M * c / np.sqrt(n_index ** 2 - 1)
+        d_R = 1 / (1 + (ff / nu_R) ** 1.27)
+        return np.insert(0.5 * A * d_L * d_R / R, 0, 0, axis=-1)
+    elif(model == 'Alvarez2000'):
+        ff = freqs[1:]
+        Elpm = 2e15 * units.eV
+        dThetaEM = 2.7 * units.deg * 500 * units.MHz / ff * (Elpm / (0.14 * energy + Elpm)) ** 0.3
+        epsilon = np.log10(energy / units.TeV)
+        if (epsilon >= 0 and epsilon <= 2):
+            dThetaHad = 500 * units.MHz / ff * (2.07 - 0.33 * epsilon + 7.5e-2 * epsilon ** 2) * units.deg
+        elif (epsilon > 2 and epsilon <= 5):
+            dThetaHad = 500 * units.MHz / ff * (1.74 - 1.21e-2 * epsilon) * units.deg
+        elif(epsilon > 5 and epsilon <= 7):
+            dThetaHad = 500 * units.MHz / ff * (4.23 - 0.785 * epsilon + 5.5e-2 * epsilon ** 2) * units.deg
+        else:
+            dThetaHad = 500 * units.MHz / ff * (4.23 - 0.785 * 7 + 5.5e-2 * 7 ** 2) * \
+                (1 + (epsilon - 7) * 0.075) * units.deg
+        f0 = 1.15 * units.GHz
+        E = 2.53e-7 * energy / units.TeV * ff / f0 / (1 + (ff / f0) ** 1.44)
+        E *= units.V / units.m / units.MHz
+        E = E * (np.sin(theta) / np.sin(cherenkov_angle))
+        tmp = np.zeros((len(theta), len(ff) + 1))
+        if(shower_type == "EM"):
+            tmp[:, 1:] = E * np.exp(-np.log(2) * ((theta - cherenkov_angle) / dThetaEM) ** 2) / R
+        else:
+            tmp[:, 1:] = E * np.exp(-np.log(2) * ((theta - cherenkov_angle) / dThetaHad) ** 2) / R
+            epsilon = np.log10(energy / units.TeV)
+            tmp[:, 1:] *= -1.27e-2 - 4.76e-2 * (epsilon + 3) - 2.07e-3 * (epsilon + 3) ** 2 + 0.52 * np.sqrt(epsilon + 3)
+        return 0.5 * tmp
+
+
+def get_profile_maximum_previous(E, EM):
+    if EM:
+        E_CRIT = 0.073 * units.GeV
+        x = np.arange(0.01, 5000.0, 0.01)
+        a = 0.31 / (np.log(E / E_CRIT))**0.5
+        nx = a * np.exp(x - 1.5 * x * np.log((3 * x) / (x + 2 * np.log(E / E_CRIT))))
+    else:
+        X0 = 39.562 * units.g / units.cm**2
+        l = 113.03 * units.g / units.cm**2
+        Ec = 0.17006 * units.GeV
+        Xmax = X0 * np.log(E / Ec)
+        x = np.arange(1.0 * units.g / units.cm**2, 200000.0 * units.g / units.cm**2, 1.0 * units.g / units.cm**2)
+        a = 0.11842 * E / Ec * (Xmax - l) / Xmax * np.exp(Xmax / l - 1)
+        nx = a * pow(x / (Xmax - l), Xmax / l) * np.exp(-x / l)
+    n_max_position = np.argmax(nx)
+    cut_left = np.argwhere((nx[:n_max_position] / nx[n_max_position]) > 0.95)[0][0]
+    cut_right = np.argwhere((nx[n_max_position:] / nx[n_max_position]) < 0.95)[0][0] + n_max_position
+    fit_width = cut_right - cut_left
+    return n_max_position, nx[n_max_position], nx[n_max_position - fit_width:n_max_position + fit_width] / nx[n_max_position]
+
+
+def get_profile_maximum(E, EM):
+    if EM:
+        parameters = (0.01, 0.01, 499999, 0.31 / (np.log(E / (0.073 * units.GeV)))**0.5, np.log(E / (0.073 * units.GeV)), 0.)
+    else:
+        Xmax = 39.562 * units.g / units.cm**2 * np.log(E / (0.17006 * units.GeV))
+        l = 113.03 * units.g / units.cm**2
+        a = 0.11842 * E / (0.17006 * units.GeV) * (Xmax - l) / Xmax * np.exp(Xmax / l - 1)
+        parameters = (1.0 * units.g / units.cm**2, 1.0 * units.g / units.cm**2, 199999, a, Xmax, l)
+    if HCRB2017.numba_available:
+        return HCRB2017._get_profile_maximum_numba(EM, *parameters, 0.95)
+    return HCRB2017._get_profile_maximum(EM, *parameters, 0.95)
+
+
+def benchmark(function, n_repetitions):
+    function()  # the first call includes the compilation of numba kernels
+    t_start = time.time()
+    for i in range(n_repetitions):
+        function()
+    return (time.time() - t_start) / n_repetitions
+
+
+for model in ['ZHS1992', 'Alvarez2000', 'Alvarez2009']:
+    for shower_type in ['HAD', 'EM']:
+        for n_views in [1, 10, 100]:
+            energy = 10 ** rng.uniform(17, 19) * units.eV
+            theta = cherenkov_angle + rng.uniform(-10, 10, n_views) * units.deg
+            R = rng.uniform(0.2, 3, n_views) * units.km
+            k_L = 25.
+            out = np.empty((n_views, len(freqs)))
+            spectrum_previous = get_spectrum_previous(energy, theta, shower_type, R, model, k_L=k_L)
+            spectrum = parametrizations.get_spectral_amplitudes(energy, theta, freqs, shower_type, n_index, R, model,
+                                                                k_L=k_L, out=out)
+            np.testing.assert_allclose(spectrum, spectrum_previous, rtol=1e-10, atol=1e-12 * np.max(spectrum_previous))
+            t_previous = benchmark(lambda: get_spectrum_previous(energy, theta, shower_type, R, model, k_L=k_L), 200)
+            t_new = benchmark(lambda: parametrizations.get_spectral_amplitudes(
+                energy, theta, freqs, shower_type, n_index, R, model, k_L=k_L, out=out), 200)
+            print(f"{model:12s} {shower_type:3s} {n_views:3d} views: previous {t_previous * 1e6:7.1f}us, "
+                  f"new {t_new * 1e6:7.1f}us -> speedup {t_previous / t_new:.1f}x")
+
+# arrays of energies: one call instead of one call per energy
+energies = 10 ** rng.uniform(17, 19, 100) * units.eV
+theta = cherenkov_angle + rng.uniform(-10, 10, 100) * units.deg
+out = np.empty((100, len(freqs)))
+spectra = parametrizations.get_spectral_amplitudes(energies, theta, freqs, 'HAD', n_index, 1 * units.km, 'Alvarez2000',
+                                                   out=out)
+for i in range(100):
+    np.testing.assert_allclose(spectra[i], get_spectrum_previous(energies[i], theta[i], 'HAD', 1 * units.km,
+                                                                 'Alvarez2000')[0], rtol=1e-10, atol=1e-12 * np.max(spectra[i]))
+t_previous = benchmark(lambda: [get_spectrum_previous(energies[i], theta[i], 'HAD', 1 * units.km, 'Alvarez2000')
+                                for i in range(100)], 10)
+t_new = benchmark(lambda: parametrizations.get_spectral_amplitudes(energies, theta, freqs, 'HAD', n_index, 1 * units.km,
+                                                                   'Alvarez2000', out=out), 10)
+print(f"Alvarez2000  HAD 100 energies: previous {t_previous * 1e6:7.1f}us, new {t_new * 1e6:7.1f}us "
+      f"-> speedup {t_previous / t_new:.1f}x")
+
+print(f"HCRB2017 shower profile maximum (numba available: {HCRB2017.numba_available})")
+for EM in [False, True]:
+    for energy in [1e16 * units.eV, 1e18 * units.eV, 1e20 * units.eV]:
+        n_max_position, n_max, max_vicinity = get_profile_maximum(energy, EM)
+        n_max_position_previous, n_max_previous, max_vicinity_previous = get_profile_maximum_previous(energy, EM)
+        np.testing.assert_equal(n_max_position, n_max_position_previous)
+        np.testing.assert_allclose(n_max, n_max_previous, rtol=1e-12)
+        np.testing.assert_allclose(max_vicinity, max_vicinity_previous, rtol=1e-12)
+        t_previous = benchmark(lambda: get_profile_maximum_previous(energy, EM), 10)
+        t_new = benchmark(lambda: get_profile_maximum(energy, EM), 10)
+        print(f"{'EM' if EM else 'HAD':3s} E = {energy / units.eV:.0e} eV: previous {t_previous * 1e3:6.2f}ms, "
+              f"new {t_new * 1e3:6.3f}ms -> speedup {t_previous / t_new:.0f}x")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+from NuRadioMC.SignalGen.askaryan import get_time_trace, get_frequency_spectrum
+from NuRadioReco.utilities import units
+import numpy as np
+from numpy import testing
+
+"""
+tests that the Askaryan signals of several views (viewing angles and distances) that are calculated in a single call
+are identical to the signals that are calculated for each view separately
+"""
+
+n_index = 1.78
+dt = 0.5 * units.ns
+n_samples = 256
+
+models = ['ZHS1992', 'Alvarez2000', 'Alvarez2009', 'HCRB2017', 'ARZ2020']
+shower_types = ['EM', 'HAD']
+
+Es = 10 ** np.linspace(16, 19, 3) * units.eV
+thetas = np.arccos(1. / n_index) + np.array([-5, -0.5, 0.1, 2, 30]) * units.deg
+Rs = np.array([0.3, 1, 1.5, 2, 3]) * units.km
+
+for model in models:
+    print(f"testing model {model}")
+    kwargs = {}
+    if model == 'Alvarez2009':
+        kwargs['k_L'] = 40.
+    if model == 'ARZ2020':
+        kwargs['iN'] = 3
+    for E in Es:
+        for shower_type in shower_types:
+            traces = get_time_trace(E, thetas, n_samples, dt, shower_type, n_index, Rs, model, seed=1234, **kwargs)
+            spectra = get_frequency_spectrum(E, thetas, n_samples, dt, shower_type, n_index, Rs, model, seed=1234, **kwargs)
+            testing.assert_equal(traces.shape, (len(thetas), n_samples))
+            testing.assert_equal(spectra.shape, (len(thetas), n_samples // 2 + 1))
+            for i_view, (theta, R) in enumerate(zip(thetas, Rs)):
+                trace = get_time_trace(E, theta, n_samples, dt, shower_type, n_index, R, model, seed=1234, **kwargs)
+                spectrum = get_frequency_spectrum(E, theta, n_samples, dt, shower_type, n_index, R, model, seed=1234, **kwargs)
+                try:
+                    testing.assert_allclose(traces[i_view], trace, rtol=1e-12, atol=1e-12 * np.max(np.abs(trace)))
+                    testing.assert_allclose(spectra[i_view], spectrum, rtol=1e-12, atol=1e-12 * np.max(np.abs(spectrum)))
+                except AssertionError as e:
+                    print(f"error in model {model}, shower type {shower_type}, E = {E/units.eV:.2g}eV, theta = {theta/units.deg:.2f}deg")
+                    raise(e)
+            # a scalar viewing angle with several distances
+            traces = get_time_trace(E, thetas[2], n_samples, dt, shower_type, n_index, Rs, model, seed=1234, **kwargs)
+            testing.assert_equal(traces.shape, (len(Rs), n_samples))
+
+print('SignalGen batch test passed without any issues!')
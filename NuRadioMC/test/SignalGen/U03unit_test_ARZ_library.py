@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+from NuRadioMC.SignalGen.ARZ import ARZ
+from NuRadioReco.utilities import units, io_utilities
+import numpy as np
+from numpy import testing
+import tempfile
+import pickle
+import os
+
+"""
+tests the memory-mapped version of the ARZ shower library: the library that is read from the memory-mapped
+files needs to be identical to the one read from the pickle file, and the memory-mapped files are not used
+anymore once the pickle file changes.
+
+A shower library with random charge-excess profiles is generated, so that the test does not depend on the
+download of the shower library.
+"""
+
+rng = np.random.default_rng(42)
+
+
+def write_random_library(filename):
+    depth = np.arange(0, 3000, 10.) * units.g / units.cm ** 2
+    library = {}
+    for shower_type in ['HAD', 'EM']:
+        library[shower_type] = {}
+        for energy in 10 ** np.arange(16, 19.1, 0.5) * units.eV:
+            # the preprocessing script stores the profiles of the realisations as a list of arrays
+            library[shower_type][energy] = {'depth': depth,
+                                            'charge_excess': [rng.normal(size=len(depth)) for i in range(10)]}
+    with open(filename, 'wb') as fout:
+        pickle.dump(library, fout, protocol=2)
+
+
+def assert_library_equal(library, library_pickle):
+    testing.assert_equal(sorted(library.keys()), sorted(library_pickle.keys()))
+    for shower_type in library_pickle:
+        testing.assert_equal(list(library[shower_type].keys()), list(library_pickle[shower_type].keys()))
+        for energy in library_pickle[shower_type]:
+            for key in ['depth', 'charge_excess']:
+                testing.assert_equal(library[shower_type][energy][key], library_pickle[shower_type][energy][key])
+
+
+with tempfile.TemporaryDirectory() as path:
+    filename = os.path.join(path, 'library_test.pkl')
+    write_random_library(filename)
+    library_pickle = ARZ.read_library(filename, memory_map=False)
+    testing.assert_equal(ARZ.get_memory_mapped_library(filename), None)
+
+    # the first call converts the library, the second one only opens the memory-mapped files
+    for i in range(2):
+        library = ARZ.read_library(filename)
+        testing.assert_equal(isinstance(library['HAD'][1e18 * units.eV]['charge_excess'], np.memmap), True)
+        assert_library_equal(library, library_pickle)
+
+    # the hash sum of the pickle file is cached in a sidecar file
+    testing.assert_equal(os.path.exists(filename + '.sha1'), True)
+    testing.assert_equal(io_utilities.get_sha1(filename), io_utilities.get_sha1(filename, use_cache=False))
+
+    # a changed pickle file invalidates the memory-mapped files
+    write_random_library(filename)
+    testing.assert_equal(ARZ.get_memory_mapped_library(filename), None)
+    assert_library_equal(ARZ.read_library(filename), ARZ.read_library(filename, memory_map=False))
+
+print('ARZ library test passed without any issues!')
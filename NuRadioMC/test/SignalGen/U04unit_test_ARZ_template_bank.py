@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+from NuRadioMC.SignalGen.ARZ import ARZ, template_bank
+from NuRadioReco.utilities import units
+import numpy as np
+from numpy import testing
+import tempfile
+import pickle
+import os
+import multiprocessing
+
+"""
+tests the bank of precomputed ARZ vector potentials: the electric fields that are interpolated from the template
+bank need to agree with the exact calculation, and views that are not covered by the bank (other index of
+refraction, viewing angles outside of the tabulated range) are calculated exactly. Forked processes (as the worker
+processes of a parallel simulation run) read the templates with their own file handle.
+
+A shower library with a Gaisser-Hillas like charge-excess profile is generated, so that the test does not depend
+on the download of the shower library. The template bank is kept small so that the test runs quickly.
+"""
+
+n_index = 1.78
+N = 512
+dt = 0.05 * units.ns
+
+
+def write_library(filename):
+    depth = np.arange(0, 3000, 10.) * units.g / units.cm ** 2
+    X = depth / (units.g / units.cm ** 2)
+    profile = (X / 700.) ** 70 * np.exp((700. - X) / 10.) * 1e8
+    library = {}
+    for shower_type in ['HAD', 'EM']:
+        library[shower_type] = {}
+        for energy in [1e17 * units.eV, 1e18 * units.eV]:
+            library[shower_type][energy] = {'depth': depth, 'charge_excess': [profile * energy / units.EeV]}
+    with open(filename, 'wb') as fout:
+        pickle.dump(library, fout, protocol=2)
+
+
+def get_time_trace_in_process(theta):
+    trace = arz.get_time_trace(1e18 * units.eV, theta, N, dt, 'HAD', n_index, 0.7 * units.km, iN=0,
+                               template_bank=bank_fork)
+    return trace, bank_fork._file_pid == os.getpid()
+
+
+with tempfile.TemporaryDirectory() as path:
+    library_filename = os.path.join(path, 'library_test.pkl')
+    write_library(library_filename)
+    arz = ARZ.ARZ(library=library_filename, create_new=True)
+    bank_filename = os.path.join(path, 'template_bank_test.hdf5')
+    template_bank.create_template_bank(bank_filename, arz, [('HAD', 1e18 * units.eV, 0)], n_index=n_index,
+                                       distances=np.array([0.5, 1]) * units.km, N=N, dt=dt,
+                                       delta_thetas=np.arange(-5, 5.1, 1) * units.deg, max_refinements=3)
+    bank = template_bank.ARZTemplateBank(bank_filename)
+    testing.assert_equal(bank.is_compatible(arz), True)
+    testing.assert_equal(bank.get_profiles(), [('HAD', 1e18 * units.eV, 0)])
+
+    # the electric field agrees with the exact calculation in between the tabulated angles and distances
+    delta_thetas = np.array([-3.3, -0.4, 0, 0.1, 2.7]) * units.deg
+    errors = template_bank.validate_template_bank(bank, arz, N, dt, [0.7 * units.km], delta_thetas=delta_thetas)
+    print(f"maximum deviation from the exact calculation {100 * errors[('HAD', 1e18 * units.eV, 0)]:.2f}%")
+    testing.assert_array_less(errors[('HAD', 1e18 * units.eV, 0)], 0.03)
+    testing.assert_equal(bank.get_statistics()['interpolated'], len(delta_thetas))
+
+    # the energy of the shower is scaled from the energy of the library
+    thetas = np.arccos(1. / n_index) + delta_thetas
+    traces = arz.get_time_trace(2e18 * units.eV, thetas, N, dt, 'HAD', n_index, 0.7 * units.km, iN=0,
+                                template_bank=bank)
+    traces_exact = arz.get_time_trace(2e18 * units.eV, thetas, N, dt, 'HAD', n_index, 0.7 * units.km, iN=0)
+    for trace, trace_exact in zip(traces, traces_exact):
+        trace, trace_exact = [template_bank._get_band_limited_trace(x.T, dt, 1 * units.GHz)
+                              for x in [trace, trace_exact]]
+        testing.assert_allclose(trace, trace_exact, atol=0.03 * np.max(np.abs(trace_exact)))
+
+    # views that are not covered by the template bank are calculated exactly
+    statistics = bank.get_statistics()
+    thetas = np.arccos(1. / 1.7) + np.array([0, 10 * units.deg])
+    traces = arz.get_time_trace(1e18 * units.eV, thetas, N, dt, 'HAD', 1.7, 1 * units.km, iN=0, template_bank=bank)
+    traces_exact = arz.get_time_trace(1e18 * units.eV, thetas, N, dt, 'HAD', 1.7, 1 * units.km, iN=0)
+    testing.assert_equal(traces, traces_exact)
+    testing.assert_equal(bank.get_statistics()['calculated'] - statistics['calculated'], 2)
+    traces = arz.get_time_trace(1e18 * units.eV, np.arccos(1. / n_index) + 10 * units.deg, N, dt, 'EM', n_index,
+                                1 * units.km, iN=0, template_bank=bank)
+    testing.assert_equal(bank.get_statistics()['calculated'] - statistics['calculated'], 3)
+
+    # the file is opened by the main process before the worker processes are forked and read their templates
+    bank_fork = template_bank.ARZTemplateBank(bank_filename)
+    bank_fork._ARZTemplateBank__get_file()
+    thetas = np.arccos(1. / n_index) + np.array([-2.1, 0.3]) * units.deg
+    with multiprocessing.get_context('fork').Pool(2) as pool:
+        results = pool.map(get_time_trace_in_process, thetas)
+    for theta, (trace, own_file) in zip(thetas, results):
+        testing.assert_equal(own_file, True)
+        testing.assert_equal(trace, arz.get_time_trace(1e18 * units.eV, theta, N, dt, 'HAD', n_index, 0.7 * units.km,
+                                                       iN=0, template_bank=bank))
+
+print('ARZ template bank test passed without any issues!')
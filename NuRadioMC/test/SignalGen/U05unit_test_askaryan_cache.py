@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+from NuRadioMC.SignalGen import askaryan
+from NuRadioReco.utilities import units
+import numpy as np
+from numpy import testing
+
+"""
+tests the cache of Askaryan spectra: views in the same bin of energy, viewing angle and index of refraction share
+the spectrum (rescaled with energy / distance), the random shower realizations are the same as without the cache,
+and the least recently used spectra are removed from the cache.
+"""
+
+N = 512
+dt = 0.2 * units.ns
+n_index = 1.78
+energy = 1e18 * units.eV
+cherenkov_angle = np.arccos(1. / n_index)
+
+cache = askaryan.AskaryanSpectrumCache(viewing_angle_tolerance=0.01 * units.deg)
+# the first two views are in the same viewing angle bin
+thetas = cherenkov_angle + np.array([0.5, 0.501, 2, -3]) * units.deg
+distances = np.array([1, 2, 1.5, 3]) * units.km
+spectra = cache.get_frequency_spectrum(energy, thetas, N, dt, 'HAD', n_index, distances, 'Alvarez2000')
+spectra_exact = askaryan.get_frequency_spectrum(energy, thetas, N, dt, 'HAD', n_index, distances, 'Alvarez2000')
+testing.assert_allclose(spectra[[0, 2, 3]], spectra_exact[[0, 2, 3]], rtol=1e-12)
+testing.assert_allclose(spectra[1], spectra_exact[0] / 2, rtol=1e-12)
+testing.assert_allclose(np.abs(spectra[1]), np.abs(spectra_exact[1]), atol=5e-3 * np.max(np.abs(spectra_exact[1])))
+testing.assert_equal([cache.hits, cache.misses], [1, 3])
+
+# a single view at another distance is obtained from the cache
+spectrum = cache.get_frequency_spectrum(energy, thetas[2], N, dt, 'HAD', n_index, 0.5 * units.km, 'Alvarez2000')
+testing.assert_allclose(spectrum, spectra_exact[2] * 3, rtol=1e-12)
+testing.assert_equal([cache.hits, cache.misses], [2, 3])
+
+# a different shower type or index of refraction is not obtained from the cache
+cache.get_frequency_spectrum(energy, thetas, N, dt, 'EM', n_index, distances, 'Alvarez2000')
+cache.get_frequency_spectrum(energy, thetas, N, dt, 'HAD', n_index + 0.01, distances, 'Alvarez2000')
+testing.assert_equal([cache.hits, cache.misses], [4, 9])
+
+# for random shower realizations, the spectra are only reused if the realization is specified
+thetas = cherenkov_angle + np.array([-1, 1]) * units.deg
+spectra, additional_output = cache.get_frequency_spectrum(
+    energy, thetas, N, dt, 'EM', n_index, 1 * units.km, 'Alvarez2009', full_output=True,
+    random_generator=np.random.default_rng(1))
+spectra_exact, additional_output_exact = askaryan.get_frequency_spectrum(
+    energy, thetas, N, dt, 'EM', n_index, 1 * units.km, 'Alvarez2009', full_output=True,
+    random_generator=np.random.default_rng(1))
+testing.assert_equal(additional_output['k_L'], additional_output_exact['k_L'])
+testing.assert_allclose(spectra, spectra_exact, rtol=1e-12)
+cache.get_frequency_spectrum(energy, thetas, N, dt, 'EM', n_index, 1 * units.km, 'Alvarez2009',
+                             random_generator=np.random.default_rng(2))
+testing.assert_equal([cache.hits, cache.misses], [4, 13])
+spectra, additional_output = cache.get_frequency_spectrum(energy, thetas, N, dt, 'EM', n_index, 1 * units.km,
+                                                          'Alvarez2009', full_output=True,
+                                                          k_L=additional_output_exact['k_L'])
+testing.assert_allclose(spectra, spectra_exact, rtol=1e-12)
+testing.assert_equal(additional_output['k_L'], additional_output_exact['k_L'])
+testing.assert_equal([cache.hits, cache.misses], [6, 13])
+
+# the least recently used spectra are removed from the cache
+spectrum_size = (N // 2 + 1) * 16
+cache = askaryan.AskaryanSpectrumCache(max_size=2.5 * spectrum_size)
+for theta in [0, 1, 0, 2, 0, 1]:
+    cache.get_frequency_spectrum(energy, cherenkov_angle + theta * units.deg, N, dt, 'HAD', n_index, 1 * units.km,
+                                 'Alvarez2000')
+statistics = cache.get_statistics()
+testing.assert_equal([statistics['hits'], statistics['misses'], statistics['evictions']], [2, 4, 2])
+testing.assert_equal([statistics['n_spectra'], statistics['size']], [2, 2 * spectrum_size])
+
+print('Askaryan cache test passed without any issues!')
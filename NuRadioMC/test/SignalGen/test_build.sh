@@ -2,3 +2,7 @@
 
 set -e
 NuRadioMC/test/SignalGen/U01unit_test.py NuRadioMC/test/SignalGen/reference_v1.pkl
+NuRadioMC/test/SignalGen/U02unit_test_batch.py
+NuRadioMC/test/SignalGen/U03unit_test_ARZ_library.py
+NuRadioMC/test/SignalGen/U04unit_test_ARZ_template_bank.py
+NuRadioMC/test/SignalGen/U05unit_test_askaryan_cache.py
@@ -0,0 +1,57 @@
+import numpy as np
+from NuRadioMC.SignalProp import analyticraytracing as ray
+from NuRadioMC.utilities import medium
+from NuRadioReco.utilities import units
+import logging
+from numpy import testing
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('test_raytracing')
+
+"""
+compares the results of the batch ray tracing (one vectorized call for many start/stop point pairs)
+against the standard single ray tracing call
+"""
+
+ice = medium.southpole_simple()
+
+np.random.seed(10)  # set seed to have reproducible results
+n_events = int(300)
+rmin = 50. * units.m
+rmax = 3. * units.km
+zmin = 0. * units.m
+zmax = -3. * units.km
+rr = np.random.triangular(rmin, rmax, rmax, n_events)
+phiphi = np.random.uniform(0, 2 * np.pi, n_events)
+xx = rr * np.cos(phiphi)
+yy = rr * np.sin(phiphi)
+zz = np.random.uniform(zmin, zmax, n_events)
+
+points = np.array([xx, yy, zz]).T
+x_receiver = np.array([0., 0., -5.])
+receivers = np.tile(x_receiver, (n_events, 1))
+
+r = ray.ray_tracing(ice, use_cpp=False)
+batch = r.find_solutions_batch(points, receivers)
+
+n_mismatch = 0
+for iX, x in enumerate(points):
+    r.set_start_and_end_point(x, x_receiver)
+    r.find_solutions()
+    n = r.get_number_of_solutions()
+    n_batch = np.sum(~np.isnan(batch['ray_tracing_C0'][iX]))
+    if n != n_batch:
+        # close-by roots near the turning point can be resolved by only one of the two root finders
+        n_mismatch += 1
+        continue
+    for iS in range(n):
+        testing.assert_allclose(batch['ray_tracing_C0'][iX, iS], r.get_results()[iS]['C0'], rtol=1e-5)
+        testing.assert_equal(batch['ray_tracing_solution_type'][iX, iS], r.get_solution_type(iS))
+        testing.assert_allclose(batch['launch_vectors'][iX, iS], r.get_launch_vector(iS), atol=1e-5)
+        testing.assert_allclose(batch['receive_vectors'][iX, iS], r.get_receive_vector(iS), atol=1e-5)
+        testing.assert_allclose(batch['travel_times'][iX, iS], r.get_travel_time(iS), rtol=1e-5)
+        testing.assert_allclose(batch['travel_distances'][iX, iS], r.get_path_length(iS), rtol=1e-5)
+
+if n_mismatch > 0.01 * n_events:
+    raise AssertionError(f"number of solutions differs for {n_mismatch} of {n_events} vertex positions")
+
+print('T07batch_vs_single passed without issues')
@@ -0,0 +1,70 @@
+import numpy as np
+import tempfile
+import shutil
+from NuRadioMC.SignalProp import analyticraytracing as ray
+from NuRadioMC.SignalProp.raytracing_lookup_table import RayTracingLookupTable
+from NuRadioMC.utilities import medium
+from NuRadioReco.utilities import units
+import logging
+from numpy import testing
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('test_raytracing')
+
+"""
+compares the ray tracing solutions (and the focusing factors) interpolated from a lookup table with the exact
+solutions
+"""
+
+ice = medium.southpole_2015()
+z_antenna = -100 * units.m
+frequencies = np.linspace(100 * units.MHz, 1 * units.GHz, 4)
+
+path = tempfile.mkdtemp()
+r_table = ray.ray_tracing(ice, use_cpp=False)
+table = RayTracingLookupTable(r_table._r2d, path=path, distances=np.arange(0, 301 * units.m, 10 * units.m),
+                              depths=np.arange(-300 * units.m, 1 * units.m, 10 * units.m), frequencies=frequencies)
+table.add_antenna_depth(z_antenna)
+r_table.set_lookup_table(table)
+
+# a second instance needs to read the table from disk
+table2 = RayTracingLookupTable(r_table._r2d, path=path, distances=np.arange(0, 301 * units.m, 10 * units.m),
+                               depths=np.arange(-300 * units.m, 1 * units.m, 10 * units.m), frequencies=frequencies)
+testing.assert_equal(table2.get_filename(z_antenna), table.get_filename(z_antenna))
+table2.add_antenna_depth(z_antenna)
+testing.assert_equal(table2.get_antenna_depths(), [z_antenna])
+
+r = ray.ray_tracing(ice, use_cpp=False)
+
+np.random.seed(10)  # set seed to have reproducible results
+n_events = 200
+rr = np.random.uniform(10 * units.m, 280 * units.m, n_events)
+phiphi = np.random.uniform(0, 2 * np.pi, n_events)
+zz = np.random.uniform(-290 * units.m, -1 * units.m, n_events)
+points = np.array([rr * np.cos(phiphi), rr * np.sin(phiphi), zz]).T
+x_receiver = np.array([0., 0., z_antenna])
+
+n_lookup = 0
+for x in points:
+    for x1, x2 in [(x, x_receiver), (x_receiver, x)]:
+        r_table.set_start_and_end_point(x1, x2)
+        r_table.find_solutions()
+        r.set_start_and_end_point(x1, x2)
+        r.find_solutions()
+        testing.assert_equal(r_table.get_number_of_solutions(), r.get_number_of_solutions())
+        if any(['lookup_table' in result for result in r_table.get_results()]):
+            n_lookup += 1
+        for iS in range(r.get_number_of_solutions()):
+            testing.assert_equal(r_table.get_solution_type(iS), r.get_solution_type(iS))
+            testing.assert_allclose(r_table.get_travel_time(iS), r.get_travel_time(iS), atol=0.1 * units.ns)
+            testing.assert_allclose(r_table.get_path_length(iS), r.get_path_length(iS), atol=0.1 * units.m)
+            testing.assert_allclose(r_table.get_launch_vector(iS), r.get_launch_vector(iS), atol=0.05 * units.deg)
+            testing.assert_allclose(r_table.get_receive_vector(iS), r.get_receive_vector(iS), atol=0.05 * units.deg)
+            testing.assert_allclose(r_table.get_attenuation(iS, frequencies),
+                                    r.get_attenuation(iS, frequencies), atol=0.01)
+            testing.assert_allclose(r_table.get_focusing(iS, limit=100), r.get_focusing(iS, limit=100), rtol=0.01)
+
+shutil.rmtree(path)
+if n_lookup < n_events // 4:
+    raise AssertionError(f"lookup table was only used for {n_lookup} of {2 * n_events} ray tracings")
+
+print('T08lookup_table passed without issues')
@@ -0,0 +1,48 @@
+import numpy as np
+from scipy import integrate
+from NuRadioMC.SignalProp import analyticraytracing as ray
+from NuRadioMC.utilities import medium
+from NuRadioMC.utilities import attenuation as attenuation_util
+from NuRadioReco.utilities import units
+import logging
+from numpy import testing
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('test_raytracing')
+
+"""
+compares the vectorized calculation of the attenuation along the ray path (Gauss-Legendre quadrature on a
+frequency x depth grid) with a precise numerical integration
+"""
+
+ice = medium.southpole_2015()
+r2d = ray.ray_tracing_2D(ice, "SP1", use_cpp=False, n_frequencies_integration=10, overwrite_speedup=False)
+frequencies = np.linspace(50 * units.MHz, 1 * units.GHz, 10)
+
+np.random.seed(10)  # set seed to have reproducible results
+n_events = 20
+n_tested = 0
+for i in range(n_events):
+    x1 = np.array([0, np.random.uniform(-2 * units.km, -10 * units.m)])
+    x2 = np.array([np.random.uniform(50 * units.m, 2 * units.km), np.random.uniform(-200 * units.m, -1 * units.m)])
+    if x2[1] < x1[1]:
+        x1[1], x2[1] = x2[1], x1[1]
+    for solution in r2d.find_solutions(x1, x2):
+        C_0 = solution['C0']
+        attenuation = r2d.get_attenuation_along_path(x1, x2, C_0, frequencies, None)
+
+        x2_mirrored = r2d.get_z_mirrored(x1, x2, C_0)
+        z_turn = r2d.get_turning_point(ice.n_ice ** 2 - C_0 ** -2)[1]
+        points = None
+        if x1[1] < z_turn < x2_mirrored[1]:
+            points = [z_turn]
+
+        def dt(t, frequency):
+            z = r2d.get_z_unmirrored(t, C_0)
+            return r2d.ds(t, C_0) / attenuation_util.get_attenuation_length(z, frequency, "SP1")
+
+        reference = np.exp(-1 * np.array([integrate.quad(dt, x1[1], x2_mirrored[1], args=(f,), epsrel=1e-8,
+                                                         limit=200, points=points)[0] for f in frequencies]))
+        testing.assert_allclose(attenuation, reference, rtol=1e-4, atol=1e-6)
+        n_tested += 1
+
+print(f'T09attenuation_vectorized passed without issues ({n_tested} ray paths tested)')
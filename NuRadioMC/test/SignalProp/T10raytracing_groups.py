@@ -0,0 +1,53 @@
+import numpy as np
+from NuRadioMC.SignalProp import analyticraytracing as ray
+from NuRadioMC.utilities import medium
+from NuRadioReco.utilities import units
+import logging
+from numpy import testing
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('test_raytracing')
+
+"""
+compares the ray tracing solutions that are derived from a close-by reference channel with the exact solutions
+"""
+
+ice = medium.southpole_2015()
+r = ray.ray_tracing(ice, use_cpp=False)
+r_reference = ray.ray_tracing(ice, use_cpp=False)
+max_miss_distance = 1 * units.mm
+frequencies = np.linspace(100 * units.MHz, 1 * units.GHz, 4)
+
+np.random.seed(10)  # set seed to have reproducible results
+n_events = 100
+x_reference = np.array([0., 0., -100.])
+n_derived = 0
+for i in range(n_events):
+    x1 = np.array([np.random.uniform(-2 * units.km, 2 * units.km), np.random.uniform(-2 * units.km, 2 * units.km),
+                   np.random.uniform(-2.5 * units.km, -1 * units.m)])
+    x2 = x_reference + np.random.uniform(-1 * units.m, 1 * units.m, 3)
+    r_reference.set_start_and_end_point(x1, x_reference)
+    r_reference.find_solutions()
+    r.set_start_and_end_point(x1, x2)
+    miss_distance = r.find_solutions_from_reference(r_reference.get_results(), x_reference, max_miss_distance)
+    if miss_distance is None:
+        continue
+    n_derived += 1
+    testing.assert_array_less(miss_distance, max_miss_distance)
+    r_reference.set_start_and_end_point(x1, x2)
+    r_reference.find_solutions()
+    testing.assert_equal(r.get_number_of_solutions(), r_reference.get_number_of_solutions())
+    for iS in range(r.get_number_of_solutions()):
+        testing.assert_equal(r.get_solution_type(iS), r_reference.get_solution_type(iS))
+        testing.assert_allclose(r.get_results()[iS]['C0'], r_reference.get_results()[iS]['C0'], rtol=1e-5)
+        testing.assert_allclose(r.get_launch_vector(iS), r_reference.get_launch_vector(iS), atol=1e-5)
+        testing.assert_allclose(r.get_receive_vector(iS), r_reference.get_receive_vector(iS), atol=1e-5)
+        testing.assert_allclose(r.get_path_length(iS), r_reference.get_path_length(iS), atol=1 * units.cm)
+        # the numerical integration is used because the analytic travel time is less precise for steep rays
+        testing.assert_allclose(r.get_travel_time(iS, analytic=False), r_reference.get_travel_time(iS, analytic=False),
+                                atol=0.01 * units.ns)
+        testing.assert_allclose(r.get_attenuation(iS, frequencies), r_reference.get_attenuation(iS, frequencies), rtol=1e-4)
+
+if n_derived < n_events // 2:
+    raise AssertionError(f"ray tracing solutions were only derived for {n_derived} of {n_events} vertex positions")
+
+print('T10raytracing_groups passed without issues')
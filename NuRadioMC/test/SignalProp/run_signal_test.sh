@@ -5,6 +5,10 @@ python3 T02test_analytic_D_T.py
 python3 T04MooresBay.py
 python3 T05unit_test_C0_SP.py
 python3 T06unit_test_C0_mooresbay.py
+python3 T07batch_vs_single.py
+python3 T08lookup_table.py
+python3 T09attenuation_vectorized.py
+python3 T10raytracing_groups.py
 cd ../../SignalProp/examples
 python3 example_3d.py
 python3 A01IceCubePulserToARA.py
\ No newline at end of file
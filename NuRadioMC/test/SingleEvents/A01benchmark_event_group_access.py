@@ -0,0 +1,66 @@
+import numpy as np
+import time
+from NuRadioMC.simulation import input_reader
+from NuRadioReco.utilities import units
+
+"""
+benchmark of the overhead of the event group loop of the simulation for an input with 1e6 showers (with several
+showers per event group as for tau/PROPOSAL inputs): finding the showers of an event group, reading their energies
+and vertex positions and converting shower ids back to shower indices.
+
+The previous implementation (a scan over all event group ids for every event group, a copy of the full columns
+and a python dictionary of the shower ids) is quadratic in the number of showers. It is therefore only timed for
+the first event groups and extrapolated to the full input.
+"""
+
+np.random.seed(0)
+n_showers = int(1e6)
+n_timed_old = 1000  # number of event groups for which the previous implementation is timed
+
+showers_per_group = np.random.poisson(2, n_showers) + 1
+n_groups = np.searchsorted(np.cumsum(showers_per_group), n_showers) + 1
+event_group_ids = np.repeat(np.arange(n_groups), showers_per_group[:n_groups])[:n_showers]
+fin = {'event_group_ids': event_group_ids,
+       'shower_ids': np.arange(n_showers),
+       'shower_energies': 10 ** np.random.uniform(16, 19, n_showers) * units.eV,
+       'xx': np.random.uniform(-3, 3, n_showers) * units.km,
+       'yy': np.random.uniform(-3, 3, n_showers) * units.km,
+       'zz': np.random.uniform(-2.7, 0, n_showers) * units.km}
+unique_event_group_ids = np.unique(event_group_ids)
+print(f"input with {n_showers:.0f} showers in {len(unique_event_group_ids)} event groups")
+
+# previous implementation
+t_start = time.time()
+shower_index_array = {}
+for shower_index, shower_id in enumerate(fin['shower_ids']):
+    shower_index_array[shower_id] = shower_index
+t_setup_old = time.time() - t_start
+t_start = time.time()
+for event_group_id in unique_event_group_ids[:n_timed_old]:
+    event_indices = np.atleast_1d(np.squeeze(np.argwhere(fin['event_group_ids'] == event_group_id)))
+    shower_energies = np.array(fin['shower_energies'])[event_indices]
+    vertex_positions = np.array([np.array(fin['xx'])[event_indices],
+                                 np.array(fin['yy'])[event_indices],
+                                 np.array(fin['zz'])[event_indices]]).T
+    shower_indices = np.array([shower_index_array[x] for x in fin['shower_ids'][event_indices]])
+t_per_group_old = (time.time() - t_start) / n_timed_old
+
+# precomputed index
+t_start = time.time()
+accessor = input_reader.ShowerAccessor(fin)
+t_setup_new = time.time() - t_start
+t_start = time.time()
+for event_group_id in accessor.event_group_ids:
+    event_indices = accessor.get_shower_indices(event_group_id)
+    shower_energies = accessor.get_column('shower_energies', event_indices)
+    vertex_positions = accessor.get_vertices(event_indices)
+    shower_indices = accessor.get_shower_index(fin['shower_ids'][event_indices])
+t_per_group_new = (time.time() - t_start) / len(unique_event_group_ids)
+
+t_total_old = t_setup_old + t_per_group_old * len(unique_event_group_ids)
+t_total_new = t_setup_new + t_per_group_new * len(unique_event_group_ids)
+print(f"previous implementation: setup {t_setup_old:.2f}s, {t_per_group_old * 1e6:.1f}us per event group "
+      f"-> {t_total_old:.0f}s for all event groups (extrapolated from {n_timed_old} event groups)")
+print(f"precomputed index:       setup {t_setup_new:.2f}s, {t_per_group_new * 1e6:.1f}us per event group "
+      f"-> {t_total_new:.1f}s for all event groups")
+print(f"speedup of the event group loop overhead: {t_total_old / t_total_new:.0f}x")
@@ -72,6 +72,8 @@ parser.add_argument('outputfilename', type=str,
                     help='hdf5 output filename')
 parser.add_argument('outputfilenameNuRadioReco', type=str, nargs='?', default=None,
                     help='outputfilename of NuRadioReco detector sim file')
+parser.add_argument('--n_workers', type=int, default=1,
+                    help='number of processes used to simulate the event groups')
 args = parser.parse_args()
 
 sim = mySimulation(inputfilename=args.inputfilename,
@@ -81,6 +83,7 @@ sim = mySimulation(inputfilename=args.inputfilename,
                             config_file=args.config,
                             write_mode='mini',
                             default_detector_station=101,
-                            file_overwrite=True)
+                            file_overwrite=True,
+                            n_workers=args.n_workers)
 sim.run()
 
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+import os
+import h5py
+import numpy as np
+from numpy import testing
+import NuRadioReco.modules.trigger.simpleThreshold
+import NuRadioReco.modules.channelBandPassFilter
+from NuRadioReco.utilities import units
+from NuRadioMC.simulation import simulation
+import logging
+logging.basicConfig(level=logging.WARNING)
+
+"""
+interrupts a simulation (as it would happen for a preempted job) and resumes it from the last checkpoint.
+The output needs to be identical to the output of an uninterrupted simulation.
+"""
+
+path = os.path.dirname(os.path.abspath(__file__))
+inputfilename = os.path.join(path, "1e18_output_reference.hdf5")
+detectorfile = os.path.join(path, "surface_station_1GHz.json")
+config_file = os.path.join(path, "config_checkpoint.yaml")
+
+triggerSimulatorSimple = NuRadioReco.modules.trigger.simpleThreshold.triggerSimulator()
+channelBandPassFilter = NuRadioReco.modules.channelBandPassFilter.channelBandPassFilter()
+
+
+class mySimulation(simulation.simulation):
+
+    def _detector_simulation_filter_amp(self, evt, station, det):
+        channelBandPassFilter.run(evt, station, det, passband=[80 * units.MHz, 500 * units.MHz],
+                                  filter_type='butter', order=2)
+
+    def _detector_simulation_trigger(self, evt, station, det):
+        triggerSimulatorSimple.run(evt, station, det,
+                                   threshold=3 * self._Vrms,
+                                   triggered_channels=None,
+                                   number_concidences=1,
+                                   trigger_name='simple_threshold')
+
+
+class Preemption(Exception):
+    pass
+
+
+class myInterruptedSimulation(mySimulation):
+
+    n_calls = 0
+
+    def _detector_simulation_trigger(self, evt, station, det):
+        myInterruptedSimulation.n_calls += 1
+        if myInterruptedSimulation.n_calls > 8:
+            raise Preemption()
+        super()._detector_simulation_trigger(evt, station, det)
+
+
+def run(simulation_class, name, resume=False):
+    sim = simulation_class(inputfilename=inputfilename,
+                           outputfilename=os.path.join(path, f"{name}.hdf5"),
+                           detectorfile=detectorfile,
+                           outputfilenameNuRadioReco=os.path.join(path, f"{name}.nur"),
+                           config_file=config_file,
+                           default_detector_station=101,
+                           file_overwrite=True,
+                           resume=resume)
+    sim.run()
+
+
+run(mySimulation, "1e18_output_uninterrupted")
+try:
+    run(myInterruptedSimulation, "1e18_output_resumed")
+    raise AssertionError("the simulation was not interrupted")
+except Preemption:
+    pass
+checkpoint_filename = os.path.join(path, "1e18_output_resumed.hdf5.checkpoint")
+assert os.path.exists(checkpoint_filename), "no checkpoint was written"
+run(mySimulation, "1e18_output_resumed", resume=True)
+assert not os.path.exists(checkpoint_filename), "the checkpoint was not removed after the simulation finished"
+
+with h5py.File(os.path.join(path, "1e18_output_uninterrupted.hdf5"), 'r') as fin1, \
+        h5py.File(os.path.join(path, "1e18_output_resumed.hdf5"), 'r') as fin2:
+    def compare(name, obj):
+        if isinstance(obj, h5py.Dataset):
+            testing.assert_equal(fin2[name][()], obj[()], err_msg=name)
+    fin1.visititems(compare)
+    testing.assert_equal(sorted(fin1.keys()), sorted(fin2.keys()))
+    testing.assert_equal(fin2.attrs['trigger_names'], fin1.attrs['trigger_names'])
+    assert np.sum(fin1['triggered']) > 0
+
+with open(os.path.join(path, "1e18_output_uninterrupted.nur"), 'rb') as fin1, \
+        open(os.path.join(path, "1e18_output_resumed.nur"), 'rb') as fin2:
+    assert fin1.read() == fin2.read(), "the .nur files of the resumed and the uninterrupted simulation differ"
+
+for name in ["1e18_output_uninterrupted", "1e18_output_resumed"]:
+    for ending in ["hdf5", "nur"]:
+        os.remove(os.path.join(path, f"{name}.{ending}"))
+
+print("T06checkpoint_resume passed without issues")
@@ -4,8 +4,23 @@ set -e
 python3 NuRadioMC/test/SingleEvents/T02RunSimulation.py NuRadioMC/test/SingleEvents/1e18_output_reference.hdf5 NuRadioMC/test/SingleEvents/surface_station_1GHz.json NuRadioMC/test/SingleEvents/config.yaml NuRadioMC/test/SingleEvents/1e18_output.hdf5 NuRadioMC/test/SingleEvents/1e18_output.nur
 python3 NuRadioMC/test/SingleEvents/T04validate_allmost_equal.py NuRadioMC/test/SingleEvents/1e18_output.hdf5 NuRadioMC/test/SingleEvents/1e18_output_reference.hdf5
 python3 NuRadioMC/test/SingleEvents/T05validate_nur_file.py NuRadioMC/test/SingleEvents/1e18_output.nur NuRadioMC/test/SingleEvents/1e18_output_reference.nur
+# the parallel simulation needs to give the same results as the serial one
+python3 NuRadioMC/test/SingleEvents/T02RunSimulation.py NuRadioMC/test/SingleEvents/1e18_output_reference.hdf5 NuRadioMC/test/SingleEvents/surface_station_1GHz.json NuRadioMC/test/SingleEvents/config.yaml NuRadioMC/test/SingleEvents/1e18_output_parallel.hdf5 NuRadioMC/test/SingleEvents/1e18_output_parallel.nur --n_workers 2
+python3 NuRadioMC/test/SingleEvents/T04validate_allmost_equal.py NuRadioMC/test/SingleEvents/1e18_output_parallel.hdf5 NuRadioMC/test/SingleEvents/1e18_output.hdf5
+python3 NuRadioMC/test/SingleEvents/T05validate_nur_file.py NuRadioMC/test/SingleEvents/1e18_output_parallel.nur NuRadioMC/test/SingleEvents/1e18_output.nur
+# reading the input file in blocks needs to give the same results
+python3 NuRadioMC/test/SingleEvents/T02RunSimulation.py NuRadioMC/test/SingleEvents/1e18_output_reference.hdf5 NuRadioMC/test/SingleEvents/surface_station_1GHz.json NuRadioMC/test/SingleEvents/config_input_chunks.yaml NuRadioMC/test/SingleEvents/1e18_output_input_chunks.hdf5 NuRadioMC/test/SingleEvents/1e18_output_input_chunks.nur
+python3 NuRadioMC/test/SingleEvents/T04validate_allmost_equal.py NuRadioMC/test/SingleEvents/1e18_output_input_chunks.hdf5 NuRadioMC/test/SingleEvents/1e18_output.hdf5
+python3 NuRadioMC/test/SingleEvents/T05validate_nur_file.py NuRadioMC/test/SingleEvents/1e18_output_input_chunks.nur NuRadioMC/test/SingleEvents/1e18_output.nur
 python3 NuRadioMC/test/SingleEvents/T02RunSimulation.py NuRadioMC/test/SingleEvents/1e18_output_reference.hdf5 NuRadioMC/test/SingleEvents/surface_station_1GHz.json NuRadioMC/test/SingleEvents/config_noise.yaml NuRadioMC/test/SingleEvents/1e18_output_noise.hdf5
 python3 NuRadioMC/test/SingleEvents/T04validate_allmost_equal.py NuRadioMC/test/SingleEvents/1e18_output_noise.hdf5 NuRadioMC/test/SingleEvents/1e18_output_noise_reference.hdf5
+# with random numbers per event group, the noise of a parallel simulation needs to be the same as for a serial one
+python3 NuRadioMC/test/SingleEvents/T02RunSimulation.py NuRadioMC/test/SingleEvents/1e18_output_reference.hdf5 NuRadioMC/test/SingleEvents/surface_station_1GHz.json NuRadioMC/test/SingleEvents/config_noise_seed_per_event_group.yaml NuRadioMC/test/SingleEvents/1e18_output_noise_serial.hdf5 NuRadioMC/test/SingleEvents/1e18_output_noise_serial.nur
+python3 NuRadioMC/test/SingleEvents/T02RunSimulation.py NuRadioMC/test/SingleEvents/1e18_output_reference.hdf5 NuRadioMC/test/SingleEvents/surface_station_1GHz.json NuRadioMC/test/SingleEvents/config_noise_seed_per_event_group.yaml NuRadioMC/test/SingleEvents/1e18_output_noise_parallel.hdf5 NuRadioMC/test/SingleEvents/1e18_output_noise_parallel.nur --n_workers 2
+python3 NuRadioMC/test/SingleEvents/T04validate_allmost_equal.py NuRadioMC/test/SingleEvents/1e18_output_noise_parallel.hdf5 NuRadioMC/test/SingleEvents/1e18_output_noise_serial.hdf5
+python3 NuRadioMC/test/SingleEvents/T05validate_nur_file.py NuRadioMC/test/SingleEvents/1e18_output_noise_parallel.nur NuRadioMC/test/SingleEvents/1e18_output_noise_serial.nur
+# an interrupted simulation that is resumed from a checkpoint needs to give the same results as an uninterrupted one
+python3 NuRadioMC/test/SingleEvents/T06checkpoint_resume.py
 
 # cleanup 
-rm -v NuRadioMC/test/SingleEvents/{1e18_output_noise.hdf5,1e18_output.hdf5,1e18_output.nur}
\ No newline at end of file
+rm -v NuRadioMC/test/SingleEvents/{1e18_output_noise.hdf5,1e18_output.hdf5,1e18_output.nur,1e18_output_parallel.hdf5,1e18_output_parallel.nur,1e18_output_noise_serial.hdf5,1e18_output_noise_serial.nur,1e18_output_noise_parallel.hdf5,1e18_output_noise_parallel.nur,1e18_output_input_chunks.hdf5,1e18_output_input_chunks.nur}
\ No newline at end of file
@@ -78,10 +78,11 @@ def get_attenuation_length(z, frequency, model):
 
     Parameters
     ----------
-    z: float
+    z: float or array
         depth in default units
-    frequency: float
-        frequency of signal in default units
+    frequency: float or array
+        frequency of signal in default units. If both z and frequency are arrays, their shapes
+        need to be broadcastable, e.g., (n_frequencies, 1) and (n_depths,) to evaluate a grid.
     model: string
         Ice model for attenuation length. Options:
         
@@ -114,10 +115,9 @@ def get_attenuation_length(z, frequency, model):
                 a = (b2 * w1 - b1 * w2) / (w1 - w2)
                 bb = (b2 - b1) / (w2 - w1)
         else:
-            a = np.ones_like(frequency) * (b2 * w1 - b1 * w2) / (w1 - w2)
-            bb = np.ones_like(frequency) * (b2 - b1) / (w2 - w1)
-            a[frequency < 1. * units.GHz] = (b1 * w0 - b0 * w1) / (w0 - w1)
-            bb[frequency < 1. * units.GHz] = (b1 - b0) / (w1 - w0)
+            # np.where broadcasts depth and frequency arrays, e.g., to evaluate a (frequency x depth) grid
+            a = np.where(frequency < 1. * units.GHz, (b1 * w0 - b0 * w1) / (w0 - w1), (b2 * w1 - b1 * w2) / (w1 - w2))
+            bb = np.where(frequency < 1. * units.GHz, (b1 - b0) / (w1 - w0), (b2 - b1) / (w2 - w1))
 
         att_length_f = 1. / np.exp(a + bb * w)
 
@@ -189,8 +189,7 @@ def get_attenuation_length(z, frequency, model):
         if z > 0:
             att_length_f = np.inf
     else:
-        att_length_f[att_length_f < min_length] = min_length
-        att_length_f[z > 0] = np.inf
+        att_length_f = np.where(z > 0, np.inf, np.maximum(att_length_f, min_length))
     return att_length_f
 
 
@@ -9,6 +9,8 @@ import logging
 import pickle
 import csv
 import cmath
+import collections
+import hashlib
 
 logger = logging.getLogger('NuRadioReco.antennapattern')
 
@@ -84,6 +86,29 @@ def interpolate_linear_vectorized(x, x0, x1, y0, y1, interpolation_method='compl
     return result
 
 
+def is_equal_vectorized(a, b, rel_precision=1e-5):
+    """
+    Same as `radiotools.helper.is_equal` but `a` and `b` can be arrays
+
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = 0.5 * np.abs(a - b) / np.abs(a + b) < rel_precision
+        opposite = (a + b) == 0
+        result[opposite] = (a[opposite] == 0) | (0.5 * np.abs(a[opposite] - b[opposite]) /
+                                                 (np.abs(a[opposite]) + np.abs(b[opposite])) < rel_precision)
+    return result
+
+
+def _get_interpolation_weight(x, x0, x1):
+    """
+    returns the weight of the upper data point x1 of a linear interpolation, as in `interpolate_linear`
+    the lower data point is used (weight 0) if both data points are identical
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(x0 == x1, 0., (x - x0) / (x1 - x0))
+
+
 def get_group_delay(vector_effective_length, df):
     """
     helper function to calculate the group delay from the vector effecitve length
@@ -537,18 +562,33 @@ def save_preprocessed_WIPLD_forARA(path):
                                                                                 np.angle(H_phi[mask][i]) / units.deg))
 
 
-def get_pickle_antenna_response(path):
+def get_antenna_model_hashes():
     """
-    opens and return the pickle file containing the preprocessed WIPL-D antenna simulation
+    returns the dictionary of the sha1 hash sums of the antenna models that are available on the data server
+    """
+    antenna_directory = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(antenna_directory, 'antenna_models_hash.json'), 'r') as fin:
+        return json.load(fin)
+
+
+def update_pickle_antenna_response(path):
+    """
+    makes sure that an up-to-date version of the pickle file containing the preprocessed antenna simulation
+    is present on the local file system
 
     If the pickle file is not present on the local file system, or if the file is outdated (verified via a sha1 hash sum),
-    the file will be downloaded from a central data server
+    the file will be downloaded from a central data server. The hash sum of the local file is cached
+    (see `NuRadioReco.utilities.io_utilities.get_sha1`), so the file is only hashed once.
 
     Parameters
     ----------
     path: string
         the path to the pickle file
 
+    Returns
+    -------
+    sha1: string
+        the sha1 hash sum of the pickle file
     """
 
     download_file = False
@@ -559,27 +599,14 @@ def get_pickle_antenna_response(path):
         download_file = True
 
     if os.path.exists(path):
-        BUF_SIZE = 65536 * 2 ** 4  # lets read stuff in 64kb chunks!
-        import hashlib
-        import json
-        sha1 = hashlib.sha1()
-        with open(path, 'rb') as f:
-            while True:
-                data = f.read(BUF_SIZE)
-                if not data:
-                    break
-                sha1.update(data)
-
-        antenna_directory = os.path.dirname(os.path.abspath(__file__))
-        with open(os.path.join(antenna_directory, 'antenna_models_hash.json'), 'r') as fin:
-            antenna_hashs = json.load(fin)
-            if os.path.basename(path) in antenna_hashs.keys():
-                if sha1.hexdigest() != antenna_hashs[os.path.basename(path)]:
-                    logger.warning("antenna model {} has changed on the server. downloading newest version...".format(
-                        os.path.basename(path)))
-                    download_file = True
-            else:
-                logger.warning("no hash sum of {} available, skipping up-to-date check".format(os.path.basename(path)))
+        antenna_hashs = get_antenna_model_hashes()
+        if os.path.basename(path) in antenna_hashs.keys():
+            if io_utilities.get_sha1(path) != antenna_hashs[os.path.basename(path)]:
+                logger.warning("antenna model {} has changed on the server. downloading newest version...".format(
+                    os.path.basename(path)))
+                download_file = True
+        else:
+            logger.warning("no hash sum of {} available, skipping up-to-date check".format(os.path.basename(path)))
 
     if download_file:
         # does not exist yet -> download file
@@ -601,12 +628,169 @@ def get_pickle_antenna_response(path):
             code.write(r.content)
         logger.warning("...download finished.")
 
+    return io_utilities.get_sha1(path)
+
+
+def get_pickle_antenna_response(path):
+    """
+    opens and return the pickle file containing the preprocessed WIPL-D antenna simulation
+
+    If the pickle file is not present on the local file system, or if the file is outdated (verified via a sha1 hash sum),
+    the file will be downloaded from a central data server
+
+    Parameters
+    ----------
+    path: string
+        the path to the pickle file
+
+    """
+    update_pickle_antenna_response(path)
+
     #         # does not exist yet -> precalculating WIPLD simulations from raw WIPLD output
     #         preprocess_WIPLD(path)
     res = io_utilities.read_pickle(path, encoding='bytes')
     return res
 
 
+def get_memory_map_filenames(path):
+    """
+    returns the names of the files of the memory-mappable version of an antenna model
+
+    The antenna model is stored as a json index file (orientation of the antenna simulation, the frequency,
+    theta and phi grid, the hash sum of the pickle file it was converted from) and one .npy file for
+    each component of the vector effective length.
+
+    Parameters
+    ----------
+    path: string
+        the path to the pickle file of the antenna model
+
+    Returns
+    -------
+    filenames: dict
+        the filenames of the index ('index') and of the 'VEL_theta' and 'VEL_phi' arrays
+    """
+    base = os.path.splitext(path)[0]
+    return {'index': base + '_index.json',
+            'VEL_theta': base + '_VEL_theta.npy',
+            'VEL_phi': base + '_VEL_phi.npy'}
+
+
+def get_antenna_response_grid(ff, thetas, phis):
+    """
+    returns the frequency, theta and phi grid of an antenna model and checks that the antenna response is
+    stored in the order expected by `AntennaPattern` (theta angle running fastest, then phi and then frequency)
+
+    Parameters
+    ----------
+    ff, thetas, phis: arrays of floats
+        the frequency, theta and phi angle of each entry of the antenna response
+
+    Returns
+    -------
+    frequencies, theta_angles, phi_angles: arrays of floats
+        the (sorted) grid points
+    """
+    frequencies = np.unique(ff)
+    theta_angles = np.unique(thetas)
+    phi_angles = np.unique(phis)
+    ff_grid, phi_grid, theta_grid = [x.flatten() for x in np.meshgrid(frequencies, phi_angles, theta_angles,
+                                                                      indexing='ij')]
+    if len(ff) != len(ff_grid):
+        logger.error("antenna response is not defined on a regular (frequency, theta, phi) grid")
+        raise Exception("antenna response is not defined on a regular grid")
+    for message, values, grid in [['phi angle has changed during theta loop', phis, phi_grid],
+                                  ['theta angle has changed during theta loop', thetas, theta_grid],
+                                  ['frequency has changed', ff, ff_grid]]:
+        mismatch = np.flatnonzero(np.asarray(values) != grid)
+        if len(mismatch):
+            logger.error("{0} {1}, {2}".format(message, grid[mismatch[0]], values[mismatch[0]]))
+            raise Exception(message)
+    return frequencies, theta_angles, phi_angles
+
+
+def convert_pickle_antenna_response_to_memory_map(path):
+    """
+    converts the pickle file of an antenna model into the memory-mappable format (see `get_memory_map_filenames`)
+
+    The files are written next to the pickle file. Each file is first written to a temporary file and then
+    renamed, so that several processes can convert the same antenna model at the same time.
+
+    Parameters
+    ----------
+    path: string
+        the path to the pickle file of the antenna model
+    """
+    sha1 = update_pickle_antenna_response(path)
+    orientation_theta, orientation_phi, rotation_theta, rotation_phi, ff, thetas, phis, H_phi, H_theta = \
+        io_utilities.read_pickle(path, encoding='bytes')
+    frequencies, theta_angles, phi_angles = get_antenna_response_grid(ff, thetas, phis)
+    filenames = get_memory_map_filenames(path)
+    tmp_suffix = ".{}.tmp".format(os.getpid())
+    for key, VEL in [['VEL_theta', H_theta], ['VEL_phi', H_phi]]:
+        with open(filenames[key] + tmp_suffix, 'wb') as fout:
+            np.save(fout, np.ascontiguousarray(VEL, dtype=complex))
+        os.replace(filenames[key] + tmp_suffix, filenames[key])
+    index = {'source': os.path.basename(path),
+             'source_sha1': sha1,
+             'orientation': [float(orientation_theta), float(orientation_phi),
+                             float(rotation_theta), float(rotation_phi)],
+             'frequencies': frequencies.tolist(),
+             'theta_angles': theta_angles.tolist(),
+             'phi_angles': phi_angles.tolist()}
+    # the index is written last, it marks the conversion as complete
+    with open(filenames['index'] + tmp_suffix, 'w') as fout:
+        json.dump(index, fout)
+    os.replace(filenames['index'] + tmp_suffix, filenames['index'])
+    logger.info("converted antenna model {} into memory-mappable format".format(path))
+
+
+def get_memory_mapped_antenna_response(path):
+    """
+    opens the memory-mappable version of an antenna model (see `get_memory_map_filenames`)
+
+    The vector effective length is not read into memory but mapped, so that the operating system loads only
+    the parts of the antenna model that are accessed and all processes that use the same antenna model
+    share the memory (via the page cache).
+
+    The files are only used if they are up to date, i.e., if they were converted from the version of the pickle
+    file that is available on the data server (or, for antenna models without a hash sum on the server,
+    from the local pickle file).
+
+    Parameters
+    ----------
+    path: string
+        the path to the pickle file of the antenna model
+
+    Returns
+    -------
+    None if no up-to-date memory-mappable version exists, otherwise the tuple
+    (orientation_theta, orientation_phi, rotation_theta, rotation_phi, frequencies, theta_angles, phi_angles,
+    VEL_phi, VEL_theta)
+    """
+    filenames = get_memory_map_filenames(path)
+    if not all([os.path.exists(filename) for filename in filenames.values()]):
+        return None
+    try:
+        with open(filenames['index'], 'r') as fin:
+            index = json.load(fin)
+    except (OSError, ValueError):
+        logger.warning("index file {} of the memory-mapped antenna model can not be read".format(filenames['index']))
+        return None
+    antenna_hashs = get_antenna_model_hashes()
+    if os.path.basename(path) in antenna_hashs:
+        if index['source_sha1'] != antenna_hashs[os.path.basename(path)]:
+            logger.warning("memory-mapped antenna model {} is outdated".format(filenames['index']))
+            return None
+    elif os.path.exists(path) and index['source_sha1'] != io_utilities.get_sha1(path):
+        logger.warning("memory-mapped antenna model {} does not match the pickle file".format(filenames['index']))
+        return None
+    VEL_theta = np.load(filenames['VEL_theta'], mmap_mode='r')
+    VEL_phi = np.load(filenames['VEL_phi'], mmap_mode='r')
+    return (*index['orientation'], np.array(index['frequencies']), np.array(index['theta_angles']),
+            np.array(index['phi_angles']), VEL_phi, VEL_theta)
+
+
 def parse_AERA_XML_file(path):
     import xml.etree.ElementTree as ET
 
@@ -966,6 +1150,25 @@ def preprocess_XFDTD(path):
                 fout, protocol=4)
 
 
+def _get_onsky_matrices(zenith, azimuth):
+    """
+    returns the matrices that transform from the ground to the on-sky (eR, eTheta, ePhi) coordinate system
+    for arrays of directions, i.e., the same matrices as `radiotools.coordinatesystems.cstrafo`
+
+    Returns
+    -------
+    matrices: array of floats of shape (n, 3, 3)
+    """
+    ct = np.cos(zenith)
+    st = np.sin(zenith)
+    cp = np.cos(azimuth)
+    sp = np.sin(azimuth)
+    e1 = np.stack([st * cp, st * sp, ct], axis=-1)
+    e2 = np.stack([ct * cp, ct * sp, -st], axis=-1)
+    e3 = np.stack([-sp, cp, np.zeros_like(sp)], axis=-1)
+    return np.stack([e1, e2, e3], axis=1)
+
+
 class AntennaPatternBase:
     """
     base class of utility class that handles access and buffering to antenna pattern
@@ -1086,6 +1289,120 @@ class AntennaPatternBase:
                'phi': V_onsky[2]}
         return VEL
 
+    def _get_antenna_rotations(self, orientation_theta, orientation_phi, rotation_theta, rotation_phi):
+        """
+        same as `_get_antenna_rotation` but for arrays of antenna orientations
+
+        Returns
+        -------
+        rotations: array of floats of shape (n, 3, 3)
+            the rotation matrix for each antenna orientation
+        """
+        e1 = hp.spherical_to_cartesian(self._orientation_theta, self._orientation_phi)  # boresight direction
+        e2 = hp.spherical_to_cartesian(self._rotation_theta, self._rotation_phi)  # vector perpendicular to tine plane
+        e3 = np.cross(e1, e2)
+        E = np.array([e1, e2, e3])
+        if np.linalg.norm(e3) < 0.9:
+            logger.error("orientation of antenna not properly defined in WIPL-D orientation file")
+            raise AssertionError("orientation of antenna not properly defined in WIPL-D orientation file")
+
+        a1 = hp.spherical_to_cartesian(orientation_theta, orientation_phi)
+        a2 = hp.spherical_to_cartesian(rotation_theta, rotation_phi)
+        a3 = np.cross(a1, a2)
+        A = np.stack([a1, a2, a3], axis=1)
+        if np.any(np.linalg.norm(a3, axis=-1) < 0.9):
+            logger.error("orientation of antenna not properly defined detector description")
+            raise AssertionError("orientation of antenna not properly defined detector description")
+
+        return np.matmul(np.linalg.inv(E), A)
+
+    def _get_antenna_response_batch_raw(self, freq, theta, phi):
+        """
+        get the vector effective length in the WIPLD coordinate system for arrays of directions
+
+        This default implementation evaluates the directions one after the other. Antenna patterns that
+        can evaluate all directions at once overwrite this function.
+
+        Returns
+        -------
+        Vtheta_raw, Vphi_raw: arrays of complex of shape (n_directions, n_frequencies)
+        """
+        Vtheta_raw = np.zeros((len(theta), len(freq)), dtype=complex)
+        Vphi_raw = np.zeros((len(theta), len(freq)), dtype=complex)
+        for i in range(len(theta)):
+            Vtheta_raw[i], Vphi_raw[i] = self._get_antenna_response_vectorized_raw(freq, theta[i], phi[i])
+        return Vtheta_raw, Vphi_raw
+
+    def get_antenna_response_batch(self, freq, zenith, azimuth, orientation_theta, orientation_phi, rotation_theta,
+                                   rotation_phi):
+        """
+        get the antenna response for many signal directions and/or antenna orientations at once
+
+        Same as `get_antenna_response_vectorized` but the incoming directions and the antenna orientations
+        can be arrays (which are broadcast against each other). All directions are evaluated with a single
+        interpolation on the (frequency, theta, phi) grid of the antenna model, e.g. all channels of a
+        station that share the same antenna model or the directions of a reconstruction scan.
+
+        All angles are specified in the ARIANNA coordinate system. All units are in ARIANNA default units
+
+        Parameters
+        ----------
+        freq : float or array of floats
+            frequency
+        zenith : float or array of floats
+            zenith angle of incoming signal direction
+        azimuth : float or array of floats
+            azimuth angle of incoming signal direction
+        orientation_theta: float or array of floats
+            orientation of the antenna, as a zenith angle, see `get_antenna_response_vectorized`
+        orientation_phi: float or array of floats
+            orientation of the antenna, as an azimuth angle, see `get_antenna_response_vectorized`
+        rotation_theta: float or array of floats
+            rotation of the antenna, as a zenith angle, see `get_antenna_response_vectorized`
+        rotation_phi: float or array of floats
+            rotation of the antenna, as an azimuth angle, see `get_antenna_response_vectorized`
+
+        Returns
+        -------
+        VEL: array of complex of shape (n_directions, 2, n_frequencies)
+            theta (index 0) and phi (index 1) component of the vector effective length for each direction
+        """
+        if isinstance(freq, (float, int)):
+            freq = np.array([freq])
+        return self._get_antenna_response_batch(
+            len(freq), lambda theta, phi: self._get_antenna_response_batch_raw(freq, theta, phi),
+            zenith, azimuth, orientation_theta, orientation_phi, rotation_theta, rotation_phi)
+
+    def _get_antenna_response_batch(self, n_freqs, get_raw_response, zenith, azimuth, orientation_theta,
+                                    orientation_phi, rotation_theta, rotation_phi):
+        """
+        implementation of `get_antenna_response_batch` for a function `get_raw_response(theta, phi)` that returns
+        the vector effective length in the WIPLD coordinate system (see `_get_antenna_response_batch_raw`)
+        """
+        zenith, azimuth, orientation_theta, orientation_phi, rotation_theta, rotation_phi = np.broadcast_arrays(
+            *[np.atleast_1d(np.asarray(x, dtype=float)) for x in
+              [zenith, azimuth, orientation_theta, orientation_phi, rotation_theta, rotation_phi]])
+        if zenith.ndim != 1:
+            raise ValueError("the directions and antenna orientations need to be scalars or one dimensional arrays")
+        if self._notfound:
+            return np.ones((len(zenith), 2, n_freqs), dtype=complex)
+
+        # transform the incoming directions into the WIPLD coordinate system (see `_get_theta_and_phi`)
+        rot = self._get_antenna_rotations(orientation_theta, orientation_phi, rotation_theta, rotation_phi)
+        incoming_direction = hp.spherical_to_cartesian(zenith, azimuth)
+        incoming_direction_WIPLD = np.matmul(rot, incoming_direction[:, :, np.newaxis])[:, :, 0]
+        theta, phi = hp.cartesian_to_spherical(*incoming_direction_WIPLD.T)
+
+        Vtheta_raw, Vphi_raw = get_raw_response(theta, phi)
+
+        # rotate the raw theta and phi component of the VEL into the ARIANNA coordinate system,
+        # the matrices are the same as the ones of `radiotools.coordinatesystems.cstrafo`
+        V_raw = np.stack([np.zeros_like(Vtheta_raw), Vtheta_raw, Vphi_raw], axis=1)
+        V_xyz_raw = np.matmul(np.linalg.inv(_get_onsky_matrices(theta, phi)), V_raw)
+        V_xyz = np.matmul(np.linalg.inv(rot), V_xyz_raw)
+        V_onsky = np.matmul(_get_onsky_matrices(zenith, azimuth), V_xyz)
+        return V_onsky[:, 1:]
+
 
 class AntennaPattern(AntennaPatternBase):
     """
@@ -1093,7 +1410,7 @@ class AntennaPattern(AntennaPatternBase):
     """
 
     def __init__(self, antenna_model, path=path_to_antennamodels,
-                 interpolation_method='complex'):
+                 interpolation_method='complex', memory_map=True):
         """
 
         Parameters
@@ -1107,6 +1424,12 @@ class AntennaPattern(AntennaPatternBase):
 
             * 'complex' (default) interpolate real and imaginary part of vector effective length
             * 'magphase' interpolate magnitude and phase of vector effective length
+        memory_map: bool
+            if True (default), the antenna model is converted once into a memory-mappable format
+            (see `convert_pickle_antenna_response_to_memory_map`) and the vector effective length is memory-mapped
+            instead of being read into memory. All processes that use the same antenna model then share its memory.
+            If the conversion is not possible (e.g. because the antenna model folder is not writable),
+            the pickle file is read.
         """
 
         self._name = antenna_model
@@ -1116,25 +1439,39 @@ class AntennaPattern(AntennaPatternBase):
         filename = os.path.join(path, antenna_model, "{}.pkl".format(antenna_model))
         self._notfound = False
         try:
-            self._orientation_theta, self._orientation_phi, self._rotation_theta, self._rotation_phi, \
-                ff, thetas, phis, H_phi, H_theta = get_pickle_antenna_response(filename)
+            antenna_response = None
+            if memory_map:
+                antenna_response = get_memory_mapped_antenna_response(filename)
+                if antenna_response is None:
+                    update_pickle_antenna_response(filename)
+                    try:
+                        convert_pickle_antenna_response_to_memory_map(filename)
+                        antenna_response = get_memory_mapped_antenna_response(filename)
+                    except OSError as e:
+                        logger.warning("antenna model {} can not be converted into memory-mappable format ({}), "
+                                       "reading the pickle file instead".format(antenna_model, e))
+            if antenna_response is None:
+                self._orientation_theta, self._orientation_phi, self._rotation_theta, self._rotation_phi, \
+                    ff, thetas, phis, H_phi, H_theta = get_pickle_antenna_response(filename)
+                # additional consistency check
+                self.frequencies, self.theta_angles, self.phi_angles = get_antenna_response_grid(ff, thetas, phis)
+            else:
+                self._orientation_theta, self._orientation_phi, self._rotation_theta, self._rotation_phi, \
+                    self.frequencies, self.theta_angles, self.phi_angles, H_phi, H_theta = antenna_response
 
         except IOError:
             self._notfound = True
             logger.error("antenna response for {} not found".format(antenna_model))
             raise FileNotFoundError("antenna response for {} not found".format(antenna_model))
 
-        self.frequencies = np.unique(ff)
         self.frequency_lower_bound = self.frequencies[0]
         self.frequency_upper_bound = self.frequencies[-1]
 
-        self.theta_angles = np.unique(thetas)
         self.theta_lower_bound = self.theta_angles[0]
         self.theta_upper_bound = self.theta_angles[-1]
         logger.debug(
             "{} thetas from {} to {}".format(len(self.theta_angles), self.theta_lower_bound, self.theta_upper_bound))
 
-        self.phi_angles = np.unique(phis)
         self.phi_lower_bound = self.phi_angles[0]
         self.phi_upper_bound = self.phi_angles[-1]
         logger.debug("{} phis from {} to {}".format(len(self.phi_angles), self.phi_lower_bound, self.phi_upper_bound))
@@ -1146,27 +1483,6 @@ class AntennaPattern(AntennaPatternBase):
         self.VEL_phi = H_phi
         self.VEL_theta = H_theta
 
-        # additional consistency check
-        for iFreq, freq in enumerate(self.frequencies):
-            for iPhi, phi in enumerate(self.phi_angles):
-                for iTheta, theta in enumerate(self.theta_angles):
-                    index = self._get_index(iFreq, iTheta, iPhi)
-
-                    if phi != phis[index]:
-                        logger.error("phi angle has changed during theta loop {0}, {1}".format(
-                            phi / units.deg, phis[index] / units.deg))
-                        raise Exception("phi angle has changed during theta loop")
-
-                    if theta != thetas[index]:
-                        logger.error("theta angle has changed during theta loop {0}, {1}".format(
-                            theta / units.deg, thetas[index] / units.deg))
-                        raise Exception("theta angle has changed during theta loop")
-
-                    if freq != ff[index]:
-                        logger.error("frequency has changed {0}, {1}".format(
-                            freq, ff[index]))
-                        raise Exception("frequency has changed")
-
         logger.warning('loading antenna file {} took {:.0f} seconds'.format(antenna_model, time() - t))
 
     def _get_index(self, iFreq, iTheta, iPhi):
@@ -1327,6 +1643,173 @@ class AntennaPattern(AntennaPatternBase):
         interpolated_VELp[out_of_bound_freqs_high] = 0 + 0 * 1j
         return interpolated_VELt, interpolated_VELp
 
+    def _get_antenna_response_batch_raw(self, freq, theta, phi):
+        """
+        get vector effective length in WIPLD coordinate system for arrays of directions
+
+        Same as `_get_antenna_response_vectorized_raw` but all directions are interpolated at once, i.e.,
+        the eight corners of the (frequency, theta, phi) grid cells of all directions are read with a single
+        gather. Directions outside of the antenna model return zeros.
+        """
+        if self._interpolation_method != 'complex':
+            # the magnitude/phase interpolation unwraps the phases along the frequency axis, so we keep the
+            # evaluation per direction in this case
+            return super()._get_antenna_response_batch_raw(freq, theta, phi)
+
+        in_range, iTheta, iPhi, weight_theta, weight_phi = self._get_angular_interpolation(theta, phi)
+        iFrequency_lower, iFrequency_upper, weight_frequency, out_of_bound_freqs = \
+            self._get_frequency_interpolation(freq)
+
+        # the angular interpolation is only done for the grid frequencies that are needed,
+        # the (in general many more) requested frequencies are interpolated afterwards
+        iFrequency_grid, iFrequency_grid_inverse = np.unique(np.append(iFrequency_lower, iFrequency_upper),
+                                                             return_inverse=True)
+        iFrequency_lower_grid = iFrequency_grid_inverse[:len(freq)]
+        iFrequency_upper_grid = iFrequency_grid_inverse[len(freq):]
+
+        # single gather of the grid corners of all directions, the axes are
+        # (lower/upper theta, lower/upper phi, direction, grid frequency)
+        index = self._get_index(iFrequency_grid[np.newaxis, np.newaxis, np.newaxis, :],
+                                iTheta[:, np.newaxis, :, np.newaxis], iPhi[np.newaxis, :, :, np.newaxis])
+
+        result = []
+        for VEL_grid in [self.VEL_theta, self.VEL_phi]:
+            VEL = VEL_grid[index]
+            VEL = VEL[:, 0] + (VEL[:, 1] - VEL[:, 0]) * weight_phi[:, np.newaxis]
+            VEL = VEL[0] + (VEL[1] - VEL[0]) * weight_theta[:, np.newaxis]
+            VEL_lower = VEL[:, iFrequency_lower_grid]
+            VEL = VEL_lower + (VEL[:, iFrequency_upper_grid] - VEL_lower) * weight_frequency
+            # set all out of bound frequencies and directions to zero
+            VEL[:, out_of_bound_freqs] = 0
+            VEL[~in_range] = 0
+            result.append(VEL)
+        return result[0], result[1]
+
+    def _get_angular_interpolation(self, theta, phi):
+        """
+        returns the grid points and weights of the linear interpolation in theta and phi for arrays of directions
+
+        Returns
+        -------
+        in_range: array of bools
+            False for directions outside of the antenna model
+        iTheta, iPhi: arrays of ints of shape (2, n_directions)
+            the indices of the lower and upper grid points
+        weight_theta, weight_phi: arrays of floats
+            the interpolation weights of the upper grid points
+        """
+        theta = np.array(theta, dtype=float)
+        phi = np.array(phi, dtype=float)
+        while np.any(phi < self.phi_lower_bound):
+            phi = np.where(phi < self.phi_lower_bound, phi + 2 * np.pi, phi)
+        while np.any(phi > self.phi_upper_bound):
+            phi = np.where(phi > self.phi_upper_bound, phi - 2 * np.pi, phi)
+
+        theta[is_equal_vectorized(theta, self.theta_upper_bound, rel_precision=1e-5)] = self.theta_upper_bound
+        theta[is_equal_vectorized(theta, self.theta_lower_bound, rel_precision=1e-5)] = self.theta_lower_bound
+        in_range = ((phi >= self.phi_lower_bound) & (phi <= self.phi_upper_bound) &
+                    (theta >= self.theta_lower_bound) & (theta <= self.theta_upper_bound))
+        if not np.all(in_range):
+            logger.warning("theta or phi out of range for {} of {} directions, returning (0,0j)".format(
+                np.sum(~in_range), len(theta)))
+            # evaluate the grid for a valid direction, the response is set to zero by the caller
+            theta[~in_range] = self.theta_lower_bound
+            phi[~in_range] = self.phi_lower_bound
+
+        if self.theta_upper_bound == self.theta_lower_bound:
+            iTheta_lower = np.zeros(len(theta), dtype=int)
+            iTheta_upper = np.zeros(len(theta), dtype=int)
+        else:
+            iTheta_lower = np.array(np.floor(
+                (theta - self.theta_lower_bound) / (self.theta_upper_bound - self.theta_lower_bound) * (
+                    self.n_theta - 1)), dtype=int)
+            iTheta_upper = np.array(np.ceil(
+                (theta - self.theta_lower_bound) / (self.theta_upper_bound - self.theta_lower_bound) * (
+                    self.n_theta - 1)), dtype=int)
+        if self.phi_upper_bound == self.phi_lower_bound:
+            iPhi_lower = np.zeros(len(phi), dtype=int)
+            iPhi_upper = np.zeros(len(phi), dtype=int)
+        else:
+            iPhi_lower = np.array(np.floor(
+                (phi - self.phi_lower_bound) / (self.phi_upper_bound - self.phi_lower_bound) * (self.n_phi - 1)),
+                dtype=int)
+            iPhi_upper = np.array(np.ceil(
+                (phi - self.phi_lower_bound) / (self.phi_upper_bound - self.phi_lower_bound) * (self.n_phi - 1)),
+                dtype=int)
+
+        weight_theta = _get_interpolation_weight(theta, self.theta_angles[iTheta_lower], self.theta_angles[iTheta_upper])
+        weight_phi = _get_interpolation_weight(phi, self.phi_angles[iPhi_lower], self.phi_angles[iPhi_upper])
+        return in_range, np.array([iTheta_lower, iTheta_upper]), np.array([iPhi_lower, iPhi_upper]), \
+            weight_theta, weight_phi
+
+    def _get_frequency_interpolation(self, freq):
+        """
+        returns the grid points and weights of the linear interpolation in frequency
+
+        Returns
+        -------
+        iFrequency_lower, iFrequency_upper: arrays of ints
+            the indices of the lower and upper grid points
+        weight_frequency: array of floats
+            the interpolation weights of the upper grid points
+        out_of_bound_freqs: array of bools
+            True for frequencies outside of the antenna model
+        """
+        iFrequency_lower = np.array(np.floor(
+            (freq - self.frequency_lower_bound) / (self.frequency_upper_bound - self.frequency_lower_bound) * (
+                self.n_freqs - 1)), dtype=int)
+        iFrequency_upper = np.array(np.ceil(
+            (freq - self.frequency_lower_bound) / (self.frequency_upper_bound - self.frequency_lower_bound) * (
+                self.n_freqs - 1)), dtype=int)
+        out_of_bound_freqs = (freq < self.frequency_lower_bound) | (freq > self.frequency_upper_bound)
+        iFrequency_lower[out_of_bound_freqs] = 0
+        iFrequency_upper[out_of_bound_freqs] = self.n_freqs - 1
+        weight_frequency = _get_interpolation_weight(freq, self.frequencies[iFrequency_lower],
+                                                     self.frequencies[iFrequency_upper])
+        return iFrequency_lower, iFrequency_upper, weight_frequency, out_of_bound_freqs
+
+    def get_frequency_table(self, freq):
+        """
+        returns the vector effective length in the WIPLD coordinate system interpolated to the given frequencies
+        on the (phi, theta) grid of the antenna model, see `AntennaResponseCache`
+
+        Returns
+        -------
+        VEL_theta, VEL_phi: arrays of complex of shape (n_phi, n_theta, n_frequencies_in_range)
+            the vector effective length for all frequencies within the frequency range of the antenna model
+        in_range: array of bools
+            True for the frequencies within the frequency range of the antenna model
+        """
+        iFrequency_lower, iFrequency_upper, weight_frequency, out_of_bound_freqs = \
+            self._get_frequency_interpolation(freq)
+        in_range = ~out_of_bound_freqs
+        table = []
+        for VEL_grid in [self.VEL_theta, self.VEL_phi]:
+            VEL_grid = np.reshape(VEL_grid, (self.n_freqs, self.n_phi, self.n_theta))
+            VEL_lower = VEL_grid[iFrequency_lower[in_range]]
+            VEL = VEL_lower + (VEL_grid[iFrequency_upper[in_range]] - VEL_lower) * \
+                weight_frequency[in_range][:, np.newaxis, np.newaxis]
+            table.append(np.ascontiguousarray(np.moveaxis(VEL, 0, -1)))
+        return table[0], table[1], in_range
+
+    def _get_antenna_response_batch_raw_from_table(self, table, theta, phi):
+        """
+        same as `_get_antenna_response_batch_raw` for the frequencies of a table returned by `get_frequency_table`
+        """
+        VEL_theta_table, VEL_phi_table, in_range_freqs = table
+        in_range, iTheta, iPhi, weight_theta, weight_phi = self._get_angular_interpolation(theta, phi)
+        result = []
+        for VEL_table in [VEL_theta_table, VEL_phi_table]:
+            # gather of the grid corners, the axes are (lower/upper theta, lower/upper phi, direction, frequency)
+            VEL = VEL_table[iPhi[np.newaxis], iTheta[:, np.newaxis]]
+            VEL = VEL[:, 0] + (VEL[:, 1] - VEL[:, 0]) * weight_phi[:, np.newaxis]
+            VEL = VEL[0] + (VEL[1] - VEL[0]) * weight_theta[:, np.newaxis]
+            VEL[~in_range] = 0
+            VEL_full = np.zeros((len(theta), len(in_range_freqs)), dtype=VEL.dtype)
+            VEL_full[:, in_range_freqs] = VEL
+            result.append(VEL_full)
+        return result[0], result[1]
+
 
 class AntennaPatternAnalytic(AntennaPatternBase):
     """
@@ -1397,12 +1880,13 @@ class AntennaPatternAnalytic(AntennaPatternBase):
             H_eff_t = np.zeros_like(Gain)
             fmask = freq > 0
             H_eff_t[fmask] = Gain[fmask] * max_gain_cross * 1 / freq[fmask]
-            H_eff_t *= np.cos(theta) * np.sin(phi)
+            # theta and phi can also be arrays of shape (n, 1), then the response has the shape (n, n_freqs)
+            H_eff_t = H_eff_t * (np.cos(theta) * np.sin(phi))
             H_eff_t *= constants.c * units.m / units.s * Z_ant / Z_0 / np.pi
 
             H_eff_p = np.zeros_like(Gain)
             H_eff_p[fmask] = Gain[fmask] * max_gain_co * 1 / freq[fmask]
-            H_eff_p *= np.cos(phi)
+            H_eff_p = H_eff_p * np.cos(phi)
             H_eff_p *= constants.c * units.m / units.s * Z_ant / Z_0 / np.pi
 
             if group_delay is not None:
@@ -1417,6 +1901,135 @@ class AntennaPatternAnalytic(AntennaPatternBase):
 
             return H_eff_p, H_eff_t
 
+    def _get_antenna_response_batch_raw(self, freq, theta, phi):
+        """
+        get vector effective length in WIPLD coordinate system for arrays of directions
+        """
+        if self._model == 'analytic_LPDA':
+            return self._get_antenna_response_vectorized_raw(freq, np.asarray(theta)[:, np.newaxis],
+                                                             np.asarray(phi)[:, np.newaxis])
+        return super()._get_antenna_response_batch_raw(freq, theta, phi)
+
+
+class AntennaResponseCache(object):
+    """
+    least recently used (LRU) cache of antenna responses that are pretabulated at fixed frequencies
+
+    In a simulation, the antenna response is evaluated many times for the same frequencies (e.g. for the
+    electric fields that all have the same number of samples and sampling rate). For tabulated antenna models, the
+    cache pretabulates the vector effective length at exactly these frequencies on the (theta, phi) grid of the
+    antenna model (see `AntennaPattern.get_frequency_table`). The antenna response for a direction is then
+    obtained by a gather of the four neighboring grid points and a bilinear interpolation in theta and phi only.
+
+    The tables are stored per antenna model and frequency grid. As they are defined in the coordinate system
+    of the antenna model, they are independent of the orientation of the antenna and shared between all
+    channels with the same antenna model. If the total size of the tables exceeds `max_size`, the least recently
+    used tables are removed.
+
+    Building a table takes much longer than a single evaluation of the antenna response (about 1 s and 400 MB for
+    8192 frequencies). A table is therefore only built once a frequency grid has been requested `min_requests` times;
+    before, the antenna response is evaluated directly. The cache pays off if the same frequencies are requested
+    many times, e.g. for the electric fields of a simulation, which all have the same number of samples. It does not
+    pay off for the voltage traces of the `efieldToVoltageConverter`, whose length changes from event to event.
+
+    Analytic antenna models and antenna models that interpolate in magnitude and phase are not cached.
+    """
+
+    def __init__(self, max_size=512 * 2 ** 20, min_requests=2):
+        """
+        Parameters
+        ----------
+        max_size: int
+            maximum size of all tables in bytes
+        min_requests: int
+            a table is only built when its frequency grid is requested for the `min_requests`-th time
+        """
+        self._max_size = max_size
+        self._min_requests = min_requests
+        self._tables = collections.OrderedDict()
+        # number of requests of the frequency grids without table (only the most recent ones are kept)
+        self._requests = collections.OrderedDict()
+        self._max_n_requests = 1000
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+
+    def _get_table(self, antenna_pattern, freq):
+        """
+        returns the table of the frequencies, or None if the frequency grid was not requested often enough yet
+        """
+        key = (antenna_pattern._name, hashlib.sha1(np.ascontiguousarray(freq, dtype=float).tobytes()).hexdigest())
+        if key in self._tables:
+            self.hits += 1
+            self._tables.move_to_end(key)
+            return self._tables[key]
+        n_requests = self._requests.pop(key, 0) + 1
+        if n_requests < self._min_requests:
+            self.bypasses += 1
+            self._requests[key] = n_requests
+            if len(self._requests) > self._max_n_requests:
+                self._requests.popitem(last=False)
+            return None
+        self.misses += 1
+        table = antenna_pattern.get_frequency_table(freq)
+        size = table[0].nbytes + table[1].nbytes
+        if size > self._max_size:
+            logger.warning("antenna response table of {} ({:.0f} MB) exceeds the cache size".format(
+                antenna_pattern._name, size / 2 ** 20))
+            return table
+        while self._size + size > self._max_size:
+            _, evicted_table = self._tables.popitem(last=False)
+            self._size -= evicted_table[0].nbytes + evicted_table[1].nbytes
+            self.evictions += 1
+        self._tables[key] = table
+        self._size += size
+        return table
+
+    def get_antenna_response_batch(self, antenna_pattern, freq, zenith, azimuth, orientation_theta, orientation_phi,
+                                   rotation_theta, rotation_phi):
+        """
+        same as `AntennaPatternBase.get_antenna_response_batch` but uses (and fills) the cache
+
+        Parameters
+        ----------
+        antenna_pattern: AntennaPatternBase
+            the antenna pattern
+        freq, zenith, azimuth, orientation_theta, orientation_phi, rotation_theta, rotation_phi
+            see `AntennaPatternBase.get_antenna_response_batch`
+        """
+        if not isinstance(antenna_pattern, AntennaPattern) or antenna_pattern._interpolation_method != 'complex':
+            return antenna_pattern.get_antenna_response_batch(freq, zenith, azimuth, orientation_theta, orientation_phi,
+                                                              rotation_theta, rotation_phi)
+        if isinstance(freq, (float, int)):
+            freq = np.array([freq])
+        table = self._get_table(antenna_pattern, freq)
+        if table is None:
+            return antenna_pattern.get_antenna_response_batch(freq, zenith, azimuth, orientation_theta, orientation_phi,
+                                                              rotation_theta, rotation_phi)
+        return antenna_pattern._get_antenna_response_batch(
+            len(freq), lambda theta, phi: antenna_pattern._get_antenna_response_batch_raw_from_table(table, theta, phi),
+            zenith, azimuth, orientation_theta, orientation_phi, rotation_theta, rotation_phi)
+
+    def get_statistics(self):
+        """
+        returns the number of cache hits, misses (a table was built), bypasses (the frequency grid was not requested
+        often enough to build a table) and evictions, the hit rate and the current size (in bytes)
+        """
+        n_requests = self.hits + self.misses + self.bypasses
+        return {'hits': self.hits, 'misses': self.misses, 'bypasses': self.bypasses, 'evictions': self.evictions,
+                'hit_rate': self.hits / n_requests if n_requests else 0., 'size': self._size,
+                'n_tables': len(self._tables)}
+
+    def clear(self):
+        """
+        removes all tables from the cache (the statistics are kept)
+        """
+        self._tables.clear()
+        self._requests.clear()
+        self._size = 0
+
 
 class AntennaPatternProvider(object):
     __instance = None
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+from NuRadioReco.detector import antennapattern
+from NuRadioReco.utilities import units
+import numpy as np
+from numpy import testing
+import tempfile
+import pickle
+import os
+
+"""
+tests that the antenna response of many directions and antenna orientations that is calculated in a single call
+(`get_antenna_response_batch`) agrees with the response that is calculated for each direction separately.
+The same is tested for the antenna responses that are obtained from the cache of pretabulated antenna responses
+(`AntennaResponseCache`).
+
+Besides the analytic LPDA model, a tabulated antenna model with a random vector effective length is generated,
+so that the test does not depend on the download of an antenna model.
+"""
+
+rng = np.random.default_rng(42)
+ff = np.fft.rfftfreq(1024, 0.2 * units.ns)
+
+
+def write_random_antenna_model(path, name):
+    frequencies = np.linspace(50, 1000, 40) * units.MHz
+    thetas = np.arange(0, 181, 10) * units.deg
+    phis = np.arange(0, 361, 15) * units.deg
+    # the pattern is stored with the theta angle running fastest, then phi and then the frequency
+    ff_grid, phi_grid, theta_grid = [x.flatten() for x in np.meshgrid(frequencies, phis, thetas, indexing='ij')]
+    n = len(ff_grid)
+    H_phi = rng.normal(size=n) + 1j * rng.normal(size=n)
+    H_theta = rng.normal(size=n) + 1j * rng.normal(size=n)
+    os.makedirs(os.path.join(path, name))
+    with open(os.path.join(path, name, f"{name}.pkl"), 'wb') as fout:
+        pickle.dump([90 * units.deg, 0, 90 * units.deg, 90 * units.deg, ff_grid, theta_grid, phi_grid, H_phi, H_theta],
+                    fout, protocol=4)
+
+
+n_directions = 200
+zeniths = rng.uniform(0, 180, n_directions) * units.deg
+zeniths[:2] = [0, 180 * units.deg]
+azimuths = rng.uniform(-180, 540, n_directions) * units.deg
+# upward, downward and sideward facing antennas with random rotations around their axis
+orientations = np.zeros((n_directions, 4))
+for i in range(n_directions):
+    phi = rng.uniform(0, 360) * units.deg
+    orientations[i] = [[0, 0, 90 * units.deg, phi],
+                       [180 * units.deg, 0, 90 * units.deg, phi],
+                       [90 * units.deg, phi, 90 * units.deg, phi + 90 * units.deg]][i % 3]
+
+with tempfile.TemporaryDirectory() as path:
+    write_random_antenna_model(path, 'random_test_antenna')
+    antenna_patterns = [antennapattern.AntennaPatternAnalytic('analytic_LPDA'),
+                        antennapattern.AntennaPattern('random_test_antenna', path=path),
+                        antennapattern.AntennaPattern('random_test_antenna', path=path, interpolation_method='magphase')]
+
+for antenna_pattern in antenna_patterns:
+    print(f"testing {type(antenna_pattern).__name__} {getattr(antenna_pattern, '_interpolation_method', '')}")
+    VEL_batch = antenna_pattern.get_antenna_response_batch(ff, zeniths, azimuths, *orientations.T)
+    testing.assert_equal(VEL_batch.shape, (n_directions, 2, len(ff)))
+    for i in range(n_directions):
+        VEL = antenna_pattern.get_antenna_response_vectorized(ff, zeniths[i], azimuths[i], *orientations[i])
+        for j, component in enumerate(['theta', 'phi']):
+            testing.assert_allclose(VEL_batch[i, j], VEL[component], rtol=1e-10,
+                                    atol=1e-10 * np.max(np.abs(VEL[component])))
+    # a single antenna orientation for all directions
+    VEL_batch = antenna_pattern.get_antenna_response_batch(ff, zeniths, azimuths, *orientations[0])
+    VEL = antenna_pattern.get_antenna_response_vectorized(ff, zeniths[5], azimuths[5], *orientations[0])
+    testing.assert_allclose(VEL_batch[5, 0], VEL['theta'], rtol=1e-10, atol=1e-10 * np.max(np.abs(VEL['theta'])))
+
+    # the pretabulated antenna responses of the cache
+    cache = antennapattern.AntennaResponseCache()
+    for i in range(3):
+        VEL_batch = antenna_pattern.get_antenna_response_batch(ff, zeniths, azimuths, *orientations.T)
+        VEL_cache = cache.get_antenna_response_batch(antenna_pattern, ff, zeniths, azimuths, *orientations.T)
+        testing.assert_allclose(VEL_cache, VEL_batch, rtol=1e-10, atol=1e-10 * np.max(np.abs(VEL_batch)))
+
+    # the table is only built when the frequencies are requested for the second time
+    statistics = cache.get_statistics()
+    if antenna_pattern is antenna_patterns[1]:
+        testing.assert_equal([statistics['bypasses'], statistics['misses'], statistics['hits']], [1, 1, 1])
+    else:
+        testing.assert_equal(statistics['hits'] + statistics['misses'] + statistics['bypasses'], 0)
+
+# the least recently used tables are removed from the cache. The size of a table is proportional to the number
+# of samples, so the cache can hold the table of 1024 and 1280 samples but not additionally the one of 512 samples
+antenna_pattern = antenna_patterns[1]
+table_size = antenna_pattern.get_frequency_table(ff)[0].nbytes * 2
+cache = antennapattern.AntennaResponseCache(max_size=2.3 * table_size, min_requests=1)
+for n_samples in [1024, 1280, 1024, 512, 1024, 1280]:
+    VEL_cache = cache.get_antenna_response_batch(antenna_pattern, np.fft.rfftfreq(n_samples, 0.2 * units.ns),
+                                                 zeniths[:10], azimuths[:10], *orientations[:10].T)
+statistics = cache.get_statistics()
+testing.assert_equal([statistics['hits'], statistics['misses'], statistics['evictions']], [2, 4, 2])
+testing.assert_equal(statistics['n_tables'], 2)
+
+# frequency grids that change with every request (as the voltage traces of the efieldToVoltageConverter)
+# are not tabulated
+cache = antennapattern.AntennaResponseCache()
+for n_samples in range(1000, 1100, 2):
+    cache.get_antenna_response_batch(antenna_pattern, np.fft.rfftfreq(n_samples, 0.2 * units.ns),
+                                     zeniths[:10], azimuths[:10], *orientations[:10].T)
+statistics = cache.get_statistics()
+testing.assert_equal([statistics['bypasses'], statistics['misses'], statistics['n_tables']], [50, 0, 0])
+
+print('antenna response batch test passed without any issues!')
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+from NuRadioReco.detector import antennapattern
+from NuRadioReco.utilities import units, io_utilities
+import numpy as np
+from numpy import testing
+import tempfile
+import pickle
+import os
+
+"""
+tests the memory-mapped version of the antenna models: the antenna model that is read from the memory-mapped
+files needs to be identical to the one read from the pickle file, and the memory-mapped files are not used
+anymore once the pickle file changes.
+
+A tabulated antenna model with a random vector effective length is generated, so that the test does not depend
+on the download of an antenna model.
+"""
+
+rng = np.random.default_rng(42)
+
+
+def write_random_antenna_model(path, name):
+    frequencies = np.linspace(50, 1000, 40) * units.MHz
+    thetas = np.arange(0, 181, 10) * units.deg
+    phis = np.arange(0, 361, 15) * units.deg
+    # the pattern is stored with the theta angle running fastest, then phi and then the frequency
+    ff_grid, phi_grid, theta_grid = [x.flatten() for x in np.meshgrid(frequencies, phis, thetas, indexing='ij')]
+    n = len(ff_grid)
+    H_phi = rng.normal(size=n) + 1j * rng.normal(size=n)
+    H_theta = rng.normal(size=n) + 1j * rng.normal(size=n)
+    os.makedirs(os.path.join(path, name), exist_ok=True)
+    with open(os.path.join(path, name, f"{name}.pkl"), 'wb') as fout:
+        pickle.dump([90 * units.deg, 0, 90 * units.deg, 90 * units.deg, ff_grid, theta_grid, phi_grid, H_phi, H_theta],
+                    fout, protocol=4)
+
+
+ff = np.fft.rfftfreq(1024, 0.2 * units.ns)
+with tempfile.TemporaryDirectory() as path:
+    name = 'random_test_antenna'
+    filename = os.path.join(path, name, f"{name}.pkl")
+    write_random_antenna_model(path, name)
+    antenna_pickle = antennapattern.AntennaPattern(name, path=path, memory_map=False)
+    testing.assert_equal(antennapattern.get_memory_mapped_antenna_response(filename), None)
+
+    # the first initialization converts the antenna model, the second one only opens the memory-mapped files
+    for i in range(2):
+        antenna = antennapattern.AntennaPattern(name, path=path)
+        testing.assert_equal(isinstance(antenna.VEL_theta, np.memmap), True)
+        for key in ['frequencies', 'theta_angles', 'phi_angles', 'VEL_theta', 'VEL_phi',
+                    '_orientation_theta', '_orientation_phi', '_rotation_theta', '_rotation_phi']:
+            testing.assert_equal(getattr(antenna, key), getattr(antenna_pickle, key))
+        VEL = antenna.get_antenna_response_vectorized(ff, 60 * units.deg, 20 * units.deg, 0, 0, 90 * units.deg, 0)
+        VEL_pickle = antenna_pickle.get_antenna_response_vectorized(ff, 60 * units.deg, 20 * units.deg, 0, 0,
+                                                                    90 * units.deg, 0)
+        testing.assert_equal(VEL['theta'], VEL_pickle['theta'])
+        testing.assert_equal(VEL['phi'], VEL_pickle['phi'])
+
+    # the hash sum of the pickle file is cached in a sidecar file
+    testing.assert_equal(os.path.exists(filename + '.sha1'), True)
+    testing.assert_equal(io_utilities.get_sha1(filename), io_utilities.get_sha1(filename, use_cache=False))
+
+    # a changed pickle file invalidates the memory-mapped files and the cached hash sum
+    write_random_antenna_model(path, name)
+    testing.assert_equal(antennapattern.get_memory_mapped_antenna_response(filename), None)
+    antenna = antennapattern.AntennaPattern(name, path=path)
+    antenna_pickle = antennapattern.AntennaPattern(name, path=path, memory_map=False)
+    testing.assert_equal(antenna.VEL_theta, antenna_pickle.VEL_theta)
+
+print('antenna pattern memory map test passed without any issues!')
@@ -1,5 +1,6 @@
 import NuRadioReco.modules.channelGenericNoiseAdder
 from NuRadioReco.utilities import units
+from NuRadioReco.utilities.noise import thermalNoiseBank
 import numpy as np
 from scipy import constants
 import argparse
@@ -40,6 +41,11 @@ parser.add_argument('--adc_sampling_frequency', type=float, help='Sampling frequ
 parser.add_argument('--noise_rms_bits', type=float, help='Bits reserved for the noise RMS', default=2)
 parser.add_argument('--adc_n_bits', type=int, help='ADC number of bits', default=8)
 parser.add_argument('--threshold_factor', type=float, help='Threshold factor', default=8)
+parser.add_argument('--noise_bank_size', type=int, default=None,
+                    help='if set, the analog noise is drawn from a bank of this many precomputed noise traces '
+                         '(randomly shifted and sign flipped) instead of being generated for every try')
+parser.add_argument('--noise_bank_file', type=str, default=None,
+                    help='.npy file in which the noise bank is stored (and from which it is memory-mapped)')
 args = parser.parse_args()
 
 main_low_angle = -50. * units.deg
@@ -332,6 +338,11 @@ print("Noise for the Nyquist zone: {:.3e} V".format(noise_rms / units.V))
 
 n_beams = len(primary_angles)
 
+noise_bank = None
+if args.noise_bank_size is not None:
+    noise_bank = thermalNoiseBank(n_samples, input_sampling_frequency, amplitude, args.noise_bank_size,
+                                  min_freq=min_freq, max_freq=max_freq, filename=args.noise_bank_file)
+
 
 for threshold_factor in threshold_factors:
 
@@ -339,10 +350,15 @@ for threshold_factor in threshold_factors:
     prob_per_window = 0
     for Ntry in range(Ntries):
         noise_array = []
+        if noise_bank is not None:
+            analog_noises = noise_bank.get_noise(len(primary_channels))
 
         for iant in range(len(primary_channels)):
 
-            analog_noise = channelGenericNoiseAdder.bandlimited_noise(min_freq, max_freq, n_samples, input_sampling_frequency, amplitude, type='rayleigh')
+            if noise_bank is not None:
+                analog_noise = analog_noises[iant]
+            else:
+                analog_noise = channelGenericNoiseAdder.bandlimited_noise(min_freq, max_freq, n_samples, input_sampling_frequency, amplitude, type='rayleigh')
             digital_noise = get_digital_trace(analog_noise,
                                               input_sampling_frequency,
                                               adc_sampling_frequency,
@@ -212,6 +212,81 @@ class BaseStation():
                 elif ray_path_type == e_field.get_parameter(parameters.electricFieldParameters.ray_path_type):
                     yield e_field
 
+    def __get_channels(self, channel_ids):
+        if channel_ids is None:
+            return list(self.iter_channels())
+        return [self.get_channel(channel_id) for channel_id in channel_ids]
+
+    def get_channel_traces(self, channel_ids=None, copy=True):
+        """
+        returns the time traces of the channels as one array of shape (n_channels, n_samples)
+
+        The time traces of all channels are calculated with a single inverse FFT and the channels are afterwards
+        backed by the rows of this array, i.e., modules can process all channels of the station at once.
+        All channels need to have the same sampling rate and number of samples.
+
+        Parameters
+        ----------
+        channel_ids: list or None
+            the channels (channel ids for a `Station`, unique identifiers for a `SimStation`). If None, all
+            channels are used in the order in which they were added to the station
+        copy: bool (default True)
+            if False, a read-only view of the array is returned
+        """
+        return NuRadioReco.framework.base_trace.get_traces(self.__get_channels(channel_ids), copy=copy)
+
+    def get_channel_frequency_spectra(self, channel_ids=None, copy=True):
+        """
+        returns the frequency spectra of the channels as one array of shape (n_channels, n_frequencies)
+
+        The spectra of all channels are calculated with a single FFT and the channels are afterwards backed by the
+        rows of this array. All channels need to have the same sampling rate and number of samples.
+
+        Parameters
+        ----------
+        channel_ids: list or None
+            the channels (channel ids for a `Station`, unique identifiers for a `SimStation`). If None, all
+            channels are used in the order in which they were added to the station
+        copy: bool (default True)
+            if False, a read-only view of the array is returned
+        """
+        return NuRadioReco.framework.base_trace.get_frequency_spectra(self.__get_channels(channel_ids), copy=copy)
+
+    def set_channel_traces(self, traces, sampling_rate, channel_ids=None, copy=True):
+        """
+        sets the time traces of the channels, the rows of `traces` back the individual channels
+
+        Parameters
+        ----------
+        traces: 2D np.array of floats
+            the time traces, one row per channel
+        sampling_rate: float
+            the sampling rate of all channels
+        channel_ids: list or None
+            the channels, see `get_channel_traces`
+        copy: bool (default True)
+            if False, the channels take ownership of the array instead of a copy of it
+        """
+        NuRadioReco.framework.base_trace.set_traces(self.__get_channels(channel_ids), traces, sampling_rate, copy=copy)
+
+    def set_channel_frequency_spectra(self, spectra, sampling_rate, channel_ids=None, copy=True):
+        """
+        sets the frequency spectra of the channels, the rows of `spectra` back the individual channels
+
+        Parameters
+        ----------
+        spectra: 2D np.array of complex floats
+            the frequency spectra, one row per channel
+        sampling_rate: float
+            the sampling rate of all channels
+        channel_ids: list or None
+            the channels, see `get_channel_traces`
+        copy: bool (default True)
+            if False, the channels take ownership of the array instead of a copy of it
+        """
+        NuRadioReco.framework.base_trace.set_frequency_spectra(self.__get_channels(channel_ids), spectra,
+                                                                sampling_rate, copy=copy)
+
     def is_neutrino(self):
         if self._particle_type == '':
             msg = "Stations particle type has not been set. Please call the module `eventTypeIdentifier.run(event, station, mode='forced', forced_event_type='neutrino'/'cosmic_ray')`."
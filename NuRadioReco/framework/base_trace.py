@@ -4,26 +4,282 @@ import logging
 import fractions
 import decimal
 import numbers
+import collections
 from NuRadioReco.utilities import fft, bandpass_filter
 import scipy.signal
-import copy
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
 logger = logging.getLogger("BaseTrace")
 
+# number of conversions between the time and frequency domain and of copies of trace arrays of all traces
+_statistics = collections.Counter()
+
+
+def get_statistics():
+    """
+    returns the number of Fourier transforms ('fft': time to frequency domain, 'ifft': frequency to time domain)
+    and of copies of trace arrays ('copies') of all traces since the last call of `reset_statistics`. A transform
+    of several traces at once (see `update_time_domain`) counts as one transform.
+    """
+    return {key: _statistics[key] for key in ['fft', 'ifft', 'copies']}
+
+
+def reset_statistics():
+    """
+    resets the counters of Fourier transforms and copies (see `get_statistics`)
+    """
+    _statistics.clear()
+
+
+def _get_array(array, copy):
+    if array is None:
+        return np.copy(array)
+    if copy:
+        _statistics['copies'] += 1
+        return np.copy(array)
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def are_compatible(traces):
+    """
+    returns True if all traces have the same sampling rate and number of samples, i.e., they can be combined into
+    one array (see `get_traces` and `get_frequency_spectra`)
+    """
+    traces = list(traces)
+    if not len(traces):
+        return False
+    sampling_rate = traces[0].get_sampling_rate()
+    n_samples = traces[0].get_number_of_samples()
+    return all(trace.get_sampling_rate() == sampling_rate and trace.get_number_of_samples() == n_samples
+               for trace in traces)
+
+
+def _group_traces(traces):
+    groups = collections.defaultdict(list)
+    for trace in traces:
+        groups[(trace.get_sampling_rate(), trace.get_number_of_samples())].append(trace)
+    return groups
+
+
+def update_time_domain(traces):
+    """
+    calculates the time traces of all traces that were modified in the frequency domain. The traces with the
+    same sampling rate and number of samples are transformed with a single inverse FFT.
+
+    Parameters
+    ----------
+    traces: iterable of BaseTrace objects
+        e.g. the channels of a station
+    """
+    for (sampling_rate, n_samples), group in _group_traces(
+            trace for trace in traces if not trace._is_up_to_date('time')).items():
+        time_traces = fft.freq2time(np.array([trace._frequency_spectrum for trace in group]), sampling_rate)
+        _statistics['ifft'] += 1
+        for trace, time_trace in zip(group, time_traces):
+            trace._set_domain('time', time_trace)
+
+
+def update_frequency_domain(traces):
+    """
+    calculates the frequency spectra of all traces that were modified in the time domain. The traces with the
+    same sampling rate and number of samples are transformed with a single FFT.
+
+    Parameters
+    ----------
+    traces: iterable of BaseTrace objects
+        e.g. the channels of a station
+    """
+    for (sampling_rate, n_samples), group in _group_traces(
+            trace for trace in traces if not trace._is_up_to_date('frequency') and trace._time_trace is not None).items():
+        spectra = fft.time2freq(np.array([trace._time_trace for trace in group]), sampling_rate)
+        _statistics['fft'] += 1
+        for trace, spectrum in zip(group, spectra):
+            trace._set_domain('frequency', spectrum)
+
+
+def _get_block(arrays):
+    """
+    returns the array of which the arrays are the consecutive rows, or None if there is no such array
+    """
+    block = arrays[0].base
+    if block is None or block.ndim != arrays[0].ndim + 1 or len(block) != len(arrays):
+        return None
+    for array, row in zip(arrays, block):
+        if array.base is not block or array.shape != row.shape or \
+                array.__array_interface__['data'][0] != row.__array_interface__['data'][0]:
+            return None
+    return block
+
+
+def _get_arrays(traces, domain, copy):
+    arrays = [trace._time_trace if domain == 'time' else trace._frequency_spectrum for trace in traces]
+    block = _get_block(arrays)
+    if block is None:
+        # the traces are combined into one array, which then backs the traces so that subsequent
+        # requests do not need to combine the traces again
+        block = np.array(arrays)
+        _statistics['copies'] += 1
+        for trace, row in zip(traces, block):
+            trace._set_domain(domain, row)
+    return _get_array(block, copy)
+
+
+def get_traces(traces, copy=True):
+    """
+    returns the time traces of several traces as one array of shape (n_traces, n_samples) (or
+    (n_traces, 3, n_samples) for electric fields)
+
+    All traces need to have the same sampling rate and number of samples. The time traces are calculated with a single
+    inverse FFT (see `update_time_domain`) and are afterwards stored as the rows of one contiguous array, so that
+    the array can be returned without a copy the next time.
+
+    Parameters
+    ----------
+    traces: iterable of BaseTrace objects
+        e.g. the channels of a station
+    copy: bool (default True)
+        if False, a read-only view of the array is returned
+
+    Returns
+    -------
+    time_traces: 2D np.array of floats
+        the time traces
+    """
+    traces = list(traces)
+    if not are_compatible(traces):
+        raise ValueError('traces need to have the same sampling rate and number of samples')
+    update_time_domain(traces)
+    return _get_arrays(traces, 'time', copy)
+
+
+def get_frequency_spectra(traces, copy=True):
+    """
+    returns the frequency spectra of several traces as one array of shape (n_traces, n_frequencies) (or
+    (n_traces, 3, n_frequencies) for electric fields)
+
+    All traces need to have the same sampling rate and number of samples. The spectra are calculated with a single
+    FFT (see `update_frequency_domain`) and are afterwards stored as the rows of one contiguous array, so that
+    the array can be returned without a copy the next time.
+
+    Parameters
+    ----------
+    traces: iterable of BaseTrace objects
+        e.g. the channels of a station
+    copy: bool (default True)
+        if False, a read-only view of the array is returned
+
+    Returns
+    -------
+    spectra: 2D np.array of complex floats
+        the frequency spectra
+    """
+    traces = list(traces)
+    if not are_compatible(traces):
+        raise ValueError('traces need to have the same sampling rate and number of samples')
+    update_frequency_domain(traces)
+    return _get_arrays(traces, 'frequency', copy)
+
+
+def set_traces(traces, time_traces, sampling_rate, copy=True):
+    """
+    sets the time traces of several traces, the rows of `time_traces` back the individual traces
+
+    Parameters
+    ----------
+    traces: iterable of BaseTrace objects
+        e.g. the channels of a station
+    time_traces: 2D np.array of floats
+        the time traces, one row per trace
+    sampling_rate: float
+        the sampling rate of all traces
+    copy: bool (default True)
+        if False, the traces take ownership of the array instead of a copy of it
+    """
+    traces = list(traces)
+    if len(traces) != len(time_traces):
+        raise ValueError(f'{len(time_traces)} time traces given for {len(traces)} traces')
+    if copy:
+        _statistics['copies'] += 1
+        time_traces = np.copy(time_traces)
+    for trace, time_trace in zip(traces, time_traces):
+        trace.set_trace(time_trace, sampling_rate, copy=False)
+
+
+def set_frequency_spectra(traces, spectra, sampling_rate, copy=True):
+    """
+    sets the frequency spectra of several traces, the rows of `spectra` back the individual traces
+
+    Parameters
+    ----------
+    traces: iterable of BaseTrace objects
+        e.g. the channels of a station
+    spectra: 2D np.array of complex floats
+        the frequency spectra, one row per trace
+    sampling_rate: float
+        the sampling rate of all traces
+    copy: bool (default True)
+        if False, the traces take ownership of the array instead of a copy of it
+    """
+    traces = list(traces)
+    if len(traces) != len(spectra):
+        raise ValueError(f'{len(spectra)} spectra given for {len(traces)} traces')
+    if copy:
+        _statistics['copies'] += 1
+        spectra = np.copy(spectra)
+    for trace, spectrum in zip(traces, spectra):
+        trace.set_frequency_spectrum(spectrum, sampling_rate, copy=False)
+
 
 class BaseTrace:
+    """
+    base class of all traces (e.g. channels and electric fields)
+
+    The trace is stored in the domain in which it was set. The other domain is calculated when it is requested for
+    the first time and is then kept as well, until the trace is modified. Alternating requests of the time trace and
+    the frequency spectrum therefore only require a single Fourier transform.
+    """
 
     def __init__(self):
         self._sampling_rate = None
         self._time_trace = None
         self._frequency_spectrum = None
         self.__time_domain_up_to_date = True
+        self.__frequency_domain_up_to_date = False
         self._trace_start_time = 0
 
-    def get_trace(self):
+    def __update_time_domain(self):
+        if not self.__time_domain_up_to_date:
+            self._time_trace = fft.freq2time(self._frequency_spectrum, self._sampling_rate)
+            _statistics['ifft'] += 1
+            self.__time_domain_up_to_date = True
+
+    def __update_frequency_domain(self):
+        if not self.__frequency_domain_up_to_date:
+            self._frequency_spectrum = fft.time2freq(self._time_trace, self._sampling_rate)
+            _statistics['fft'] += 1
+            self.__frequency_domain_up_to_date = True
+
+    def _is_up_to_date(self, domain):
+        if domain == 'time':
+            return self.__time_domain_up_to_date
+        return self.__frequency_domain_up_to_date
+
+    def _set_domain(self, domain, array):
+        """
+        stores an array that is consistent with the representation in the other domain
+        """
+        if domain == 'time':
+            self._time_trace = array
+            self.__time_domain_up_to_date = True
+        else:
+            self._frequency_spectrum = array
+            self.__frequency_domain_up_to_date = True
+
+    def get_trace(self, copy=True):
         """
         returns the time trace.
 
@@ -31,16 +287,19 @@ class BaseTrace:
         an ifft is performed automatically to have the time domain representation
         up to date.
 
+        Parameters
+        ----------
+        copy: bool (default True)
+            if False, a read-only view of the stored time trace is returned instead of a copy. This avoids the
+            copy for code that only reads the trace. The view must not be used anymore after the trace was modified.
+
         Returns
         -------
         trace: np.array of floats
             the time trace
         """
-        if not self.__time_domain_up_to_date:
-            self._time_trace = fft.freq2time(self._frequency_spectrum, self._sampling_rate)
-            self.__time_domain_up_to_date = True
-            self._frequency_spectrum = None
-        return np.copy(self._time_trace)
+        self.__update_time_domain()
+        return _get_array(self._time_trace, copy)
 
     def get_filtered_trace(self, passband, filter_type='butter', order=10, rp=None):
         """
@@ -55,21 +314,35 @@ class BaseTrace:
         order: int
             Order of the Butterworth filter, if the filter types butter or butterabs are chosen
         """
-        spec = copy.copy(self.get_frequency_spectrum())
+        spec = self.get_frequency_spectrum()
         freq = self.get_frequencies()
         filter_response = bandpass_filter.get_filter_response(freq, passband, filter_type, order, rp)
         spec *= filter_response
         return fft.freq2time(spec, self.get_sampling_rate())
 
-    def get_frequency_spectrum(self):
-        if self.__time_domain_up_to_date:
-            self._frequency_spectrum = fft.time2freq(self._time_trace, self._sampling_rate)
-            self._time_trace = None
-            # logger.debug("frequency spectrum has shape {}".format(self._frequency_spectrum.shape))
-            self.__time_domain_up_to_date = False
-        return np.copy(self._frequency_spectrum)
+    def get_frequency_spectrum(self, copy=True):
+        """
+        returns the frequency spectrum.
+
+        If the time trace was modified before, an fft is performed automatically to have the frequency domain
+        representation up to date.
+
+        Parameters
+        ----------
+        copy: bool (default True)
+            if False, a read-only view of the stored frequency spectrum is returned instead of a copy. This avoids
+            the copy for code that only reads the spectrum. The view must not be used anymore after the trace was
+            modified.
+
+        Returns
+        -------
+        spectrum: np.array of complex floats
+            the frequency spectrum
+        """
+        self.__update_frequency_domain()
+        return _get_array(self._frequency_spectrum, copy)
 
-    def set_trace(self, trace, sampling_rate):
+    def set_trace(self, trace, sampling_rate, copy=True):
         """
         sets the time trace
 
@@ -79,19 +352,45 @@ class BaseTrace:
             the time series
         sampling_rate: float
             the sampling rage of the trace, i.e., the inverse of the bin width
+        copy: bool (default True)
+            if False, the trace object takes ownership of the array instead of storing a copy of it, i.e.,
+            the array must not be modified anymore by the caller
         """
         if trace is not None:
             if trace.shape[trace.ndim - 1] % 2 != 0:
                 raise ValueError(('Attempted to set trace with an uneven number ({}) of samples. '
                                  'Only traces with an even number of samples are allowed.').format(trace.shape[trace.ndim - 1]))
         self.__time_domain_up_to_date = True
-        self._time_trace = np.copy(trace)
+        self.__frequency_domain_up_to_date = False
+        if trace is None:
+            trace = np.copy(trace)
+        elif copy:
+            _statistics['copies'] += 1
+            trace = np.copy(trace)
+        self._time_trace = trace
         self._sampling_rate = sampling_rate
         self._frequency_spectrum = None
 
-    def set_frequency_spectrum(self, frequency_spectrum, sampling_rate):
+    def set_frequency_spectrum(self, frequency_spectrum, sampling_rate, copy=True):
+        """
+        sets the frequency spectrum
+
+        Parameters
+        ----------
+        frequency_spectrum: np.array of complex floats
+            the frequency spectrum
+        sampling_rate: float
+            the sampling rage of the trace, i.e., the inverse of the bin width
+        copy: bool (default True)
+            if False, the trace object takes ownership of the array instead of storing a copy of it, i.e.,
+            the array must not be modified anymore by the caller
+        """
         self.__time_domain_up_to_date = False
-        self._frequency_spectrum = np.copy(frequency_spectrum)
+        self.__frequency_domain_up_to_date = True
+        if copy:
+            _statistics['copies'] += 1
+            frequency_spectrum = np.copy(frequency_spectrum)
+        self._frequency_spectrum = frequency_spectrum
         self._sampling_rate = sampling_rate
         self._time_trace = None
 
@@ -134,7 +433,7 @@ class BaseTrace:
     def get_hilbert_envelope(self):
         from scipy import signal
         # get hilbert envelope for either 1D (N) analytic trace or (3,N) E-field
-        h = signal.hilbert(self.get_trace())
+        h = signal.hilbert(self.get_trace(copy=False))
         return np.abs(h)
 
     def get_hilbert_envelope_mag(self):
@@ -173,16 +472,15 @@ class BaseTrace:
         """
         if delta_t > .1 * self.get_number_of_samples() / self.get_sampling_rate() and not silent:
             logger.warning('Trace is shifted by more than 10% of its length')
-        spec = self.get_frequency_spectrum()
-        spec *= np.exp(-2.j * np.pi * delta_t * self.get_frequencies())
-        self.set_frequency_spectrum(spec, self._sampling_rate)
+        spec = self.get_frequency_spectrum(copy=False) * np.exp(-2.j * np.pi * delta_t * self.get_frequencies())
+        self.set_frequency_spectrum(spec, self._sampling_rate, copy=False)
 
     def resample(self, sampling_rate):
         if sampling_rate == self.get_sampling_rate():
             return
         resampling_factor = fractions.Fraction(decimal.Decimal(sampling_rate / self.get_sampling_rate())).limit_denominator(5000)
 
-        resampled_trace = self.get_trace()
+        resampled_trace = self.get_trace(copy=False)
         if resampling_factor.numerator != 1:
             # resample and use axis -1 since trace might be either shape (N) for analytic trace or shape (3,N) for E-field
             resampled_trace = scipy.signal.resample(resampled_trace, resampling_factor.numerator * self.get_number_of_samples(), axis=-1)
@@ -194,10 +492,10 @@ class BaseTrace:
         if resampled_trace.shape[-1] % 2 != 0:
             resampled_trace = resampled_trace.T[:-1].T
 
-        self.set_trace(resampled_trace, sampling_rate)
+        self.set_trace(resampled_trace, sampling_rate, copy=resampling_factor == 1)
 
     def serialize(self):
-        time_trace = self.get_trace()
+        time_trace = self.get_trace(copy=False)
         # if there is no trace, the above will return np.array(None).
         if not time_trace.shape:
             return None
@@ -208,7 +506,7 @@ class BaseTrace:
 
     def deserialize(self, data_pkl):
         data = pickle.loads(data_pkl)
-        self.set_trace(data['time_trace'], data['sampling_rate'])
+        self.set_trace(data['time_trace'], data['sampling_rate'], copy=False)
         if 'trace_start_time' in data.keys():
             self.set_trace_start_time(data['trace_start_time'])
 
@@ -223,10 +521,10 @@ class BaseTrace:
         if not isinstance(x, BaseTrace):
             raise TypeError('+ operator is only defined for 2 BaseTrace objects')
 
-        if self.get_trace() is None or x.get_trace() is None:
+        if self.get_trace(copy=False) is None or x.get_trace(copy=False) is None:
             raise ValueError('One of the trace objects has no trace set')
 
-        if self.get_trace().ndim != x.get_trace().ndim:
+        if self.get_trace(copy=False).ndim != x.get_trace(copy=False).ndim:
             raise ValueError('Traces have different dimensions')
 
         if self.get_sampling_rate() != x.get_sampling_rate():
@@ -234,21 +532,21 @@ class BaseTrace:
             # Create new baseTrace object for the resampling so we don't change the originals
             if self.get_sampling_rate() > x.get_sampling_rate():
                 upsampled_trace = BaseTrace()
-                upsampled_trace.set_trace(x.get_trace(), x.get_sampling_rate())
+                upsampled_trace.set_trace(x.get_trace(copy=False), x.get_sampling_rate())
                 upsampled_trace.resample(self.get_sampling_rate())
-                trace_1 = copy.copy(self.get_trace())
-                trace_2 = upsampled_trace.get_trace()
+                trace_1 = self.get_trace(copy=False)
+                trace_2 = upsampled_trace.get_trace(copy=False)
                 sampling_rate = self.get_sampling_rate()
             else:
                 upsampled_trace = BaseTrace()
-                upsampled_trace.set_trace(self.get_trace(), self.get_sampling_rate())
+                upsampled_trace.set_trace(self.get_trace(copy=False), self.get_sampling_rate())
                 upsampled_trace.resample(x.get_sampling_rate())
-                trace_1 = upsampled_trace.get_trace()
-                trace_2 = copy.copy(x.get_trace())
+                trace_1 = upsampled_trace.get_trace(copy=False)
+                trace_2 = x.get_trace(copy=False)
                 sampling_rate = x.get_sampling_rate()
         else:
-            trace_1 = copy.copy(self.get_trace())
-            trace_2 = copy.copy(x.get_trace())
+            trace_1 = self.get_trace(copy=False)
+            trace_2 = x.get_trace(copy=False)
             sampling_rate = self.get_sampling_rate()
 
         # Figure out which of the traces has the earlier trace start time
@@ -290,24 +588,25 @@ class BaseTrace:
         # Correct for different trace start times by using fourier shift theorem to
         # shift the later trace backwards.
         late_trace_object = BaseTrace()
-        late_trace_object.set_trace(late_trace, sampling_rate)
+        late_trace_object.set_trace(late_trace, sampling_rate, copy=False)
         late_trace_object.apply_time_shift(time_offset, True)
 
         # Create new BaseTrace object holding the summed traces
         new_trace = BaseTrace()
-        new_trace.set_trace(early_trace + late_trace_object.get_trace(), sampling_rate)
+        new_trace.set_trace(early_trace + late_trace_object.get_trace(copy=False), sampling_rate, copy=False)
         new_trace.set_trace_start_time(trace_start)
         return new_trace
 
     def __mul__(self, x):
         if isinstance(x, numbers.Number):
-            if self._time_trace is not None:
-                self._time_trace *= x
-                return self
-            if self._frequency_spectrum is not None:
-                self._frequency_spectrum *= x
-                return self
-            raise ValueError('Cant multiply baseTrace with number because no value is set for trace.')
+            if self._time_trace is None and self._frequency_spectrum is None:
+                raise ValueError('Cant multiply baseTrace with number because no value is set for trace.')
+            # the arrays are replaced instead of modified in place, because they might be shared with read-only views
+            if self.__time_domain_up_to_date and self._time_trace is not None:
+                self._time_trace = self._time_trace * x
+            if self.__frequency_domain_up_to_date:
+                self._frequency_spectrum = self._frequency_spectrum * x
+            return self
         else:
             raise TypeError('Multiplication of baseTrace object with object of type {} is not defined'.format(type(x)))
 
@@ -316,12 +615,12 @@ class BaseTrace:
 
     def __truediv__(self, x):
         if isinstance(x, numbers.Number):
-            if self._time_trace is not None:
+            if self._time_trace is None and self._frequency_spectrum is None:
+                raise ValueError('Cant divide baseTrace by number because no value is set for trace.')
+            if self.__time_domain_up_to_date and self._time_trace is not None:
                 self._time_trace = self._time_trace / x
-                return self
-            if self._frequency_spectrum is not None:
+            if self.__frequency_domain_up_to_date:
                 self._frequency_spectrum = self._frequency_spectrum / x
-                return self
-            raise ValueError('Cant divide baseTrace by number because no value is set for trace.')
+            return self
         else:
             raise TypeError('Division of baseTrace object with object of type {} is not defined'.format(type(x)))
@@ -0,0 +1,62 @@
+import NuRadioReco.framework.station
+import NuRadioReco.framework.channel
+import NuRadioReco.framework.event
+import NuRadioReco.modules.channelBandPassFilter
+import NuRadioReco.modules.channelResampler
+from NuRadioReco.utilities import units, fft
+import numpy as np
+from numpy import testing
+import time
+
+"""
+benchmark of the detector simulation chain of a 24-channel station (two band-pass filters, resampling and reading
+the time traces for the trigger) with the station-wide trace arrays, compared to processing the channels one by
+one as previously done by the modules.
+"""
+
+rng = np.random.default_rng(0)
+n_channels = 24
+n_samples = 2048
+sampling_rate = 5 * units.GHz
+spectra = fft.time2freq(rng.normal(size=(n_channels, n_samples)), sampling_rate)
+event = NuRadioReco.framework.event.Event(1, 1)
+channelBandPassFilter = NuRadioReco.modules.channelBandPassFilter.channelBandPassFilter()
+channelResampler = NuRadioReco.modules.channelResampler.channelResampler()
+
+
+def get_station():
+    # the efieldToVoltageConverter sets the channels in the frequency domain
+    station = NuRadioReco.framework.station.Station(11)
+    for channel_id, spectrum in enumerate(spectra):
+        channel = NuRadioReco.framework.channel.Channel(channel_id)
+        channel.set_frequency_spectrum(spectrum, sampling_rate)
+        station.add_channel(channel)
+    return station
+
+
+def run_previous():
+    station = get_station()
+    for channel in station.iter_channels():
+        channelBandPassFilter._apply_filter(channel, [80 * units.MHz, 1000 * units.GHz], 'butter', 2)
+    for channel in station.iter_channels():
+        channelBandPassFilter._apply_filter(channel, [0, 500 * units.MHz], 'butter', 10)
+    for channel in station.iter_channels():
+        channel.resample(2 * units.GHz)
+    return np.array([channel.get_trace(copy=False) for channel in station.iter_channels()])
+
+
+def run_batched():
+    station = get_station()
+    channelBandPassFilter.run(event, station, None, passband=[80 * units.MHz, 1000 * units.GHz], filter_type='butter', order=2)
+    channelBandPassFilter.run(event, station, None, passband=[0, 500 * units.MHz], filter_type='butter', order=10)
+    channelResampler.run(event, station, None, sampling_rate=2 * units.GHz)
+    return station.get_channel_traces(copy=False)
+
+
+testing.assert_allclose(run_batched(), run_previous(), rtol=1e-10, atol=1e-12)
+for function in [run_previous, run_batched]:
+    function()
+    t_start = time.time()
+    for i in range(20):
+        function()
+    print(f"{function.__name__}: {(time.time() - t_start) / 20 * 1e3:.2f}ms per event")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+import NuRadioReco.framework.base_trace
+from NuRadioReco.framework.base_trace import BaseTrace
+from NuRadioReco.utilities import units, fft
+import numpy as np
+from numpy import testing
+
+"""
+tests the representation of traces in the time and frequency domain: the other domain is only calculated once,
+read-only views do not copy the arrays and can not be modified, and modifying a trace invalidates the other domain.
+"""
+
+rng = np.random.default_rng(1)
+sampling_rate = 2 * units.GHz
+trace = rng.normal(size=512)
+spectrum = fft.time2freq(trace, sampling_rate)
+
+NuRadioReco.framework.base_trace.reset_statistics()
+base_trace = BaseTrace()
+base_trace.set_trace(trace, sampling_rate)
+for i in range(3):
+    testing.assert_allclose(base_trace.get_frequency_spectrum(copy=False), spectrum)
+    testing.assert_allclose(base_trace.get_trace(copy=False), trace)
+# the time trace is kept and the frequency spectrum is only calculated once
+testing.assert_equal(NuRadioReco.framework.base_trace.get_statistics(), {'fft': 1, 'ifft': 0, 'copies': 1})
+
+# views can not be modified, copies are independent of the stored trace
+view = base_trace.get_trace(copy=False)
+testing.assert_equal(view.flags.writeable, False)
+testing.assert_raises(ValueError, view.__setitem__, 0, 1.)
+testing.assert_raises(ValueError, base_trace.get_frequency_spectrum(copy=False).__imul__, 2)
+trace_copy = base_trace.get_trace()
+trace_copy[0] = 1.
+testing.assert_equal(base_trace.get_trace(copy=False)[0], trace[0])
+
+# setting the frequency spectrum invalidates the time trace
+base_trace.set_frequency_spectrum(2 * spectrum, sampling_rate, copy=False)
+testing.assert_allclose(base_trace.get_trace(copy=False), 2 * trace)
+testing.assert_equal(NuRadioReco.framework.base_trace.get_statistics(), {'fft': 1, 'ifft': 1, 'copies': 2})
+
+# multiplication and time shifts are applied to both domains
+base_trace = base_trace * 0.5
+testing.assert_allclose(base_trace.get_trace(), trace)
+testing.assert_allclose(base_trace.get_frequency_spectrum(), spectrum)
+base_trace.apply_time_shift(10 * units.ns)
+testing.assert_allclose(base_trace.get_trace(), np.roll(trace, 20), atol=1e-12)
+testing.assert_equal(base_trace.get_number_of_samples(), len(trace))
+
+# the trace object takes ownership of arrays that are set without a copy
+new_trace = np.zeros(512)
+base_trace.set_trace(new_trace, sampling_rate, copy=False)
+new_trace[0] = 1.
+testing.assert_equal(base_trace.get_trace(copy=False)[0], 1.)
+testing.assert_raises(ValueError, base_trace.set_trace, np.zeros(511), sampling_rate)
+
+print('base trace test passed without any issues!')
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+import NuRadioReco.framework.base_trace
+import NuRadioReco.framework.event
+import NuRadioReco.framework.station
+import NuRadioReco.framework.channel
+import NuRadioReco.modules.channelBandPassFilter
+import NuRadioReco.modules.channelResampler
+from NuRadioReco.utilities import units, fft
+import numpy as np
+from numpy import testing
+
+"""
+tests the station-wide trace arrays: the channels of a station are transformed at once and are backed by the rows
+of one array, and the batched paths of the modules give the same results as processing the channels one by one.
+"""
+
+rng = np.random.default_rng(2)
+sampling_rate = 5 * units.GHz
+n_channels = 24
+traces = rng.normal(size=(n_channels, 1024))
+
+
+def get_station(traces):
+    station = NuRadioReco.framework.station.Station(11)
+    for channel_id, trace in enumerate(traces):
+        channel = NuRadioReco.framework.channel.Channel(channel_id)
+        channel.set_trace(trace, sampling_rate)
+        station.add_channel(channel)
+    return station
+
+
+station = get_station(traces)
+NuRadioReco.framework.base_trace.reset_statistics()
+spectra = station.get_channel_frequency_spectra(copy=False)
+testing.assert_allclose(spectra, fft.time2freq(traces, sampling_rate))
+testing.assert_equal(NuRadioReco.framework.base_trace.get_statistics()['fft'], 1)
+# the channels are views of the station-wide array, i.e., it is returned without combining the channels again
+testing.assert_equal(np.shares_memory(station.get_channel(3).get_frequency_spectrum(copy=False), spectra), True)
+testing.assert_equal(np.shares_memory(station.get_channel_frequency_spectra(copy=False), spectra), True)
+testing.assert_equal(spectra.flags.writeable, False)
+testing.assert_allclose(station.get_channel_traces([2, 5]), traces[[2, 5]])
+
+# setting the spectra of the station updates the channels
+station.set_channel_frequency_spectra(2 * spectra, sampling_rate)
+testing.assert_allclose(station.get_channel_traces(), 2 * traces)
+testing.assert_allclose(station.get_channel(7).get_trace(), 2 * traces[7])
+testing.assert_equal(NuRadioReco.framework.base_trace.get_statistics()['ifft'], 1)
+testing.assert_raises(ValueError, station.set_channel_traces, traces[:3], sampling_rate)
+
+# the batched modules give the same results as processing the channels individually
+station_batched = get_station(traces)
+station = get_station(traces)
+channelBandPassFilter = NuRadioReco.modules.channelBandPassFilter.channelBandPassFilter()
+channelResampler = NuRadioReco.modules.channelResampler.channelResampler()
+passband = {channel_id: [80 * units.MHz, (500 + channel_id) * units.MHz] for channel_id in range(n_channels)}
+event = NuRadioReco.framework.event.Event(1, 1)
+channelBandPassFilter.run(event, station_batched, None, passband=passband, filter_type='butter', order=10)
+channelResampler.run(event, station_batched, None, sampling_rate=2 * units.GHz)
+for channel in station.iter_channels():
+    channelBandPassFilter._apply_filter(channel, passband[channel.get_id()], 'butter', 10)
+    channel.resample(2 * units.GHz)
+testing.assert_allclose(station_batched.get_channel_traces(), station.get_channel_traces(), rtol=1e-12, atol=1e-14)
+testing.assert_equal(station_batched.get_channel(0).get_sampling_rate(), 2 * units.GHz)
+
+# channels with different numbers of samples are processed one by one
+station.get_channel(0).set_trace(traces[0, :512], sampling_rate)
+testing.assert_equal(NuRadioReco.framework.base_trace.are_compatible(station.iter_channels()), False)
+testing.assert_raises(ValueError, station.get_channel_traces)
+channelBandPassFilter.run(event, station, None, passband=[80 * units.MHz, 500 * units.MHz], filter_type='butter')
+
+print('station trace block test passed without any issues!')
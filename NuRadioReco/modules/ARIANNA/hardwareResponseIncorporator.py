@@ -145,7 +145,7 @@ class hardwareResponseIncorporator:
 
             # hardwareResponse incorporator should always be used in conjunction with bandpassfilter
             # otherwise, noise will be blown up
-            channel.set_frequency_spectrum(trace_fft, channel.get_sampling_rate())
+            channel.set_frequency_spectrum(trace_fft, channel.get_sampling_rate(), copy=False)
 
             if not sim_to_data:
                 # Include cable delays
@@ -2,6 +2,7 @@ from NuRadioReco.modules.base.module import register_run
 from NuRadioReco.detector.RNO_G import analog_components
 import numpy as np
 from NuRadioReco.utilities import units, fft
+import NuRadioReco.framework.base_trace
 import time
 import logging
 
@@ -141,17 +142,30 @@ class hardwareResponseIncorporator:
 
         t = time.time()
 
-        for channel in station.iter_channels():
-            frequencies = channel.get_frequencies()
-            trace_fft = channel.get_frequency_spectrum()
-
-            trace_fft *= self.get_filter(frequencies, station.get_id(), channel.get_id(), det, temp, sim_to_data, phase_only, mode, mingainlin)
+        channels = list(station.iter_channels())
+        batched = len(channels) > 1 and NuRadioReco.framework.base_trace.are_compatible(channels)
+        if batched:
+            # the responses of all channels are applied at once
+            frequencies = channels[0].get_frequencies()
+            filter_responses = np.array([self.get_filter(frequencies, station.get_id(), channel.get_id(), det, temp, sim_to_data,
+                                                         phase_only, mode, mingainlin) for channel in channels])
+            spectra = station.get_channel_frequency_spectra(copy=False) * filter_responses
             # zero first bins to avoid DC offset
-            trace_fft[0] = 0
+            spectra[:, 0] = 0
+            station.set_channel_frequency_spectra(spectra, channels[0].get_sampling_rate(), copy=False)
+
+        for channel in channels:
+            if not batched:
+                frequencies = channel.get_frequencies()
+                trace_fft = channel.get_frequency_spectrum()
+
+                trace_fft *= self.get_filter(frequencies, station.get_id(), channel.get_id(), det, temp, sim_to_data, phase_only, mode, mingainlin)
+                # zero first bins to avoid DC offset
+                trace_fft[0] = 0
 
-            # hardwareResponse incorporator should always be used in conjunction with bandpassfilter
-            # otherwise, noise will be blown up
-            channel.set_frequency_spectrum(trace_fft, channel.get_sampling_rate())
+                # hardwareResponse incorporator should always be used in conjunction with bandpassfilter
+                # otherwise, noise will be blown up
+                channel.set_frequency_spectrum(trace_fft, channel.get_sampling_rate(), copy=False)
 
             if not sim_to_data:
                 # Include cable delays
@@ -3,6 +3,7 @@ from scipy import signal
 import logging
 from NuRadioReco.modules.base.module import register_run
 from NuRadioReco.utilities import units, bandpass_filter
+import NuRadioReco.framework.base_trace
 
 
 class channelBandPassFilter:
@@ -92,9 +93,23 @@ class channelBandPassFilter:
         """
         if passband is None:
             passband = [55 * units.MHz, 1000 * units.MHz]
-        for channel in station.iter_channels():
-            tmp_passband, tmp_order, tmp_filter_type, tmp_rp = self.get_filter_arguments(channel.get_id(), passband, filter_type, order, rp)
-            self._apply_filter(channel, tmp_passband, tmp_filter_type, tmp_order, tmp_rp, False)
+        channels = list(station.iter_channels())
+        filter_arguments = [self.get_filter_arguments(channel.get_id(), passband, filter_type, order, rp) for channel in channels]
+        if len(channels) > 1 and NuRadioReco.framework.base_trace.are_compatible(channels) and \
+                all(tmp_filter_type.find('FIR') < 0 for _, _, tmp_filter_type, _ in filter_arguments):
+            # all channels are filtered at once in the frequency domain
+            frequencies = channels[0].get_frequencies()
+            filters = {}
+            for tmp_passband, tmp_order, tmp_filter_type, tmp_rp in filter_arguments:
+                key = repr((tmp_passband, tmp_order, tmp_filter_type, tmp_rp))
+                if key not in filters:
+                    filters[key] = self.get_filter(frequencies, 0, 0, None, tmp_passband, tmp_filter_type, tmp_order, tmp_rp)
+            filter_responses = np.array([filters[repr(arguments)] for arguments in filter_arguments])
+            station.set_channel_frequency_spectra(station.get_channel_frequency_spectra(copy=False) * filter_responses,
+                                                  channels[0].get_sampling_rate(), copy=False)
+        else:
+            for channel, (tmp_passband, tmp_order, tmp_filter_type, tmp_rp) in zip(channels, filter_arguments):
+                self._apply_filter(channel, tmp_passband, tmp_filter_type, tmp_order, tmp_rp, False)
 
     def get_filter(self, frequencies, station_id, channel_id, det, passband, filter_type, order=2, rp=None):
         """
@@ -147,7 +162,6 @@ class channelBandPassFilter:
     def _apply_filter(self, channel, passband, filter_type, order, rp=None, is_efield=False):
 
         frequencies = channel.get_frequencies()
-        trace_fft = channel.get_frequency_spectrum()
         sample_rate = channel.get_sampling_rate()
 
         # for FIR filters, it is easier to set the trace rather than the FFT to apply the
@@ -157,15 +171,18 @@ class channelBandPassFilter:
         # set the trace.
 
         isFIR = False
+        if filter_type.find('FIR') < 0:
+            # the time trace is not needed for the IIR filters, i.e., it does not need to be kept up to date
+            trace_fft = channel.get_frequency_spectrum(copy=False)
 
         if(filter_type == 'rectangular'):
-            trace_fft *= self.get_filter(frequencies, 0, 0, None, passband, filter_type)
+            trace_fft = trace_fft * self.get_filter(frequencies, 0, 0, None, passband, filter_type)
         elif(filter_type == 'butter'):
-            trace_fft *= self.get_filter(frequencies, 0, 0, None, passband, filter_type, order)
+            trace_fft = trace_fft * self.get_filter(frequencies, 0, 0, None, passband, filter_type, order)
         elif(filter_type == 'butterabs'):
-            trace_fft *= self.get_filter(frequencies, 0, 0, None, passband, filter_type, order)
+            trace_fft = trace_fft * self.get_filter(frequencies, 0, 0, None, passband, filter_type, order)
         elif(filter_type == 'cheby1'):
-            trace_fft *= self.get_filter(frequencies, 0, 0, None, passband, filter_type, order, rp)
+            trace_fft = trace_fft * self.get_filter(frequencies, 0, 0, None, passband, filter_type, order, rp)
         elif(filter_type.find('FIR') >= 0):
             # print('This is a FIR filter')
             firarray = filter_type.split()
@@ -207,15 +224,15 @@ class channelBandPassFilter:
                 print("odd filter order, rolling is off by T_s/2")
 
             ndelay = int(0.5 * (Nfir - 1))
-            trace_fir = signal.lfilter(taps, 1.0, channel.get_trace())
+            trace_fir = signal.lfilter(taps, 1.0, channel.get_trace(copy=False))
             trace_fir = np.roll(trace_fir, -ndelay)
             isFIR = True
         else:
-            trace_fft *= self.get_filter(frequencies, 0, 0, None, passband, filter_type)
+            trace_fft = trace_fft * self.get_filter(frequencies, 0, 0, None, passband, filter_type)
         if isFIR:
-            channel.set_trace(trace_fir, sample_rate)
+            channel.set_trace(trace_fir, sample_rate, copy=False)
         else:
-            channel.set_frequency_spectrum(trace_fft, sample_rate)
+            channel.set_frequency_spectrum(trace_fft, sample_rate, copy=False)
 
     def end(self):
         pass
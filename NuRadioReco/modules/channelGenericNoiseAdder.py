@@ -2,6 +2,7 @@ from __future__ import print_function
 from NuRadioReco.modules.base.module import register_run
 import numpy as np
 from NuRadioReco.utilities import units, fft
+import NuRadioReco.framework.base_trace
 from numpy.random import Generator, Philox
 import logging
 
@@ -106,6 +107,50 @@ class channelGenericNoiseAdder:
         *   Add 'multi_white' noise option on 20-Sept-2018 (RL)
 
         """
+        return self.bandlimited_noise_multi_channel(min_freq, max_freq, n_samples, sampling_rate, [amplitude], type=type,
+                                                    time_domain=time_domain, bandwidth=bandwidth)[0]
+
+    def bandlimited_noise_multi_channel(self, min_freq, max_freq, n_samples, sampling_rate, amplitudes,
+                                        type='perfect_white', time_domain=True, bandwidth=None):
+        """
+        Generating noise of n_samples in a bandwidth [min_freq,max_freq] for several channels at once.
+
+        The noise of all channels is generated as one (n_channels x n_frequencies) array and is transformed into the
+        time domain with a single inverse FFT. The random numbers are drawn in the same order as by calling
+        `bandlimited_noise` for one channel after the other, i.e., the generated noise is identical.
+
+        Parameters
+        ----------
+
+        min_freq: float
+            Minimum frequency of passband for noise generation
+            min_freq = None: Only the DC component is removed. If the DC component should be included,
+            min_freq = 0 has to be specified
+        max_freq: float
+            Maximum frequency of passband for noise generation
+            If the maximum frequency is above the Nquist frequencey (0.5 * sampling rate), the Nquist frequency is used
+            max_freq = None: Frequencies up to Nyquist freq are used.
+        n_samples: int
+            number of samples in the time domain
+        sampling_rate: float
+            desired sampling rate of data
+        amplitudes: array of floats
+            desired voltage of noise as V_rms (only roughly, since bandpass limited), one value per channel
+        type: string
+            perfect_white: flat frequency spectrum
+            rayleigh: Amplitude of each frequency bin is drawn from a Rayleigh distribution
+        time_domain: bool (default True)
+            if True returns noise in the time domain, if False it returns the noise in the frequency domain.
+        bandwidth: float or None (default)
+            if this parameter is specified, the amplitude is interpreted as the amplitude for the bandwidth specified here
+            Otherwise the amplitude is interpreted for the bandwidth of min(max_freq, 0.5 * sampling rate) - min_freq
+
+        Returns
+        -------
+        noise: 2D array of floats (or complex floats if `time_domain` is False)
+            the noise of the channels, shape (n_channels, n_samples) or (n_channels, n_frequencies)
+        """
+        amplitudes = np.array(amplitudes, dtype=float)
         frequencies = np.fft.rfftfreq(n_samples, 1. / sampling_rate)
 
         n_samples_freq = len(frequencies)
@@ -126,30 +171,30 @@ class channelGenericNoiseAdder:
         nbinsactive = np.sum(selection)
         self.logger.debug('Total number of frequency bins (bilateral spectrum) : {} , of those active: {} '.format(n_samples, nbinsactive))
 
-        # Debug plots
-#         f1 = plt.figure()
-#         plt.plot (frequencies/max(frequencies))
-#         plt.plot(fbinsactive,'kx')
-
         if(bandwidth is not None):
             sampling_bandwidth = min(0.5 * sampling_rate, max_freq) - min_freq
-            amplitude *= 1. / (bandwidth / (sampling_bandwidth)) ** 0.5  # normalize noise level to the bandwidth its generated for
+            amplitudes *= 1. / (bandwidth / (sampling_bandwidth)) ** 0.5  # normalize noise level to the bandwidth its generated for
 
-        ampl = np.zeros(n_samples_freq)
+        noise = np.zeros((len(amplitudes), n_samples_freq), dtype=complex)
         sigscale = (1. * n_samples) / np.sqrt(nbinsactive)
+        Np = (n_samples - 1) // 2
         if type == 'perfect_white':
-            ampl[selection] = amplitude * sigscale
+            noise[:, selection] = (amplitudes * sigscale)[:, np.newaxis]
+            phases = self.__random_generator.random((len(amplitudes), Np))
         elif type == 'rayleigh':
-            fsigma = amplitude * sigscale / np.sqrt(2.)
-            ampl[selection] = self.__random_generator.rayleigh(fsigma, nbinsactive)
-#         elif type == 'white':
-# FIXME: amplitude normalization is not correct for 'white'
-#             ampl = np.random.rand(n_samples) * 0.05 * amplitude + amplitude * np.sqrt(2.*n_samples * 2)
+            # the amplitudes and phases are drawn channel by channel to keep the order of the random numbers
+            phases = np.empty((len(amplitudes), Np))
+            for i in range(len(amplitudes)):
+                noise[i, selection] = self.__random_generator.rayleigh(1., nbinsactive)
+                phases[i] = self.__random_generator.random(Np)
+            noise[:, selection] *= (amplitudes * sigscale / np.sqrt(2.))[:, np.newaxis]
         else:
             self.logger.error("Other types of noise not yet implemented.")
             raise NotImplementedError("Other types of noise not yet implemented.")
 
-        noise = self.add_random_phases(ampl, n_samples) / sampling_rate
+        phases *= 2 * np.pi
+        noise[:, 1:Np + 1] *= np.cos(phases) + 1j * np.sin(phases)  # Note that the last entry of the index slice is f[Np] !
+        noise /= sampling_rate
         if(time_domain):
             return fft.freq2time(noise, sampling_rate, n=n_samples)
         else:
@@ -308,10 +353,22 @@ class channelGenericNoiseAdder:
 
     def begin(self, debug=False, seed=None):
         self.__debug = debug
-        self.__random_generator = Generator(Philox(seed))
+        self.set_seed(seed)
         if debug:
             self.logger.setLevel(logging.DEBUG)
 
+    def set_seed(self, seed):
+        """
+        (re)initializes the random number generator of the noise generation
+
+        Parameters
+        ----------
+        seed: None, int or numpy.random.SeedSequence
+            the seed of the random number generator. A seed sequence allows to use an independent random number
+            stream, e.g. one stream per event group and station (see `NuRadioReco.utilities.random_streams`)
+        """
+        self.__random_generator = Generator(Philox(seed))
+
     @register_run()
     def run(self, event, station, detector,
             amplitude=1 * units.mV,
@@ -354,12 +411,28 @@ class channelGenericNoiseAdder:
         """
         if excluded_channels is None:
             excluded_channels = []
-        channels = station.iter_channels()
-        for channel in channels:
-            if(channel.get_id() in excluded_channels):
-                continue
+        channels = [channel for channel in station.iter_channels() if channel.get_id() not in excluded_channels]
+        if len(channels) > 1 and not self.__debug and NuRadioReco.framework.base_trace.are_compatible(channels):
+            # the noise of all channels is generated at once
+            channel_ids = [channel.get_id() for channel in channels]
+            if(isinstance(amplitude, dict)):
+                amplitudes = [amplitude[channel_id] for channel_id in channel_ids]
+            else:
+                amplitudes = [amplitude] * len(channel_ids)
+            sampling_rate = channels[0].get_sampling_rate()
+            noise = self.bandlimited_noise_multi_channel(min_freq=min_freq,
+                                                         max_freq=max_freq,
+                                                         n_samples=channels[0].get_number_of_samples(),
+                                                         sampling_rate=sampling_rate,
+                                                         amplitudes=amplitudes,
+                                                         type=type,
+                                                         bandwidth=bandwidth)
+            noise += station.get_channel_traces(channel_ids, copy=False)
+            station.set_channel_traces(noise, sampling_rate, channel_ids, copy=False)
+            return
 
-            trace = channel.get_trace()
+        for channel in channels:
+            trace = channel.get_trace(copy=False)
             sampling_rate = channel.get_sampling_rate()
 
             if(isinstance(amplitude, dict)):
@@ -394,7 +467,7 @@ class channelGenericNoiseAdder:
                 plt.show()
 
             new_trace = trace + noise
-            channel.set_trace(new_trace, sampling_rate)
+            channel.set_trace(new_trace, sampling_rate, copy=False)
 
     def end(self):
         pass
@@ -1,4 +1,5 @@
 from NuRadioReco.modules.base.module import register_run
+import NuRadioReco.framework.base_trace
 import logging
 
 
@@ -43,8 +44,17 @@ class channelResampler:
             In units 1/time provides the desired sampling rate of the data.
 
         """
-        for channel in station.iter_channels():
-            channel.resample(sampling_rate)
+        channels = list(station.iter_channels())
+        if len(channels) > 1 and NuRadioReco.framework.base_trace.are_compatible(channels):
+            # all channels are resampled at once
+            traces = NuRadioReco.framework.base_trace.BaseTrace()
+            traces.set_trace(station.get_channel_traces(copy=False), channels[0].get_sampling_rate(), copy=False)
+            traces.resample(sampling_rate)
+            if traces.get_sampling_rate() != channels[0].get_sampling_rate():
+                station.set_channel_traces(traces.get_trace(copy=False), sampling_rate, copy=False)
+        else:
+            for channel in station.iter_channels():
+                channel.resample(sampling_rate)
 
     def end(self):
         pass
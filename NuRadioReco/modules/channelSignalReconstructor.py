@@ -81,7 +81,7 @@ class channelSignalReconstructor:
             dictionary of various SNR parameters
         """
 
-        trace = channel.get_trace()
+        trace = channel.get_trace(copy=False)
         times = channel.get_times() - channel.get_trace_start_time()
 
         if self.__signal_window_start is not None:
@@ -170,7 +170,7 @@ class channelSignalReconstructor:
         max_amplitude_station = 0
         for channel in station.iter_channels():
             times = channel.get_times()
-            trace = channel.get_trace()
+            trace = channel.get_trace(copy=False)
             h = np.abs(signal.hilbert(trace))
             max_amplitude = np.max(np.abs(trace))
             logger.info(f"event {evt.get_run_number()}.{evt.get_id()} station {station.get_id()} channel {channel.get_id()} max amp = {max_amplitude:.6g} max amp env {h.max():.6g}")
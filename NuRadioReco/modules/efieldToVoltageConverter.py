@@ -11,7 +11,6 @@ from NuRadioReco.utilities import ice
 from NuRadioReco.utilities import trace_utilities
 from NuRadioReco.framework.parameters import electricFieldParameters as efp
 from NuRadioReco.framework.parameters import stationParameters as stnp
-import copy
 
 
 class efieldToVoltageConverter():
@@ -35,6 +34,7 @@ class efieldToVoltageConverter():
         self.__post_pulse_time = None
         self.__max_upsampling_factor = None
         self.antenna_provider = None
+        self.__frequency_domain_summation = None
         self.begin()
         self.logger = logging.getLogger('NuRadioReco.efieldToVoltageConverter')
         self.logger.setLevel(log_level)
@@ -42,7 +42,8 @@ class efieldToVoltageConverter():
     def begin(self, debug=False, uncertainty=None,
               time_resolution=0.1 * units.ns,
               pre_pulse_time=200 * units.ns,
-              post_pulse_time=200 * units.ns
+              post_pulse_time=200 * units.ns,
+              frequency_domain_summation=False
               ):
         """
         Begin method, sets general parameters of module
@@ -68,12 +69,21 @@ class efieldToVoltageConverter():
             length of empty samples that is added before the first pulse
         post_pulse_time: float
             length of empty samples that is added after the simulated trace
+        frequency_domain_summation: bool
+            if False (default), each electric field is shifted by the sub-sample part of its start time, placed into
+            a zero-padded trace of the full length and transformed into the frequency domain.
+            If True, the transverse components of each electric field are transformed directly into the frequency grid
+            of the full trace (a zero-padded FFT) and the complete start time is applied as a phase ramp. This avoids
+            the time domain copies and the additional FFTs of each electric field. The time shift is then cyclic
+            in the full trace instead of in the trace of the electric field, which leads to small differences
+            at the edges of the electric field traces.
         """
         self.__debug = debug
         self.__time_resolution = time_resolution
         self.__pre_pulse_time = pre_pulse_time
         self.__post_pulse_time = post_pulse_time
         self.__max_upsampling_factor = 5000
+        self.__frequency_domain_summation = frequency_domain_summation
         if uncertainty is None:
             self.__uncertainty = {}
         else:
@@ -142,6 +152,22 @@ class efieldToVoltageConverter():
             trace_length_samples += 1
         self.logger.debug("smallest trace start time {:.1f}, largest trace time {:.1f} -> n_samples = {:d} {:.0f}ns)".format(times_min.min(), times_max.max(), trace_length_samples, trace_length / units.ns))
 
+        # calculate the antenna response for all electric fields of the station at once
+        ff = np.fft.rfftfreq(trace_length_samples, d=1. / (1. / time_resolution))  # same as the frequencies of `trace_object`
+        efield_channel_ids = []
+        efield_zeniths = []
+        efield_azimuths = []
+        for channel_id in det.get_channel_ids(station.get_id()):
+            for electric_field in sim_station.get_electric_fields_for_channels([channel_id]):
+                efield_channel_ids.append(channel_id)
+                efield_zeniths.append(electric_field[efp.zenith])
+                efield_azimuths.append(electric_field[efp.azimuth])
+        VELs = None
+        if len(efield_channel_ids):
+            VELs = trace_utilities.get_efield_antenna_factor(sim_station, ff, efield_channel_ids, det, efield_zeniths,
+                                                             efield_azimuths, self.antenna_provider)
+        i_efield = 0
+
         # loop over all channels
         for channel_id in det.get_channel_ids(station.get_id()):
 
@@ -152,22 +178,16 @@ class efieldToVoltageConverter():
             self.logger.debug('channel id {}'.format(channel_id))
             channel = NuRadioReco.framework.channel.Channel(channel_id)
             channel_spectrum = None
-            trace_object = None
             if(self.__debug):
                 from matplotlib import pyplot as plt
                 fig, axes = plt.subplots(2, 1)
             for electric_field in sim_station.get_electric_fields_for_channels([channel_id]):
 
-                # all simulated channels have a different trace start time
-                # in a measurement, all channels have the same physical start time
-                # so we need to create one long trace that can hold all the different channel times
-                # to achieve a good time resolution, we upsample the trace first.
-                new_efield = NuRadioReco.framework.base_trace.BaseTrace()  # create new data structure with new efield length
-                new_efield.set_trace(copy.copy(electric_field.get_trace()), electric_field.get_sampling_rate())
-                new_trace = np.zeros((3, trace_length_samples))
-                # calculate the start bin
+                # calculate the start time
+                start_time = None
                 if(not np.isnan(electric_field.get_trace_start_time())):
                     cab_delay = det.get_cable_delay(sim_station_id, channel_id)
+                    start_time = electric_field.get_trace_start_time() + cab_delay - times_min.min()
                     if sim_station.is_cosmic_ray():
                         site = det.get_site(sim_station_id)
                         antenna_position = det.get_relative_position(sim_station_id, channel_id) - electric_field.get_position()
@@ -181,46 +201,70 @@ class efieldToVoltageConverter():
                             antenna_position,
                             index_of_refraction
                         )
-                        start_time = electric_field.get_trace_start_time() + cab_delay - times_min.min() + travel_time_shift
-                        start_bin = int(round(start_time / time_resolution))
-                        time_remainder = start_time - start_bin * time_resolution
-                    else:
-                        start_time = electric_field.get_trace_start_time() + cab_delay - times_min.min()
+                        start_time += travel_time_shift
+                    self.logger.debug('channel {}, start time {:.1f}, ray solution {}'.format(channel_id, electric_field.get_trace_start_time() + cab_delay, electric_field[efp.ray_path_type]))
+
+                if self.__frequency_domain_summation:
+                    # the transverse components of the electric field are transformed directly into the frequency
+                    # grid of the full trace (zero padding) and the start time is applied as a phase ramp
+                    efield_fft = np.zeros((3, len(ff)), dtype=complex)
+                    if start_time is not None:
+                        # same normalization as `fft.time2freq`
+                        efield_fft[1:] = np.fft.rfft(electric_field.get_trace(copy=False)[1:], n=trace_length_samples) * time_resolution * 2 ** 0.5
+                        efield_fft[1:] *= np.exp(-2j * np.pi * ff * start_time)
+                    if(self.__debug):
+                        axes[0].plot(electric_field.get_times(), electric_field.get_trace()[1], c='C1', linestyle='-', alpha=.5)
+                        axes[0].plot(electric_field.get_times(), electric_field.get_trace()[2], c='C1', linestyle=':', alpha=.5)
+                else:
+                    # all simulated channels have a different trace start time
+                    # in a measurement, all channels have the same physical start time
+                    # so we need to create one long trace that can hold all the different channel times
+                    # to achieve a good time resolution, we upsample the trace first.
+                    new_efield = NuRadioReco.framework.base_trace.BaseTrace()  # create new data structure with new efield length
+                    new_efield.set_trace(electric_field.get_trace(copy=False), electric_field.get_sampling_rate(), copy=False)
+                    new_trace = np.zeros((3, trace_length_samples))
+                    if start_time is not None:
+                        # calculate the start bin
                         start_bin = int(round(start_time / time_resolution))
                         time_remainder = start_time - start_bin * time_resolution
-                    self.logger.debug('channel {}, start time {:.1f} = bin {:d}, ray solution {}'.format(channel_id, electric_field.get_trace_start_time() + cab_delay, start_bin, electric_field[efp.ray_path_type]))
-                    new_efield.apply_time_shift(time_remainder)
+                        self.logger.debug('channel {}, start bin {:d}'.format(channel_id, start_bin))
+                        new_efield.apply_time_shift(time_remainder)
 
-                    tr = new_efield.get_trace()
-                    stop_bin = start_bin + new_efield.get_number_of_samples()
+                        tr = new_efield.get_trace(copy=False)
+                        stop_bin = start_bin + new_efield.get_number_of_samples()
 
-                    # if checks should never be true...
-                    if stop_bin > np.shape(new_trace)[-1]:
-                        # ensure new efield does not extend beyond end of trace although this should not happen
-                        self.logger.warning("electric field trace extends beyond the end of the trace and will be cut.")
-                        stop_bin = np.shape(new_trace)[-1]
-                        tr = np.atleast_2d(tr)[:,:stop_bin-start_bin]
-                    if start_bin < 0:
-                        # ensure new efield does not extend beyond start of trace although this should not happen
-                        self.logger.warning("electric field trace extends beyond the beginning of the trace and will be cut.")
-                        tr = np.atleast_2d(tr)[:,-start_bin:]
-                        start_bin = 0
-                    new_trace[:, start_bin:stop_bin] = tr
-                trace_object = NuRadioReco.framework.base_trace.BaseTrace()
-                trace_object.set_trace(new_trace, 1. / time_resolution)
-                if(self.__debug):
-                    axes[0].plot(trace_object.get_times(), new_trace[1], label="eTheta {}".format(electric_field[efp.ray_path_type]), c='C0')
-                    axes[0].plot(trace_object.get_times(), new_trace[2], label="ePhi {}".format(electric_field[efp.ray_path_type]), c='C0', linestyle=':')
-                    axes[0].plot(electric_field.get_times(), electric_field.get_trace()[1], c='C1', linestyle='-', alpha=.5)
-                    axes[0].plot(electric_field.get_times(), electric_field.get_trace()[2], c='C1', linestyle=':', alpha=.5)
-                ff = trace_object.get_frequencies()
-                efield_fft = trace_object.get_frequency_spectrum()
+                        # if checks should never be true...
+                        if stop_bin > np.shape(new_trace)[-1]:
+                            # ensure new efield does not extend beyond end of trace although this should not happen
+                            self.logger.warning("electric field trace extends beyond the end of the trace and will be cut.")
+                            stop_bin = np.shape(new_trace)[-1]
+                            tr = np.atleast_2d(tr)[:,:stop_bin-start_bin]
+                        if start_bin < 0:
+                            # ensure new efield does not extend beyond start of trace although this should not happen
+                            self.logger.warning("electric field trace extends beyond the beginning of the trace and will be cut.")
+                            tr = np.atleast_2d(tr)[:,-start_bin:]
+                            start_bin = 0
+                        new_trace[:, start_bin:stop_bin] = tr
+                    trace_object = NuRadioReco.framework.base_trace.BaseTrace()
+                    trace_object.set_trace(new_trace, 1. / time_resolution, copy=False)
+                    if(self.__debug):
+                        axes[0].plot(trace_object.get_times(), new_trace[1], label="eTheta {}".format(electric_field[efp.ray_path_type]), c='C0')
+                        axes[0].plot(trace_object.get_times(), new_trace[2], label="ePhi {}".format(electric_field[efp.ray_path_type]), c='C0', linestyle=':')
+                        axes[0].plot(electric_field.get_times(), electric_field.get_trace()[1], c='C1', linestyle='-', alpha=.5)
+                        axes[0].plot(electric_field.get_times(), electric_field.get_trace()[2], c='C1', linestyle=':', alpha=.5)
+                    efield_fft = trace_object.get_frequency_spectrum(copy=False)
 
                 zenith = electric_field[efp.zenith]
                 azimuth = electric_field[efp.azimuth]
 
                 # get antenna pattern for current channel
-                VEL = trace_utilities.get_efield_antenna_factor(sim_station, ff, [channel_id], det, zenith, azimuth, self.antenna_provider)
+                if VELs is None:
+                    # at least one electric field of the station has no signal path to its antenna,
+                    # so we calculate the antenna response for each electric field separately
+                    VEL = trace_utilities.get_efield_antenna_factor(sim_station, ff, [channel_id], det, zenith, azimuth, self.antenna_provider)
+                else:
+                    VEL = VELs[i_efield:i_efield + 1]
+                i_efield += 1
 
                 if VEL is None:  # this can happen if there is not signal path to the antenna
                     voltage_fft = np.zeros_like(efield_fft[1])  # set voltage trace to zeros
@@ -233,7 +277,7 @@ class efieldToVoltageConverter():
                 voltage_fft[np.where(ff < 5 * units.MHz)] = 0.
 
                 if(self.__debug):
-                    axes[1].plot(trace_object.get_times(), fft.freq2time(voltage_fft, electric_field.get_sampling_rate()), label="{}, zen = {:.0f}deg".format(electric_field[efp.ray_path_type], zenith / units.deg))
+                    axes[1].plot(np.arange(trace_length_samples) * time_resolution, fft.freq2time(voltage_fft, 1. / time_resolution), label="{}, zen = {:.0f}deg".format(electric_field[efp.ray_path_type], zenith / units.deg))
 
                 if('amp' in self.__uncertainty):
                     voltage_fft *= np.random.normal(1, self.__uncertainty['amp'][channel_id])
@@ -249,11 +293,12 @@ class efieldToVoltageConverter():
                 axes[0].legend(loc='upper left')
                 axes[1].legend(loc='upper left')
                 plt.show()
-            if trace_object is None:  # this happens if don't have any efield for this channel
+            if channel_spectrum is None:  # this happens if don't have any efield for this channel
                 # set the trace to zeros
-                channel.set_trace(np.zeros(trace_length_samples), 1. / time_resolution)
+                channel.set_trace(np.zeros(trace_length_samples), 1. / time_resolution, copy=False)
             else:
-                channel.set_frequency_spectrum(channel_spectrum, trace_object.get_sampling_rate())
+                # the inverse FFT of the summed spectrum is only performed once the trace is requested
+                channel.set_frequency_spectrum(channel_spectrum, 1. / time_resolution, copy=False)
             channel.set_trace_start_time(times_min.min())
 
             station.add_channel(channel)
@@ -22,6 +22,17 @@ class efieldToVoltageConverterPerEfield():
         if(log_level):
             self.logger.setLevel(log_level)
         self.antenna_provider = antennapattern.AntennaPatternProvider()
+        self.__antenna_response_cache = None
+
+    def begin(self, antenna_response_cache=None):
+        """
+        Parameters
+        ----------
+        antenna_response_cache: AntennaResponseCache or None
+            if set, the antenna responses are obtained from this cache of antenna responses that are pretabulated
+            at the frequencies of the electric fields (see `NuRadioReco.detector.antennapattern.AntennaResponseCache`)
+        """
+        self.__antenna_response_cache = antenna_response_cache
 
     @register_run()
     def run(self, evt, station, det):
@@ -41,13 +52,14 @@ class efieldToVoltageConverterPerEfield():
                                                                            ray_tracing_id=electric_field.get_ray_tracing_solution_id())
 
                 ff = electric_field.get_frequencies()
-                efield_fft = electric_field.get_frequency_spectrum()
+                efield_fft = electric_field.get_frequency_spectrum(copy=False)
 
                 zenith = electric_field[efp.zenith]
                 azimuth = electric_field[efp.azimuth]
 
                 # get antenna pattern for current channel
-                VEL = trace_utilities.get_efield_antenna_factor(sim_station, ff, [channel_id], det, zenith, azimuth, self.antenna_provider)
+                VEL = trace_utilities.get_efield_antenna_factor(sim_station, ff, [channel_id], det, zenith, azimuth, self.antenna_provider,
+                                                                antenna_response_cache=self.__antenna_response_cache)
 
                 if VEL is None:  # this can happen if there is not signal path to the antenna
                     voltage_fft = np.zeros_like(efield_fft[1])  # set voltage trace to zeros
@@ -80,7 +92,7 @@ class efieldToVoltageConverterPerEfield():
                     travel_time_shift = 0
 
                 # set the trace to zeros
-                sim_channel.set_frequency_spectrum(voltage_fft, electric_field.get_sampling_rate())
+                sim_channel.set_frequency_spectrum(voltage_fft, electric_field.get_sampling_rate(), copy=False)
                 sim_channel.set_trace_start_time(electric_field.get_trace_start_time() + travel_time_shift)
                 sim_station.add_channel(sim_channel)
 
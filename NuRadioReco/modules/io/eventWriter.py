@@ -1,10 +1,12 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
+import os
 import pickle
 from NuRadioReco.modules.base.module import register_run
 from NuRadioReco.modules.io.NuRadioRecoio import VERSION, VERSION_MINOR
 import logging
 from NuRadioReco.framework.parameters import stationParameters as stnp
 from NuRadioReco.detector import generic_detector
+import NuRadioReco.framework.event
 logger = logging.getLogger("eventWriter")
 
 
@@ -45,12 +47,13 @@ class eventWriter:
         self.__events_in_current_file = 0
         self.__fout = None
 
-    def __write_fout_header(self):
+    def __get_current_filename(self):
         if self.__number_of_files > 1:
-            self.__fout = open("{}_part{:02d}.nur".format(
-                self.__filename, self.__number_of_files), 'wb')
-        else:
-            self.__fout = open("{}.nur".format(self.__filename), 'wb')
+            return "{}_part{:02d}.nur".format(self.__filename, self.__number_of_files)
+        return "{}.nur".format(self.__filename)
+
+    def __write_fout_header(self):
+        self.__fout = open(self.__get_current_filename(), 'wb')
         b = bytearray()
         b.extend(VERSION.to_bytes(6, 'little'))
         b.extend(VERSION_MINOR.to_bytes(6, 'little'))
@@ -128,11 +131,60 @@ class eventWriter:
                 'SimChannels': True,
                 'SimElectricFields': True
             }
+        self.write_event_bytearray(self.__get_event_bytearray(evt, mode), evt, det)
+
+    @register_run()
+    def get_event_bytearray(self, evt, det=None, mode=None):
+        """
+        serializes the event in the same way as the `run` method without writing it into a file
+
+        This allows to serialize events in a different process than the one that writes the file.
+        The returned byte array is written with `write_event_bytearray`.
+
+        Parameters
+        ----------
+        evt: NuRadioReco event object
+        det: detector object
+            not used, only accepted to register the module with the same arguments as the `run` method
+        mode: dictionary, optional
+            Specifies what will saved into the `*.nur` output file, see `run`
+
+        Returns
+        -------
+        bytearray
+        """
+        if mode is None:
+            mode = {
+                'Channels': True,
+                'ElectricFields': True,
+                'SimChannels': True,
+                'SimElectricFields': True
+            }
+        return self.__get_event_bytearray(evt, mode)
+
+    def write_event_bytearray(self, event_bytearray, evt=None, det=None):
+        """
+        writes an event that was serialized with `get_event_bytearray` into the file
+
+        Parameters
+        ----------
+        event_bytearray: bytearray
+            the serialized event
+        evt: NuRadioReco event object or None
+            the event corresponding to the byte array. If None, the event is deserialized from the byte array
+        det: detector object
+            If a detector object is passed, the detector description for the
+            events is written in the file as well
+        """
+        if evt is None:
+            evt_header_length = int.from_bytes(event_bytearray[6:12], 'little')
+            evt_length = int.from_bytes(event_bytearray[12 + evt_header_length:18 + evt_header_length], 'little')
+            evt = NuRadioReco.framework.event.Event(0, 0)
+            evt.deserialize(bytes(event_bytearray[18 + evt_header_length:18 + evt_header_length + evt_length]))
         self.__check_for_duplicate_ids(evt.get_run_number(), evt.get_id())
         if not self.__header_written:
             self.__write_fout_header()
 
-        event_bytearray = self.__get_event_bytearray(evt, mode)
         n_bytes_written = self.__fout.write(event_bytearray)
         logger.debug(f"{n_bytes_written} bytes written to diks")
         self.__current_file_size += event_bytearray.__sizeof__()
@@ -326,6 +378,59 @@ class eventWriter:
                                  "begin method.".format(event_id, run_number))
         return
 
+    def get_checkpoint(self):
+        """
+        returns the state of the writer to continue writing after an interruption, see `resume_from_checkpoint`
+
+        The events written so far are flushed to disk.
+
+        Returns
+        -------
+        dict
+            the bookkeeping of the writer including the number of bytes written into the current file
+        """
+        file_offset = 0
+        if self.__header_written:
+            self.__fout.flush()
+            os.fsync(self.__fout.fileno())
+            file_offset = self.__fout.tell()
+        return {'number_of_events': self.__number_of_events,
+                'current_file_size': self.__current_file_size,
+                'number_of_files': self.__number_of_files,
+                'stored_stations': self.__stored_stations,
+                'stored_channels': self.__stored_channels,
+                'header_written': self.__header_written,
+                'event_ids_and_runs': self.__event_ids_and_runs,
+                'events_in_current_file': self.__events_in_current_file,
+                'file_offset': file_offset}
+
+    def resume_from_checkpoint(self, checkpoint):
+        """
+        restores the state of the writer from a checkpoint (see `get_checkpoint`). Needs to be called after `begin`.
+
+        Everything that was written into the current file after the checkpoint was taken is removed, the
+        following events are appended.
+
+        Parameters
+        ----------
+        checkpoint: dict
+            the state of the writer as returned by `get_checkpoint`
+        """
+        self.__number_of_events = checkpoint['number_of_events']
+        self.__current_file_size = checkpoint['current_file_size']
+        self.__number_of_files = checkpoint['number_of_files']
+        self.__stored_stations = checkpoint['stored_stations']
+        self.__stored_channels = checkpoint['stored_channels']
+        self.__header_written = checkpoint['header_written']
+        self.__event_ids_and_runs = checkpoint['event_ids_and_runs']
+        self.__events_in_current_file = checkpoint['events_in_current_file']
+        if self.__header_written:
+            filename = self.__get_current_filename()
+            logger.info(f"resuming to write file {filename} after {checkpoint['file_offset']} bytes")
+            self.__fout = open(filename, 'r+b')
+            self.__fout.truncate(checkpoint['file_offset'])
+            self.__fout.seek(checkpoint['file_offset'])
+
     def end(self):
         if self.__fout is not None:
             self.__fout.close()
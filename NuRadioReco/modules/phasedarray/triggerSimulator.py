@@ -193,7 +193,8 @@ class triggerSimulator:
         Parameters
         ----------
         coh_sum: array of floats
-            Phased signal to be integrated over
+            Phased signal to be integrated over. A 2D array (n_beams x n_samples) calculates
+            the power of all beams at once
         window: int
             Power integral window
             Units of ADC time ticks
@@ -209,7 +210,7 @@ class triggerSimulator:
         Returns
         -------
         power:
-            Integrated power in each integration window
+            Integrated power in each integration window (array of shape (n_beams, num_frames) for 2D input)
         num_frames
             Number of integration windows calculated
 
@@ -219,49 +220,81 @@ class triggerSimulator:
             error_msg = 'ADC output type must be "counts" or "voltage". Currently set to:' + str(adc_output)
             raise ValueError(error_msg)
 
-        num_frames = int(np.floor((len(coh_sum) - window) / step))
+        num_frames = int(np.floor((np.shape(coh_sum)[-1] - window) / step))
 
         if(adc_output == 'voltage'):
             coh_sum_squared = (coh_sum * coh_sum).astype(float)
         elif(adc_output == 'counts'):
             coh_sum_squared = (coh_sum * coh_sum).astype(int)
 
-        coh_sum_windowed = np.lib.stride_tricks.as_strided(coh_sum_squared, (num_frames, window),
-                                                           (coh_sum_squared.strides[0] * step, coh_sum_squared.strides[0]))
-        power = np.sum(coh_sum_windowed, axis=1)
+        # the windows of all beams as one strided view of shape (..., num_frames, window)
+        coh_sum_windowed = np.lib.stride_tricks.as_strided(
+            coh_sum_squared, coh_sum_squared.shape[:-1] + (num_frames, window),
+            coh_sum_squared.strides[:-1] + (coh_sum_squared.strides[-1] * step, coh_sum_squared.strides[-1]),
+            writeable=False)
+        power = np.sum(coh_sum_windowed, axis=-1)
 
         return power.astype(float) / window, num_frames
 
-    def phase_signals(self, traces, beam_rolls):
+    def get_delay_matrix(self, beam_rolls, channel_ids):
         """
-        Phase signals together given the rolls
+        Converts the rolls of the beams into a matrix of delays
 
         Parameters
         ----------
-        traces: 2D array of floats
-            Signals from the antennas to be phased together.
-        beam_rolls: 2D array of floats
-            The amount to shift each signal before phasing the
-            traces together
+        beam_rolls: array of dicts of keys=antenna and content=delay
+            the rolls of the beams, see `calculate_time_delays`
+        channel_ids: array of ints
+            the channel ids in the order of the columns of the matrix
 
         Returns
         -------
-        phased_traces: array of arrays
+        delay_matrix: 2D array of ints
+            the rolls of shape (n_beams x n_channels)
         """
+        return np.array([[subbeam_rolls[channel_id] for channel_id in channel_ids] for subbeam_rolls in beam_rolls],
+                        dtype=int).reshape(len(beam_rolls), len(channel_ids))
 
-        phased_traces = [[] for i in range(len(beam_rolls))]
+    def phase_signals(self, traces, beam_rolls):
+        """
+        Phase signals together given the rolls
 
-        running_i = 0
-        for subbeam_rolls in beam_rolls:
+        The trace of a channel is rolled by the delay of a beam (as `np.roll`) and summed over the channels.
+        All beams are calculated at once with a single gather of the rolled traces of shape
+        (n_beams x n_channels x n_samples) from a strided view of the (periodically continued) traces.
 
-            phased_trace = np.zeros(len(list(traces.values())[0]))
-            for channel_id in traces:
+        Parameters
+        ----------
+        traces: dict of arrays of floats or 2D array of floats
+            Signals from the antennas to be phased together, either a dict of keys=channel id and
+            content=trace or an array of shape (n_channels x n_samples).
+        beam_rolls: array of dicts or 2D array of ints
+            The amount to shift each signal before phasing the
+            traces together, either as returned by `calculate_time_delays` or as matrix of
+            shape (n_beams x n_channels), see `get_delay_matrix` (required if `traces` is an array)
 
-                trace = traces[channel_id]
-                phased_trace += np.roll(trace, subbeam_rolls[channel_id])
+        Returns
+        -------
+        phased_traces: 2D array of floats
+            the phased traces of shape (n_beams x n_samples)
+        """
 
-            phased_traces[running_i] = phased_trace
-            running_i += 1
+        if isinstance(traces, dict):
+            channel_ids = list(traces.keys())
+            traces = np.array([traces[channel_id] for channel_id in channel_ids])
+            if not isinstance(beam_rolls, np.ndarray):
+                beam_rolls = self.get_delay_matrix(beam_rolls, channel_ids)
+        traces = np.asarray(traces, dtype=float)
+        n_samples = traces.shape[-1]
+        # np.roll(trace, roll)[i] = trace[(i - roll) % n_samples], i.e., the rolled trace is the window that
+        # starts at (-roll) % n_samples in the trace repeated twice
+        starts = np.mod(-np.asarray(beam_rolls, dtype=int), n_samples)
+
+        traces_twice = np.concatenate([traces, traces], axis=-1)
+        windows = np.lib.stride_tricks.as_strided(traces_twice, (len(traces), n_samples, n_samples),
+                                                  (traces_twice.strides[0], traces_twice.strides[1],
+                                                   traces_twice.strides[1]), writeable=False)
+        phased_traces = np.sum(windows[np.arange(len(traces)), starts], axis=1)
 
         return phased_traces
 
@@ -406,28 +439,25 @@ class triggerSimulator:
         channel_trace_start_time = self.get_channel_trace_start_time(station, triggered_channels)
 
         trigger_delays = {}
-        maximum_amps = np.zeros_like(phased_traces)
-
-        for iTrace, phased_trace in enumerate(phased_traces):
 
-            # Create a sliding window
-            squared_mean, num_frames = self.power_sum(coh_sum=phased_trace, window=window, step=step, adc_output=adc_output)
+        # Create a sliding window for all beams at once
+        squared_mean, num_frames = self.power_sum(coh_sum=phased_traces, window=window, step=step, adc_output=adc_output)
 
-            maximum_amps[iTrace] = np.max(squared_mean)
+        maximum_amps = np.max(squared_mean, axis=-1)
 
-            if True in (squared_mean > threshold):
-                trigger_delays[iTrace] = {}
+        for iTrace in np.flatnonzero(np.any(squared_mean > threshold, axis=-1)).tolist():
+            trigger_delays[iTrace] = {}
 
-                for channel_id in beam_rolls[iTrace]:
-                    trigger_delays[iTrace][channel_id] = beam_rolls[iTrace][channel_id] * time_step
+            for channel_id in beam_rolls[iTrace]:
+                trigger_delays[iTrace][channel_id] = beam_rolls[iTrace][channel_id] * time_step
 
-                triggered_bins = np.atleast_1d(np.squeeze(np.argwhere(squared_mean > threshold)))
-                logger.debug(f"Station has triggered, at bins {triggered_bins}")
-                logger.debug(trigger_delays)
-                logger.debug(f"trigger_delays {trigger_delays[iTrace][triggered_channels[0]]}")
-                is_triggered = True
-                trigger_times[iTrace] = trigger_delays[iTrace][triggered_channels[0]] + triggered_bins * step * time_step + channel_trace_start_time
-                logger.debug(f"trigger times  = {trigger_times[iTrace]}")
+            triggered_bins = np.atleast_1d(np.squeeze(np.argwhere(squared_mean[iTrace] > threshold)))
+            logger.debug(f"Station has triggered, at bins {triggered_bins}")
+            logger.debug(trigger_delays)
+            logger.debug(f"trigger_delays {trigger_delays[iTrace][triggered_channels[0]]}")
+            is_triggered = True
+            trigger_times[iTrace] = trigger_delays[iTrace][triggered_channels[0]] + triggered_bins * step * time_step + channel_trace_start_time
+            logger.debug(f"trigger times  = {trigger_times[iTrace]}")
         if is_triggered:
             logger.debug("Trigger condition satisfied!")
             logger.debug("all trigger times", trigger_times)
@@ -0,0 +1,64 @@
+import NuRadioReco.framework.station
+import NuRadioReco.framework.channel
+import NuRadioReco.framework.event
+import NuRadioReco.modules.channelGenericNoiseAdder
+from NuRadioReco.utilities import units
+import numpy as np
+from numpy import testing
+import time
+
+"""
+benchmark of adding noise to all channels of a station with the batched noise generation of the
+channelGenericNoiseAdder, compared to the previous implementation that generated the noise channel by channel
+(copied below). The benchmark asserts that both give identical noise for the same seed.
+"""
+
+n_samples = 2048
+sampling_rate = 2 * units.GHz
+event = NuRadioReco.framework.event.Event(1, 1)
+
+
+def add_noise_previous(noise_adder, station, amplitude, min_freq, max_freq, type):
+    for channel in station.iter_channels():
+        trace = channel.get_trace()
+        noise = noise_adder.bandlimited_noise(min_freq=min_freq, max_freq=max_freq, n_samples=trace.shape[0],
+                                              sampling_rate=channel.get_sampling_rate(),
+                                              amplitude=amplitude[channel.get_id()], type=type)
+        channel.set_trace(trace + noise, channel.get_sampling_rate())
+
+
+def get_station(n_channels):
+    # the efieldToVoltageConverter sets the channels in the frequency domain
+    station = NuRadioReco.framework.station.Station(11)
+    for channel_id in range(n_channels):
+        channel = NuRadioReco.framework.channel.Channel(channel_id)
+        channel.set_frequency_spectrum(np.zeros(n_samples // 2 + 1, dtype=complex), sampling_rate)
+        station.add_channel(channel)
+    return station
+
+
+for n_channels in [4, 16, 24]:
+    amplitude = {channel_id: (10 + channel_id) * units.micro * units.V for channel_id in range(n_channels)}
+    for type in ['rayleigh', 'perfect_white']:
+        kwargs = dict(amplitude=amplitude, min_freq=0, max_freq=800 * units.MHz, type=type)
+        noise_adder = NuRadioReco.modules.channelGenericNoiseAdder.channelGenericNoiseAdder()
+        noise_adder.begin(seed=1)
+        station = get_station(n_channels)
+        noise_adder.run(event, station, None, **kwargs)
+        noise_adder.begin(seed=1)
+        station_previous = get_station(n_channels)
+        add_noise_previous(noise_adder, station_previous, **kwargs)
+        testing.assert_allclose(station.get_channel_traces(), station_previous.get_channel_traces(), rtol=1e-12)
+
+        t = {}
+        for name, function in [('previous', add_noise_previous), ('batched', noise_adder.run)]:
+            stations = [get_station(n_channels) for i in range(50)]
+            t_start = time.time()
+            for station in stations:
+                if name == 'previous':
+                    function(noise_adder, station, **kwargs)
+                else:
+                    function(event, station, None, **kwargs)
+            t[name] = (time.time() - t_start) / len(stations)
+        print(f"{n_channels:2d} channels, {type:13s}: previous {t['previous'] * 1e3:.2f}ms, batched {t['batched'] * 1e3:.2f}ms "
+              f"-> speedup {t['previous'] / t['batched']:.1f}x")
@@ -0,0 +1,73 @@
+from NuRadioReco.modules.phasedarray.triggerSimulator import triggerSimulator
+import numpy as np
+from numpy import testing
+import time
+
+"""
+benchmark of the beamforming and the power integration of the phased array trigger, which process all beams at
+once, compared to the previous implementation that rolled and summed the traces and integrated the power beam
+by beam (copied below). The benchmark asserts that both give identical results.
+"""
+
+rng = np.random.default_rng(1)
+trigger_simulator = triggerSimulator()
+
+
+def phase_signals_previous(traces, beam_rolls):
+    phased_traces = [[] for i in range(len(beam_rolls))]
+
+    running_i = 0
+    for subbeam_rolls in beam_rolls:
+
+        phased_trace = np.zeros(len(list(traces.values())[0]))
+        for channel_id in traces:
+
+            trace = traces[channel_id]
+            phased_trace += np.roll(trace, subbeam_rolls[channel_id])
+
+        phased_traces[running_i] = phased_trace
+        running_i += 1
+
+    return phased_traces
+
+
+def power_sum_previous(coh_sum, window, step):
+    num_frames = int(np.floor((len(coh_sum) - window) / step))
+    coh_sum_squared = (coh_sum * coh_sum).astype(float)
+    coh_sum_windowed = np.lib.stride_tricks.as_strided(coh_sum_squared, (num_frames, window),
+                                                       (coh_sum_squared.strides[0] * step, coh_sum_squared.strides[0]))
+    power = np.sum(coh_sum_windowed, axis=1)
+    return power.astype(float) / window, num_frames
+
+
+def trigger_previous(traces, beam_rolls, window, step):
+    phased_traces = phase_signals_previous(traces, beam_rolls)
+    return [power_sum_previous(phased_trace, window, step)[0] for phased_trace in phased_traces]
+
+
+def trigger(traces, beam_rolls, window, step):
+    phased_traces = trigger_simulator.phase_signals(traces, beam_rolls)
+    return trigger_simulator.power_sum(phased_traces, window, step)[0]
+
+
+def benchmark(function, n_repetitions):
+    t_start = time.time()
+    for i in range(n_repetitions):
+        function()
+    return (time.time() - t_start) / n_repetitions
+
+
+for n_beams in [11, 30]:
+    for n_channels in [4, 8]:
+        for n_samples in [1024, 4096]:
+            # digitized (integer valued) traces, the rolls of the beams are negative as in calculate_time_delays
+            traces = {channel_id: np.floor(rng.normal(0, 3, n_samples)) for channel_id in range(n_channels)}
+            beam_rolls = [dict(zip(range(n_channels), -rng.integers(0, 8 * n_channels, n_channels)))
+                          for i in range(n_beams)]
+            power = trigger(traces, beam_rolls, 32, 16)
+            power_previous = trigger_previous(traces, beam_rolls, 32, 16)
+            testing.assert_equal(power, np.array(power_previous))
+            t_previous = benchmark(lambda: trigger_previous(traces, beam_rolls, 32, 16), 50)
+            t_new = benchmark(lambda: trigger(traces, beam_rolls, 32, 16), 50)
+            print(f"{n_beams:2d} beams, {n_channels} channels, {n_samples:4d} samples: previous {t_previous * 1e3:6.2f}ms, "
+                  f"new {t_new * 1e3:6.2f}ms -> speedup {t_previous / t_new:.1f}x")
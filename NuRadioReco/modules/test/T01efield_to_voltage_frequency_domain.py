@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+import NuRadioReco.modules.efieldToVoltageConverter
+import NuRadioReco.framework.event
+import NuRadioReco.framework.station
+import NuRadioReco.framework.sim_station
+import NuRadioReco.framework.electric_field
+from NuRadioReco.framework.parameters import electricFieldParameters as efp
+from NuRadioReco.detector import generic_detector
+from NuRadioReco.utilities import units
+import numpy as np
+from numpy import testing
+import datetime
+
+"""
+tests that the frequency domain summation of the efieldToVoltageConverter (`frequency_domain_summation=True`)
+gives the same voltage traces as the default time domain summation for a station with several electric fields
+(e.g. a direct and a reflected ray) per channel
+"""
+
+station_id = 101
+channel_ids = [0, 1, 2]
+detector_description = {
+    'stations': {'1': {'station_id': station_id, 'pos_altitude': 0, 'pos_easting': 0, 'pos_northing': 0,
+                       'pos_site': 'southpole', 'commission_time': '{TinyDate}:2017-11-04T00:00:00',
+                       'decommission_time': '{TinyDate}:2038-01-01T00:00:00'}},
+    'channels': {str(channel_id): {'station_id': station_id, 'channel_id': channel_id, 'ant_type': 'analytic_LPDA',
+                                   'ant_position_x': 3. * channel_id, 'ant_position_y': 0, 'ant_position_z': -1.,
+                                   'ant_orientation_phi': 0, 'ant_orientation_theta': 180,
+                                   'ant_rotation_phi': 90. * channel_id, 'ant_rotation_theta': 90,
+                                   'cab_time_delay': 19.8 + channel_id, 'adc_sampling_frequency': 1.,
+                                   'adc_n_samples': 256, 'amp_type': '100',
+                                   'commission_time': '{TinyDate}:2017-11-01T00:00:00',
+                                   'decommission_time': '{TinyDate}:2038-01-01T00:00:00'}
+                 for channel_id in channel_ids}}
+det = generic_detector.GenericDetector(json_filename=None, source='dictionary', dictionary=detector_description)
+det.update(datetime.datetime(2020, 1, 1))
+
+
+def get_event():
+    event = NuRadioReco.framework.event.Event(1, 1)
+    station = NuRadioReco.framework.station.Station(station_id)
+    sim_station = NuRadioReco.framework.sim_station.SimStation(station_id)
+    sim_station.set_is_neutrino()
+    rng = np.random.default_rng(1)
+    sampling_rate = 5 * units.GHz
+    n_samples = 512
+    times = np.arange(n_samples) / sampling_rate
+    for channel_id in channel_ids:
+        # a direct and a reflected pulse with start times that are not multiples of the sampling
+        for ray_path_type, start_time, zenith in [('direct', 100.3 * units.ns, 120 * units.deg),
+                                                  ('reflected', 163.77 * units.ns, 60 * units.deg)]:
+            electric_field = NuRadioReco.framework.electric_field.ElectricField([channel_id], position=None,
+                                                                                shower_id=0, ray_tracing_id=0)
+            trace = np.zeros((3, n_samples))
+            pulse = np.exp(-0.5 * ((times - 30 * units.ns) / (0.5 * units.ns)) ** 2) * \
+                np.sin(2 * np.pi * 250 * units.MHz * times)
+            trace[1] = rng.uniform(0.5, 1) * pulse * units.mV / units.m
+            trace[2] = rng.uniform(-0.5, 0.5) * pulse * units.mV / units.m
+            electric_field.set_trace(trace, sampling_rate)
+            electric_field.set_trace_start_time(start_time + 2.1 * channel_id * units.ns)
+            electric_field[efp.ray_path_type] = ray_path_type
+            electric_field[efp.zenith] = zenith
+            electric_field[efp.azimuth] = 30 * units.deg
+            sim_station.add_electric_field(electric_field)
+    station.set_sim_station(sim_station)
+    event.set_station(station)
+    return event, station
+
+
+traces = {}
+for frequency_domain_summation in [False, True]:
+    converter = NuRadioReco.modules.efieldToVoltageConverter.efieldToVoltageConverter()
+    converter.begin(frequency_domain_summation=frequency_domain_summation)
+    event, station = get_event()
+    converter.run(event, station, det)
+    traces[frequency_domain_summation] = {channel.get_id(): (channel.get_trace_start_time(), channel.get_trace())
+                                          for channel in station.iter_channels()}
+
+testing.assert_equal(sorted(traces[True].keys()), channel_ids)
+for channel_id in channel_ids:
+    start_time, trace = traces[False][channel_id]
+    start_time_fd, trace_fd = traces[True][channel_id]
+    testing.assert_equal(start_time_fd, start_time)
+    testing.assert_equal(trace_fd.shape, trace.shape)
+    testing.assert_array_less(1e-3 * units.mV, np.max(np.abs(trace)))
+    testing.assert_allclose(trace_fd, trace, rtol=0, atol=1e-6 * np.max(np.abs(trace)))
+
+print('efieldToVoltageConverter frequency domain summation test passed without any issues!')
@@ -1,6 +1,7 @@
 from NuRadioReco.modules.base.module import register_run
 from NuRadioReco.utilities import units
 from NuRadioReco.framework.parameters import stationParameters as stnp
+import NuRadioReco.framework.base_trace
 from NuRadioReco.framework.trigger import HighLowTrigger
 import numpy as np
 import time
@@ -142,6 +143,8 @@ class triggerSimulator:
         sampling_rate = station.get_channel(station.get_channel_ids()[0]).get_sampling_rate()
         channels_that_passed_trigger = []
         if not set_not_triggered:
+            # the time traces of all triggered channels are calculated at once
+            NuRadioReco.framework.base_trace.update_time_domain(station.iter_channels(use_channels=triggered_channels))
             triggerd_bins_channels = []
             dt = 1. / sampling_rate
             if triggered_channels is None:
@@ -156,7 +159,7 @@ class triggerSimulator:
                     continue
                 if channel.get_trace_start_time() != channel_trace_start_time:
                     logger.warning('Channel has a trace_start_time that differs from the other channels. The trigger simulator may not work properly')
-                trace = channel.get_trace()
+                trace = channel.get_trace(copy=False)
                 if(isinstance(threshold_high, dict)):
                     threshold_high_tmp = threshold_high[channel_id]
                 else:
@@ -178,7 +181,7 @@ class triggerSimulator:
             max_signal = 0
             if(has_triggered):
                 for channel in station.iter_channels():
-                    max_signal = max(max_signal, np.abs(channel.get_trace()[triggered_bins]).max())
+                    max_signal = max(max_signal, np.abs(channel.get_trace(copy=False)[triggered_bins]).max())
                 station.set_parameter(stnp.channels_max_amplitude, max_signal)
         else:
             logger.info("set_not_triggered flag True, setting triggered to False.")
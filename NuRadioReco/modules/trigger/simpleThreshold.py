@@ -1,6 +1,7 @@
 from NuRadioReco.modules.base.module import register_run
 from NuRadioReco.utilities import units
 from NuRadioReco.framework.parameters import stationParameters as stnp
+import NuRadioReco.framework.base_trace
 from NuRadioReco.framework.trigger import SimpleThresholdTrigger
 from NuRadioReco.modules.trigger.highLowThreshold import get_majority_logic
 import numpy as np
@@ -83,6 +84,8 @@ class triggerSimulator:
         else:
             channel_trace_start_time = station.get_channel(triggered_channels[0]).get_trace_start_time()
         channels_that_passed_trigger = []
+        # the time traces of all triggered channels are calculated at once
+        NuRadioReco.framework.base_trace.update_time_domain(station.iter_channels(use_channels=triggered_channels))
         for channel in station.iter_channels():
             channel_id = channel.get_id()
             if triggered_channels is not None and channel_id not in triggered_channels:
@@ -90,7 +93,7 @@ class triggerSimulator:
                 continue
             if channel.get_trace_start_time() != channel_trace_start_time:
                 self.logger.warning('Channel has a trace_start_time that differs from the other channels. The trigger simulator may not work properly')
-            trace = channel.get_trace()
+            trace = channel.get_trace(copy=False)
             if(isinstance(threshold, dict)):
                 threshold_tmp = threshold[channel_id]
             else:
@@ -106,7 +109,7 @@ class triggerSimulator:
         max_signal = 0
         if(has_triggered):
             for channel in station.iter_channels():
-                max_signal = max(max_signal, np.abs(channel.get_trace()[triggered_bins]).max())
+                max_signal = max(max_signal, np.abs(channel.get_trace(copy=False)[triggered_bins]).max())
             station.set_parameter(stnp.channels_max_amplitude, max_signal)
         trigger = SimpleThresholdTrigger(trigger_name, threshold, triggered_channels,
                                          number_concidences)
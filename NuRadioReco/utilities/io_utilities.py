@@ -1,4 +1,9 @@
 import pickle
+import os
+import json
+import hashlib
+import logging
+logger = logging.getLogger('NuRadioReco.io_utilities')
 
 
 def read_pickle(filename, encoding='latin1'):
@@ -21,3 +26,51 @@ def read_pickle(filename, encoding='latin1'):
     except:
         with open(filename, 'rb') as file:
             return pickle.load(file, encoding=encoding)
+
+
+def get_sha1(filename, use_cache=True):
+    """
+    Returns the sha1 hash sum of a file
+
+    Hashing a large file (e.g. an antenna model) takes a significant time. Therefore, the hash sum is stored
+    together with the size and the modification time of the file in the sidecar file `<filename>.sha1`.
+    As long as the size and modification time of the file do not change, the hash sum is read from the
+    sidecar file instead of being recalculated.
+
+    Parameters
+    ----------
+    filename: string
+        Name of the file
+    use_cache: bool
+        if False, the hash sum is always calculated (and the sidecar file is updated)
+    """
+    stat = os.stat(filename)
+    sidecar_filename = filename + '.sha1'
+    if use_cache and os.path.exists(sidecar_filename):
+        try:
+            with open(sidecar_filename, 'r') as fin:
+                cache = json.load(fin)
+            if cache['size'] == stat.st_size and cache['mtime_ns'] == stat.st_mtime_ns:
+                return cache['sha1']
+        except (OSError, ValueError, KeyError):
+            logger.warning("the sha1 cache file {} can not be read, recalculating the hash sum".format(sidecar_filename))
+
+    BUF_SIZE = 65536 * 2 ** 4  # lets read stuff in 64kb chunks!
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        while True:
+            data = f.read(BUF_SIZE)
+            if not data:
+                break
+            sha1.update(data)
+    hexdigest = sha1.hexdigest()
+
+    # write the cache atomically, several processes might hash the same file at the same time
+    try:
+        tmp_filename = "{}.{}.tmp".format(sidecar_filename, os.getpid())
+        with open(tmp_filename, 'w') as fout:
+            json.dump({'sha1': hexdigest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}, fout)
+        os.replace(tmp_filename, sidecar_filename)
+    except OSError:
+        logger.debug("the sha1 cache file {} can not be written".format(sidecar_filename))
+    return hexdigest
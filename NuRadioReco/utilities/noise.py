@@ -1,14 +1,19 @@
 import numpy as np
 from NuRadioReco.modules import channelGenericNoiseAdder
 from NuRadioReco.utilities import units, fft
-from NuRadioReco.modules.trigger.highLowThreshold import get_high_low_triggers
+from NuRadioReco.modules.trigger.highLowThreshold import get_high_low_triggers, get_majority_logic
 from NuRadioReco.detector import generic_detector as detector
 from scipy import constants
 import datetime
 import scipy
 import scipy.signal
+from scipy.special import logsumexp
 import copy
 import time
+import itertools
+import os
+import json
+import hashlib
 
 import logging
 logger = logging.getLogger('noiseTriggerSimulation')
@@ -113,6 +118,68 @@ def rolled_sum_slicing(traces, rolling):
     return sumtr
 
 
+def get_importance_sampling_kernel(n_samples, sampling_rate, amplitude, filt, min_freq=None, max_freq=None):
+    """
+    returns the variance of filtered thermal noise and the spectrum of the mean shift that is used for importance
+    sampling of noise triggers
+
+    The noise is assumed to be generated with `channelGenericNoiseAdder.bandlimited_noise` (noise type "rayleigh",
+    i.e., Gaussian noise) and filtered with `filt`. Shifting the mean of the unfiltered noise by
+    `a * shift_spectrum` (delayed by t0) shifts the mean of the filtered noise by `a * rho(t - t0)`, where `rho` is
+    the autocorrelation function of the filtered noise normalized to `rho(0) = 1`. This is the most likely shape
+    of a fluctuation of the filtered noise that reaches the value `a` at t0, and the likelihood ratio of noise
+    with and without the shift only depends on the value of the filtered noise at t0:
+    `p(x) / q(x) = exp(-a * x(t0) / variance + a ** 2 / (2 * variance))`.
+
+    Parameters
+    ----------
+    n_samples: int
+        the number of samples of the noise traces
+    sampling_rate: float
+        the sampling rate
+    amplitude: float
+        the amplitude of the noise generation (see `channelGenericNoiseAdder.bandlimited_noise`)
+    filt: array of complex values
+        the filter that is applied after the noise generation
+    min_freq: float or None (default)
+        the minimum frequency of the noise generation
+    max_freq: float or None (default)
+        the maximum frequency of the noise generation
+
+    Returns
+    -------
+    variance: float
+        the variance of a sample of the filtered noise
+    shift_spectrum: array of complex values
+        the spectrum (before filtering) of the mean shift for `a = 1` and `t0 = 0`
+    """
+    frequencies = np.fft.rfftfreq(n_samples, 1. / sampling_rate)
+    # the same frequency range as in the noise generation
+    if min_freq is None or min_freq == 0:
+        min_freq = 0.5 * (frequencies[2] - frequencies[1])
+    if max_freq is None:
+        max_freq = max(frequencies)
+    selection = (frequencies >= min_freq) & (frequencies <= max_freq)
+    sigscale = (1. * n_samples) / np.sqrt(np.sum(selection))
+    # only the frequency bins with random phases contribute to the (zero mean) noise
+    random_bins = np.zeros_like(selection)
+    random_bins[1:(n_samples - 1) // 2 + 1] = True
+    power = np.where(selection & random_bins, (amplitude * sigscale / sampling_rate) ** 2, 0)
+    power_filtered = power * np.abs(filt) ** 2
+    variance = np.fft.irfft(power_filtered, n=n_samples)[0] * sampling_rate ** 2 / (2 * n_samples)
+    autocorrelation = fft.freq2time(power_filtered, sampling_rate, n=n_samples)
+    shift_spectrum = power * np.conj(filt) / autocorrelation[0]
+    return variance, shift_spectrum
+
+
+def log_cosh(x):
+    """
+    numerically stable logarithm of the hyperbolic cosine
+    """
+    x = np.abs(x)
+    return x + np.log1p(np.exp(-2 * x)) - np.log(2)
+
+
 class thermalNoiseGenerator():
 
     def __init__(self, n_samples, sampling_rate, Vrms, threshold, time_coincidence, n_majority, time_coincidence_majority,
@@ -223,6 +290,268 @@ class thermalNoiseGenerator():
                     traces[iCh] = fft.freq2time(spec * self.filt, self.sampling_rate)
         return traces
 
+    def generate_noise_importance_sampling(self, shift_amplitude=None):
+        """
+        generates noise traces for all channels that cause a high/low majority logic trigger using importance
+        sampling
+
+        Instead of regenerating noise until a trigger occurs by chance (see `generate_noise`), the noise of
+        `n_majority` randomly chosen channels is biased towards a high/low threshold crossing. The most likely
+        shape of a noise fluctuation that reaches +shift_amplitude and, a few bins later, -shift_amplitude is a
+        combination of two autocorrelation functions of the filtered noise (see `get_importance_sampling_kernel`),
+        where the delay between the two is the most negative lobe of the autocorrelation function within the
+        high/low coincidence window. It is added with a random sign at a random time t0 (plus a random offset
+        within the majority coincidence window per channel). The traces are weighted with the likelihood ratio of
+        the unbiased noise and the mixture of all biased noise distributions, which can be calculated from the
+        traces. The trigger probability of a noise trace is estimated without bias as the sum of the weights of the
+        triggered traces divided by the total number of trials, i.e., `sum(weights) / sum(n_trials)` over several
+        calls.
+
+        Only Gaussian noise (noise_type "rayleigh") is supported. The traces are rolled such that the trigger
+        happens at `trigger_time`, like for `generate_noise`.
+
+        Parameters
+        ----------
+        shift_amplitude: float or None (default)
+            the amplitude of the fluctuation that is added to the noise. If None, the threshold is used.
+            Larger values increase the fraction of triggered trials but also the spread of the weights.
+
+        Returns
+        -------
+        traces: np.array of shape (n_channels, n_samples)
+            the noise traces
+        weight: float
+            the likelihood ratio of the traces
+        n_trials: int
+            the number of generated noise realizations until the trigger condition was fulfilled
+        """
+        if self.noise_type != "rayleigh":
+            raise ValueError(f"importance sampling requires Gaussian noise (noise_type 'rayleigh'), not '{self.noise_type}'")
+        if shift_amplitude is None:
+            shift_amplitude = self.threshold
+        variance, shift_spectrum = get_importance_sampling_kernel(self.n_samples, self.sampling_rate, self.amplitude,
+                                                                  self.filt, self.min_freq, self.max_freq)
+        autocorrelation = fft.freq2time(shift_spectrum * self.filt, self.sampling_rate, n=self.n_samples)
+        n_bins_coincidence = max(int(np.round(self.time_coincidence / self.dt)), 1)
+        lag = np.argmin(autocorrelation[1:n_bins_coincidence + 1]) + 1
+        # the coefficients of the two autocorrelation functions so that the mean reaches +/- shift_amplitude
+        coefficient = shift_amplitude / (1 - autocorrelation[lag])
+        energy = 2 * coefficient ** 2 * (1 - autocorrelation[lag])
+        delays = -2j * np.pi * np.arange(len(self.ff)) / self.n_samples
+        template = coefficient * shift_spectrum * (1 - np.exp(delays * lag))
+        n_bins_majority = int(np.round(self.time_coincidence_majority / self.dt))
+        n_trials = 0
+        while True:
+            n_trials += 1
+            spec = self.noise.bandlimited_noise_multi_channel(self.min_freq, self.max_freq, self.n_samples,
+                                                              self.sampling_rate, np.full(self.n_channels, self.amplitude),
+                                                              self.noise_type, time_domain=False)
+            channels = np.random.choice(self.n_channels, self.n_majority, replace=False)
+            shift_times = np.random.randint(self.n_samples) + np.random.randint(0, n_bins_majority + 1, self.n_majority)
+            signs = np.random.choice([-1., 1.], self.n_majority)
+            spec[channels] += signs[:, np.newaxis] * template * np.exp(delays * shift_times[:, np.newaxis])
+            traces = fft.freq2time(spec * self.filt, self.sampling_rate, n=self.n_samples)
+            triggered_bins = [get_high_low_triggers(trace, self.threshold, -self.threshold, self.time_coincidence,
+                                                    self.dt) for trace in traces]
+            is_triggered, triggered_bins, triggered_times = get_majority_logic(
+                triggered_bins, self.n_majority, self.time_coincidence_majority, self.dt)
+            if is_triggered:
+                break
+
+        # the likelihood ratio of the mixture of all shift times, offsets, signs and channels
+        projection = coefficient * (traces - np.roll(traces, -lag, axis=1))
+        log_g = log_cosh(projection / variance) - 0.5 * energy / variance
+        # average over the offsets within the coincidence window
+        log_h = logsumexp([np.roll(log_g, -offset, axis=1) for offset in range(n_bins_majority + 1)], axis=0) - \
+            np.log(n_bins_majority + 1)
+        log_q = [logsumexp(np.sum(log_h[list(subset)], axis=0)) for subset in
+                 itertools.combinations(range(self.n_channels), self.n_majority)]
+        log_weight = -(logsumexp(log_q) - np.log(len(log_q) * self.n_samples))
+
+        if self.keep_full_band:
+            traces = fft.freq2time(spec, self.sampling_rate, n=self.n_samples)
+        # the weight does not depend on a circular shift of the traces
+        traces = np.roll(traces, self.trigger_bin - triggered_bins[0], axis=-1)
+        return traces, np.exp(log_weight), n_trials
+
+
+class thermalNoiseBank():
+
+    def __init__(self, n_samples, sampling_rate, amplitude, n_blocks, filt=None, min_freq=0 * units.MHz,
+                 max_freq=None, noise_type="rayleigh", filename=None, seed=None, chunk_size=100):
+        """
+        A bank of precomputed (filtered) thermal noise blocks from which noise trials are drawn
+
+        Generating band-limited noise (random numbers + inverse FFT) dominates the run time of noise trigger rate
+        studies. The bank generates `n_blocks` blocks of filtered noise once. A noise trace of a channel is then
+        obtained by picking a random block, shifting it circularly by a random number of samples and flipping its
+        sign at random. Traces that are longer than one block are concatenated from several blocks. Within one call
+        of `get_noise`, all channels (and all concatenated segments) use different blocks, so that the channels of
+        a trial are uncorrelated.
+
+        Correlation limits: the trials are only approximately independent.
+
+        * The noise is generated in the frequency domain and is therefore periodic in the block length, so a
+          circular shift gives a valid noise realization with the same spectrum. However, trials that use the
+          same block are the same realization at a different time (and sign). A large fluctuation in a block
+          appears in every trial that uses the block with a shift that contains the fluctuation.
+        * A single channel therefore never sees more than `n_blocks * n_samples` different noise samples. For a
+          single-channel threshold trigger, probabilities per trigger window below roughly
+          `window / (n_blocks * n_samples)` are dominated by the few largest fluctuations in the bank, and the
+          estimate does not improve with more trials.
+        * For multi-channel triggers (coincidences, phased arrays), a trial is a combination of independent
+          blocks, shifts and signs of all channels, i.e., the number of distinct combinations grows as
+          `(2 * n_blocks * n_samples) ** n_channels`. The trigger rate estimate is unbiased, but its statistical
+          uncertainty is larger than for the same number of trials of fresh noise, because single-channel
+          fluctuations are reused. Use a bank that is much larger than the number of triggers that are expected.
+        * At the junction of two concatenated blocks, the noise is not correlated over the length of the
+          impulse response of the filter. Use blocks that are at least as long as the trials to avoid junctions.
+
+        The blocks can be stored in a .npy file that is memory-mapped, so that banks larger than the available
+        memory can be used and several processes share the same bank (via the page cache). The parameters of the
+        bank are stored in a json file next to it; an existing bank is only reused if its parameters agree.
+
+        Parameters
+        ----------
+        n_samples: int
+            the number of samples of one block
+        sampling_rate: float
+            the sampling rate
+        amplitude: float
+            the amplitude of the noise before filtering (see `channelGenericNoiseAdder.bandlimited_noise`)
+        n_blocks: int
+            the number of blocks in the bank
+        filt: array of complex values or None (default)
+            the filter that is applied to the noise (needs to match the frequency binning of a block).
+            If None, the noise is not filtered.
+        min_freq: float (default 0)
+            the minimum frequency of the noise generation
+        max_freq: float or None (default)
+            the maximum frequency of the noise generation. If None, the Nyquist frequency is used.
+        noise_type: string
+            the type of the noise, can be
+            * "rayleigh" (default)
+            * "perfect_white"
+        filename: string or None (default)
+            the .npy file of the bank. If the file exists and was created with the same parameters, the bank is
+            memory-mapped from the file. Otherwise the bank is generated and written to the file.
+            If None, the bank is generated in memory.
+        seed: None, int or numpy.random.SeedSequence
+            the seed of the noise generation and of the random draws of the trials
+        chunk_size: int (default 100)
+            the number of blocks that are generated at once
+        """
+        self.n_samples = n_samples
+        self.sampling_rate = sampling_rate
+        self.n_blocks = n_blocks
+        self.ff = np.fft.rfftfreq(self.n_samples, 1. / self.sampling_rate)
+        if filt is not None and len(filt) != len(self.ff):
+            raise ValueError(f"Frequency filter supplied has {len(filt)} bins. It should match the frequency binning "
+                             f"of a block of {len(self.ff)} bins")
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        # independent random number streams for the generation of the blocks and for the draws of the trials
+        seed_generation, seed_draws = seed.spawn(2)
+        self.__random_generator = np.random.Generator(np.random.Philox(seed_draws))
+        self.__n_trials = 0
+        self.__n_samples_drawn = 0
+
+        parameters = {'n_samples': int(n_samples), 'sampling_rate': float(sampling_rate),
+                      'amplitude': float(amplitude), 'n_blocks': int(n_blocks),
+                      'min_freq': None if min_freq is None else float(min_freq),
+                      'max_freq': None if max_freq is None else float(max_freq), 'noise_type': noise_type,
+                      'filter_sha1': None if filt is None else
+                      hashlib.sha1(np.ascontiguousarray(filt, dtype=complex).tobytes()).hexdigest()}
+        if filename is not None and os.path.exists(filename) and os.path.exists(filename + '.json'):
+            with open(filename + '.json', 'r') as fin:
+                if json.load(fin) == parameters:
+                    logger.info(f"memory-mapping noise bank {filename}")
+                    self.__blocks = np.load(filename, mmap_mode='r')
+                    return
+            logger.warning(f"the noise bank {filename} was created with different parameters, it is generated again")
+
+        noise = channelGenericNoiseAdder.channelGenericNoiseAdder()
+        noise.set_seed(seed_generation)
+        if filename is None:
+            self.__blocks = np.empty((n_blocks, n_samples))
+        else:
+            tmp_suffix = ".{}.tmp".format(os.getpid())
+            self.__blocks = np.lib.format.open_memmap(filename + tmp_suffix, mode='w+', dtype=float,
+                                                      shape=(n_blocks, n_samples))
+        for i_block in range(0, n_blocks, chunk_size):
+            n_chunk = min(chunk_size, n_blocks - i_block)
+            spec = noise.bandlimited_noise_multi_channel(min_freq, max_freq, n_samples, sampling_rate,
+                                                         np.full(n_chunk, amplitude), noise_type, time_domain=False)
+            if filt is not None:
+                spec *= filt
+            self.__blocks[i_block:i_block + n_chunk] = fft.freq2time(spec, sampling_rate, n=n_samples)
+        if filename is not None:
+            self.__blocks.flush()
+            del self.__blocks
+            os.replace(filename + tmp_suffix, filename)
+            # the parameters are written last, they mark the bank as complete
+            with open(filename + '.json' + tmp_suffix, 'w') as fout:
+                json.dump(parameters, fout)
+            os.replace(filename + '.json' + tmp_suffix, filename + '.json')
+            self.__blocks = np.load(filename, mmap_mode='r')
+        logger.info(f"generated noise bank of {n_blocks} blocks with {n_samples} samples")
+
+    def get_blocks(self):
+        """
+        returns the (read-only) array of noise blocks of shape (n_blocks, n_samples)
+        """
+        return self.__blocks
+
+    def get_noise(self, n_channels, n_samples=None):
+        """
+        draws noise traces from the bank
+
+        Each channel uses different blocks, random circular shifts and random signs (see class docstring for the
+        correlation between trials).
+
+        Parameters
+        ----------
+        n_channels: int
+            the number of channels
+        n_samples: int or None (default)
+            the number of samples of the traces. Traces longer than one block are concatenated from several blocks.
+            If None, the number of samples of a block is used.
+
+        Returns
+        -------
+        traces: np.array of shape (n_channels, n_samples)
+        """
+        if n_samples is None:
+            n_samples = self.n_samples
+        n_segments = -(-n_samples // self.n_samples)
+        if n_channels * n_segments > self.n_blocks:
+            raise ValueError(f"the noise bank has {self.n_blocks} blocks, but {n_channels * n_segments} different "
+                             f"blocks are needed for {n_channels} channels with {n_samples} samples")
+        i_blocks = self.__random_generator.choice(self.n_blocks, n_channels * n_segments, replace=False)
+        # the shifts and signs are drawn with a single call
+        shifts, signs = self.__random_generator.integers(0, [self.n_samples, 2], (n_channels * n_segments, 2)).T
+        if n_segments == 1:
+            i_samples = (shifts[:, np.newaxis] + np.arange(n_samples)) % self.n_samples
+            traces = self.__blocks[i_blocks[:, np.newaxis], i_samples]
+        else:
+            # sample j of a trace is taken from segment j // n_samples at the shifted position j % n_samples
+            i_segments = np.arange(n_channels)[:, np.newaxis] * n_segments + np.arange(n_samples) // self.n_samples
+            i_samples = (shifts[i_segments] + np.arange(n_samples) % self.n_samples) % self.n_samples
+            traces = self.__blocks[i_blocks[i_segments], i_samples]
+            signs = signs[i_segments]
+        traces *= (2. * signs - 1.).reshape(n_channels, -1)
+        self.__n_trials += 1
+        self.__n_samples_drawn += n_channels * n_samples
+        return traces
+
+    def get_statistics(self):
+        """
+        returns the number of trials and of samples that were drawn from the bank, and the number of samples in the
+        bank. The ratio of the samples drawn and the samples in the bank is the average reuse of a noise sample.
+        """
+        return {'trials': self.__n_trials, 'samples_drawn': self.__n_samples_drawn,
+                'samples_in_bank': self.n_blocks * self.n_samples}
+
 
 from NuRadioReco.modules.analogToDigitalConverter import perfect_floor_comparator
 
@@ -236,7 +565,7 @@ class thermalNoiseGeneratorPhasedArray():
                  upsampling=2, window_length=16 * units.ns, step_size=8 * units.ns,
                  main_low_angle=np.deg2rad(-59.54968597864437), 
                  main_high_angle=np.deg2rad(59.54968597864437),
-                 n_beams=11, quantize=True):
+                 n_beams=11, quantize=True, noise_bank_size=None, noise_bank_filename=None):
         """
         Efficient algorithms to generate thermal noise fluctuations that fulfill a phased array trigger
 
@@ -284,6 +613,11 @@ class thermalNoiseGeneratorPhasedArray():
             number of beams to calculate
         quantize: bool, default True
             If set to true, the conversion to and from ADC will be performed to mimic digitizations
+        noise_bank_size: int, default None
+            If set, the noise is not generated for every trial, but drawn from a bank of `noise_bank_size`
+            precomputed blocks of filtered noise (see `thermalNoiseBank` for the correlation between the trials)
+        noise_bank_filename: string, default None
+            the .npy file in which the noise bank is stored (and from which it is memory-mapped)
         """
         logger.setLevel(log_level)
         self.debug = False
@@ -321,7 +655,7 @@ class thermalNoiseGeneratorPhasedArray():
 
         phasing_angles = np.arcsin(np.linspace(np.sin(main_low_angle), np.sin(main_high_angle), n_beams))
         cspeed = constants.c * units.m / units.s
-        self.beam_time_delays = np.zeros((len(phasing_angles), self.n_channels), dtype=np.int)
+        self.beam_time_delays = np.zeros((len(phasing_angles), self.n_channels), dtype=int)
         for iBeam, angle in enumerate(phasing_angles):
 
             delays = []
@@ -379,23 +713,42 @@ class thermalNoiseGeneratorPhasedArray():
                                                   self.sampling_rate * self.upsampling,
                                                   self.amplitude, self.noise_type)
 
-    def __generation(self):
-        """ separated trace generation part for PA noise trigger """
+        self.noise_bank = None
+        if noise_bank_size is not None:
+            self.noise_bank = thermalNoiseBank(self.n_samples * self.upsampling, self.sampling_rate * self.upsampling,
+                                               self.amplitude, noise_bank_size, filt=self.filt, min_freq=self.min_freq,
+                                               max_freq=self.max_freq, noise_type=self.noise_type,
+                                               filename=noise_bank_filename)
 
-        for iCh in range(self.n_channels):
-            # spec = self.noise.bandlimited_noise(self.min_freq, self.max_freq, self.n_samples * self.upsampling,
-            #                                    self.sampling_rate * self.upsampling,
-            #                                    self.amplitude, self.noise_type, time_domain=False)
+    def __generation(self, shift=None):
+        """
+        separated trace generation part for PA noise trigger
 
-            # function that does not re-calculate parameters in each simulated trace
-            spec = self.noise.bandlimited_noise_from_precalculated_parameters(self.noise_type, time_domain=False)
-            spec *= self.filt
-            trace = fft.freq2time(spec, self.sampling_rate * self.upsampling)
+        If `shift` is given, it is added to the noise before the quantization and the (analog) noise is kept in
+        `self._analog_traces` (used for importance sampling).
+        """
 
-            if self.quantize:
-                self._traces[iCh] = perfect_floor_comparator(trace, self.adc_n_bits, self.adc_ref_voltage)
-            else:
-                self._traces[iCh] = trace
+        if self.noise_bank is not None:
+            traces = self.noise_bank.get_noise(self.n_channels)
+        else:
+            traces = np.empty_like(self._traces)
+            for iCh in range(self.n_channels):
+                # spec = self.noise.bandlimited_noise(self.min_freq, self.max_freq, self.n_samples * self.upsampling,
+                #                                    self.sampling_rate * self.upsampling,
+                #                                    self.amplitude, self.noise_type, time_domain=False)
+
+                # function that does not re-calculate parameters in each simulated trace
+                spec = self.noise.bandlimited_noise_from_precalculated_parameters(self.noise_type, time_domain=False)
+                spec *= self.filt
+                traces[iCh] = fft.freq2time(spec, self.sampling_rate * self.upsampling)
+
+        if shift is not None:
+            traces += shift
+            self._analog_traces = traces
+        if self.quantize:
+            self._traces[:] = perfect_floor_comparator(traces, self.adc_n_bits, self.adc_ref_voltage)
+        else:
+            self._traces[:] = traces
 
     def __phasing(self):
         """ separated phasing part for PA noise trigger """
@@ -487,6 +840,25 @@ class thermalNoiseGeneratorPhasedArray():
                 return True, triggered_bin, iBeam
         return False, None, None
 
+    def __cut_triggered_traces(self, triggered_bin):
+        """ downsamples the traces and cuts them around the triggered bin """
+
+        triggered_bin = triggered_bin // self.upsampling  # the trace is cut in the downsampled version. Therefore, triggered bin is factor of two smaller. 
+        i_low = triggered_bin - self.pre_trigger_bins
+        i_high = i_low + self.n_samples_trigger
+
+        # traces need to be downsampled
+        # resample and use axis -1 since trace might be either shape (N) for analytic trace or shape (3,N) for E-field
+        self._traces = scipy.signal.resample(self._traces, np.shape(self._traces)[-1] // self.upsampling, axis=-1)
+
+        if (i_low >= 0) and (i_high < self.n_samples): # If range is directly a subset of the waveform
+            return self._traces[:, i_low:i_high], self._phased_traces
+
+        # Otherwise, roll the waveforms. Safe as long as noise is generated in the freq domain
+        self._phased_traces = np.roll(self._phased_traces, -i_low * self.upsampling, axis=-1)
+        self._traces = np.roll(self._traces, -i_low, axis=-1)
+        return self._traces[:, :self.n_samples_trigger], self._phased_traces
+
     def generate_noise(self, phasing_mode="slice", trigger_mode="binned_sum", debug=False):
         """
         generates noise traces for all channels that will cause a high/low majority logic trigger
@@ -556,21 +928,70 @@ class thermalNoiseGeneratorPhasedArray():
             dt_triggering += time.process_time() - tstart
 
             if is_triggered:
-                triggered_bin = triggered_bin // self.upsampling  # the trace is cut in the downsampled version. Therefore, triggered bin is factor of two smaller. 
-                i_low = triggered_bin - self.pre_trigger_bins
-                i_high = i_low + self.n_samples_trigger
+                traces, phased_traces = self.__cut_triggered_traces(triggered_bin)
+                return traces, phased_traces, triggered_beam
 
-                # traces need to be downsampled
-                # resample and use axis -1 since trace might be either shape (N) for analytic trace or shape (3,N) for E-field
-                self._traces = scipy.signal.resample(self._traces, np.shape(self._traces)[-1] // self.upsampling, axis=-1)
+    def generate_noise_importance_sampling(self, shift_amplitude=None):
+        """
+        generates noise traces for all channels that cause a phased array trigger using importance sampling
+
+        Instead of regenerating noise until a trigger occurs by chance (see `generate_noise`), the noise is biased
+        towards a trigger: the most likely shape of a noise fluctuation (the autocorrelation function of the
+        filtered noise, see `get_importance_sampling_kernel`) with amplitude `shift_amplitude` is added to all
+        channels with the time delays of a random beam, at a random time and with a random sign. The traces are
+        weighted with the likelihood ratio of the unbiased noise and the mixture of all biased noise distributions,
+        which only depends on the coherent sums of the (analog) noise in the beams. The trigger probability of a
+        noise trace is estimated without bias as the sum of the weights of the triggered traces divided by the
+        total number of trials, i.e., `sum(weights) / sum(n_trials)` over several calls.
+
+        Only Gaussian noise (noise_type "rayleigh") is supported. The noise can be drawn from the noise bank.
+
+        Parameters
+        ----------
+        shift_amplitude: float or None (default)
+            the amplitude of the fluctuation that is added to each channel. If None, the amplitude is chosen such
+            that the power of the coherent sum of the fluctuations in the trigger window equals the threshold.
+            Larger values increase the fraction of triggered trials but also the spread of the weights.
 
-                if (i_low >= 0) and (i_high < self.n_samples): # If range is directly a subset of the waveform
-                    return self._traces[:, i_low:i_high], self._phased_traces, triggered_beam
+        Returns
+        -------
+        np.array of shape (n_channels, n_samples), phased traces, index of triggered beam, weight (the likelihood
+        ratio of the traces), number of generated noise realizations until the trigger condition was fulfilled
+        """
+        if self.noise_type != "rayleigh":
+            raise ValueError(f"importance sampling requires Gaussian noise (noise_type 'rayleigh'), not '{self.noise_type}'")
+        n_samples = self.n_samples * self.upsampling
+        variance, shift_spectrum = get_importance_sampling_kernel(n_samples, self.sampling_rate * self.upsampling,
+                                                                  self.amplitude, self.filt, self.min_freq, self.max_freq)
+        autocorrelation = fft.freq2time(shift_spectrum * self.filt, self.sampling_rate * self.upsampling, n=n_samples)
+        if shift_amplitude is None:
+            shift_amplitude = (self.threshold * self.window / np.sum(autocorrelation ** 2)) ** 0.5 / self.n_channels
+        # the coherent sum of rolled_sum_slicing at time t contains the sample t + abs(roll) of each channel,
+        # the first trace is not rolled
+        offsets = np.abs(self.beam_time_delays)
+        offsets[:, 0] = 0
+
+        self._traces = np.zeros((self.n_channels, n_samples))
+        n_trials = 0
+        while True:
+            n_trials += 1
+            i_beam = np.random.randint(len(offsets))
+            shift_time = np.random.randint(n_samples)
+            sign = np.random.choice([-1., 1.])
+            shift = sign * shift_amplitude * np.array([np.roll(autocorrelation, shift_time + offset)
+                                                       for offset in offsets[i_beam]])
+            self.__generation(shift)
+            self.__phasing()
+            is_triggered, triggered_bin, triggered_beam = self.__triggering()
+            if is_triggered:
+                break
 
-                # Otherwise, roll the waveforms. Safe as long as noise is generated in the freq domain
-                self._phased_traces = np.roll(self._phased_traces, -i_low * self.upsampling, axis=-1)
-                self._traces = np.roll(self._traces, -i_low, axis=-1)
-                return self._traces[:, :self.n_samples_trigger], self._phased_traces, triggered_beam
+        # the likelihood ratio of the mixture of all beams, shift times and signs
+        coherent_sums = np.array([rolled_sum_slicing(self._analog_traces, delays) for delays in self.beam_time_delays])
+        log_q = logsumexp(log_cosh(shift_amplitude * coherent_sums / variance)) - np.log(coherent_sums.size) - \
+            0.5 * self.n_channels * shift_amplitude ** 2 / variance
+        traces, phased_traces = self.__cut_triggered_traces(triggered_bin)
+        return traces, phased_traces, triggered_beam, np.exp(-log_q), n_trials
 
     def generate_noise2(self, debug=False):
         """
@@ -598,16 +1019,16 @@ class thermalNoiseGeneratorPhasedArray():
                 else:
                     self._traces[iCh] = trace
 
-            shifts = np.zeros(self.n_channels, dtype=np.int)
+            shifts = np.zeros(self.n_channels, dtype=int)
             shifted_traces = copy.copy(traces)
-            for shift1 in np.arange(-100, 100, 4, dtype=np.int):
+            for shift1 in np.arange(-100, 100, 4, dtype=int):
                 shifted_traces[1] = np.roll(traces[1], shift1)
                 shifts[1] = shift1
-                for shift2 in np.arange(-100, 100, 4, dtype=np.int):
+                for shift2 in np.arange(-100, 100, 4, dtype=int):
                     shifts[2] = shift2
                     shifted_traces[2] = np.roll(traces[2], shift2)
 
-                    for shift3 in np.arange(-100, 100, 4, dtype=np.int):
+                    for shift3 in np.arange(-100, 100, 4, dtype=int):
                         shifts[3] = shift3
                         shifted_traces[3] = np.roll(traces[3], shift3)
                         phased_trace = np.zeros(self.n_samples * self.upsampling)
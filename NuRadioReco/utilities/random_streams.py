@@ -0,0 +1,51 @@
+"""
+Reproducible and independent random number streams
+
+A random number stream is derived from a global seed and a key of non-negative integers (e.g. the event group id
+and the station id) via numpy's `SeedSequence`, the same mechanism that `SeedSequence.spawn` uses. The random
+numbers of one stream therefore only depend on the seed and the key, and not on how many random numbers were
+drawn before in other streams. This makes a simulation independent of the order in which the events are processed,
+e.g., when events are skipped, simulated in parallel or re-simulated individually.
+"""
+import numpy as np
+
+# identifiers of the streams that are used per event group and station in a simulation
+STREAM_SIGNAL = 0
+STREAM_NOISE = 1
+
+
+def get_seed_sequence(seed, *key):
+    """
+    returns the seed sequence of the random number stream with the given key
+
+    Parameters
+    ----------
+    seed: int
+        the global seed
+    key: non-negative ints
+        the key of the stream, e.g. (event_group_id, station_id, STREAM_NOISE)
+
+    Returns
+    -------
+    seed_sequence: numpy.random.SeedSequence
+    """
+    return np.random.SeedSequence(seed, spawn_key=tuple(int(k) for k in key))
+
+
+def get_random_generator(seed, *key):
+    """
+    returns a random number generator for the random number stream with the given key
+
+    Parameters
+    ----------
+    seed: int
+        the global seed
+    key: non-negative ints
+        the key of the stream, e.g. (event_group_id, station_id, STREAM_SIGNAL)
+
+    Returns
+    -------
+    random_generator: numpy.random.Generator
+        a generator using the counter-based Philox bit generator
+    """
+    return np.random.Generator(np.random.Philox(get_seed_sequence(seed, *key)))
@@ -0,0 +1,477 @@
+"""
+Trigger simulation on long continuous traces that are processed in blocks
+
+The trigger modules operate on the (short) trace of an event that is fully in memory. The classes of this module
+run the same trigger algorithms on a continuous stream, e.g. hours of noise for firmware studies. The stream is fed
+block by block (of arbitrary length) and the trigger times of every block are returned. The state that the
+algorithms need across the block boundaries (the filter state, the samples of the previous block that are needed by
+the high/low, power integration and coincidence windows, and the dead time after a trigger) is carried over, so the
+memory does not depend on the length of the stream.
+
+The per-event trigger functions (`get_threshold_triggers`, `get_high_low_triggers`, `get_envelope_triggers`,
+`get_power_int_triggers`, `get_majority_logic`, and `phase_signals` and `power_sum` of the phased array trigger) are
+applied to a block extended by the carried-over samples. For all triggers but the envelope trigger, this gives the
+same triggered bins as running the per-event function on the whole stream. The Hilbert envelope depends on the full
+trace, it is calculated with a margin of samples before and after each block instead.
+
+Example::
+
+    trigger = highLowStreamingTrigger(sampling_rate, n_channels=4, threshold_high=3 * Vrms, threshold_low=-3 * Vrms,
+                                      number_coincidences=2, dead_time=1 * units.microsecond)
+    for block in blocks:  # arrays of shape (n_channels, n_samples)
+        trigger_times = trigger.process(block)
+"""
+import numpy as np
+import scipy.signal
+from NuRadioReco.utilities import units
+from NuRadioReco.modules.trigger.simpleThreshold import get_threshold_triggers
+from NuRadioReco.modules.trigger.highLowThreshold import get_high_low_triggers, get_majority_logic
+from NuRadioReco.modules.trigger.envelopeTrigger import get_envelope_triggers
+from NuRadioReco.modules.trigger.powerIntegration import get_power_int_triggers
+from NuRadioReco.modules.phasedarray.triggerSimulator import triggerSimulator as phasedArrayTriggerSimulator
+
+import logging
+logger = logging.getLogger('streamingTrigger')
+
+
+class streamingTrigger:
+    """
+    Base class of the triggers on continuous streams
+
+    Handles the (optional) causal filter, the dead time and the bookkeeping of the processed samples. The
+    subclasses implement `_get_triggered_bins` that returns the triggered bins of a (filtered) block.
+    """
+
+    def __init__(self, sampling_rate, n_channels, passband=None, order=4, dead_time=0, start_time=0):
+        """
+        Parameters
+        ----------
+        sampling_rate: float
+            the sampling rate of the stream
+        n_channels: int
+            the number of channels of the stream
+        passband: list of floats or None
+            if not None, the stream is filtered with a (causal) butterworth filter with this passband before the
+            trigger. passband[0] = 0 (or None) gives a lowpass and passband[1] = None a highpass filter.
+            Contrary to the filters of the per-event trigger modules, which are applied in the frequency domain,
+            the filter is applied sample by sample as in a firmware implementation.
+        order: int
+            the order of the butterworth filter
+        dead_time: float
+            triggers within the dead time after a trigger are discarded. If 0, all triggered bins are returned
+        start_time: float
+            the time of the first sample of the stream
+        """
+        self._sampling_rate = sampling_rate
+        self._dt = 1. / sampling_rate
+        self._n_channels = n_channels
+        self._n_dead_time = int(np.round(dead_time * sampling_rate))
+        self._start_time = start_time
+        self._sos = None
+        if passband is not None:
+            if passband[0] is None or passband[0] == 0:
+                scipy_args = [passband[1], 'lowpass']
+            elif passband[1] is None:
+                scipy_args = [passband[0], 'highpass']
+            else:
+                scipy_args = [passband, 'bandpass']
+            self._sos = scipy.signal.butter(order, *scipy_args, fs=sampling_rate, output='sos')
+        self.reset()
+
+    def reset(self):
+        """
+        resets the state to the start of a new stream
+        """
+        self._n_samples = 0
+        self._n_triggers = 0
+        self._next_allowed_bin = 0
+        if self._sos is not None:
+            self._filter_state = np.zeros((len(self._sos), self._n_channels, 2))
+
+    def process(self, traces):
+        """
+        processes the next block of the stream
+
+        Parameters
+        ----------
+        traces: 2D array of floats
+            the next samples of all channels, shape (n_channels x n_samples). The blocks can have different lengths.
+
+        Returns
+        -------
+        trigger_times: array of floats
+            the trigger times that were found in this block. The trigger conditions that span the block boundary
+            are evaluated once the following block is processed, i.e., the trigger times can be (slightly) before
+            the start of the block.
+        """
+        traces = np.asarray(traces, dtype=float)
+        if traces.shape[0] != self._n_channels:
+            raise ValueError(f"expected traces of {self._n_channels} channels, got {traces.shape[0]}")
+        if self._sos is not None:
+            traces, self._filter_state = scipy.signal.sosfilt(self._sos, traces, axis=-1, zi=self._filter_state)
+        triggered_bins = self._get_triggered_bins(traces)
+        self._n_samples += traces.shape[-1]
+
+        triggered_bins = self.__apply_dead_time(triggered_bins)
+        self._n_triggers += len(triggered_bins)
+        return self._start_time + triggered_bins * self._dt
+
+    def process_stream(self, blocks):
+        """
+        processes a stream block by block
+
+        Parameters
+        ----------
+        blocks: iterable of 2D arrays of floats
+            the blocks of the stream, e.g. a generator that reads or simulates the blocks one by one
+
+        Yields
+        ------
+        trigger_times: array of floats
+            the trigger times of each block, see `process`
+        """
+        for traces in blocks:
+            yield self.process(traces)
+
+    def get_statistics(self):
+        """
+        returns the number of processed samples, the processed time and the number of triggers
+
+        Returns
+        -------
+        statistics: dict
+        """
+        return {'samples': self._n_samples, 'time': self._n_samples * self._dt, 'triggers': self._n_triggers}
+
+    def __apply_dead_time(self, triggered_bins):
+        triggered_bins = triggered_bins[triggered_bins >= self._next_allowed_bin]
+        if len(triggered_bins) == 0:
+            return triggered_bins
+        if self._n_dead_time <= 1:
+            self._next_allowed_bin = triggered_bins[-1] + 1
+            return triggered_bins
+        selected_bins = []
+        i = 0
+        while i < len(triggered_bins):
+            selected_bins.append(triggered_bins[i])
+            self._next_allowed_bin = triggered_bins[i] + self._n_dead_time
+            i = np.searchsorted(triggered_bins, self._next_allowed_bin)
+        return np.array(selected_bins, dtype=int)
+
+    def _get_triggered_bins(self, traces):
+        raise NotImplementedError
+
+
+class channelStreamingTrigger(streamingTrigger):
+    """
+    Base class of the triggers that require a coincidence of single channel triggers (`get_majority_logic`)
+
+    The subclasses implement the single channel trigger in `_get_channel_triggers`. A single channel trigger at a
+    bin depends on the `lookback` previous and the `lookahead` following samples, these samples are carried over
+    between the blocks.
+    """
+
+    def __init__(self, sampling_rate, n_channels, number_coincidences=1, coinc_window=0, lookback=0, lookahead=0,
+                 **kwargs):
+        """
+        Parameters
+        ----------
+        sampling_rate: float
+            the sampling rate of the stream
+        n_channels: int
+            the number of channels of the stream
+        number_coincidences: int
+            number of channels that are required in coincidence to trigger
+        coinc_window: float
+            time window in which number_coincidences channels need to trigger
+        lookback: int
+            the number of samples before a bin that the single channel trigger depends on
+        lookahead: int
+            the number of samples after a bin that the single channel trigger depends on
+        kwargs:
+            passband, order, dead_time and start_time, see `streamingTrigger`
+        """
+        self._number_coincidences = number_coincidences
+        self._coinc_window = coinc_window
+        self._n_coinc = int(np.round(coinc_window * sampling_rate))
+        self._lookback = lookback
+        self._lookahead = lookahead
+        super().__init__(sampling_rate, n_channels, **kwargs)
+
+    def reset(self):
+        super().reset()
+        # the last samples of the stream and the (absolute) bin of the first one
+        self._buffer = np.zeros((self._n_channels, 0))
+        self._buffer_start = 0
+        # the single channel triggers of the bins of the coincidence window before the next bin
+        self._channel_triggers = np.zeros((self._n_channels, 0), dtype=bool)
+        self._n_channel_triggers = 0
+
+    def _get_triggered_bins(self, traces):
+        traces = np.concatenate([self._buffer, traces], axis=-1)
+        # the single channel triggers are calculated for the bins whose lookahead samples are available
+        i_first = self._n_channel_triggers - self._buffer_start
+        i_stop = traces.shape[-1] - self._lookahead
+        n_keep = self._lookback + self._lookahead
+        if n_keep < traces.shape[-1]:
+            self._buffer = traces[:, -n_keep:] if n_keep else traces[:, :0]
+            self._buffer_start += traces.shape[-1] - n_keep
+        else:
+            self._buffer = traces
+        if i_stop <= i_first:
+            return np.zeros(0, dtype=int)
+
+        channel_triggers = np.array([self._get_channel_triggers(trace, i_channel)[i_first:i_stop]
+                                     for i_channel, trace in enumerate(traces)])
+        channel_triggers = np.concatenate([self._channel_triggers, channel_triggers], axis=-1)
+        n_previous = self._channel_triggers.shape[-1]
+        first_bin = self._n_channel_triggers - n_previous
+        self._n_channel_triggers += channel_triggers.shape[-1] - n_previous
+        self._channel_triggers = channel_triggers[:, channel_triggers.shape[-1] - min(self._n_coinc, channel_triggers.shape[-1]):]
+
+        has_triggered, triggered_bins, triggered_times = get_majority_logic(
+            list(channel_triggers), self._number_coincidences, self._coinc_window, self._dt)
+        if not has_triggered:
+            return np.zeros(0, dtype=int)
+        triggered_bins = triggered_bins[triggered_bins >= n_previous]
+        return first_bin + triggered_bins
+
+    def _get_channel_triggers(self, trace, i_channel):
+        raise NotImplementedError
+
+
+class thresholdStreamingTrigger(channelStreamingTrigger):
+    """
+    Simple amplitude threshold trigger on a stream, see `NuRadioReco.modules.trigger.simpleThreshold`
+    """
+
+    def __init__(self, sampling_rate, n_channels, threshold, number_coincidences=1, coinc_window=0, **kwargs):
+        """
+        Parameters
+        ----------
+        sampling_rate: float
+            the sampling rate of the stream
+        n_channels: int
+            the number of channels of the stream
+        threshold: float or array of floats
+            the threshold (per channel)
+        number_coincidences: int
+            number of channels that are required in coincidence to trigger
+        coinc_window: float
+            time window in which number_coincidences channels need to trigger
+        kwargs:
+            passband, order, dead_time and start_time, see `streamingTrigger`
+        """
+        self._threshold = np.broadcast_to(threshold, n_channels)
+        super().__init__(sampling_rate, n_channels, number_coincidences, coinc_window, **kwargs)
+
+    def _get_channel_triggers(self, trace, i_channel):
+        return get_threshold_triggers(trace, self._threshold[i_channel])
+
+
+class highLowStreamingTrigger(channelStreamingTrigger):
+    """
+    High/low threshold trigger on a stream, see `NuRadioReco.modules.trigger.highLowThreshold`
+    """
+
+    def __init__(self, sampling_rate, n_channels, threshold_high, threshold_low, high_low_window=5 * units.ns,
+                 number_coincidences=2, coinc_window=200 * units.ns, **kwargs):
+        """
+        Parameters
+        ----------
+        sampling_rate: float
+            the sampling rate of the stream
+        n_channels: int
+            the number of channels of the stream
+        threshold_high: float or array of floats
+            the high threshold (per channel)
+        threshold_low: float or array of floats
+            the low threshold (per channel)
+        high_low_window: float
+            time window in which a high+low crossing needs to occur to trigger a channel
+        number_coincidences: int
+            number of channels that are required in coincidence to trigger
+        coinc_window: float
+            time window in which number_coincidences channels need to trigger
+        kwargs:
+            passband, order, dead_time and start_time, see `streamingTrigger`
+        """
+        self._threshold_high = np.broadcast_to(threshold_high, n_channels)
+        self._threshold_low = np.broadcast_to(threshold_low, n_channels)
+        self._high_low_window = high_low_window
+        # the high/low coincidence window and the change of the coincidence with respect to the previous bin
+        lookback = int(np.round(high_low_window * sampling_rate)) + 1
+        super().__init__(sampling_rate, n_channels, number_coincidences, coinc_window, lookback=lookback, **kwargs)
+
+    def _get_channel_triggers(self, trace, i_channel):
+        return get_high_low_triggers(trace, self._threshold_high[i_channel], self._threshold_low[i_channel],
+                                     self._high_low_window, self._dt)
+
+
+class envelopeStreamingTrigger(channelStreamingTrigger):
+    """
+    Hilbert envelope trigger on a stream, see `NuRadioReco.modules.trigger.envelopeTrigger`
+
+    The Hilbert envelope depends on the whole trace. It is calculated from the samples of a margin before and after
+    each bin, which is a good approximation if the margin is long compared to the impulse response of the filter.
+    """
+
+    def __init__(self, sampling_rate, n_channels, threshold, number_coincidences=2, coinc_window=200 * units.ns,
+                 margin=100 * units.ns, **kwargs):
+        """
+        Parameters
+        ----------
+        sampling_rate: float
+            the sampling rate of the stream
+        n_channels: int
+            the number of channels of the stream
+        threshold: float or array of floats
+            the threshold (per channel) on the envelope
+        number_coincidences: int
+            number of channels that are required in coincidence to trigger
+        coinc_window: float
+            time window in which number_coincidences channels need to trigger
+        margin: float
+            the length of the trace before and after a bin that the envelope is calculated from
+        kwargs:
+            passband, order, dead_time and start_time, see `streamingTrigger`
+        """
+        self._threshold = np.broadcast_to(threshold, n_channels)
+        n_margin = int(np.round(margin * sampling_rate))
+        super().__init__(sampling_rate, n_channels, number_coincidences, coinc_window, lookback=n_margin,
+                         lookahead=n_margin, **kwargs)
+
+    def _get_channel_triggers(self, trace, i_channel):
+        return get_envelope_triggers(trace, self._threshold[i_channel])
+
+
+class powerIntegrationStreamingTrigger(channelStreamingTrigger):
+    """
+    Power integration trigger on a stream, see `NuRadioReco.modules.trigger.powerIntegration`
+
+    As for `get_power_int_triggers`, the triggered bins are the first bins of the integration windows.
+    """
+
+    def __init__(self, sampling_rate, n_channels, threshold, integration_window, number_coincidences=1,
+                 coinc_window=0, **kwargs):
+        """
+        Parameters
+        ----------
+        sampling_rate: float
+            the sampling rate of the stream
+        n_channels: int
+            the number of channels of the stream
+        threshold: float or array of floats
+            the threshold (per channel) on the integrated power
+        integration_window: float
+            the integration window
+        number_coincidences: int
+            number of channels that are required in coincidence to trigger
+        coinc_window: float
+            time window in which number_coincidences channels need to trigger
+        kwargs:
+            passband, order, dead_time and start_time, see `streamingTrigger`
+        """
+        self._threshold = np.broadcast_to(threshold, n_channels)
+        self._integration_window = integration_window
+        lookahead = int(integration_window / (1. / sampling_rate)) - 1
+        super().__init__(sampling_rate, n_channels, number_coincidences, coinc_window, lookahead=lookahead, **kwargs)
+
+    def _get_channel_triggers(self, trace, i_channel):
+        return get_power_int_triggers(trace, self._threshold[i_channel], self._integration_window, self._dt)
+
+
+class phasedArrayStreamingTrigger(streamingTrigger):
+    """
+    Phased array trigger on a stream, see `NuRadioReco.modules.phasedarray.triggerSimulator`
+
+    The channels are delayed by the rolls of the beams and summed, and the power of the beams is integrated in windows
+    of `window` samples every `step` samples. A trigger is issued at the first bin of every window in which the
+    power of any beam exceeds the threshold. Contrary to the per-event trigger, which rolls the traces periodically,
+    the beams are formed from the neighbouring samples of the stream. The traces are used as they are, i.e., the
+    digitization and upsampling have to be applied to the stream beforehand.
+    """
+
+    def __init__(self, sampling_rate, delay_matrix, threshold, window=32, step=16, adc_output='voltage', **kwargs):
+        """
+        Parameters
+        ----------
+        sampling_rate: float
+            the sampling rate of the stream
+        delay_matrix: 2D array of ints
+            the rolls of shape (n_beams x n_channels) in units of samples, see `get_delay_matrix` and
+            `calculate_time_delays` of the phased array trigger simulator
+        threshold: float
+            the threshold on the power (per sample) of a beam
+        window: int
+            power integral window in units of samples
+        step: int
+            time step in power integral in units of samples
+        adc_output: string
+            'voltage' or 'counts', see `power_sum`
+        kwargs:
+            passband, order, dead_time and start_time, see `streamingTrigger`
+        """
+        self._delay_matrix = np.array(delay_matrix, dtype=int, ndmin=2)
+        self._threshold = threshold
+        self._window = window
+        self._step = step
+        self._adc_output = adc_output
+        self._phased_array = phasedArrayTriggerSimulator()
+        # beam sample i is the sum of the channel samples i - roll
+        self._lookback = max(0, self._delay_matrix.max())
+        self._lookahead = max(0, -self._delay_matrix.min())
+        super().__init__(sampling_rate, self._delay_matrix.shape[1], **kwargs)
+
+    def reset(self):
+        super().reset()
+        self._buffer = np.zeros((self._n_channels, 0))
+        self._buffer_start = 0
+        # the beams of the first bins that are not (completely) integrated yet, the first window that has all
+        # samples in the stream starts at a multiple of the step
+        self._beams = np.zeros((len(self._delay_matrix), 0))
+        self._beams_start = int(np.ceil(self._lookback / self._step)) * self._step
+        self._beam_triggers = np.zeros(len(self._delay_matrix), dtype=int)
+
+    def get_statistics(self):
+        """
+        returns the number of processed samples, the processed time, the number of triggers and the number of
+        integration windows above threshold per beam
+
+        Returns
+        -------
+        statistics: dict
+        """
+        statistics = super().get_statistics()
+        statistics['beam_triggers'] = self._beam_triggers.copy()
+        return statistics
+
+    def _get_triggered_bins(self, traces):
+        traces = np.concatenate([self._buffer, traces], axis=-1)
+        buffer_start = self._buffer_start
+        n_keep = self._lookback + self._lookahead
+        if n_keep < traces.shape[-1]:
+            self._buffer = traces[:, -n_keep:] if n_keep else traces[:, :0]
+            self._buffer_start += traces.shape[-1] - n_keep
+        else:
+            self._buffer = traces
+
+        # the beams of the bins whose delayed samples are all available, for these the periodic roll of
+        # phase_signals does not wrap around
+        i_first = self._beams_start + self._beams.shape[-1] - buffer_start
+        i_stop = traces.shape[-1] - self._lookahead
+        if i_stop > i_first:
+            beams = self._phased_array.phase_signals(traces, self._delay_matrix)[:, i_first:i_stop]
+            self._beams = np.concatenate([self._beams, beams], axis=-1)
+
+        # power_sum integrates the windows that are followed by at least one step
+        if self._beams.shape[-1] < self._window + self._step:
+            return np.zeros(0, dtype=int)
+        power, num_frames = self._phased_array.power_sum(self._beams, self._window, self._step, self._adc_output)
+        triggered = power > self._threshold
+        self._beam_triggers += np.sum(triggered, axis=-1)
+        triggered_bins = self._beams_start + np.flatnonzero(np.any(triggered, axis=0)) * self._step
+
+        self._beams = self._beams[:, num_frames * self._step:]
+        self._beams_start += num_frames * self._step
+        return triggered_bins
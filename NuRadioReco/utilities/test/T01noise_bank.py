@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+from NuRadioReco.utilities import noise, units, fft
+from NuRadioReco.modules import channelGenericNoiseAdder
+import numpy as np
+from numpy import testing
+import tempfile
+import os
+
+"""
+tests the bank of precomputed noise blocks: the drawn traces have the RMS and spectrum of freshly generated noise,
+the channels of a trial use different blocks, long traces are concatenated from several blocks, and a bank that is
+stored on disk is memory-mapped when it is used again with the same parameters.
+"""
+
+n_samples = 1024
+sampling_rate = 2 * units.GHz
+amplitude = 10 * units.micro * units.V
+ff = np.fft.rfftfreq(n_samples, 1. / sampling_rate)
+filt = 1. / (1 + 1j * ff / (200 * units.MHz)) ** 4  # a simple low pass filter
+
+bank = noise.thermalNoiseBank(n_samples, sampling_rate, amplitude, 200, filt=filt, seed=1)
+
+# the noise of the bank has the same RMS and spectrum as freshly generated noise
+noise_adder = channelGenericNoiseAdder.channelGenericNoiseAdder()
+noise_adder.set_seed(2)
+fresh = fft.freq2time(noise_adder.bandlimited_noise_multi_channel(0, None, n_samples, sampling_rate,
+                                                                  np.full(200, amplitude), 'rayleigh',
+                                                                  time_domain=False) * filt, sampling_rate)
+traces = np.array([bank.get_noise(4) for i in range(50)]).reshape(200, n_samples)
+testing.assert_allclose(np.std(traces), np.std(fresh), rtol=0.03)
+power, power_fresh = [np.add.reduceat(np.mean(np.abs(fft.time2freq(x, sampling_rate)) ** 2, axis=0)[1:201],
+                                        np.arange(0, 200, 20)) for x in [traces, fresh]]
+testing.assert_allclose(power, power_fresh, rtol=0.1)
+
+# the traces are shifted (and possibly sign flipped) blocks of the bank, every channel uses a different block
+blocks = bank.get_blocks()
+
+
+def find_block(segment):
+    for i_block, i_sample in np.argwhere(np.isclose(np.abs(blocks), np.abs(segment[0]), rtol=1e-12, atol=0)):
+        if np.allclose(np.abs(segment), np.abs(np.roll(blocks[i_block], -i_sample)[:len(segment)]), rtol=1e-12, atol=0):
+            return i_block
+    return None
+
+
+i_blocks = [find_block(trace) for trace in bank.get_noise(8)]
+testing.assert_equal(None in i_blocks, False)
+testing.assert_equal(len(set(i_blocks)), 8)
+
+# long traces are concatenated from different blocks
+traces = bank.get_noise(3, n_samples=2500)
+testing.assert_equal(traces.shape, (3, 2500))
+i_blocks = [find_block(trace[i:i + n_samples]) for trace in traces for i in range(0, 2500, n_samples)]
+testing.assert_equal(None in i_blocks, False)
+testing.assert_equal(len(set(i_blocks)), 9)
+testing.assert_equal(bank.get_statistics(), {'trials': 52, 'samples_drawn': 200 * n_samples + 8 * n_samples + 7500,
+                                             'samples_in_bank': 200 * n_samples})
+with testing.assert_raises(ValueError):
+    bank.get_noise(201)
+
+# a bank on disk is generated once and memory-mapped afterwards
+with tempfile.TemporaryDirectory() as path:
+    filename = os.path.join(path, 'noise_bank.npy')
+    bank = noise.thermalNoiseBank(n_samples, sampling_rate, amplitude, 20, filt=filt, seed=3, filename=filename)
+    testing.assert_equal(isinstance(bank.get_blocks(), np.memmap), True)
+    testing.assert_equal(bank.get_blocks().flags.writeable, False)
+    bank2 = noise.thermalNoiseBank(n_samples, sampling_rate, amplitude, 20, filt=filt, seed=4, filename=filename)
+    testing.assert_equal(np.array(bank2.get_blocks()), np.array(bank.get_blocks()))
+    # a bank with different parameters is generated again
+    bank3 = noise.thermalNoiseBank(n_samples, sampling_rate, amplitude, 20, seed=4, filename=filename)
+    testing.assert_equal(np.allclose(bank3.get_blocks(), bank.get_blocks()), False)
+    testing.assert_equal(sorted(os.listdir(path)), ['noise_bank.npy', 'noise_bank.npy.json'])
+    del bank, bank2, bank3
+
+print('Noise bank test passed without any issues!')
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+import NuRadioReco
+from NuRadioReco.utilities import noise, units, fft
+from NuRadioReco.modules.trigger.highLowThreshold import get_high_low_triggers, get_majority_logic
+import numpy as np
+from numpy import testing
+import scipy.signal
+import os
+
+"""
+tests the importance sampling of noise triggers: the variance and autocorrelation of the filtered noise, and the
+trigger probabilities estimated from the weighted traces of the high/low majority logic and the phased array
+generators, compared to the trigger probabilities of unbiased noise.
+"""
+
+np.random.seed(1)
+n_samples = 256
+sampling_rate = 2 * units.GHz
+ff = np.fft.rfftfreq(n_samples, 1. / sampling_rate)
+filt = scipy.signal.freqs(*scipy.signal.butter(6, [80 * units.MHz, 500 * units.MHz], 'bandpass', analog=True), ff)[1]
+
+# the variance and the autocorrelation function of the filtered noise
+generator = noise.thermalNoiseGenerator(n_samples, sampling_rate, 1., 2.5, 2 * units.ns, 2, 10 * units.ns, 3,
+                                        50 * units.ns, filt)
+generator.noise.set_seed(2)
+variance, shift_spectrum = noise.get_importance_sampling_kernel(n_samples, sampling_rate, generator.amplitude, filt)
+traces = fft.freq2time(generator.noise.bandlimited_noise_multi_channel(
+    0, None, n_samples, sampling_rate, np.full(30000, generator.amplitude), 'rayleigh', time_domain=False) * filt,
+    sampling_rate)
+testing.assert_allclose(np.var(traces), variance, rtol=0.01)
+autocorrelation = fft.freq2time(shift_spectrum * filt, sampling_rate)
+autocorrelation_traces = np.mean(np.fft.irfft(np.abs(np.fft.rfft(traces)) ** 2), axis=0) / n_samples
+testing.assert_allclose(autocorrelation_traces[:10] / variance, autocorrelation[:10], atol=0.01)
+
+# the high/low majority logic trigger probability agrees with the one of unbiased noise
+n_triggers = 0
+for trace in traces.reshape(-1, 3, n_samples):
+    triggered_bins = [get_high_low_triggers(x, 2.5, -2.5, 2 * units.ns, 1. / sampling_rate) for x in trace]
+    n_triggers += get_majority_logic(triggered_bins, 2, 10 * units.ns, 1. / sampling_rate)[0]
+probability = n_triggers / (len(traces) // 3)
+weights, n_trials = np.array([generator.generate_noise_importance_sampling()[1:] for i in range(600)]).T
+probability_importance_sampling = np.sum(weights) / np.sum(n_trials)
+print(f"high/low trigger probability: {probability:.4f} (unbiased noise), {probability_importance_sampling:.4f} "
+      f"(importance sampling, {len(weights) / np.sum(n_trials):.0%} of the trials trigger)")
+testing.assert_allclose(probability_importance_sampling, probability, rtol=0.25)
+testing.assert_array_less(np.sum(n_trials), len(traces) // 3)
+
+# the traces are rolled to the trigger time
+traces, weight, n_trials = generator.generate_noise_importance_sampling()
+triggered_bins = [get_high_low_triggers(x, 2.5, -2.5, 2 * units.ns, 1. / sampling_rate) for x in traces]
+testing.assert_equal(get_majority_logic(triggered_bins, 2, 10 * units.ns, 1. / sampling_rate)[1][0],
+                     generator.trigger_bin)
+
+# the phased array trigger probability agrees with the one of unbiased noise
+detector_file = os.path.join(os.path.dirname(NuRadioReco.__file__),
+                             'examples/AliasPhasedArray/SNR_study/phased_array_100m_0.5GHz.json')
+generator = noise.thermalNoiseGeneratorPhasedArray(detector_file, 101, [0, 1, 2, 3], 1., 14., 1.75, quantize=False,
+                                                   trace_length=100 * units.ns, pre_trigger_time=50 * units.ns)
+generator.noise.set_seed(3)
+weights, n_trials = np.array([generator.generate_noise_importance_sampling()[3:] for i in range(300)]).T
+probability_importance_sampling = np.sum(weights) / np.sum(n_trials)
+n_triggers = 0
+generator._traces = np.zeros((4, generator.n_samples * generator.upsampling))
+for i in range(3000):
+    # the noise that is generated by generate_noise until the first trigger
+    generator._thermalNoiseGeneratorPhasedArray__generation()
+    generator._thermalNoiseGeneratorPhasedArray__phasing()
+    n_triggers += generator._thermalNoiseGeneratorPhasedArray__triggering()[0]
+print(f"phased array trigger probability: {n_triggers / 3000:.4f} (unbiased noise), "
+      f"{probability_importance_sampling:.4f} (importance sampling, {len(weights) / np.sum(n_trials):.0%} of the "
+      "trials trigger)")
+testing.assert_allclose(probability_importance_sampling, n_triggers / 3000, rtol=0.25)
+
+print('Noise importance sampling test passed without any issues!')
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+from NuRadioReco.utilities import streaming_trigger, units, fft
+from NuRadioReco.modules import channelGenericNoiseAdder
+from NuRadioReco.modules.trigger.simpleThreshold import get_threshold_triggers
+from NuRadioReco.modules.trigger.highLowThreshold import get_high_low_triggers, get_majority_logic
+from NuRadioReco.modules.trigger.envelopeTrigger import get_envelope_triggers
+from NuRadioReco.modules.trigger.powerIntegration import get_power_int_triggers
+from NuRadioReco.modules.phasedarray.triggerSimulator import triggerSimulator
+import numpy as np
+from numpy import testing
+import scipy.signal
+
+"""
+tests the triggers on continuous streams: a long noise trace that is processed in blocks of random lengths gives the
+same trigger times as the per-event trigger functions applied to the whole trace.
+"""
+
+n_channels = 4
+n_samples = 2 ** 17
+sampling_rate = 2 * units.GHz
+dt = 1. / sampling_rate
+noise_adder = channelGenericNoiseAdder.channelGenericNoiseAdder()
+noise_adder.set_seed(1)
+spectra = noise_adder.bandlimited_noise_multi_channel(80 * units.MHz, 500 * units.MHz, n_samples, sampling_rate,
+                                                      np.ones(n_channels), 'rayleigh', time_domain=False)
+stream = fft.freq2time(spectra, sampling_rate)
+stream /= np.std(stream)
+
+rng = np.random.default_rng(2)
+block_edges = np.concatenate([[0, 1, 4], np.sort(rng.integers(5, n_samples, 150)), [n_samples]])
+
+
+def process_blocks(trigger, traces=stream):
+    trigger_times = [trigger.process(traces[:, start:stop]) for start, stop in zip(block_edges[:-1], block_edges[1:])]
+    return np.concatenate(trigger_times)
+
+
+def majority_logic(channel_triggers, number_coincidences, coinc_window):
+    has_triggered, triggered_bins, triggered_times = get_majority_logic(list(channel_triggers), number_coincidences,
+                                                                        coinc_window, dt)
+    return triggered_bins * dt if has_triggered else np.zeros(0)
+
+
+# simple threshold trigger
+trigger = streaming_trigger.thresholdStreamingTrigger(sampling_rate, n_channels, 3.5, 2, 10 * units.ns)
+trigger_times = majority_logic([get_threshold_triggers(trace, 3.5) for trace in stream], 2, 10 * units.ns)
+testing.assert_array_less(0, len(trigger_times))
+testing.assert_allclose(process_blocks(trigger), trigger_times)
+testing.assert_equal(trigger.get_statistics()['samples'], n_samples)
+testing.assert_equal(trigger.get_statistics()['triggers'], len(trigger_times))
+
+# high/low trigger with different thresholds per channel
+threshold_high = np.array([2.4, 2.5, 2.6, 2.7])
+trigger = streaming_trigger.highLowStreamingTrigger(sampling_rate, n_channels, threshold_high, -threshold_high,
+                                                    5 * units.ns, 2, 40 * units.ns)
+trigger_times = majority_logic([get_high_low_triggers(trace, threshold_high[i], -threshold_high[i], 5 * units.ns, dt)
+                                for i, trace in enumerate(stream)], 2, 40 * units.ns)
+testing.assert_array_less(0, len(trigger_times))
+testing.assert_allclose(process_blocks(trigger), trigger_times)
+
+# the dead time removes the triggers within the dead time after a trigger
+trigger = streaming_trigger.highLowStreamingTrigger(sampling_rate, n_channels, threshold_high, -threshold_high,
+                                                    5 * units.ns, 2, 40 * units.ns, dead_time=1 * units.microsecond,
+                                                    start_time=100 * units.ns)
+trigger_times_dead_time = [trigger_times[0]]
+for trigger_time in trigger_times:
+    if trigger_time >= trigger_times_dead_time[-1] + 1 * units.microsecond:
+        trigger_times_dead_time.append(trigger_time)
+testing.assert_allclose(process_blocks(trigger), np.array(trigger_times_dead_time) + 100 * units.ns)
+
+# power integration trigger
+trigger = streaming_trigger.powerIntegrationStreamingTrigger(sampling_rate, n_channels, 30, 10 * units.ns, 2,
+                                                             20 * units.ns)
+trigger_times = majority_logic([get_power_int_triggers(trace, 30, 10 * units.ns, dt) for trace in stream], 2,
+                               20 * units.ns)
+testing.assert_array_less(0, len(trigger_times))
+testing.assert_allclose(process_blocks(trigger), trigger_times)
+
+# the (causal) filter is applied continuously across the blocks
+sos = scipy.signal.butter(4, [100 * units.MHz, 300 * units.MHz], 'bandpass', fs=sampling_rate, output='sos')
+filtered_stream = scipy.signal.sosfilt(sos, stream, axis=-1)
+trigger = streaming_trigger.thresholdStreamingTrigger(sampling_rate, n_channels, 2.5, 2, 10 * units.ns,
+                                                      passband=[100 * units.MHz, 300 * units.MHz], order=4)
+trigger_times = majority_logic([get_threshold_triggers(trace, 2.5) for trace in filtered_stream], 2, 10 * units.ns)
+testing.assert_array_less(0, len(trigger_times))
+testing.assert_allclose(process_blocks(trigger), trigger_times)
+
+# the envelope trigger agrees except for bins close to the threshold
+trigger = streaming_trigger.envelopeStreamingTrigger(sampling_rate, n_channels, 3.5, 2, 20 * units.ns)
+trigger_times = majority_logic([get_envelope_triggers(trace, 3.5) for trace in stream], 2, 20 * units.ns)
+trigger_times_stream = process_blocks(trigger)
+testing.assert_array_less(0, len(trigger_times))
+n_different = len(np.setxor1d(np.round(trigger_times / dt), np.round(trigger_times_stream / dt)))
+testing.assert_array_less(n_different, 0.02 * len(trigger_times))
+
+# phased array trigger, the beams of the whole stream are rolled periodically, the last windows therefore differ
+phased_array = triggerSimulator()
+delay_matrix = -np.outer(np.arange(-5, 6), np.arange(n_channels))
+delay_matrix -= delay_matrix.max(axis=1, keepdims=True)
+power, num_frames = phased_array.power_sum(phased_array.phase_signals(stream, delay_matrix), 32, 16)
+threshold = 0.9 * np.sort(power.flatten())[-100]
+trigger_bins = np.flatnonzero(np.any(power > threshold, axis=0)) * 16
+trigger = streaming_trigger.phasedArrayStreamingTrigger(sampling_rate, delay_matrix, threshold, 32, 16)
+trigger_times = process_blocks(trigger)
+n_valid = n_samples + delay_matrix.min() - 32 - 16
+testing.assert_array_less(0, len(trigger_times))
+testing.assert_allclose(trigger_times, trigger_bins[trigger_bins <= n_valid] * dt)
+testing.assert_equal(trigger.get_statistics()['beam_triggers'], np.sum(power > threshold, axis=-1))
+
+# the memory does not grow with the length of the stream
+testing.assert_array_less(trigger._beams.shape[-1], 32 + 16)
+testing.assert_equal(trigger._buffer.shape[-1], -delay_matrix.min())
+
+print('Streaming trigger test passed without any issues!')
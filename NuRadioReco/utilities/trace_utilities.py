@@ -14,10 +14,14 @@ conversion_factor_integrated_signal = scipy.constants.c * scipy.constants.epsilo
 # to convert V**2/m**2 * s -> J/m**2 -> eV/m**2
 
 
-def get_efield_antenna_factor(station, frequencies, channels, detector, zenith, azimuth, antenna_pattern_provider):
+def get_efield_antenna_factor(station, frequencies, channels, detector, zenith, azimuth, antenna_pattern_provider,
+                              antenna_response_cache=None):
     """
     Returns the antenna response to a radio signal coming from a specific direction
 
+    The antenna responses of all channels that share the same antenna model are calculated in a single call
+    of the antenna pattern (see `AntennaPatternBase.get_antenna_response_batch`).
+
     Parameters
     ----------
     
@@ -25,27 +29,34 @@ def get_efield_antenna_factor(station, frequencies, channels, detector, zenith,
     frequencies: array of complex
         frequencies of the radio signal for which the antenna response is needed
     channels: array of int
-        IDs of the channels
+        IDs of the channels (the same channel can appear several times, e.g., for different signal directions)
     detector: Detector
-    zenith, azimuth: float, float
-        incoming direction of the signal. Note that refraction and reflection at the ice/air boundary are taken into account
+    zenith, azimuth: float, float or arrays of floats
+        incoming direction of the signal. Note that refraction and reflection at the ice/air boundary are taken into account.
+        Can also be arrays with one direction per entry of `channels`
     antenna_pattern_provider: AntennaPatternProvider
+    antenna_response_cache: AntennaResponseCache or None
+        if set, the antenna responses are obtained from this cache of pretabulated antenna responses
     """
     n_ice = ice.get_refractive_index(-0.01, detector.get_site(station.get_id()))
     efield_antenna_factor = np.zeros((len(channels), 2, len(frequencies)), dtype=complex)  # from antenna model in e_theta, e_phi
+    zeniths = np.broadcast_to(zenith, (len(channels),))
+    azimuths = np.broadcast_to(azimuth, (len(channels),))
+    # the channels are grouped by antenna model: model -> (channel indices, zeniths, orientations)
+    antenna_models = {}
+    transmission = np.ones((len(channels), 2))
     for iCh, channel_id in enumerate(channels):
+        zenith = zeniths[iCh]
         zenith_antenna = zenith
-        t_theta = 1.
-        t_phi = 1.
         # first check case if signal comes from above
         if zenith <= 0.5 * np.pi and station.is_cosmic_ray():
             # is antenna below surface?
             position = detector.get_relative_position(station.get_id(), channel_id)
             if position[2] <= 0:
                 zenith_antenna = geo_utl.get_fresnel_angle(zenith, n_ice, 1)
-                t_theta = geo_utl.get_fresnel_t_p(zenith, n_ice, 1)
-                t_phi = geo_utl.get_fresnel_t_s(zenith, n_ice, 1)
-                logger.info("channel {:d}: electric field is refracted into the firn. theta {:.0f} -> {:.0f}. Transmission coefficient p (eTheta) {:.2f} s (ePhi) {:.2f}".format(iCh, zenith / units.deg, zenith_antenna / units.deg, t_theta, t_phi))
+                transmission[iCh, 0] = geo_utl.get_fresnel_t_p(zenith, n_ice, 1)
+                transmission[iCh, 1] = geo_utl.get_fresnel_t_s(zenith, n_ice, 1)
+                logger.info("channel {:d}: electric field is refracted into the firn. theta {:.0f} -> {:.0f}. Transmission coefficient p (eTheta) {:.2f} s (ePhi) {:.2f}".format(iCh, zenith / units.deg, zenith_antenna / units.deg, transmission[iCh, 0], transmission[iCh, 1]))
         else:
             # now the signal is coming from below, do we have an antenna above the surface?
             position = detector.get_relative_position(station.get_id(), channel_id)
@@ -55,12 +66,22 @@ def get_efield_antenna_factor(station, frequencies, channels, detector, zenith,
             logger.warning("fresnel reflection at air-firn boundary leads to unphysical results, no reconstruction possible")
             return None
 
-        logger.debug("angles: zenith {0:.0f}, zenith antenna {1:.0f}, azimuth {2:.0f}".format(np.rad2deg(zenith), np.rad2deg(zenith_antenna), np.rad2deg(azimuth)))
+        logger.debug("angles: zenith {0:.0f}, zenith antenna {1:.0f}, azimuth {2:.0f}".format(np.rad2deg(zenith), np.rad2deg(zenith_antenna), np.rad2deg(azimuths[iCh])))
         antenna_model = detector.get_antenna_model(station.get_id(), channel_id, zenith_antenna)
+        if antenna_model not in antenna_models:
+            antenna_models[antenna_model] = ([], [], [])
+        antenna_models[antenna_model][0].append(iCh)
+        antenna_models[antenna_model][1].append(zenith_antenna)
+        antenna_models[antenna_model][2].append(detector.get_antenna_orientation(station.get_id(), channel_id))
+
+    for antenna_model, (indices, zeniths_antenna, orientations) in antenna_models.items():
         antenna_pattern = antenna_pattern_provider.load_antenna_pattern(antenna_model)
-        ori = detector.get_antenna_orientation(station.get_id(), channel_id)
-        VEL = antenna_pattern.get_antenna_response_vectorized(frequencies, zenith_antenna, azimuth, *ori)
-        efield_antenna_factor[iCh] = np.array([VEL['theta'] * t_theta, VEL['phi'] * t_phi])
+        if antenna_response_cache is None:
+            VEL = antenna_pattern.get_antenna_response_batch(frequencies, zeniths_antenna, azimuths[indices], *np.array(orientations).T)
+        else:
+            VEL = antenna_response_cache.get_antenna_response_batch(antenna_pattern, frequencies, zeniths_antenna,
+                                                                    azimuths[indices], *np.array(orientations).T)
+        efield_antenna_factor[indices] = VEL * transmission[indices][:, :, np.newaxis]
     return efield_antenna_factor
 
 